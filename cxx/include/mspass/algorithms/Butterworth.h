@@ -2,6 +2,7 @@
 #define _MSPASS_BUTTERWORTH_H_
 #include "mspass/seismic/TimeSeries.h"
 #include "mspass/seismic/Seismogram.h"
+#include "mspass/seismic/Ensemble.h"
 #include "mspass/algorithms/deconvolution/ComplexArray.h"
 namespace mspass::algorithms{
 /*! \brief MsPASS implementation of Butterworth filter as processing object.
@@ -258,6 +259,39 @@ public:
   elog
   */
   void apply(mspass::seismic::Seismogram& d);
+  /*! \brief Apply the filter to all the members of a TimeSeries ensemble.
+
+  Filters the data of each live member of d in place.   Each member is
+  filtered with the same result as calling the TimeSeries apply method of a
+  copy of this operator.   That is, automatic sample rate adjustments are made
+  for each member independently and this operator is not altered.   Members
+  are distributed to a set of threads so a large ensemble is filtered using
+  all the cores of a node.  Nothing is done if the ensemble is marked dead.
+
+  \param d ensemble to be filtered - members are altered in place.
+  \param nthreads is the number of threads to use.  When 0 (the default)
+    the number of concurrent threads supported by the hardware is used.
+    The number used is never more than the number of members.
+  \exception none, but as with the TimeSeries method callers should consider
+    checking for errors posted to the elog of the members.
+  */
+  void apply(mspass::seismic::LoggingEnsemble<mspass::seismic::TimeSeries>& d,
+    const int nthreads=0);
+  /*! \brief Apply the filter to all the members of a Seismogram ensemble.
+
+  Filters the data of each live member of d in place.  The behavior is
+  the same as the TimeSeries ensemble method but each member is filtered
+  as by the Seismogram apply method.  Each thread uses a single work buffer
+  for the components of all the members it filters.
+
+  \param d ensemble to be filtered - members are altered in place.
+  \param nthreads is the number of threads to use.  When 0 (the default)
+    the number of concurrent threads supported by the hardware is used.
+  \exception none, but callers should consider checking for errors posted to
+    the elog of the members.
+  */
+  void apply(mspass::seismic::LoggingEnsemble<mspass::seismic::Seismogram>& d,
+    const int nthreads=0);
   /*! \brief Return the response of the filter in the frequency domain.
 
   The impulse response of any linear system can always be characterized by
@@ -369,6 +403,19 @@ private:
   low end of the pass band and high is the high end of the pass band.
   */
 
+  /* Filters the n samples of the buffer d in place.  The core of all
+  the apply methods. */
+  void filter_buffer(const int n, double *d);
+  /* Filters the 3 components of d using work as a buffer for the
+  components.  work is resized if it is too small. */
+  void filter_components(mspass::seismic::CoreSeismogram& d,
+    std::vector<double>& work);
+  /* Implementation of the Seismogram apply method using work as the
+  buffer for the components */
+  void apply_3c(mspass::seismic::Seismogram& d, std::vector<double>& work);
+  /* Common implementation of the ensemble apply methods */
+  template <typename T> void apply_ensemble(mspass::seismic::LoggingEnsemble<T>& d,
+    const int nthreads);
   void bfdesign (double fpass, double apass, double fstop, double astop,
     int *npoles, double *f3db);
   void bfhighcut (int npoles, double f3db, int n, double p[], double q[]);
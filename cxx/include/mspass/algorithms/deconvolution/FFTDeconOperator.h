@@ -14,7 +14,10 @@ The fft based algorithms implemented here us the GNU Scientific Library
 prime factorization fft algorithm.  Those methods require initialization
 given length of the fft to load and store the factorization data.  This
 object holds these for all such methods and recomputes them only when
-needed for efficiency.  */
+needed for efficiency.  The factorization (wavetable) is read only and is
+shared by all operators with the same fft length (see shared_fft_wavetable)
+so constructing an operator for each datum does not recompute it.  Each
+operator has its own workspace.  */
 class FFTDeconOperator
 {
 public:
@@ -54,9 +57,12 @@ public:
 protected:
     int nfft;
     int sample_shift;
-    gsl_fft_complex_wavetable *wavetable;
+    const gsl_fft_complex_wavetable *wavetable;
     gsl_fft_complex_workspace *workspace;
     ComplexArray winv;
+private:
+    void allocate_fft(const int n);
+    void free_fft();
 };
 
 /* This helper is best referenced here */
@@ -74,6 +80,26 @@ protected:
 */
 
 std::vector<double>  circular_shift(const std::vector<double>& d,const int i0);
+/*! \brief Return the GSL fft wavetable for a given fft length.
+
+Computing the factorization and trig tables of the GSL mixed radix fft
+is a significant fraction of the cost of a short fft.   This procedure
+keeps one wavetable for each fft length requested for the life of the
+process and returns the same one on each call.  The number of distinct
+lengths used by a workflow is small (they are normally powers of 2) so
+the memory used is negligible.  A wavetable is read only
+so the returned pointer can be used by any number of threads
+concurrently.   Each thread must, however, use its own workspace.
+This procedure is thread safe.
+
+\param nfft - length of the fft (must be positive)
+\exception MsPASSError is thrown if nfft is not positive or gsl
+  cannot create the wavetable.
+*/
+const gsl_fft_complex_wavetable *shared_fft_wavetable(const int nfft);
+/*! Return the number of wavetables held by the cache used by
+shared_fft_wavetable. */
+int shared_fft_wavetable_count();
 /*! Derive fft length from a time window.
 
 All deconvlution methods using an fft need to define nfft based on the
@@ -160,7 +160,8 @@ private:
   mspass::utility::dmatrix tapers;
   /* Frequency bin interval of last data processed.*/
   double deltaf;
-  gsl_fft_complex_wavetable *wavetable;
+  /* owned by the cache of shared_fft_wavetable */
+  const gsl_fft_complex_wavetable *wavetable;
   gsl_fft_complex_workspace *workspace;
 };
 } //namespace ed
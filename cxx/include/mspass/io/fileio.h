@@ -226,6 +226,8 @@ a mismatch the results are unpredictable.
   TimeSeries objects to be read in the given file.
 \param indexes is a vector of indexes of TimeSeries objects to be read to the 
   ensemble.
+  The members are read in order of increasing foff, not the order of
+  indexes, so the file is read sequentially.
 \param length is the size of the ensemble. It is used to resize the ensemble.
 
 \return total number of samples read for all TimeSeries objects.  Note caller 
@@ -259,6 +261,8 @@ a mismatch the results are unpredictable.
   Seismogram objects to be read in the given file.
 \param indexes is a vector of indexes of Seismogram objects to be read to the 
   ensemble.
+  The members are read in order of increasing foff, not the order of
+  indexes, so the file is read sequentially.
 \param length is the size of the ensemble. It is used to resize the ensemble.
 
 \return total number of samples read for all Seismogram objects.  Note caller 
@@ -2,6 +2,7 @@
 #include <pybind11/stl.h>
 
 #include <mspass/algorithms/amplitudes.h>
+#include "python/utility/release_gil_py.h"
 
 namespace mspass {
 namespace mspasspy {
@@ -17,35 +18,35 @@ PYBIND11_MODULE(amplitudes, m) {
   m.doc() = "A submodule for amplitudes namespace of ccore.algorithms";
 
   /* Amplitude functions - overloads */
-  m.def("PeakAmplitude",py::overload_cast<const CoreTimeSeries&>(&PeakAmplitude),
+  m.def("PeakAmplitude",release_gil_py(py::overload_cast<const CoreTimeSeries&>(&PeakAmplitude)),
     "Compute amplitude as largest absolute amplitude",
     py::return_value_policy::copy,py::arg("d") )
   ;
-  m.def("PeakAmplitude",py::overload_cast<const CoreSeismogram&>(&PeakAmplitude),
+  m.def("PeakAmplitude",release_gil_py(py::overload_cast<const CoreSeismogram&>(&PeakAmplitude)),
     "Compute amplitude as largest vector amplitude",
     py::return_value_policy::copy,py::arg("d") )
   ;
-  m.def("RMSAmplitude",py::overload_cast<const CoreTimeSeries&>(&RMSAmplitude),
+  m.def("RMSAmplitude",release_gil_py(py::overload_cast<const CoreTimeSeries&>(&RMSAmplitude)),
     "Compute amplitude from rms of signal",
     py::return_value_policy::copy,py::arg("d") )
   ;
-  m.def("RMSAmplitude",py::overload_cast<const CoreSeismogram&>(&RMSAmplitude),
+  m.def("RMSAmplitude",release_gil_py(py::overload_cast<const CoreSeismogram&>(&RMSAmplitude)),
     "Compute amplitude as rms on all 3 components",
     py::return_value_policy::copy,py::arg("d") )
   ;
-  m.def("MADAmplitude",py::overload_cast<const CoreTimeSeries&>(&MADAmplitude),
+  m.def("MADAmplitude",release_gil_py(py::overload_cast<const CoreTimeSeries&>(&MADAmplitude)),
     "Compute amplitude from median absolute deviation (MAD) of signal",
     py::return_value_policy::copy,py::arg("d") )
   ;
-  m.def("MADAmplitude",py::overload_cast<const CoreSeismogram&>(&MADAmplitude),
+  m.def("MADAmplitude",release_gil_py(py::overload_cast<const CoreSeismogram&>(&MADAmplitude)),
     "Compute amplitude as median of vector amplitudes",
     py::return_value_policy::copy,py::arg("d") )
   ;
-  m.def("PercAmplitude",py::overload_cast<const CoreTimeSeries&,const double>(&PercAmplitude),
+  m.def("PercAmplitude",release_gil_py(py::overload_cast<const CoreTimeSeries&,const double>(&PercAmplitude)),
     "Compute amplitude of signal using clip percentage metric",
     py::return_value_policy::copy,py::arg("d"),py::arg("perf") )
   ;
-  m.def("PercAmplitude",py::overload_cast<const CoreSeismogram&,const double>(&PercAmplitude),
+  m.def("PercAmplitude",release_gil_py(py::overload_cast<const CoreSeismogram&,const double>(&PercAmplitude)),
     "Compute amplitude of signal using clip percentage metric",
     py::return_value_policy::copy,py::arg("d"),py::arg("perf") )
   ;
@@ -59,46 +60,46 @@ PYBIND11_MODULE(amplitudes, m) {
   a standard hint they are not to be used directly - should be hidden behing
   python functions that simply the api and (more importantly) add an optional
   history preservation. */
-  m.def("_scale",py::overload_cast<Seismogram&,
+  m.def("_scale",release_gil_py(py::overload_cast<Seismogram&,
       const ScalingMethod,
          const double,
-            const TimeWindow>(&scale<Seismogram>),
+            const TimeWindow>(&scale<Seismogram>)),
     "Scale a Seismogram object with a chosen amplitude metric",
     py::return_value_policy::copy,
     py::arg("d"),py::arg("method"),py::arg("level"),py::arg("window") )
   ;
-  m.def("_scale",py::overload_cast<TimeSeries&,
+  m.def("_scale",release_gil_py(py::overload_cast<TimeSeries&,
     const ScalingMethod,
       const double,
-         const TimeWindow>(&scale<TimeSeries>),
+         const TimeWindow>(&scale<TimeSeries>)),
     "Scale a TimeSeries object with a chosen amplitude metric",
     py::return_value_policy::copy,
     py::arg("d"),py::arg("method"),py::arg("level"),py::arg("window") )
   ;
-  m.def("_scale_ensemble_members",py::overload_cast<Ensemble<Seismogram>&,
+  m.def("_scale_ensemble_members",release_gil_py(py::overload_cast<Ensemble<Seismogram>&,
           const ScalingMethod&,
             const double,
-               const TimeWindow>(&scale_ensemble_members<Seismogram>),
+               const TimeWindow>(&scale_ensemble_members<Seismogram>)),
     "Scale each member of a SeismogramEnsemble individually by selected metric",
     py::return_value_policy::copy,
     py::arg("d"),py::arg("method"),py::arg("level"),py::arg("window") )
   ;
-  m.def("_scale_ensemble_members",py::overload_cast<Ensemble<TimeSeries>&,
+  m.def("_scale_ensemble_members",release_gil_py(py::overload_cast<Ensemble<TimeSeries>&,
           const ScalingMethod&,
             const double,
-               const TimeWindow>(&scale_ensemble_members<TimeSeries>),
+               const TimeWindow>(&scale_ensemble_members<TimeSeries>)),
     "Scale each member of a TimeSeriesEnsemble individually by selected metric",
     py::return_value_policy::copy,
     py::arg("d"),py::arg("method"),py::arg("level"),py::arg("window") )
   ;
-  m.def("_scale_ensemble",py::overload_cast<Ensemble<Seismogram>&,
-          const ScalingMethod&, const double, const bool>(&scale_ensemble<Seismogram>),
+  m.def("_scale_ensemble",release_gil_py(py::overload_cast<Ensemble<Seismogram>&,
+          const ScalingMethod&, const double, const bool>(&scale_ensemble<Seismogram>)),
     "Apply a uniform scale to a SeismogramEnsemble using average member estimates by a selected method",
     py::return_value_policy::copy,
     py::arg("d"),py::arg("method"),py::arg("level"),py::arg("use_mean") )
   ;
-  m.def("_scale_ensemble",py::overload_cast<Ensemble<TimeSeries>&,
-          const ScalingMethod&, const double, const bool>(&scale_ensemble<TimeSeries>),
+  m.def("_scale_ensemble",release_gil_py(py::overload_cast<Ensemble<TimeSeries>&,
+          const ScalingMethod&, const double, const bool>(&scale_ensemble<TimeSeries>)),
     "Apply a uniform scale to a TimeSeriesEnsemble using average member estimates by a selected method",
     py::return_value_policy::copy,
     py::arg("d"),py::arg("method"),py::arg("level"),py::arg("use_mean") )
@@ -120,7 +121,7 @@ PYBIND11_MODULE(amplitudes, m) {
     .def_readwrite("f_range",&BandwidthData::f_range,
          "Total frequency range of signal spectrum used for snr estimate")
   ;
-  m.def("EstimateBandwidth",&EstimateBandwidth,"Estimate signal bandwidth estimate of power spectra of signal and noise",
+  m.def("EstimateBandwidth",release_gil_py(&EstimateBandwidth),"Estimate signal bandwidth estimate of power spectra of signal and noise",
     py::return_value_policy::copy,
     py::arg("signal_df"),
     py::arg("signal_power_spectrum"),
@@ -131,7 +132,7 @@ PYBIND11_MODULE(amplitudes, m) {
     py::arg("fix_high_edge_to_fhs")
     )
   ;
-  m.def("BandwidthStatistics",&BandwidthStatistics,
+  m.def("BandwidthStatistics",release_gil_py(&BandwidthStatistics),
       "Compute statistical summary of snr in a passband returned by EstimateBandwidth - Returned in Metadata container",
     py::return_value_policy::copy,
     py::arg("signal_spectrum"),
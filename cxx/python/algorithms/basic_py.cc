@@ -10,6 +10,7 @@
 #include <mspass/algorithms/Taper.h>
 #include <mspass/algorithms/TimeWindow.h>
 #include <mspass/utility/Metadata.h>
+#include "python/utility/release_gil_py.h"
 
 namespace mspass {
 namespace mspasspy {
@@ -80,11 +81,19 @@ PYBIND11_MODULE(basic, m) {
          "Change sample interval defining the operator (does not change corners) ")
     /* Note we intentionally do not overload CoreTimeSeries and CoreSeismogram.
     They do not handle errors as gracefully */
-    .def("apply",py::overload_cast<mspass::seismic::TimeSeries&>
-         (&Butterworth::apply),"Apply the predefined filter to a TimeSeries object")
-    .def("apply",py::overload_cast<mspass::seismic::Seismogram&>
-         (&Butterworth::apply),
+    .def("apply",release_gil_py(py::overload_cast<mspass::seismic::TimeSeries&>
+         (&Butterworth::apply)),"Apply the predefined filter to a TimeSeries object")
+    .def("apply",release_gil_py(py::overload_cast<mspass::seismic::Seismogram&>
+         (&Butterworth::apply)),
          "Apply the predefined filter to a 3c Seismogram object")
+    .def("apply",release_gil_py(py::overload_cast<mspass::seismic::LoggingEnsemble<TimeSeries>&,const int>
+         (&Butterworth::apply)),
+         "Apply the predefined filter to all members of a TimeSeriesEnsemble using multiple threads",
+         py::arg("d"),py::arg("nthreads")=0)
+    .def("apply",release_gil_py(py::overload_cast<mspass::seismic::LoggingEnsemble<Seismogram>&,const int>
+         (&Butterworth::apply)),
+         "Apply the predefined filter to all members of a SeismogramEnsemble using multiple threads",
+         py::arg("d"),py::arg("nthreads")=0)
     .def("dt",&Butterworth::current_dt,
       "Current sample interval used for nondimensionalizing frequencies")
     .def("low_corner",&Butterworth::low_corner,"Return low frequency f3d point")
@@ -99,8 +108,8 @@ PYBIND11_MODULE(basic, m) {
       "Returns True if operator defines a zerophase filter")
   ;
   m.def("ArrivalTimeReference",
-      py::overload_cast<Seismogram&,std::string,TimeWindow>
-          (&ArrivalTimeReference),
+      release_gil_py(py::overload_cast<Seismogram&,std::string,TimeWindow>
+          (&ArrivalTimeReference)),
           "Shifts data so t=0 is a specified arrival time",
       py::return_value_policy::copy,
       py::arg("d"),
@@ -109,8 +118,8 @@ PYBIND11_MODULE(basic, m) {
   );
 
   m.def("ArrivalTimeReference",
-      py::overload_cast<Ensemble<Seismogram>&,std::string,TimeWindow>
-          (&ArrivalTimeReference),
+      release_gil_py(py::overload_cast<Ensemble<Seismogram>&,std::string,TimeWindow>
+          (&ArrivalTimeReference)),
           "Shifts data so t=0 is a specified arrival time",
       py::return_value_policy::copy,
       py::arg("d"),
@@ -120,46 +129,46 @@ PYBIND11_MODULE(basic, m) {
 
   /* overload_cast would not work on this name because of a strange limitation with templated functions
    * used for the Ensemble definition.   */
-  m.def("_ExtractComponent",static_cast<TimeSeries(*)(const Seismogram&,const unsigned int)>(&ExtractComponent),
+  m.def("_ExtractComponent",release_gil_py(static_cast<TimeSeries(*)(const Seismogram&,const unsigned int)>(&ExtractComponent)),
   	"Extract component as a TimeSeries object",
       py::return_value_policy::copy,
       py::arg("tcs"),
       py::arg("component")
   );
 
-  m.def("_ExtractComponent",static_cast<Ensemble<TimeSeries>(*)(const Ensemble<Seismogram>&,const unsigned int)>(&ExtractComponent),
+  m.def("_ExtractComponent",release_gil_py(static_cast<Ensemble<TimeSeries>(*)(const Ensemble<Seismogram>&,const unsigned int)>(&ExtractComponent)),
   	"Extract one component from a 3C ensemble",
       py::return_value_policy::copy,
       py::arg("d"),
       py::arg("component")
   );
 
-  m.def("agc",&agc,"Automatic gain control a Seismogram",
+  m.def("agc",release_gil_py(&agc),"Automatic gain control a Seismogram",
     py::return_value_policy::copy,
     py::arg("d"),
     py::arg("twin") )
   ;
-  m.def("_WindowData",py::overload_cast<const TimeSeries&,const TimeWindow&>(&WindowData),
+  m.def("_WindowData",release_gil_py(py::overload_cast<const TimeSeries&,const TimeWindow&>(&WindowData)),
           "Reduce data to window inside original",
     py::return_value_policy::copy,
     py::arg("d"),
     py::arg("twin") )
   ;
 
-  m.def("_WindowData3C",py::overload_cast<const Seismogram&,const TimeWindow&>(&WindowData),
+  m.def("_WindowData3C",release_gil_py(py::overload_cast<const Seismogram&,const TimeWindow&>(&WindowData)),
               "Reduce data to window inside original",
     py::return_value_policy::copy,
     py::arg("d"),
     py::arg("twin") )
   ;
 
-  m.def("splice_segments",&splice_segments,"Splice a time sorted list of TimeSeries data into a continuous block",
+  m.def("splice_segments",release_gil_py(&splice_segments),"Splice a time sorted list of TimeSeries data into a continuous block",
     py::return_value_policy::copy,
     py::arg("segments"),
     py::arg("save_history")
   );
 
-  m.def("repair_overlaps",&repair_overlaps,"Attempt to remove redundant, matching overlapping data segments",
+  m.def("repair_overlaps",release_gil_py(&repair_overlaps),"Attempt to remove redundant, matching overlapping data segments",
     py::return_value_policy::copy,
     py::arg("segments")
   );
@@ -169,20 +178,20 @@ PYBIND11_MODULE(basic, m) {
   */
   py::module_::import("mspasspy.ccore.seismic");
 
-  m.def("_bundle_seed_data",&bundle_seed_data,
+  m.def("_bundle_seed_data",release_gil_py(&bundle_seed_data),
     "Create SeismogramEnsemble from sorted TimeSeriesEnsemble",
     py::return_value_policy::copy,
     py::arg("d") )
   ;
 
-  m.def("_BundleSEEDGroup",&BundleSEEDGroup,
+  m.def("_BundleSEEDGroup",release_gil_py(&BundleSEEDGroup),
     "Bundle a seed grouping of TimeSeries into one or more Seismogram objects",
     py::return_value_policy::copy,
     py::arg("d"),
     py::arg("i0"),
     py::arg("iend") )
   ;
-  m.def("seed_ensemble_sort",&seed_ensemble_sort,R"mspass_doc(
+  m.def("seed_ensemble_sort",release_gil_py(&seed_ensemble_sort),R"mspass_doc(
       Sort a TimeSeriesEnsemble with a natural order with seed name codes.
 
       The seed standard tags every single miniseed record with four string keys
@@ -246,9 +255,11 @@ PYBIND11_MODULE(basic, m) {
       "Define a ramp taper function")
     .def(py::init<>())
     .def(py::init<const double, const double, const double, const double>())
-    .def("apply",py::overload_cast<TimeSeries&>(&LinearTaper::apply),
+    .def("apply",release_gil_py(py::overload_cast<TimeSeries&>
+         (&LinearTaper::apply)),
       "Apply taper to a scalar TimeSeries object")
-    .def("apply",py::overload_cast<Seismogram&>(&LinearTaper::apply),
+    .def("apply",release_gil_py(py::overload_cast<Seismogram&>
+         (&LinearTaper::apply)),
       "Apply taper to a Seismogram (3C) object")
     .def("get_t0head",&LinearTaper::get_t0head,
       "Return time of end of zero zone - taper sets data with time < this value 0")
@@ -281,8 +292,10 @@ PYBIND11_MODULE(basic, m) {
       "Define a taper using a half period cosine function")
     .def(py::init<>())
     .def(py::init<const double, const double, const double, const double>())
-    .def("apply",py::overload_cast<TimeSeries&>(&CosineTaper::apply),"Apply taper to a scalar TimeSeries object")
-    .def("apply",py::overload_cast<Seismogram&>(&CosineTaper::apply),"Apply taper to a Seismogram (3C) object")
+    .def("apply",release_gil_py(py::overload_cast<TimeSeries&>
+         (&CosineTaper::apply)),"Apply taper to a scalar TimeSeries object")
+    .def("apply",release_gil_py(py::overload_cast<Seismogram&>
+         (&CosineTaper::apply)),"Apply taper to a Seismogram (3C) object")
     .def("get_t0head",&CosineTaper::get_t0head,
       "Return time of end of zero zone - taper sets data with time < this value 0")
     .def("get_t1head",&CosineTaper::get_t1head,
@@ -314,9 +327,11 @@ PYBIND11_MODULE(basic, m) {
       "Define generic taper function with a parallel vector of weights")
     .def(py::init<>())
     .def(py::init<const std::vector<double>>())
-    .def("apply",py::overload_cast<TimeSeries&>(&VectorTaper::apply),
+    .def("apply",release_gil_py(py::overload_cast<TimeSeries&>
+         (&VectorTaper::apply)),
       "Apply taper to a scalar TimeSeries object")
-    .def("apply",py::overload_cast<Seismogram&>(&VectorTaper::apply),
+    .def("apply",release_gil_py(py::overload_cast<Seismogram&>
+         (&VectorTaper::apply)),
         "Apply taper to a Seismogram (3C) object")
     .def(py::pickle(
       [](const VectorTaper& self)
@@ -342,9 +357,11 @@ PYBIND11_MODULE(basic, m) {
     .def(py::init<>())
     .def(py::init<const double, const double, const std::string>())
     .def(py::init<const TopMute&>())
-    .def("apply",py::overload_cast<TimeSeries&>(&TopMute::apply),
+    .def("apply",release_gil_py(py::overload_cast<TimeSeries&>
+         (&TopMute::apply)),
       "Apply to a TimeSeries object")
-    .def("apply",py::overload_cast<Seismogram&>(&TopMute::apply),
+    .def("apply",release_gil_py(py::overload_cast<Seismogram&>
+         (&TopMute::apply)),
       "Apply to a Seismogram object")
     .def("get_t0",&TopMute::get_t0,
       "Return the zero end time for marking the start of the mute")
@@ -11,6 +11,7 @@
 #include <mspass/algorithms/deconvolution/MultiTaperSpecDivDecon.h>
 #include <mspass/algorithms/deconvolution/GeneralIterDecon.h>
 #include <mspass/algorithms/deconvolution/CNR3CDecon.h>
+#include "python/utility/release_gil_py.h"
 PYBIND11_MAKE_OPAQUE(std::vector<double>);
 
 
@@ -93,49 +94,49 @@ PYBIND11_MODULE(deconvolution, m) {
 
   /* this is a set of deconvolution related classes*/
   py::class_<ScalarDecon,PyScalarDecon>(m,"ScalarDecon","Base class for scalar TimeSeries data")
-    .def("load",&ScalarDecon::load,
+    .def("load",release_gil_py(&ScalarDecon::load),
     py::arg("w"),py::arg("d"),"Load data and wavelet to use to construct deconvolutions operator")
-    .def("loaddata",&ScalarDecon::loaddata,py::arg("d"))
-    .def("loadwavelet",&ScalarDecon::loadwavelet,py::arg("w"))
-    .def("process",&ScalarDecon::process)
+    .def("loaddata",release_gil_py(&ScalarDecon::loaddata),py::arg("d"))
+    .def("loadwavelet",release_gil_py(&ScalarDecon::loadwavelet),py::arg("w"))
+    .def("process",release_gil_py(&ScalarDecon::process))
     .def("getresult",&ScalarDecon::getresult,
             "Fetch vector of deconvolved data - after calling process")
     .def("change_parameter",&ScalarDecon::changeparameter,"Change deconvolution parameters")
     .def("change_shaping_wavelet",&ScalarDecon::change_shaping_wavelet,
             "Change the shaping wavelet applied to output")
-    .def("actual_output",&ScalarDecon::actual_output,"Return actual output of inverse*wavelet")
+    .def("actual_output",release_gil_py(&ScalarDecon::actual_output),"Return actual output of inverse*wavelet")
     .def("ideal_output",&ScalarDecon::ideal_output,"Return ideal output of for inverse")
-    .def("inverse_wavelet",py::overload_cast<>(&ScalarDecon::inverse_wavelet))
-    .def("inverse_wavelet",py::overload_cast<double>(&ScalarDecon::inverse_wavelet))
+    .def("inverse_wavelet",release_gil_py(py::overload_cast<>(&ScalarDecon::inverse_wavelet)))
+    .def("inverse_wavelet",release_gil_py(py::overload_cast<double>(&ScalarDecon::inverse_wavelet)))
     .def("QCMetrics",&ScalarDecon::QCMetrics,"Return ideal output of for inverse")
   ;
   py::class_<WaterLevelDecon,ScalarDecon>(m,"WaterLevelDecon","Water level frequency domain operator")
     .def(py::init<const Metadata>())
     .def("changeparameter",&WaterLevelDecon::changeparameter,"Change operator parameters")
-    .def("process",&WaterLevelDecon::process,"Process previously loaded data")
-    .def("actual_output",&WaterLevelDecon::actual_output,"Return actual output of inverse*wavelet")
-    .def("inverse_wavelet",py::overload_cast<>(&WaterLevelDecon::inverse_wavelet))
-    .def("inverse_wavelet",py::overload_cast<double>(&WaterLevelDecon::inverse_wavelet))
+    .def("process",release_gil_py(&WaterLevelDecon::process),"Process previously loaded data")
+    .def("actual_output",release_gil_py(&WaterLevelDecon::actual_output),"Return actual output of inverse*wavelet")
+    .def("inverse_wavelet",release_gil_py(py::overload_cast<>(&WaterLevelDecon::inverse_wavelet)))
+    .def("inverse_wavelet",release_gil_py(py::overload_cast<double>(&WaterLevelDecon::inverse_wavelet)))
     .def("QCMetrics",&WaterLevelDecon::QCMetrics,"Return ideal output of for inverse")
   ;
   py::class_<LeastSquareDecon,ScalarDecon>(m,"LeastSquareDecon","Water level frequency domain operator")
     .def(py::init<const Metadata>())
     .def("changeparameter",&LeastSquareDecon::changeparameter,"Change operator parameters")
-    .def("process",&LeastSquareDecon::process,"Process previously loaded data")
-    .def("actual_output",&LeastSquareDecon::actual_output,"Return actual output of inverse*wavelet")
-    .def("inverse_wavelet",py::overload_cast<>(&LeastSquareDecon::inverse_wavelet))
-    .def("inverse_wavelet",py::overload_cast<double>(&LeastSquareDecon::inverse_wavelet))
+    .def("process",release_gil_py(&LeastSquareDecon::process),"Process previously loaded data")
+    .def("actual_output",release_gil_py(&LeastSquareDecon::actual_output),"Return actual output of inverse*wavelet")
+    .def("inverse_wavelet",release_gil_py(py::overload_cast<>(&LeastSquareDecon::inverse_wavelet)))
+    .def("inverse_wavelet",release_gil_py(py::overload_cast<double>(&LeastSquareDecon::inverse_wavelet)))
     .def("QCMetrics",&LeastSquareDecon::QCMetrics,"Return ideal output of for inverse")
   ;
   py::class_<MultiTaperSpecDivDecon,ScalarDecon>(m,"MultiTaperSpecDivDecon","Water level frequency domain operator")
     .def(py::init<const Metadata>())
     .def("changeparameter",&MultiTaperSpecDivDecon::changeparameter,"Change operator parameters")
-    .def("process",&MultiTaperSpecDivDecon::process,"Process previously loaded data")
-    .def("loadnoise",&MultiTaperSpecDivDecon::loadnoise,"Load noise data for regularization")
-    .def("load",&MultiTaperSpecDivDecon::load,"Load all data, wavelet, and noise")
-    .def("actual_output",&MultiTaperSpecDivDecon::actual_output,"Return actual output of inverse*wavelet")
-    .def("inverse_wavelet",py::overload_cast<>(&MultiTaperSpecDivDecon::inverse_wavelet))
-    .def("inverse_wavelet",py::overload_cast<double>(&MultiTaperSpecDivDecon::inverse_wavelet))
+    .def("process",release_gil_py(&MultiTaperSpecDivDecon::process),"Process previously loaded data")
+    .def("loadnoise",release_gil_py(&MultiTaperSpecDivDecon::loadnoise),"Load noise data for regularization")
+    .def("load",release_gil_py(&MultiTaperSpecDivDecon::load),"Load all data, wavelet, and noise")
+    .def("actual_output",release_gil_py(&MultiTaperSpecDivDecon::actual_output),"Return actual output of inverse*wavelet")
+    .def("inverse_wavelet",release_gil_py(py::overload_cast<>(&MultiTaperSpecDivDecon::inverse_wavelet)))
+    .def("inverse_wavelet",release_gil_py(py::overload_cast<double>(&MultiTaperSpecDivDecon::inverse_wavelet)))
     .def("QCMetrics",&MultiTaperSpecDivDecon::QCMetrics,"Return ideal output of for inverse")
     .def("get_taperlen",&MultiTaperSpecDivDecon::get_taperlen,"Get length of the Slepian tapers used by the operator")
     .def("get_number_tapers",&MultiTaperSpecDivDecon::get_number_tapers,"Get number of Slepian tapers used by the operator")
@@ -152,12 +153,12 @@ PYBIND11_MODULE(deconvolution, m) {
   py::class_<MultiTaperXcorDecon,ScalarDecon>(m,"MultiTaperXcorDecon","Water level frequency domain operator")
     .def(py::init<const Metadata>())
     .def("changeparameter",&MultiTaperXcorDecon::changeparameter,"Change operator parameters")
-    .def("process",&MultiTaperXcorDecon::process,"Process previously loaded data")
-    .def("loadnoise",&MultiTaperXcorDecon::loadnoise,"Load noise data for regularization")
-    .def("load",&MultiTaperXcorDecon::load,"Load all data, wavelet, and noise")
-    .def("actual_output",&MultiTaperXcorDecon::actual_output,"Return actual output of inverse*wavelet")
-    .def("inverse_wavelet",py::overload_cast<>(&MultiTaperXcorDecon::inverse_wavelet))
-    .def("inverse_wavelet",py::overload_cast<double>(&MultiTaperXcorDecon::inverse_wavelet))
+    .def("process",release_gil_py(&MultiTaperXcorDecon::process),"Process previously loaded data")
+    .def("loadnoise",release_gil_py(&MultiTaperXcorDecon::loadnoise),"Load noise data for regularization")
+    .def("load",release_gil_py(&MultiTaperXcorDecon::load),"Load all data, wavelet, and noise")
+    .def("actual_output",release_gil_py(&MultiTaperXcorDecon::actual_output),"Return actual output of inverse*wavelet")
+    .def("inverse_wavelet",release_gil_py(py::overload_cast<>(&MultiTaperXcorDecon::inverse_wavelet)))
+    .def("inverse_wavelet",release_gil_py(py::overload_cast<double>(&MultiTaperXcorDecon::inverse_wavelet)))
     .def("QCMetrics",&MultiTaperXcorDecon::QCMetrics,"Return ideal output of for inverse")
     .def("get_taperlen",&MultiTaperXcorDecon::get_taperlen,"Get length of the Slepian tapers used by the operator")
     .def("get_number_tapers",&MultiTaperXcorDecon::get_number_tapers,"Get number of Slepian tapers used by the operator")
@@ -187,25 +188,25 @@ PYBIND11_MODULE(deconvolution, m) {
     .def(py::init<const CNR3CDecon&>())
     .def("change_parameters",&CNR3CDecon::change_parameters,
         "Change operator definition")
-    .def("loaddata",py::overload_cast<Seismogram&,const int,const bool>(&CNR3CDecon::loaddata),
+    .def("loaddata",release_gil_py(py::overload_cast<Seismogram&,const int,const bool>(&CNR3CDecon::loaddata)),
         "Load data defining wavelet by one data component")
-    .def("loaddata",py::overload_cast<Seismogram&,const bool>(&CNR3CDecon::loaddata),
+    .def("loaddata",release_gil_py(py::overload_cast<Seismogram&,const bool>(&CNR3CDecon::loaddata)),
         "Load data only with optional noise")
-    .def("loadnoise_data",py::overload_cast<const Seismogram&>(&CNR3CDecon::loadnoise_data),
+    .def("loadnoise_data",release_gil_py(py::overload_cast<const Seismogram&>(&CNR3CDecon::loadnoise_data)),
         "Load noise to use for regularization from a seismogram")
-    .def("loadnoise_data",py::overload_cast<const PowerSpectrum&>(&CNR3CDecon::loadnoise_data),
+    .def("loadnoise_data",release_gil_py(py::overload_cast<const PowerSpectrum&>(&CNR3CDecon::loadnoise_data)),
         "Load noise to use for regularization from a seismogram")
-    .def("loadnoise_wavelet",py::overload_cast<const TimeSeries&>(&CNR3CDecon::loadnoise_wavelet),
+    .def("loadnoise_wavelet",release_gil_py(py::overload_cast<const TimeSeries&>(&CNR3CDecon::loadnoise_wavelet)),
         "Load noise to use for regularization from a seismogram")
-    .def("loadnoise_wavelet",py::overload_cast<const PowerSpectrum&>(&CNR3CDecon::loadnoise_wavelet),
+    .def("loadnoise_wavelet",release_gil_py(py::overload_cast<const PowerSpectrum&>(&CNR3CDecon::loadnoise_wavelet)),
         "Load noise to use for regularization from a seismogram")
-    .def("loadwavelet",&CNR3CDecon::loadwavelet,
+    .def("loadwavelet",release_gil_py(&CNR3CDecon::loadwavelet),
         "Load an externally determined wavelet for deconvolution")
-    .def("process",&CNR3CDecon::process,"Process data previously loaded")
+    .def("process",release_gil_py(&CNR3CDecon::process),"Process data previously loaded")
     .def("ideal_output",&CNR3CDecon::ideal_output,
         "Return ideal output for this operator")
-    .def("actual_output",&CNR3CDecon::actual_output,"Return actual output computed for current wavelet")
-    .def("inverse_wavelet",&CNR3CDecon::inverse_wavelet,
+    .def("actual_output",release_gil_py(&CNR3CDecon::actual_output),"Return actual output computed for current wavelet")
+    .def("inverse_wavelet",release_gil_py(&CNR3CDecon::inverse_wavelet),
         "Return time domain form of inverse wavelet")
     .def("QCMetrics",&CNR3CDecon::QCMetrics,
         "Return set of quality control metrics for this operator")
@@ -227,9 +228,9 @@ PYBIND11_MODULE(deconvolution, m) {
     .def(py::init<const int, const double, const int>(),
         "Parameterized constructor:  nsamples, tbp, ntapers(nfft=2*nsamples, dt=1.0")
     .def(py::init<const MTPowerSpectrumEngine&>(),"Copy constructor")
-    .def("apply",py::overload_cast<const mspass::seismic::TimeSeries&>(&MTPowerSpectrumEngine::apply),
+    .def("apply",release_gil_py(py::overload_cast<const mspass::seismic::TimeSeries&>(&MTPowerSpectrumEngine::apply)),
       "Compute from data in a TimeSeries container")
-    .def("apply",py::overload_cast<const std::vector<double>&>(&MTPowerSpectrumEngine::apply),
+    .def("apply",release_gil_py(py::overload_cast<const std::vector<double>&>(&MTPowerSpectrumEngine::apply)),
       "Compute from data stored in a simple vector container")
     .def("df",&MTPowerSpectrumEngine::df,"Return frequency bin size")
     .def("taper_length",&MTPowerSpectrumEngine::taper_length,
@@ -265,11 +266,14 @@ PYBIND11_MODULE(deconvolution, m) {
       }
     ))
   ;
-  m.def("circular_shift",&circular_shift,"Time-domain circular shift operator",
+  m.def("circular_shift",release_gil_py(&circular_shift),"Time-domain circular shift operator",
       py::return_value_policy::copy,
       py::arg("d"),
       py::arg("i0") )
     ;
+  m.def("shared_fft_wavetable_count",&shared_fft_wavetable_count,
+      "Return the number of fft lengths with a wavetable held by the cache shared by all fft based operators")
+    ;
 }
 
 } // namespace mspasspy
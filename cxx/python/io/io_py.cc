@@ -9,6 +9,7 @@
 #include "mspass/io/fileio.h"
 #include "mspass/seismic/TimeSeries.h"
 #include "mspass/seismic/Seismogram.h"
+#include "python/utility/release_gil_py.h"
 /*  these are supposed to be included from fileio.h - temporary for testing only*/
 namespace mspass::io {
 
@@ -66,7 +67,7 @@ PYBIND11_MODULE(io,m){
     .def_readwrite("last_packet_time",&mseed_index::last_packet_time,
       "Time tag of last packe of data in this block - less than endtime")
     ;
-  m.def("_mseed_file_indexer",&mseed_file_indexer,
+  m.def("_mseed_file_indexer",release_gil_py(&mseed_file_indexer),
     "Builds an index for a miniseed file returning std::pair with index and ErrorLogger object",
     py::return_value_policy::copy,
     py::arg("file"),
@@ -74,32 +75,32 @@ PYBIND11_MODULE(io,m){
     py::arg("verbose") = false
     )
   ;
- m.def("_fwrite_to_file",py::overload_cast<mspass::seismic::Seismogram&,
-    const std::string,const std::string>(&fwrite_to_file),
+ m.def("_fwrite_to_file",release_gil_py(py::overload_cast<mspass::seismic::Seismogram&,
+    const std::string,const std::string>(&fwrite_to_file)),
     "Open and read sample data for native format std::vector<double> container",
     py::return_value_policy::copy,
     py::arg("d"),
     py::arg("dir"),
     py::arg("dfile")
   );
-  m.def("_fwrite_to_file",py::overload_cast<mspass::seismic::TimeSeries&,
-     const std::string,const std::string>(&fwrite_to_file),
+  m.def("_fwrite_to_file",release_gil_py(py::overload_cast<mspass::seismic::TimeSeries&,
+     const std::string,const std::string>(&fwrite_to_file)),
      "Open and read sample data for native format dmatrix container",
      py::return_value_policy::copy,
      py::arg("d"),
      py::arg("dir"),
      py::arg("dfile")
    );
-  m.def("_fwrite_to_file",py::overload_cast<mspass::seismic::LoggingEnsemble<mspass::seismic::Seismogram>&,
-    const std::string,const std::string>(&fwrite_to_file),
+  m.def("_fwrite_to_file",release_gil_py(py::overload_cast<mspass::seismic::LoggingEnsemble<mspass::seismic::Seismogram>&,
+    const std::string,const std::string>(&fwrite_to_file)),
     "Write data for format Ensemble<Seismogram> to one file",
     py::return_value_policy::copy,
     py::arg("d"),
     py::arg("dir"),
     py::arg("dfile")
   );
-  m.def("_fwrite_to_file",py::overload_cast<mspass::seismic::LoggingEnsemble<mspass::seismic::TimeSeries>&,
-    const std::string,const std::string>(&fwrite_to_file),
+  m.def("_fwrite_to_file",release_gil_py(py::overload_cast<mspass::seismic::LoggingEnsemble<mspass::seismic::TimeSeries>&,
+    const std::string,const std::string>(&fwrite_to_file)),
     "Write data for format Ensemble<TimeSeries> to one file",
     py::return_value_policy::copy,
     py::arg("d"),
@@ -107,8 +108,8 @@ PYBIND11_MODULE(io,m){
     py::arg("dfile")
   );
    m.def("_fread_from_file",
-      py::overload_cast<mspass::seismic::TimeSeries&,
-         const std::string,const std::string,const long int>(&fread_from_file),
+      release_gil_py(py::overload_cast<mspass::seismic::TimeSeries&,
+         const std::string,const std::string,const long int>(&fread_from_file)),
       "Read the sample data for a TimeSeries object from a file as native doubles",
      py::arg("d"),
      py::arg("dir"),
@@ -116,8 +117,8 @@ PYBIND11_MODULE(io,m){
      py::arg("foff")
    );
    m.def("_fread_from_file",
-      py::overload_cast<mspass::seismic::Seismogram&,
-         const std::string,const std::string,const long int>(&fread_from_file),
+      release_gil_py(py::overload_cast<mspass::seismic::Seismogram&,
+         const std::string,const std::string,const long int>(&fread_from_file)),
       "Read the sample data for a Seismogram object from a file as native doubles",
      py::arg("d"),
      py::arg("dir"),
@@ -125,8 +126,8 @@ PYBIND11_MODULE(io,m){
      py::arg("foff")
    );
    m.def("_fread_from_file",
-      py::overload_cast<mspass::seismic::LoggingEnsemble<mspass::seismic::TimeSeries>&,
-        const std::string,const std::string,std::vector<long int>>(&fread_from_file),
+      release_gil_py(py::overload_cast<mspass::seismic::LoggingEnsemble<mspass::seismic::TimeSeries>&,
+        const std::string,const std::string,std::vector<long int>>(&fread_from_file)),
       "Read the sample data for a TimeSeriesEnsemble object from files as native doubles",
      py::arg("de"),
      py::arg("dir"),
@@ -134,8 +135,8 @@ PYBIND11_MODULE(io,m){
      py::arg("indexes")
    );
    m.def("_fread_from_file",
-      py::overload_cast<mspass::seismic::LoggingEnsemble<mspass::seismic::Seismogram>&,
-         const std::string,const std::string,std::vector<long int>>(&fread_from_file),
+      release_gil_py(py::overload_cast<mspass::seismic::LoggingEnsemble<mspass::seismic::Seismogram>&,
+         const std::string,const std::string,std::vector<long int>>(&fread_from_file)),
       "Read the sample data for a SeismogramEnsemble object from files as native doubles",
      py::arg("de"),
      py::arg("dir"),
@@ -6,6 +6,9 @@
 #include <pybind11/embed.h>
 
 #include <boost/archive/text_oarchive.hpp>
+#include <boost/archive/text_iarchive.hpp>
+#include <boost/archive/binary_oarchive.hpp>
+#include <boost/archive/binary_iarchive.hpp>
 
 #include <mspass/seismic/keywords.h>
 #include <mspass/seismic/SlownessVector.h>
@@ -153,6 +156,100 @@ public:
   }
 };
 
+/* Helpers for the pickle interface.  The data object attributes handled by
+boost serialization are written with a binary archive and returned as python
+bytes.  Older pickles used text archives returned as python str, so the
+restore function dispatches on the python type to keep those readable. */
+template <typename T> py::bytes archive_py(const T& obj)
+{
+  std::ostringstream ss;
+  boost::archive::binary_oarchive ar(ss, boost::archive::no_header);
+  ar << obj;
+  return py::bytes(ss.str());
+}
+template <typename T> void restore_archive_py(const py::handle buf, T& obj)
+{
+  std::istringstream ss(buf.cast<std::string>());
+  if(py::isinstance<py::bytes>(buf))
+  {
+    boost::archive::binary_iarchive ar(ss, boost::archive::no_header);
+    ar >> obj;
+  }
+  else
+  {
+    boost::archive::text_iarchive ar(ss);
+    ar >> obj;
+  }
+}
+/* Returns a numpy array that aliases a sample buffer owned by the C++
+object wrapped by owner.  The owner is set as the array base so the buffer
+stays valid for the life of the array.  That allows pickle protocol 5 to
+hand the samples to a buffer_callback out-of-band without any copy. */
+py::array_t<double> sample_buffer_py(const double *ptr, const size_t n,
+  py::handle owner)
+{
+  if(n==0) return py::array_t<double>(0);
+  return py::array_t<double>(n, ptr, owner);
+}
+/* The inverse of sample_buffer_py.   The array restored by pickle is returned
+as a contiguous double array (converting only if necessary) for the caller
+to copy into the data object. */
+py::array_t<double, py::array::c_style | py::array::forcecast>
+  sample_array_py(const py::handle buf)
+{
+  auto darr=py::array_t<double, py::array::c_style | py::array::forcecast>::ensure(buf);
+  if(!darr)
+    throw MsPASSError("pickle restore:  sample buffer is not a numeric array",
+      ErrorSeverity::Invalid);
+  return darr;
+}
+
+/* Pickle state for LoggingEnsemble<Tdata>.  The members are returned as a
+python list of references to the ensemble members rather than a nested
+pickle string.  pickle then serializes each member inline with the same
+protocol, which lets protocol 5 pass all the member sample buffers
+out-of-band in one pass and avoids holding an extra copy of every member
+as bytes. */
+template <typename Tdata> py::tuple ensemble_getstate_py(const LoggingEnsemble<Tdata>& self)
+{
+  pybind11::object sbuf;
+  sbuf=serialize_metadata_py(self);
+  py::bytes elogbuf=archive_py(self.elog);
+  py::object owner=py::cast(&self, py::return_value_policy::reference);
+  py::list dlist(self.member.size());
+  for(size_t i=0;i<self.member.size();++i)
+    dlist[i]=py::cast(&(self.member[i]),
+      py::return_value_policy::reference_internal, owner);
+  bool is_live=self.live();
+  return py::make_tuple(sbuf, elogbuf, is_live, dlist);
+}
+template <typename Tdata> LoggingEnsemble<Tdata> ensemble_setstate_py(py::tuple t)
+{
+  pybind11::object sbuf=t[0];
+  Metadata md=restore_serialized_metadata_py(sbuf);
+  ErrorLogger elog;
+  restore_archive_py(t[1],elog);
+  py::list dlist;
+  /* Older pickles hold the member list as a nested pickle string */
+  if(py::isinstance<py::list>(t[3]))
+    dlist=t[3];
+  else
+    dlist=py::module_::import("pickle").attr("loads")(t[3]);
+  LoggingEnsemble<Tdata> result(md, elog, 0);
+  result.member.reserve(dlist.size());
+  for(auto d : dlist)
+    result.member.push_back(d.cast<const Tdata&>());
+  bool is_live = t[2].cast<bool>();
+  if(is_live)
+    result.set_live();
+  else
+    /* this kill is not really necessary with the current implmentation
+    The constructor we use here set ensmeble dead by default.  For
+    a tiny cost we make this more robust by forcing a kill here */
+    result.kill();
+  return result;
+}
+
 PYBIND11_MODULE(seismic, m) {
   m.attr("__name__") = "mspasspy.ccore.seismic";
   m.doc() = "A submodule for seismic namespace of ccore";
@@ -426,62 +523,44 @@ PYBIND11_MODULE(seismic, m) {
       [](const Seismogram &self) {
         pybind11::object sbuf;
         sbuf=serialize_metadata_py(self);
-        stringstream ssbts;
-        ssbts << std::setprecision(17);
-        boost::archive::text_oarchive arbts(ssbts);
-        arbts << dynamic_cast<const BasicTimeSeries&>(self);
-        stringstream sscorets;
-        boost::archive::text_oarchive arcorets(sscorets);
-        arcorets<<dynamic_cast<const ProcessingHistory&>(self);
+        py::bytes btsbuf=archive_py(dynamic_cast<const BasicTimeSeries&>(self));
+        py::bytes histbuf=archive_py(dynamic_cast<const ProcessingHistory&>(self));
         // these are behind getter/setters
         bool cardinal=self.cardinal();
         bool orthogonal=self.orthogonal();
-        dmatrix tmatrix=self.get_transformation_matrix();
-        stringstream sstm;
-        boost::archive::text_oarchive artm(sstm);
-        artm<<tmatrix;
-        //This creates a numpy array alias from the vector container
-        //without a move or copy of the data
+        py::bytes tmbuf=archive_py(self.get_transformation_matrix());
+        /* The sample array is an alias of the dmatrix buffer.  With
+        protocol 5 pickle passes it out-of-band; older protocols copy it. */
         size_t u_size = self.u.rows()*self.u.columns();
-        if(u_size==0){
-          py::array_t<double, py::array::f_style> darr(u_size,NULL);
-          return py::make_tuple(sbuf,ssbts.str(),sscorets.str(),
-            cardinal, orthogonal,sstm.str(),
-            u_size, darr);
-        } else {
-          py::array_t<double, py::array::f_style> darr(u_size,self.u.get_address(0,0));
-          return py::make_tuple(sbuf,ssbts.str(),sscorets.str(),
-            cardinal, orthogonal,sstm.str(),
-            u_size, darr);
-        }
+        py::object owner=py::cast(&self, py::return_value_policy::reference);
+        py::array_t<double> darr=sample_buffer_py(
+          u_size==0 ? NULL : self.u.get_address(0,0), u_size, owner);
+        return py::make_tuple(sbuf,btsbuf,histbuf,
+          cardinal, orthogonal,tmbuf,
+          u_size, darr);
       },
       [](py::tuple t) {
         pybind11::object sbuf=t[0];
         Metadata md=restore_serialized_metadata_py(sbuf);
-        stringstream ssbts(t[1].cast<std::string>());
-        boost::archive::text_iarchive arbts(ssbts);
         BasicTimeSeries bts;
-        arbts>>bts;
-        stringstream sscorets(t[2].cast<std::string>());
-        boost::archive::text_iarchive arcorets(sscorets);
+        restore_archive_py(t[1],bts);
         ProcessingHistory corets;
-        arcorets>>corets;
+        restore_archive_py(t[2],corets);
         bool cardinal=t[3].cast<bool>();
         bool orthogonal=t[4].cast<bool>();
-        stringstream sstm(t[5].cast<std::string>());
-        boost::archive::text_iarchive artm(sstm);
         dmatrix tmatrix;
-        artm>>tmatrix;
+        restore_archive_py(t[5],tmatrix);
         size_t u_size = t[6].cast<size_t>();
-        py::array_t<double, py::array::f_style> darr;
-        darr=t[7].cast<py::array_t<double, py::array::f_style>>();
-        py::buffer_info info = darr.request();
         if(u_size==0) {
           dmatrix u;
           return Seismogram(bts,md,corets,cardinal,orthogonal,tmatrix,u);
         } else {
+          auto darr=sample_array_py(t[7]);
+          if(static_cast<size_t>(darr.size())!=u_size)
+            throw MsPASSError("Seismogram pickle restore:  sample buffer size does not match the pickled size",
+              ErrorSeverity::Invalid);
           dmatrix u(3, u_size/3);
-          memcpy(u.get_address(0,0), info.ptr, sizeof(double) * u_size);
+          memcpy(u.get_address(0,0), darr.data(), sizeof(double) * u_size);
           return Seismogram(bts,md,corets,cardinal,orthogonal,tmatrix,u);
         }
      }
@@ -543,39 +622,27 @@ PYBIND11_MODULE(seismic, m) {
         [](const TimeSeries &self) {
           pybind11::object sbuf;
           sbuf=serialize_metadata_py(self);
-          stringstream ssbts;
-          ssbts << std::setprecision(17);
-          boost::archive::text_oarchive arbts(ssbts);
-          arbts << dynamic_cast<const BasicTimeSeries&>(self);
-          stringstream sscorets;
-          boost::archive::text_oarchive arcorets(sscorets);
-          arcorets<<dynamic_cast<const ProcessingHistory&>(self);
-          //This creates a numpy array alias from the vector container
-          //without a move or copy of the data
-          py::array_t<double, py::array::f_style> darr(self.s.size(),&(self.s[0]));
-          return py::make_tuple(sbuf,ssbts.str(),sscorets.str(),darr);
+          py::bytes btsbuf=archive_py(dynamic_cast<const BasicTimeSeries&>(self));
+          py::bytes histbuf=archive_py(dynamic_cast<const ProcessingHistory&>(self));
+          /* This creates a numpy array alias of the vector container
+          without a move or copy of the data.  With protocol 5 pickle
+          passes it out-of-band; older protocols copy it. */
+          py::object owner=py::cast(&self, py::return_value_policy::reference);
+          py::array_t<double> darr=sample_buffer_py(self.s.data(),self.s.size(),owner);
+          return py::make_tuple(sbuf,btsbuf,histbuf,darr);
         },
         [](py::tuple t) {
          pybind11::object sbuf=t[0];
          Metadata md=restore_serialized_metadata_py(sbuf);
-         stringstream ssbts(t[1].cast<std::string>());
-         boost::archive::text_iarchive arbts(ssbts);
          BasicTimeSeries bts;
-         arbts>>bts;
-         stringstream sscorets(t[2].cast<std::string>());
-         boost::archive::text_iarchive arcorets(sscorets);
+         restore_archive_py(t[1],bts);
          ProcessingHistory corets;
-         arcorets>>corets;
-         // There might be a faster way to do this than a copy like
-         //this but for now this, like Seismogram, is make it work before you
-         //make it fast
-         py::array_t<double, py::array::f_style> darr;
-         darr=t[3].cast<py::array_t<double, py::array::f_style>>();
-         py::buffer_info info = darr.request();
-         std::vector<double> d;
-         d.resize(info.shape[0]);
-         memcpy(d.data(), info.ptr, sizeof(double) * d.size());
-         return TimeSeries(bts,md,corets,d);;
+         restore_archive_py(t[2],corets);
+         /* One copy from the (possibly out-of-band) buffer into the
+         vector is unavoidable as TimeSeries owns its sample vector */
+         auto darr=sample_array_py(t[3]);
+         std::vector<double> d(darr.data(),darr.data()+darr.size());
+         return TimeSeries(bts,md,corets,d);
        }
      ))
      ;
@@ -700,58 +767,11 @@ PYBIND11_MODULE(seismic, m) {
     .def_readwrite("elog",&LoggingEnsemble<Seismogram>::elog,"Error log attached to the ensemble - not the same as member error logs")
     .def(py::pickle(
       [](const LoggingEnsemble<Seismogram> &self) {
-        pybind11::gil_scoped_acquire acquire;
-        try{
-          pybind11::object sbuf;
-          sbuf=serialize_metadata_py(self);
-          stringstream sselog;
-          boost::archive::text_oarchive arelog(sselog);
-          arelog << self.elog;
-          pybind11::module pickle = pybind11::module::import("pickle");
-          pybind11::object dumps = pickle.attr("dumps");
-          pybind11::object dbuf = dumps(py::list(pybind11::cast(self.member)));
-          bool is_live=self.live();
-          pybind11::tuple r_tuple = py::make_tuple(sbuf, sselog.str(), is_live, dbuf);
-          pybind11::gil_scoped_release release;
-          return r_tuple;
-        }catch(...){pybind11::gil_scoped_release release;throw;};
+        return ensemble_getstate_py<Seismogram>(self);
       },
       [](py::tuple t) {
-        pybind11::gil_scoped_acquire acquire;
-        try{
-          pybind11::object sbuf=t[0];
-          Metadata md=restore_serialized_metadata_py(sbuf);
-          ErrorLogger elog;
-          stringstream sselog(t[1].cast<std::string>());
-          boost::archive::text_iarchive arelog(sselog);;
-          arelog>>elog;
-          pybind11::module pickle = pybind11::module::import("pickle");
-          pybind11::object loads = pickle.attr("loads");
-          /* This algorithm is a horrible memory pig because it has to
-          hold both a copy of the monster list of strings of pickled
-          data members and the reconstituted C++ data objects (ensemble
-          members).  Need to see if we can find a way to handle that
-          in a more memory efficient way.
-          wangyinz: The new implementation below should be better. */
-          py::list dlist = loads(t[3]);
-          LoggingEnsemble<Seismogram> result(md, elog, 0);
-          pybind11::object member_py = pybind11::module_::import("mspasspy.ccore.seismic").attr("SeismogramVector")(dlist);
-          result.member = member_py.cast<vector<Seismogram>>();
-          bool is_live = t[2].cast<bool>();
-          if(is_live)
-            result.set_live();
-          else
-            /* this kill is not really necessary with the current implmentation
-            The constructor we use here set ensmeble dead by default.  For
-            a tiny cost we make this more robust by forcing a kill here */
-            result.kill();
-          pybind11::gil_scoped_release release;
-          return result;
-        }catch(...){
-          pybind11::gil_scoped_release release;
-          throw;
-        };
-      } )
+        return ensemble_setstate_py<Seismogram>(t);
+      })
     )
   ;
   py::class_<LoggingEnsemble<TimeSeries>, Ensemble<TimeSeries> >(m,"TimeSeriesEnsemble","Gather of scalar time series objects")
@@ -767,66 +787,15 @@ PYBIND11_MODULE(seismic, m) {
     .def("set_live",&LoggingEnsemble<TimeSeries>::set_live,"Mark ensemble live but use a validate test first")
     .def("__sizeof__",[](const LoggingEnsemble<TimeSeries>& self){return self.memory_use();})
     .def_readwrite("elog",&LoggingEnsemble<TimeSeries>::elog,"Error log attached to the ensemble - not the same as member error logs")
-    /* This is exactly parallel to the version for a SeismogramEnsemble.
-    Only changed Seismogram to TimeSeries everywhere in this section.
-    It might be preferable for maintenance to create a template version of
-    the key code in Ensemble.h to reduce the redundant code.   Making the
-    pickle bindings a template would really be adventure land but would
-    be the ideal solution. */
+    /* The pickle state functions are templates shared with
+    SeismogramEnsemble - see ensemble_getstate_py and ensemble_setstate_py. */
     .def(py::pickle(
       [](const LoggingEnsemble<TimeSeries> &self) {
-        pybind11::gil_scoped_acquire acquire;
-        try{
-          pybind11::object sbuf;
-          sbuf=serialize_metadata_py(self);
-          stringstream sselog;
-          boost::archive::text_oarchive arelog(sselog);
-          arelog << self.elog;
-          pybind11::module pickle = pybind11::module::import("pickle");
-          pybind11::object dumps = pickle.attr("dumps");
-          pybind11::object dbuf = dumps(py::list(pybind11::cast(self.member)));
-          bool is_live = self.live();
-          pybind11::tuple r_tuple = py::make_tuple(sbuf, sselog.str(), is_live, dbuf);
-          pybind11::gil_scoped_release release;
-          return r_tuple;
-        }catch(...){pybind11::gil_scoped_release release;throw;};
+        return ensemble_getstate_py<TimeSeries>(self);
       },
       [](py::tuple t) {
-        pybind11::gil_scoped_acquire acquire;
-        try{
-          pybind11::object sbuf=t[0];
-          Metadata md=restore_serialized_metadata_py(sbuf);
-          ErrorLogger elog;
-          stringstream sselog(t[1].cast<std::string>());
-          boost::archive::text_iarchive arelog(sselog);;
-          arelog>>elog;
-          pybind11::module pickle = pybind11::module::import("pickle");
-          pybind11::object loads = pickle.attr("loads");
-          /* This algorithm is a horrible memory pig because it has to
-          hold both a copy of the monster list of strings of pickled
-          data members and the reconstituted C++ data objects (ensemble
-          members).  Need to see if we can find a way to handle that
-          in a more memory efficient way.
-          wangyinz: The new implementation below should be better. */
-          py::list dlist = loads(t[3]);
-          LoggingEnsemble<TimeSeries> result(md, elog, 0);
-          pybind11::object member_py = pybind11::module_::import("mspasspy.ccore.seismic").attr("TimeSeriesVector")(dlist);
-          result.member = member_py.cast<vector<TimeSeries>>();
-          bool is_live = t[2].cast<bool>();
-          if(is_live)
-            result.set_live();
-          else
-            /* this kill is not really necessary with the current implmentation
-            The constructor we use here set ensmeble dead by default.  For
-            a tiny cost we make this more robust by forcing a kill here */
-            result.kill();
-          pybind11::gil_scoped_release release;
-          return result;
-        }catch(...){
-          pybind11::gil_scoped_release release;
-          throw;
-        };
-      } )
+        return ensemble_setstate_py<TimeSeries>(t);
+      })
     )
   ;
   py::class_<BasicSpectrum,PyBasicSpectrum>(m,"_BasicSpectrum",
@@ -0,0 +1,102 @@
+#ifndef _RELEASE_GIL_PY_H_
+#define _RELEASE_GIL_PY_H_
+#include <memory>
+#include <type_traits>
+#include <typeinfo>
+#include <utility>
+#include <vector>
+#include <pybind11/pybind11.h>
+#include <mspass/utility/Metadata.h>
+#include <mspass/seismic/Ensemble.h>
+/* Tools used by the bindings of pure C++ numerical and I/O functions to
+release the python GIL while they run.  That allows a threaded scheduler
+(dask threads or a ThreadPoolExecutor) to run those functions in parallel.
+
+There is one complication.  Metadata can hold arbitrary python objects
+(pybind11::object values set with put_object).  Copying or destroying one of
+those changes a python reference count, which is not safe without the GIL.
+The algorithms copy their inputs freely, so the GIL is released only when
+none of the arguments holds a python object.  That is the normal case as
+metadata loaded from MongoDB are all simple types.
+
+The processing objects (e.g. Butterworth, the deconvolution operators)
+are not made thread safe by this.  Threads should not share one instance.
+*/
+namespace mspass {
+namespace mspasspy {
+
+/* Returns true if any value in md is a python object */
+inline bool metadata_holds_python_object(const mspass::utility::Metadata& md)
+{
+  for(auto mptr=md.begin();mptr!=md.end();++mptr)
+    if(mptr->second.type()==typeid(pybind11::object)) return true;
+  return false;
+}
+template <typename T> bool holds_python_object(const T& d)
+{
+  if constexpr (std::is_base_of<mspass::utility::Metadata,T>::value)
+    return metadata_holds_python_object(d);
+  else
+    return false;
+}
+template <typename T> bool holds_python_object(const std::vector<T>& d)
+{
+  for(auto& x : d)
+    if(holds_python_object(x)) return true;
+  return false;
+}
+template <typename T> bool holds_python_object(const mspass::seismic::Ensemble<T>& d)
+{
+  return metadata_holds_python_object(d) || holds_python_object(d.member);
+}
+template <typename T> bool holds_python_object(const mspass::seismic::LoggingEnsemble<T>& d)
+{
+  return metadata_holds_python_object(d) || holds_python_object(d.member);
+}
+
+/* Scoped guard releasing the GIL for the life of the object unless one of
+the arguments passed to the constructor holds a python object. */
+class ScopedGILRelease
+{
+public:
+  template <typename... Args> ScopedGILRelease(const Args&... args)
+  {
+    if(!(holds_python_object(args) || ...))
+      release.reset(new pybind11::gil_scoped_release());
+  };
+private:
+  std::unique_ptr<pybind11::gil_scoped_release> release;
+};
+
+/* Wrap a function or member function pointer in a lambda that calls it
+with the GIL released (see ScopedGILRelease) to use in place of the
+function pointer in m.def or py::class_::def.  The return value is
+converted to python after the GIL is acquired again. */
+template <typename R, typename... Args>
+auto release_gil_py(R (*f)(Args...))
+{
+  return [f](Args... args) -> R {
+    ScopedGILRelease guard(args...);
+    return f(std::forward<Args>(args)...);
+  };
+}
+template <typename R, typename C, typename... Args>
+auto release_gil_py(R (C::*f)(Args...))
+{
+  return [f](C& self, Args... args) -> R {
+    ScopedGILRelease guard(args...);
+    return (self.*f)(std::forward<Args>(args)...);
+  };
+}
+template <typename R, typename C, typename... Args>
+auto release_gil_py(R (C::*f)(Args...) const)
+{
+  return [f](const C& self, Args... args) -> R {
+    ScopedGILRelease guard(args...);
+    return (self.*f)(std::forward<Args>(args)...);
+  };
+}
+
+} // namespace mspasspy
+} // namespace mspass
+#endif
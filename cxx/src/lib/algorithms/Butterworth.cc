@@ -1,5 +1,9 @@
 #include "sstream"
 #include <math.h>
+#include <atomic>
+#include <exception>
+#include <thread>
+#include <type_traits>
 #include "misc/blas.h"
 #include "mspass/algorithms/Butterworth.h"
 #include "mspass/utility/MsPASSError.h"
@@ -8,8 +12,12 @@ namespace mspass::algorithms
 {
 using mspass::algorithms::deconvolution::ComplexArray;
 using mspass::algorithms::deconvolution::circular_shift;
+using mspass::algorithms::deconvolution::shared_fft_wavetable;
 using mspass::seismic::CoreTimeSeries;
 using mspass::seismic::CoreSeismogram;
+using mspass::seismic::TimeSeries;
+using mspass::seismic::Seismogram;
+using mspass::seismic::LoggingEnsemble;
 using mspass::seismic::TimeReferenceType;
 using mspass::utility::Metadata;
 using mspass::utility::MsPASSError;
@@ -327,32 +335,57 @@ void reverse_vector(int nd, double *d)
 }
 
 
-/* This is a core method.  The other apply methods just call his one.
-It depends on a property of seismic unix implementation of bw Filters
-that allow input and output to be the same data vector*/
+/* The other apply methods all call this one.  It depends on a property
+of seismic unix implementation of bw Filters that allow input and output to
+be the same data vector*/
 void Butterworth::apply(vector<double>& d)
 {
+	this->filter_buffer(d.size(),d.data());
+}
+/* This is the core method.  Note zerophase filters reverse the data in
+place so no additional buffer is needed. */
+void Butterworth::filter_buffer(const int n, double *d)
+{
+	if(n<=0) return;
 	if(use_lo)
 	{
-		this->bflowcut(npoles_hi,f3db_hi,d.size(),&(d[0]),&(d[0]));
+		this->bflowcut(npoles_hi,f3db_hi,n,d,d);
 		if(zerophase)
 		{
-			reverse_vector(d.size(),&(d[0]));
-			this->bflowcut(npoles_hi,f3db_hi,d.size(),&(d[0]),&(d[0]));
-			reverse_vector(d.size(),&(d[0]));
+			reverse_vector(n,d);
+			this->bflowcut(npoles_hi,f3db_hi,n,d,d);
+			reverse_vector(n,d);
 		}
 	}
 	if(use_hi)
 	{
-		this->bfhighcut(npoles_lo,f3db_lo,d.size(),&(d[0]),&(d[0]));
+		this->bfhighcut(npoles_lo,f3db_lo,n,d,d);
 		if(zerophase)
 		{
-			reverse_vector(d.size(),&(d[0]));
-			this->bfhighcut(npoles_lo,f3db_lo,d.size(),&(d[0]),&(d[0]));
-			reverse_vector(d.size(),&(d[0]));
+			reverse_vector(n,d);
+			this->bfhighcut(npoles_lo,f3db_lo,n,d,d);
+			reverse_vector(n,d);
 		}
 	}
 }
+/* We copy each component to the work buffer, filter, and then copy
+back.  Not as efficient as if we used a strike parameter in the filter
+functions, but I did not want to rewrite those functions. The buffer is
+an argument so callers filtering many objects can reuse one buffer. */
+void Butterworth::filter_components(CoreSeismogram& d, vector<double>& work)
+{
+	int npts=d.npts();
+	if(npts<=0) return;
+	if(work.size()<(size_t)npts) work.resize(npts);
+	/* dcopy handles the skip for a fortran style array used for storing
+	the 3c data in  u*/
+	for(auto k=0;k<3;++k)
+	{
+		dcopy(npts,d.u.get_address(k,0),3,&(work[0]),1);
+		this->filter_buffer(npts,&(work[0]));
+		dcopy(npts,&(work[0]),1,d.u.get_address(k,0),3);
+	}
+}
 
 void Butterworth::apply(CoreSeismogram& d)
 {
@@ -361,22 +394,8 @@ void Butterworth::apply(CoreSeismogram& d)
 	try{
 		double d_dt=d.dt();
 		if(this->dt != d_dt) this->change_dt(d_dt);
-		/* We copy each component to this buffer, filter, and then copy
-		back.  Not as efficient as if we used a strike parameter in the filter
-		functions, but I did not want to rewrite those functions. */
-		vector<double> comp;
-		int npts=d.npts();
-		comp.reserve(npts);
-		/* This initializes the buffer to allow us a simpler loop from 0 to 2
-		using the blas function dcopy to handle the skip for a fortran style
-		array used for storing the 3c data in  u*/
-		for(auto i=0;i<npts;++i)comp.push_back(0.0);
-		for(auto k=0;k<3;++k)
-		{
-			dcopy(npts,d.u.get_address(k,0),3,&(comp[0]),1);
-			this->apply(comp);
-			dcopy(npts,&(comp[0]),1,d.u.get_address(k,0),3);
-		}
+		vector<double> work;
+		this->filter_components(d,work);
 	}catch(...){throw;};
 }
 /* The logic used here is identical to the apply method for TimeSeries to
@@ -384,8 +403,11 @@ log errors and with an internal return.  Difference is the need to handle
 3 components. */
 void Butterworth::apply(mspass::seismic::Seismogram& d)
 {
-
-
+	vector<double> work;
+	this->apply_3c(d,work);
+}
+void Butterworth::apply_3c(Seismogram& d, vector<double>& work)
+{
 	double d_dt=d.dt();
 	if(this->dt != d_dt)
 	{
@@ -399,7 +421,7 @@ void Butterworth::apply(mspass::seismic::Seismogram& d)
 			double olddt=this->dt;
 			double flow_old=this->f3db_lo;
 			use_hi=false;
-			this->apply(d);
+			this->apply_3c(d,work);
 			use_hi=true;
 			this->dt=olddt;
 			this->f3db_lo=flow_old;
@@ -419,19 +441,69 @@ void Butterworth::apply(mspass::seismic::Seismogram& d)
 			this->change_dt(d_dt);
 		}
 	}
-	vector<double> comp;
-	int npts=d.npts();
-	comp.reserve(npts);
-	/* This initializes the buffer to allow us a simpler loop from 0 to 2
-	using the blas function dcopy to handle the skip for a fortran style
-	array used for storing the 3c data in  u*/
-	for(auto i=0;i<npts;++i)comp.push_back(0.0);
-	for(auto k=0;k<3;++k)
+	this->filter_components(d,work);
+}
+/* Members are handed out to the threads one at a time from a shared
+counter so threads that get short members do not sit idle.  Each member
+is filtered by a copy of this operator because the apply methods change the
+operator when the sample interval of the data differs from that of the
+operator.  The copy is cheap as the operator is only a few numbers. */
+template <typename T> void Butterworth::apply_ensemble(LoggingEnsemble<T>& d,
+	const int nthreads)
+{
+	if(d.dead()) return;
+	size_t nmembers=d.member.size();
+	if(nmembers==0) return;
+	size_t nt;
+	if(nthreads>0)
+		nt=nthreads;
+	else
+		nt=std::thread::hardware_concurrency();
+	if(nt<1) nt=1;
+	if(nt>nmembers) nt=nmembers;
+	std::atomic<size_t> next(0);
+	vector<std::exception_ptr> errors(nt);
+	auto worker=[&](const size_t ithread){
+		/* One component buffer per thread - used only for Seismogram */
+		vector<double> work;
+		try{
+			for(size_t i=next++;i<nmembers;i=next++)
+			{
+				T& member=d.member[i];
+				if(member.dead()) continue;
+				Butterworth op(*this);
+				if constexpr (std::is_same<T,Seismogram>::value)
+					op.apply_3c(member,work);
+				else
+					op.apply(member);
+			}
+		}catch(...){
+			errors[ithread]=std::current_exception();
+		}
+	};
+	if(nt==1)
 	{
-		dcopy(npts,d.u.get_address(k,0),3,&(comp[0]),1);
-		this->apply(comp);
-		dcopy(npts,&(comp[0]),1,d.u.get_address(k,0),3);
+		worker(0);
 	}
+	else
+	{
+		vector<std::thread> threads;
+		threads.reserve(nt-1);
+		for(size_t i=1;i<nt;++i) threads.emplace_back(worker,i);
+		/* The calling thread does its share of the work */
+		worker(0);
+		for(auto& t : threads) t.join();
+	}
+	for(auto& err : errors)
+		if(err) std::rethrow_exception(err);
+}
+void Butterworth::apply(LoggingEnsemble<TimeSeries>& d, const int nthreads)
+{
+	this->apply_ensemble(d,nthreads);
+}
+void Butterworth::apply(LoggingEnsemble<Seismogram>& d, const int nthreads)
+{
+	this->apply_ensemble(d,nthreads);
 }
 ComplexArray Butterworth::transfer_function(const int nfft)
 {
@@ -442,11 +514,10 @@ ComplexArray Butterworth::transfer_function(const int nfft)
 	circular shift function */
 	int ishift=imp.sample_number(0.0);
 	imp.s=circular_shift(imp.s,ishift);
-	gsl_fft_complex_wavetable *wavetable = gsl_fft_complex_wavetable_alloc (nfft);
+	const gsl_fft_complex_wavetable *wavetable = shared_fft_wavetable(nfft);
 	gsl_fft_complex_workspace *workspace = gsl_fft_complex_workspace_alloc (nfft);
 	ComplexArray work(nfft,imp.s);
 	gsl_fft_complex_forward(work.ptr(), 1, nfft, wavetable, workspace);
-	gsl_fft_complex_wavetable_free (wavetable);
 	gsl_fft_complex_workspace_free (workspace);
 	return work;
 }
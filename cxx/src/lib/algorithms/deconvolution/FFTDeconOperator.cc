@@ -1,4 +1,7 @@
 #include <math.h>
+#include <map>
+#include <memory>
+#include <mutex>
 #include "mspass/algorithms/deconvolution/FFTDeconOperator.h"
 #include "mspass/utility/MsPASSError.h"
 #include "mspass/seismic/CoreTimeSeries.h"
@@ -17,6 +20,8 @@ FFTDeconOperator::FFTDeconOperator()
 }
 FFTDeconOperator::FFTDeconOperator(const Metadata& md)
 {
+  wavetable=NULL;
+  workspace=NULL;
   try {
     const string base_error("FFTDeconOperator Metadata constructor:  ");
     int nfftpf=md.get_int("operator_nfft");
@@ -40,8 +45,7 @@ FFTDeconOperator::FFTDeconOperator(const Metadata& md)
 	    	+ "Computed shift parameter exceeds length of fft\n"
 		    + "Deconvolution data window parameters are probably nonsense",
          ErrorSeverity::Invalid);
-    wavetable = gsl_fft_complex_wavetable_alloc (nfft);
-    workspace = gsl_fft_complex_workspace_alloc (nfft);
+    this->allocate_fft(nfft);
   } catch(...) {
         throw;
     };
@@ -50,14 +54,14 @@ FFTDeconOperator::FFTDeconOperator(const FFTDeconOperator& parent)
 {
     nfft=parent.nfft;
     sample_shift=parent.sample_shift;
-    /* copies need their own work space */
-    wavetable = gsl_fft_complex_wavetable_alloc (nfft);
-    workspace = gsl_fft_complex_workspace_alloc (nfft);
+    wavetable=NULL;
+    workspace=NULL;
+    /* copies share the wavetable but need their own work space */
+    if(nfft>0) this->allocate_fft(nfft);
 }
 FFTDeconOperator::~FFTDeconOperator()
 {
-    if(wavetable!=NULL) gsl_fft_complex_wavetable_free (wavetable);
-    if(workspace!=NULL) gsl_fft_complex_workspace_free (workspace);
+    this->free_fft();
 }
 FFTDeconOperator& FFTDeconOperator::operator=(const FFTDeconOperator& parent)
 {
@@ -65,23 +69,20 @@ FFTDeconOperator& FFTDeconOperator::operator=(const FFTDeconOperator& parent)
     {
         nfft=parent.nfft;
         sample_shift=parent.sample_shift;
-        /* copies need their own work space */
-        wavetable = gsl_fft_complex_wavetable_alloc (nfft);
-        workspace = gsl_fft_complex_workspace_alloc (nfft);
+        this->free_fft();
+        if(nfft>0) this->allocate_fft(nfft);
     }
     return *this;
 }
 void FFTDeconOperator::changeparameter(const Metadata& md)
 {
     try {
-        size_t nfft_test=md.get_int("operator_nfft");
+        int nfft_test=md.get_int("operator_nfft");
         if(nfft_test != nfft)
         {
+            this->free_fft();
             nfft=nfft_test;
-            if(wavetable!=NULL) gsl_fft_complex_wavetable_free (wavetable);
-            if(workspace!=NULL) gsl_fft_complex_workspace_free (workspace);
-            wavetable = gsl_fft_complex_wavetable_alloc (nfft);
-            workspace = gsl_fft_complex_workspace_alloc (nfft);
+            this->allocate_fft(nfft);
         }
         sample_shift=md.get_int("sample_shift");
         if(sample_shift<0)
@@ -95,18 +96,26 @@ void FFTDeconOperator::changeparameter(const Metadata& md)
 void FFTDeconOperator::change_size(const int n)
 {
     try {
-        if(nfft!=0)
-        {
-            if(wavetable!=NULL) gsl_fft_complex_wavetable_free (wavetable);
-            if(workspace!=NULL) gsl_fft_complex_workspace_free (workspace);
-        }
+        this->free_fft();
         nfft=n;
-        wavetable = gsl_fft_complex_wavetable_alloc (nfft);
-        workspace = gsl_fft_complex_workspace_alloc (nfft);
+        this->allocate_fft(nfft);
     } catch(...) {
         throw;
     };
 }
+/* The wavetable is owned by the cache of shared_fft_wavetable so only
+the workspace is allocated and freed here. */
+void FFTDeconOperator::allocate_fft(const int n)
+{
+    wavetable = shared_fft_wavetable(n);
+    workspace = gsl_fft_complex_workspace_alloc (n);
+}
+void FFTDeconOperator::free_fft()
+{
+    if(workspace!=NULL) gsl_fft_complex_workspace_free (workspace);
+    wavetable=NULL;
+    workspace=NULL;
+}
 /* Helper method to avoid repetitious code in Fourier methods.   Computes the
  inverse FIR filter for the inverse_wavelet methods of fourier decon operators.
 
@@ -153,6 +162,41 @@ CoreTimeSeries FFTDeconOperator::FourierInverse(const ComplexArray& winv, const
 }
 
 /* helpers*/
+namespace {
+struct WavetableDeleter
+{
+  void operator()(gsl_fft_complex_wavetable *w) const
+  {
+    gsl_fft_complex_wavetable_free(w);
+  }
+};
+std::mutex wavetable_cache_lock;
+std::map<int,std::unique_ptr<gsl_fft_complex_wavetable,WavetableDeleter>> wavetable_cache;
+}
+const gsl_fft_complex_wavetable *shared_fft_wavetable(const int nfft)
+{
+  if(nfft<=0) throw MsPASSError(string("shared_fft_wavetable:  ")
+      + "illegal fft length - must be positive", ErrorSeverity::Invalid);
+  std::lock_guard<std::mutex> guard(wavetable_cache_lock);
+  auto& w = wavetable_cache[nfft];
+  if(!w)
+  {
+    w.reset(gsl_fft_complex_wavetable_alloc(nfft));
+    if(!w)
+    {
+      wavetable_cache.erase(nfft);
+      throw MsPASSError(string("shared_fft_wavetable:  ")
+        + "gsl_fft_complex_wavetable_alloc failed for nfft="
+        + std::to_string(nfft), ErrorSeverity::Fatal);
+    }
+  }
+  return w.get();
+}
+int shared_fft_wavetable_count()
+{
+  std::lock_guard<std::mutex> guard(wavetable_cache_lock);
+  return static_cast<int>(wavetable_cache.size());
+}
 int ComputeFFTLength(const TimeWindow w, const double dt)
 {
     int nsamples,nfft;
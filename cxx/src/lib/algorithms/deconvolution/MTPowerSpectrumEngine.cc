@@ -3,12 +3,7 @@
 #include "mspass/algorithms/deconvolution/MTPowerSpectrumEngine.h"
 #include "mspass/algorithms/deconvolution/dpss.h"
 #include "mspass/algorithms/deconvolution/ComplexArray.h"
-/* This C function is defined in FFTDeconOperator.h but it has a lot of
-other baggage that could create mysterious problems so we just define it
-again here.  Maintenanc issue if the api changes.*/
-extern "C" {
-    unsigned int nextPowerOf2(unsigned int n);
-}
+#include "mspass/algorithms/deconvolution/FFTDeconOperator.h"
 namespace mspass::algorithms::deconvolution
 {
 using namespace std;
@@ -88,7 +83,7 @@ MTPowerSpectrumEngine::MTPowerSpectrumEngine(const int winsize,
       for(j=0;j<taperlen;++j) tapers(i,j) = -tapers(i,j);
     }
   }
-  wavetable=gsl_fft_complex_wavetable_alloc (nfft);
+  wavetable=shared_fft_wavetable(nfft);
   workspace=gsl_fft_complex_workspace_alloc (nfft);
 }
 MTPowerSpectrumEngine::MTPowerSpectrumEngine(const MTPowerSpectrumEngine& parent) : tapers(parent.tapers)
@@ -99,13 +94,12 @@ MTPowerSpectrumEngine::MTPowerSpectrumEngine(const MTPowerSpectrumEngine& parent
   tbp=parent.tbp;
   operator_dt=parent.operator_dt;
   deltaf=parent.deltaf;
-  wavetable=gsl_fft_complex_wavetable_alloc (nfft);
+  wavetable=shared_fft_wavetable(nfft);
   workspace=gsl_fft_complex_workspace_alloc (nfft);
 }
 
 MTPowerSpectrumEngine::~MTPowerSpectrumEngine()
 {
-    if(wavetable!=NULL) gsl_fft_complex_wavetable_free (wavetable);
     if(workspace!=NULL) gsl_fft_complex_workspace_free (workspace);
 }
 MTPowerSpectrumEngine& MTPowerSpectrumEngine::operator=(const MTPowerSpectrumEngine& parent)
@@ -119,7 +113,8 @@ MTPowerSpectrumEngine& MTPowerSpectrumEngine::operator=(const MTPowerSpectrumEng
     operator_dt=parent.operator_dt;
     deltaf=parent.deltaf;
     tapers=parent.tapers;
-    wavetable = gsl_fft_complex_wavetable_alloc (nfft);
+    if(workspace!=NULL) gsl_fft_complex_workspace_free (workspace);
+    wavetable = shared_fft_wavetable(nfft);
     workspace = gsl_fft_complex_workspace_alloc (nfft);
   }
   return *this;
@@ -34,12 +34,12 @@ ShapingWavelet::ShapingWavelet(const Metadata& md, int nfftin)
                  ErrorSeverity::Invalid);
             }
         }
-        /* these are workspaces used by gnu's fft algorithm.  Other parts
-         * of this library cache them for efficiency, but this one we
-         * compute ever time the object is created and then discard it. */
-        gsl_fft_complex_wavetable *wavetable;
+        /* these are workspaces used by gnu's fft algorithm.  The wavetable
+         * is shared with other operators using the same nfft.   The
+         * workspace is created here and discarded when we are done. */
+        const gsl_fft_complex_wavetable *wavetable;
         gsl_fft_complex_workspace *workspace;
-        wavetable = gsl_fft_complex_wavetable_alloc (nfft);
+        wavetable = shared_fft_wavetable(nfft);
         workspace = gsl_fft_complex_workspace_alloc (nfft);
         string wavelettype=md.get_string("shaping_wavelet_type");
         wavelet_name=wavelettype;
@@ -154,7 +154,6 @@ ShapingWavelet::ShapingWavelet(const Metadata& md, int nfftin)
                   + "illegal value for shaping_wavelet_type="+wavelettype,
                   ErrorSeverity::Invalid);
         }
-        gsl_fft_complex_wavetable_free (wavetable);
         gsl_fft_complex_workspace_free (workspace);
         df=1.0/(dt*((double)nfft));
     } catch(MsPASSError& err)
@@ -180,12 +179,11 @@ ShapingWavelet::ShapingWavelet(const double fpeak, const double dtin,
   double *r;
   r=rickerwavelet((float)fpeak,(float)dt,nfft);
   w=ComplexArray(nfft,r);
-  gsl_fft_complex_wavetable *wavetable;
+  const gsl_fft_complex_wavetable *wavetable;
   gsl_fft_complex_workspace *workspace;
-  wavetable = gsl_fft_complex_wavetable_alloc (nfft);
+  wavetable = shared_fft_wavetable(nfft);
   workspace = gsl_fft_complex_workspace_alloc (nfft);
   gsl_fft_complex_forward(w.ptr(), 1, nfft, wavetable, workspace);
-  gsl_fft_complex_wavetable_free (wavetable);
   gsl_fft_complex_workspace_free (workspace);
   delete [] r;
 }
@@ -246,13 +244,12 @@ ShapingWavelet::ShapingWavelet(CoreTimeSeries d, int nfft)
         if(t>d.endtime()) break;
         if( (iw>=0) && (iw<nfft)) dwork[i]=d.s[iw];
     }
-    gsl_fft_complex_wavetable *wavetable;
+    const gsl_fft_complex_wavetable *wavetable;
     gsl_fft_complex_workspace *workspace;
-    wavetable = gsl_fft_complex_wavetable_alloc (nfft);
+    wavetable = shared_fft_wavetable(nfft);
     workspace = gsl_fft_complex_workspace_alloc (nfft);
     w=ComplexArray(nfft,&(dwork[0]));
     gsl_fft_complex_forward(w.ptr(), 1, nfft, wavetable, workspace);
-    gsl_fft_complex_wavetable_free (wavetable);
     gsl_fft_complex_workspace_free (workspace);
 }
 ShapingWavelet& ShapingWavelet::operator=(const ShapingWavelet& parent)
@@ -270,15 +267,14 @@ CoreTimeSeries ShapingWavelet::impulse_response()
 {
     try {
         int nfft=w.size();
-        gsl_fft_complex_wavetable *wavetable;
+        const gsl_fft_complex_wavetable *wavetable;
         gsl_fft_complex_workspace *workspace;
-        wavetable = gsl_fft_complex_wavetable_alloc (nfft);
+        wavetable = shared_fft_wavetable(nfft);
         workspace = gsl_fft_complex_workspace_alloc (nfft);
         /* We need to copy the current shaping wavelet or the inverse fft
          * will make it invalid */
         ComplexArray iwf(w);
         gsl_fft_complex_inverse(iwf.ptr(), 1, nfft, wavetable, workspace);
-        gsl_fft_complex_wavetable_free (wavetable);
         gsl_fft_complex_workspace_free (workspace);
         CoreTimeSeries result(nfft);
         /* old API
@@ -1,4 +1,7 @@
+#include <algorithm>
 #include <memory>
+#include <sstream>
+#include <utility>
 #include <vector>
 #include <stdio.h>
 #include <string>
@@ -216,80 +219,42 @@ size_t fread_from_file(TimeSeries& d,const string dir, const string dfile,
 		return ns_read;
 	}catch(...){throw;};
 }
-size_t fread_from_file(mspass::seismic::LoggingEnsemble<mspass::seismic::Seismogram> &de,
- const std::string dir, const std::string dfile, std::vector<long int> indexes)
+/* File scope function used by the ensemble readers to build the list of
+members to read sorted by foff.  Reading in order of increasing file offset
+makes the reads sequential no matter what order the caller lists them in.
+Members with foff undefined are killed and left out of the list. */
+template <typename Tdata>
+vector<pair<long int,int>> sorted_read_list(mspass::seismic::LoggingEnsemble<Tdata>& de,
+	const std::vector<long int>& indexes)
 {
-	size_t ns_read_sum;
-	int n = indexes.size();
-	FILE *fp;
-	string fname;
-	if(dir.length()>0)
-	  /* for expected context for use in python we will assume dir does not
-		have a trailing path separator so we always insert / */
-		fname = dir + "/" + dfile;
-	else
-	  /* Null as always in unix means use current directory*/
-		fname=dfile;
-	if((fp=fopen(fname.c_str(),"r")) == NULL) {
-		de.kill();
-		stringstream ss;
-		ss << "can not open file in " << fname << endl;
-		de.elog.log_error(ss.str());
-		return -1;
-	}
-	
-	for (int ind = 0; ind < n; ++ind) {
-		size_t ns_read;
-		int i = indexes[ind];
-		long int foff;
+	vector<pair<long int,int>> readlist;
+	readlist.reserve(indexes.size());
+	for (auto i : indexes)
+	{
 		if (de.member[i].is_defined(SEISMICMD_foff))
 		{
-		  foff = de.member[i].get_long(SEISMICMD_foff);
+			readlist.push_back(pair<long int,int>(de.member[i].get_long(SEISMICMD_foff),i));
 		}
 		else
 		{
-		  de.member[i].kill();
-		  stringstream ss;
-		  ss << "foff not defined for " << i << " member in ensemble" << endl;
-		  de.member[i].elog.log_error(ss.str());
-		  continue;
+			de.member[i].kill();
+			stringstream ss;
+			ss << "foff not defined for " << i << " member in ensemble" << endl;
+			de.member[i].elog.log_error(ss.str());
 		}
-		try{
-			if(foff>0)
-			{
-				if(fseek(fp,foff,SEEK_SET))
-				{
-					fclose(fp);
-					de.member[i].kill();
-					stringstream ss;
-		  			ss << "can not fseek in " << foff << endl;
-					de.member[i].elog.log_error(ss.str());
-					continue;
-				}
-			}
-			ns_read = fread((void*)de.member[i].u.get_address(0, 0), sizeof(double), 3 * de.member[i].npts(), fp);
-			if (ns_read != 3 * de.member[i].npts())
-			{
-				de.member[i].elog.log_error(string("read error: npts not equal"));
-				de.member[i].kill();
-			}
-			else
-			{
-				de.member[i].set_live();
-			}
-			ns_read_sum += ns_read;
-		}catch(...){throw;};
 	}
-	fclose(fp);
-	de.set_live();
-	return ns_read_sum;
+	std::sort(readlist.begin(),readlist.end());
+	return readlist;
 }
-size_t fread_from_file(mspass::seismic::LoggingEnsemble<mspass::seismic::TimeSeries> &de,
- const std::string dir, const std::string dfile, std::vector<long int> indexes)
-
+/* Shared implementation of the two overloaded ensemble readers.   ncomp is the
+number of values per sample (1 for TimeSeries and 3 for Seismogram) and
+sample_address returns the address of the first sample of a member. */
+template <typename Tdata, typename AddressFunction>
+size_t fread_ensemble_members(mspass::seismic::LoggingEnsemble<Tdata> &de,
+ const std::string dir, const std::string dfile, const std::vector<long int>& indexes,
+ const size_t ncomp, AddressFunction sample_address)
 {
-	size_t ns_read_sum;
-	int n = indexes.size();
+	size_t ns_read_sum(0);
 	FILE *fp;
 	string fname;
 	if(dir.length()>0)
@@ -306,50 +271,51 @@ size_t fread_from_file(mspass::seismic::LoggingEnsemble<mspass::seismic::TimeSer
 		de.elog.log_error(ss.str());
 		return -1;
 	}
-	for (int ind = 0; ind < n; ++ind) {
+	vector<pair<long int,int>> readlist = sorted_read_list(de,indexes);
+	for (auto& entry : readlist) {
 		size_t ns_read;
-		int i = indexes[ind];
-		long int foff;
-		if (de.member[i].is_defined(SEISMICMD_foff))
+		long int foff = entry.first;
+		int i = entry.second;
+		size_t nexpected = ncomp*de.member[i].npts();
+		/* Skip the seek when the file is already positioned at foff - the
+		normal case for members written sequentially */
+		if(ftell(fp) != foff)
 		{
-		  foff = de.member[i].get_long(SEISMICMD_foff);
+			if(fseek(fp,foff,SEEK_SET))
+			{
+				de.member[i].kill();
+				stringstream ss;
+				ss << "can not fseek in " << foff << endl;
+				de.member[i].elog.log_error(ss.str());
+				continue;
+			}
+		}
+		ns_read = fread((void*)sample_address(de.member[i]), sizeof(double), nexpected, fp);
+		if (ns_read != nexpected)
+		{
+			de.member[i].elog.log_error(string("read error: npts not equal"));
+			de.member[i].kill();
 		}
 		else
 		{
-		  de.member[i].kill();
-		  stringstream ss;
-		  ss << "foff not defined for " << i << " member in ensemble" << endl;
-		  de.member[i].elog.log_error(ss.str());
-		  continue;
+			de.member[i].set_live();
 		}
-		try{
-			if(foff>0)
-			{
-				if(fseek(fp,foff,SEEK_SET))
-				{
-					fclose(fp);
-					de.member[i].kill();
-					stringstream ss;
-		  			ss << "can not fseek in " << foff << endl;
-					de.member[i].elog.log_error(ss.str());
-					continue;
-				}
-			}
-			ns_read = fread((void*)(&(de.member[i].s[0])), sizeof(double), de.member[i].npts(), fp);
-			if (ns_read != de.member[i].npts())
-			{
-				de.member[i].elog.log_error(string("read error: npts not equal"));
-				de.member[i].kill();
-			}
-			else
-			{
-				de.member[i].set_live();
-			}
-			ns_read_sum += ns_read;
-		}catch(...){throw;};
+		ns_read_sum += ns_read;
 	}
 	fclose(fp);
 	de.set_live();
 	return ns_read_sum;
 }
+size_t fread_from_file(mspass::seismic::LoggingEnsemble<mspass::seismic::Seismogram> &de,
+ const std::string dir, const std::string dfile, std::vector<long int> indexes)
+{
+	return fread_ensemble_members(de,dir,dfile,indexes,3,
+		[](Seismogram& d){return d.u.get_address(0,0);});
+}
+size_t fread_from_file(mspass::seismic::LoggingEnsemble<mspass::seismic::TimeSeries> &de,
+ const std::string dir, const std::string dfile, std::vector<long int> indexes)
+{
+	return fread_ensemble_members(de,dir,dfile,indexes,1,
+		[](TimeSeries& d){return &(d.s[0]);});
+}
 } // Termination of namespace definitions
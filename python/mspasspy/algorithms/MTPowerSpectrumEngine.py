@@ -1,11 +1,28 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+from functools import lru_cache
 import numpy as np
 from multitaper.mtspec import MTSpec
+import multitaper.utils as mtutils
 from mspasspy.ccore.utility import MsPASSError, ErrorSeverity, Metadata
 from mspasspy.ccore.seismic import TimeSeries, DoubleVector, PowerSpectrum
 
 
+@lru_cache(maxsize=32)
+def _slepian_tapers(npts, nw, kspec):
+    """
+    Return the (vn, lamb) Slepian tapers and eigenvalues computed by
+    multitaper's dpss function.  The results are cached so all instances
+    of MTPowerSpectrumEngine working on the same window size share one
+    copy instead of each computing their own.
+    """
+    vn, lamb = mtutils.dpss(npts, nw, kspec)
+    # shared by all callers so protect them from accidental alteration
+    vn.setflags(write=False)
+    lamb.setflags(write=False)
+    return vn, lamb
+
+
 class MTPowerSpectrumEngine:
     """
     Wrapper class to use German Prieto's multitaper package as a plug
@@ -88,6 +105,12 @@ class MTPowerSpectrumEngine:
             raise TypeError(
                 "MTPowerSpectrumEngine.apply:  arg0 has invalid type - must be TimeSeries, DoubleVector, or numpy array"
             )
+        # Use shared tapers when the taper count is explicit.   With 0
+        # MTSpec sets the count itself so we let it compute the tapers.
+        if self.number_tapers > 0 and (self.vn is None or self.vn.shape[0] != len(y)):
+            self.vn, self.lamb = _slepian_tapers(
+                len(y), float(self.tbp), int(self.number_tapers)
+            )
         self.MTSpec_instance = MTSpec(
             y,
             nw=self.tbp,
@@ -120,10 +143,8 @@ class MTPowerSpectrumEngine:
         # This method returns only the positive frequencies and spectra values
         f, spec = self.MTSpec_instance.rspec()
         # this is an obnoxious collision with the C++ api DoubleVector
-        npts = self.MTSpec_instance.npts
-        work = DoubleVector()
-        for i in range(len(spec)):
-            work.append(spec[i])
+        # DoubleVector supports the buffer protocol so this is one copy
+        work = DoubleVector(np.ascontiguousarray(spec, dtype=np.float64).ravel())
 
         result = PowerSpectrum(
             md,
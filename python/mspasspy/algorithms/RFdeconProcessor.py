@@ -10,6 +10,9 @@ Created on Fri Jul 31 06:24:10 2020
 
 @author: Gary Pavlis
 """
+import threading
+from collections import OrderedDict
+
 import numpy as np
 
 from mspasspy.ccore.seismic import DoubleVector
@@ -25,6 +28,14 @@ from mspasspy.ccore.algorithms.deconvolution import (
 )
 from mspasspy.util.decorators import mspass_func_wrapper
 
+# ccore deconvolution operator implementing each algorithm of RFdeconProcessor
+_DECON_OPERATORS = {
+    "LeastSquares": LeastSquareDecon,
+    "WaterLevel": WaterLevelDecon,
+    "MultiTaperXcor": MultiTaperXcorDecon,
+    "MultiTaperSpecDiv": MultiTaperSpecDivDecon,
+}
+
 
 class RFdeconProcessor:
     """
@@ -73,6 +84,42 @@ class RFdeconProcessor:
             raise RuntimeError("Illegal value for alg=" + alg)
         # below is needed because AntelopePf cannot be serialized.
         self.md = Metadata(self.md)
+        self._operators = threading.local()
+
+    def __getstate__(self):
+        # the cached ccore operators cannot be serialized and are
+        # constructed again when first used after unpickling
+        state = self.__dict__.copy()
+        state.pop("_operators", None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._operators = threading.local()
+
+    def _operator(self):
+        """
+        Returns the ccore deconvolution operator of this processor for
+        the calling thread loaded with the current data, wavelet, and
+        noise vectors.  The operator is constructed on the first call and
+        reused by later calls.   That way the setup done by the constructor
+        (parsing the parameters, allocating the FFT work space, and for the
+        multitaper methods computing the Slepian tapers) is done once
+        instead of every time an output is computed.  An operator is kept
+        for each thread because it holds work space that is not safe to
+        share between threads.
+        """
+        processor = getattr(self._operators, "processor", None)
+        if processor is None:
+            processor = _DECON_OPERATORS[self.algorithm](self.md)
+            self._operators.processor = processor
+        if hasattr(self, "dvector"):
+            processor.loaddata(DoubleVector(self.dvector))
+        if hasattr(self, "wvector"):
+            processor.loadwavelet(DoubleVector(self.wvector))
+        if self.__uses_noise and hasattr(self, "nvector"):
+            processor.loadnoise(DoubleVector(self.nvector))
+        return processor
 
     def loaddata(self, d, dtype="Seismogram", component=0, window=False):
         """
@@ -230,20 +277,7 @@ class RFdeconProcessor:
 
         :return: vector of data that are the RF estimate computed from previously loaded data.
         """
-        if self.algorithm == "LeastSquares":
-            processor = LeastSquareDecon(self.md)
-        elif self.algorithm == "WaterLevel":
-            processor = WaterLevelDecon(self.md)
-        elif self.algorithm == "MultiTaperXcor":
-            processor = MultiTaperXcorDecon(self.md)
-        elif self.algorithm == "MultiTaperSpecDiv":
-            processor = MultiTaperSpecDivDecon(self.md)
-        if hasattr(self, "dvector"):
-            processor.loaddata(DoubleVector(self.dvector))
-        if hasattr(self, "wvector"):
-            processor.loadwavelet(DoubleVector(self.wvector))
-        if self.__uses_noise and hasattr(self, "nvector"):
-            processor.loadnoise(DoubleVector(self.nvector))
+        processor = self._operator()
         processor.process()
         return processor.getresult()
 
@@ -260,20 +294,7 @@ class RFdeconProcessor:
         centered (i.e. t0 is rounded n/2 where n is the length of the vector
                   returned).
         """
-        if self.algorithm == "LeastSquares":
-            processor = LeastSquareDecon(self.md)
-        elif self.algorithm == "WaterLevel":
-            processor = WaterLevelDecon(self.md)
-        elif self.algorithm == "MultiTaperXcor":
-            processor = MultiTaperXcorDecon(self.md)
-        elif self.algorithm == "MultiTaperSpecDiv":
-            processor = MultiTaperSpecDivDecon(self.md)
-        if hasattr(self, "dvector"):
-            processor.loaddata(DoubleVector(self.dvector))
-        if hasattr(self, "wvector"):
-            processor.loadwavelet(DoubleVector(self.wvector))
-        if self.__uses_noise and hasattr(self, "nvector"):
-            processor.loadnoise(DoubleVector(self.nvector))
+        processor = self._operator()
         return processor.actual_output()
 
     def ideal_output(self):
@@ -289,20 +310,7 @@ class RFdeconProcessor:
         is a helpful metric to display the stability and accuracy of the
         inverse.
         """
-        if self.algorithm == "LeastSquares":
-            processor = LeastSquareDecon(self.md)
-        elif self.algorithm == "WaterLevel":
-            processor = WaterLevelDecon(self.md)
-        elif self.algorithm == "MultiTaperXcor":
-            processor = MultiTaperXcorDecon(self.md)
-        elif self.algorithm == "MultiTaperSpecDiv":
-            processor = MultiTaperSpecDivDecon(self.md)
-        if hasattr(self, "dvector"):
-            processor.loaddata(DoubleVector(self.dvector))
-        if hasattr(self, "wvector"):
-            processor.loadwavelet(DoubleVector(self.wvector))
-        if self.__uses_noise and hasattr(self, "nvector"):
-            processor.loadnoise(DoubleVector(self.nvector))
+        processor = self._operator()
         return processor.ideal_output()
 
     def inverse_filter(self):
@@ -318,20 +326,7 @@ class RFdeconProcessor:
 
         The result is returned as  TimeSeries object.
         """
-        if self.algorithm == "LeastSquares":
-            processor = LeastSquareDecon(self.md)
-        elif self.algorithm == "WaterLevel":
-            processor = WaterLevelDecon(self.md)
-        elif self.algorithm == "MultiTaperXcor":
-            processor = MultiTaperXcorDecon(self.md)
-        elif self.algorithm == "MultiTaperSpecDiv":
-            processor = MultiTaperSpecDivDecon(self.md)
-        if hasattr(self, "dvector"):
-            processor.loaddata(DoubleVector(self.dvector))
-        if hasattr(self, "wvector"):
-            processor.loadwavelet(DoubleVector(self.wvector))
-        if self.__uses_noise and hasattr(self, "nvector"):
-            processor.loadnoise(DoubleVector(self.nvector))
+        processor = self._operator()
         return processor.inverse_filter()
 
     def QCMetrics(self):
@@ -342,20 +337,7 @@ class RFdeconProcessor:
         algorithm dependent.  See related documentation for metrics computed
         by different algorithms.
         """
-        if self.algorithm == "LeastSquares":
-            processor = LeastSquareDecon(self.md)
-        elif self.algorithm == "WaterLevel":
-            processor = WaterLevelDecon(self.md)
-        elif self.algorithm == "MultiTaperXcor":
-            processor = MultiTaperXcorDecon(self.md)
-        elif self.algorithm == "MultiTaperSpecDiv":
-            processor = MultiTaperSpecDivDecon(self.md)
-        if hasattr(self, "dvector"):
-            processor.loaddata(DoubleVector(self.dvector))
-        if hasattr(self, "wvector"):
-            processor.loadwavelet(DoubleVector(self.wvector))
-        if self.__uses_noise and hasattr(self, "nvector"):
-            processor.loadnoise(DoubleVector(self.nvector))
+        processor = self._operator()
         return processor.QCMetrics()
 
     def change_parameters(self, md):
@@ -371,6 +353,8 @@ class RFdeconProcessor:
         for the alternative algorithm.
         """
         self.md = Metadata(md)
+        # operators constructed with the old parameters are discarded
+        self._operators = threading.local()
 
     @property
     def uses_noise(self):
@@ -392,6 +376,38 @@ class RFdeconProcessor:
             return TimeWindow  # always initialize even if not used
 
 
+# Maximum number of processors cached in each thread by _get_processor
+_PROCESSOR_CACHE_SIZE = 8
+_processor_cache = threading.local()
+
+
+def _get_processor(alg, pf):
+    """
+    Return a RFdeconProcessor for alg and pf.
+
+    Constructing a RFdeconProcessor parses the pf file and the first
+    output it computes constructs the ccore operator.  RFdecon would
+    otherwise do both for every Seismogram it processes, so processors
+    are cached here with least recently used eviction.  The cache is per
+    thread because a processor holds the data of the last call and is not
+    safe to share between threads.
+    """
+    cache = getattr(_processor_cache, "processors", None)
+    if cache is None:
+        cache = OrderedDict()
+        _processor_cache.processors = cache
+    key = (alg, pf)
+    processor = cache.get(key)
+    if processor is None:
+        processor = RFdeconProcessor(alg, pf)
+        cache[key] = processor
+        if len(cache) > _PROCESSOR_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+    return processor
+
+
 @mspass_func_wrapper
 def RFdecon(
     d,
@@ -401,6 +417,7 @@ def RFdecon(
     noisedata=None,
     wcomp=2,
     ncomp=2,
+    processor=None,
     object_history=False,
     alg_name="RFdecon",
     alg_id=None,
@@ -409,8 +426,11 @@ def RFdecon(
     """
     Use this function to compute conventional receiver functions
     from a single three component seismogram. In this function,
-    an instance of wrapper class RFdeconProcessor will be built and
-    initialized with alg and pf.
+    an instance of wrapper class RFdeconProcessor initialized with alg
+    and pf is used to compute the deconvolution.  Unless one is passed
+    with the processor argument the instance is fetched from a cache of
+    recently used processors of the calling thread so the pf file is
+    parsed and the operator is constructed only once per worker.
 
     Default assumes d contains all data sections required to do
     the deconvolution with the wavelet in component 2 (3 for matlab
@@ -469,6 +489,11 @@ def RFdecon(
      :param ncomp: component number to use to compute noise.  This is used
      only if the algorithm in processor requires a noise estimate.
      Normally it should be the same as wcomp and is by default (2).
+     :param processor:  optional RFdeconProcessor to use instead of one
+           created from alg and pf (alg and pf are then ignored).
+           Default is None which uses a processor from the cache
+           described above.   A processor passed this way must not be
+           used by more than one thread at a time.
      :param object_history: boolean to enable or disable saving object
            level history.  Default is False.  Note this functionality is
            implemented via the mspass_func_wrapper decorator.
@@ -487,7 +512,8 @@ def RFdecon(
      The orientations are always the same as the input.
     """
 
-    processor = RFdeconProcessor(alg, pf)
+    if processor is None:
+        processor = _get_processor(alg, pf)
 
     try:
         if wavelet is not None:
@@ -513,29 +539,24 @@ def RFdecon(
         return result
     npts = result.npts
     try:
+        rf = np.zeros((3, npts))
         for k in range(3):
             processor.loaddata(result, component=k)
-            x = processor.apply()
-            # overwrite this component's data in the result Seismogram
+            x = np.asarray(processor.apply())
             # Use some caution handling any size mismatch
             nx = len(x)
             if nx >= npts:
-                for i in range(npts):
-                    result.data[k, i] = x[i]
+                rf[k, :] = x[:npts]
             else:
-                # this may not be the fastest way to do this but it is simple and clean
-                # matters little since this is an error condition and should be rare
-                for i in range(npts):
-                    if i < nx:
-                        result.data[k, i] = x[i]
-                    else:
-                        result.data[k, i] = 0.0
+                rf[k, :nx] = x
                 # This is actually an error condition so we log it
                 message = (
                     "Windowing size mismatch.\nData window length = %d which is less than operator length= %d"
                     % (nx, npts)
                 )
                 result.elog.log_error("RFdecon", message, ErrorSeverity.Complaint)
+        # overwrite the data of the result Seismogram with a single copy
+        np.asarray(result.data)[:, :] = rf
     except MsPASSError as err:
         result.kill()
         result.elog.log_error(err)
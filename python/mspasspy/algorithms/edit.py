@@ -1,4 +1,9 @@
+import operator
 from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
 from mspasspy.ccore.seismic import (
     TimeSeries,
     Seismogram,
@@ -42,6 +47,57 @@ def _is_ensemble(d):
     return isinstance(d, (TimeSeriesEnsemble, SeismogramEnsemble))
 
 
+def _metadata_frame(data, keys):
+    """
+    Builds a pandas DataFrame with one row for each member of the list
+    data and one column for each of keys that is defined in at least one
+    member.   data can be a list of MsPASS data objects or of python dicts
+    (e.g. the metadata records of the readers).   Values of keys a member
+    does not define are NaN.   A member can also hold NaN (or None) as a
+    value, which kill_if_true treats as defined, so which rows define each
+    key is posted separately to df.attrs["defined"] as a dict of boolean
+    arrays keyed by key (see _column_defined).   Used to evaluate the
+    kill_mask method of an Executioner on many objects at once.
+    """
+    rows = [{k: x[k] for k in keys if k in x} for x in data]
+    df = pd.DataFrame(rows)
+    df.attrs["defined"] = {
+        k: np.array([k in row for row in rows], dtype=bool) for k in keys
+    }
+    return df
+
+
+def _column_defined(df, key):
+    """
+    Returns a boolean numpy array that is True for the rows of df with a
+    value for key.   Frames built by _metadata_frame say which rows define
+    key in df.attrs["defined"].   For any other DataFrame NaN and None are
+    treated as undefined as they are in the DataFrames created by
+    read_to_dataframe.
+    """
+    defined = df.attrs.get("defined", {})
+    if key in defined:
+        # copy as callers edit the mask in place
+        return defined[key].copy()
+    if key in df.columns:
+        return np.array(df[key].notna(), dtype=bool)
+    return np.zeros(len(df), dtype=bool)
+
+
+def _column_test(df, key, op, value):
+    """
+    Returns a boolean numpy array that is True for the rows of df with a
+    value for key for which op(df[key], value) is True, where op is one of
+    the comparison functions of the operator module.   Rows without a
+    value for key are always False as kill_if_true silently skips data
+    that do not define the key.
+    """
+    mask = _column_defined(df, key)
+    if mask.any():
+        mask[mask] = op(df[key][mask], value).to_numpy(dtype=bool)
+    return mask
+
+
 # Use of abstract base class based on:
 # https://python-course.eu/oop/the-abc-of-abstract-base-classes.php
 
@@ -86,12 +142,81 @@ class Executioner(ABC):
         base class avoids the duplication of duplicate code in all
         subclasses.
 
+        When the test can be compiled (see kill_mask) and is not verbose
+        the Metadata of the live members are loaded into a DataFrame and
+        the test is applied to all members in one vectorized pass.
+        Otherwise kill_if_true is called for each member.
         """
         if ensemble.live():
-            for d in ensemble.member:
-                self.kill_if_true(d)
+            members = [d for d in ensemble.member if d.live]
+            mask = None
+            if len(members) > 0 and self._can_edit_in_bulk():
+                try:
+                    mask = self.kill_mask(
+                        _metadata_frame(members, self.metadata_keys())
+                    )
+                except TypeError:
+                    # values that cannot be compared - let kill_if_true
+                    # handle the error for each member as it always has
+                    mask = None
+            if mask is None:
+                for d in ensemble.member:
+                    self.kill_if_true(d)
+            else:
+                for d, doomed in zip(members, mask):
+                    if doomed:
+                        d.kill()
         return ensemble
 
+    def metadata_keys(self):
+        """
+        Returns the list of Metadata keys the test of this Executioner
+        uses or None if the test cannot be compiled into a kill_mask.
+        The base class returns None.
+        """
+        return None
+
+    def kill_query(self):
+        """
+        Returns a MongoDB query (python dict) that matches the documents
+        whose data kill_if_true would kill or None if the test cannot be
+        expressed as a query.   Readers use it to avoid loading data
+        that would be killed immediately.  Note MongoDB only compares values
+        of the same type (e.g. numbers with numbers) so results can differ
+        from kill_if_true for documents with values of unexpected types.
+        The base class returns None.
+        """
+        return None
+
+    def keep_query(self):
+        """
+        Returns a MongoDB query matching the documents that survive this
+        test (the negation of kill_query) or None if the test cannot be
+        expressed as a query.
+        """
+        query = self.kill_query()
+        if query is None:
+            return None
+        return {"$nor": [query]}
+
+    def kill_mask(self, df):
+        """
+        Vectorized version of kill_if_true for tabular metadata.  Returns
+        a boolean numpy array with one value for each row of the pandas
+        DataFrame df that is True for the rows kill_if_true would kill.
+        Columns are Metadata keys and NaN marks an undefined value
+        as in the output of read_to_dataframe.   Returns None if the test
+        cannot be compiled.   The base class returns None.
+        """
+        return None
+
+    def _can_edit_in_bulk(self):
+        """
+        Returns True if edit_ensemble_members can use kill_mask.   Verbose
+        tests are not because they post a message to each datum killed.
+        """
+        return not getattr(self, "verbose", False) and self.metadata_keys() is not None
+
     def log_kill(self, d, testname, message, severity=ErrorSeverity.Informational):
         """
         This base class method is used to standardize the error logging
@@ -186,6 +311,22 @@ class MetadataGT(Executioner):
             )
         return d
 
+    def metadata_keys(self):
+        return [self.key]
+
+    def kill_query(self):
+        """
+        Returns the MongoDB query matching documents with self.key greater than
+        the test value.
+        """
+        return {self.key: {"$gt": self.value}}
+
+    def kill_mask(self, df):
+        """
+        Returns True for rows of df with self.key greater than the test value.
+        """
+        return _column_test(df, self.key, operator.gt, self.value)
+
 
 class MetadataGE(Executioner):
     """
@@ -247,6 +388,22 @@ class MetadataGE(Executioner):
             )
         return d
 
+    def metadata_keys(self):
+        return [self.key]
+
+    def kill_query(self):
+        """
+        Returns the MongoDB query matching documents with self.key greater than or equal to
+        the test value.
+        """
+        return {self.key: {"$gte": self.value}}
+
+    def kill_mask(self, df):
+        """
+        Returns True for rows of df with self.key greater than or equal to the test value.
+        """
+        return _column_test(df, self.key, operator.ge, self.value)
+
 
 class MetadataLT(Executioner):
     """
@@ -308,6 +465,22 @@ class MetadataLT(Executioner):
             )
         return d
 
+    def metadata_keys(self):
+        return [self.key]
+
+    def kill_query(self):
+        """
+        Returns the MongoDB query matching documents with self.key less than
+        the test value.
+        """
+        return {self.key: {"$lt": self.value}}
+
+    def kill_mask(self, df):
+        """
+        Returns True for rows of df with self.key less than the test value.
+        """
+        return _column_test(df, self.key, operator.lt, self.value)
+
 
 class MetadataLE(Executioner):
     """
@@ -369,6 +542,22 @@ class MetadataLE(Executioner):
             )
         return d
 
+    def metadata_keys(self):
+        return [self.key]
+
+    def kill_query(self):
+        """
+        Returns the MongoDB query matching documents with self.key less than or equal to
+        the test value.
+        """
+        return {self.key: {"$lte": self.value}}
+
+    def kill_mask(self, df):
+        """
+        Returns True for rows of df with self.key less than or equal to the test value.
+        """
+        return _column_test(df, self.key, operator.le, self.value)
+
 
 class MetadataEQ(Executioner):
     """
@@ -432,6 +621,22 @@ class MetadataEQ(Executioner):
             )
         return d
 
+    def metadata_keys(self):
+        return [self.key]
+
+    def kill_query(self):
+        """
+        Returns the MongoDB query matching documents with self.key equal to
+        the test value.
+        """
+        return {self.key: {"$eq": self.value}}
+
+    def kill_mask(self, df):
+        """
+        Returns True for rows of df with self.key equal to the test value.
+        """
+        return _column_test(df, self.key, operator.eq, self.value)
+
 
 class MetadataNE(Executioner):
     """
@@ -495,6 +700,23 @@ class MetadataNE(Executioner):
             )
         return d
 
+    def metadata_keys(self):
+        return [self.key]
+
+    def kill_query(self):
+        """
+        Returns the MongoDB query matching documents with self.key defined
+        and not equal to the test value.
+        """
+        return {self.key: {"$exists": True, "$ne": self.value}}
+
+    def kill_mask(self, df):
+        """
+        Returns True for rows of df with self.key defined and not equal to
+        the test value.
+        """
+        return _column_test(df, self.key, operator.ne, self.value)
+
 
 class MetadataDefined(Executioner):
     """
@@ -544,6 +766,21 @@ class MetadataDefined(Executioner):
             )
         return d
 
+    def metadata_keys(self):
+        return [self.key]
+
+    def kill_query(self):
+        """
+        Returns the MongoDB query matching documents defining self.key.
+        """
+        return {self.key: {"$exists": True}}
+
+    def kill_mask(self, df):
+        """
+        Returns True for rows of df with a value for self.key.
+        """
+        return _column_defined(df, self.key)
+
 
 class MetadataUndefined(Executioner):
     """
@@ -597,6 +834,21 @@ class MetadataUndefined(Executioner):
             )
         return d
 
+    def metadata_keys(self):
+        return [self.key]
+
+    def kill_query(self):
+        """
+        Returns the MongoDB query matching documents not defining self.key.
+        """
+        return {self.key: {"$exists": False}}
+
+    def kill_mask(self, df):
+        """
+        Returns True for rows of df without a value for self.key.
+        """
+        return np.logical_not(_column_defined(df, self.key))
+
 
 class MetadataInterval(Executioner):
     """
@@ -733,6 +985,41 @@ class MetadataInterval(Executioner):
             )
         return d
 
+    def metadata_keys(self):
+        return [self.key]
+
+    def kill_query(self):
+        """
+        Returns the MongoDB query matching documents with a value of
+        self.key outside (or inside when kill_if_outside is False) the
+        interval.
+        """
+        if self.kill_if_outside:
+            below = "$lt" if self.use_lower_edge else "$lte"
+            above = "$gt" if self.use_upper_edge else "$gte"
+            return {
+                "$or": [
+                    {self.key: {below: self.lower_endpoint}},
+                    {self.key: {above: self.upper_endpoint}},
+                ]
+            }
+        lower = "$gte" if self.use_lower_edge else "$gt"
+        upper = "$lte" if self.use_upper_edge else "$lt"
+        return {self.key: {lower: self.lower_endpoint, upper: self.upper_endpoint}}
+
+    def kill_mask(self, df):
+        """
+        Returns True for rows of df with a value of self.key outside (or
+        inside when kill_if_outside is False) the interval.
+        """
+        lower = operator.ge if self.use_lower_edge else operator.gt
+        upper = operator.le if self.use_upper_edge else operator.lt
+        inside = _column_test(df, self.key, lower, self.lower_endpoint)
+        inside &= _column_test(df, self.key, upper, self.upper_endpoint)
+        if self.kill_if_outside:
+            return _column_defined(df, self.key) & np.logical_not(inside)
+        return inside
+
 
 class FiringSquad(Executioner):
     """
@@ -816,6 +1103,50 @@ class FiringSquad(Executioner):
             )
         return self
 
+    def metadata_keys(self):
+        """
+        Returns the union of the keys used by the Executioners of the
+        chain or None if any of them cannot be compiled.
+        """
+        keys = []
+        for killer in self.executioners:
+            killer_keys = killer.metadata_keys()
+            if killer_keys is None:
+                return None
+            keys += [k for k in killer_keys if k not in keys]
+        return keys
+
+    def kill_query(self):
+        """
+        Returns a MongoDB query matching documents any of the Executioners
+        of the chain would kill ($or of their queries).  Returns None if any
+        of them cannot be expressed as a query or the chain is empty.
+        """
+        queries = [killer.kill_query() for killer in self.executioners]
+        if len(queries) == 0 or None in queries:
+            return None
+        if len(queries) == 1:
+            return queries[0]
+        return {"$or": queries}
+
+    def kill_mask(self, df):
+        """
+        Returns True for the rows of df any of the Executioners of the
+        chain would kill.   Returns None if any of them cannot be compiled.
+        """
+        mask = np.zeros(len(df), dtype=bool)
+        for killer in self.executioners:
+            killer_mask = killer.kill_mask(df)
+            if killer_mask is None:
+                return None
+            mask |= killer_mask
+        return mask
+
+    def _can_edit_in_bulk(self):
+        return len(self.executioners) > 0 and all(
+            [killer._can_edit_in_bulk() for killer in self.executioners]
+        )
+
 
 # Start base class and subclasses for header math operators
 
@@ -3,7 +3,18 @@ import obspy.signal.detrend
 import obspy.signal.cross_correlation
 import obspy.signal.interpolation
 import obspy.core.utcdatetime
+from functools import lru_cache
 
+import numpy as np
+from scipy.signal import iirfilter, sosfilt
+
+from mspasspy.ccore.seismic import (
+    TimeSeries,
+    Seismogram,
+    TimeSeriesEnsemble,
+    SeismogramEnsemble,
+)
+from mspasspy.ccore.utility import MsPASSError, ErrorSeverity
 from mspasspy.util.decorators import (
     mspass_func_wrapper,
     mspass_func_wrapper_multi,
@@ -16,11 +27,12 @@ from mspasspy.util.decorators import (
 from mspasspy.util.converter import Stream2Seismogram, Stream2TimeSeriesEnsemble
 
 
+# filter types computed by filter without conversion to obspy objects.
+# All other types are passed to the obspy filter methods.
+_NATIVE_FILTER_TYPES = ("bandpass", "bandstop", "lowpass", "highpass")
+
+
 @mspass_func_wrapper
-@timeseries_as_trace
-@seismogram_as_stream
-@timeseries_ensemble_as_stream
-@seismogram_ensemble_as_stream
 def filter(
     data,
     type,
@@ -36,6 +48,15 @@ def filter(
     This function filters the data of mspasspy objects. Note it is wrapped by mspass_func_wrapper, so the processing
     history and error logs can be preserved.
 
+    The 'bandpass', 'bandstop', 'lowpass', and 'highpass' types are computed
+    in place on the sample arrays of the data with the same filter designs
+    obspy uses.  The designs are cached by type, corners, and sample interval
+    so a filter is designed only once for a workflow.  Ensembles are filtered
+    member by member with the sample interval of each member.  All other types
+    are computed by converting the data to obspy Trace or Stream objects.
+    A datum with a corner frequency that is above the Nyquist frequency
+    is killed with a message posted to its error log.
+
     :param data: input data, only mspasspy data objects are accepted, i.e. TimeSeries, Seismogram, Ensemble.
     :param type: type of filter, 'bandpass', 'bandstop', 'lowpass', 'highpass', 'lowpass_cheby_2', 'lowpass_fir',
      'remez_fir'. You can refer to
@@ -53,9 +74,119 @@ def filter(
     :param options: extra kv options
     :return: None
     """
+    if type in _NATIVE_FILTER_TYPES:
+        _sos_filter(data, type, **options)
+    else:
+        _obspy_filter(data, type, *args, **options)
+
+
+@timeseries_as_trace
+@seismogram_as_stream
+@timeseries_ensemble_as_stream
+@seismogram_ensemble_as_stream
+def _obspy_filter(data, type, *args, **options):
+    """
+    Filters data by converting it to obspy Trace or Stream objects.  Used by
+    filter for the types it does not compute natively.
+    """
     data.filter(type, **options)  # inplace filtering
 
 
+@lru_cache(maxsize=128)
+def _filter_design(type, freqs, dt, corners, ftype, rp, rs):
+    """
+    Return the second order sections of the filter obspy designs for
+    filter type with corner frequencies freqs (a tuple) for data with
+    sample interval dt.   Designs are cached because for a workflow
+    there are normally only a few distinct sample intervals while the
+    design is more expensive than applying the filter to short data.
+    Raises a MsPASSError when a corner frequency is above the Nyquist
+    frequency.   Like obspy a bandpass with the high corner at or above
+    Nyquist is replaced by a highpass.
+    """
+    fe = 0.5 / dt
+    normalized_freqs = [f / fe for f in freqs]
+    btype = type
+    if type == "bandpass":
+        btype = "band"
+        if normalized_freqs[1] - 1.0 > -1.0e-6:
+            btype = "highpass"
+            normalized_freqs = normalized_freqs[:1]
+    if max(normalized_freqs) > 1.0:
+        raise MsPASSError(
+            "filter:  corner frequency of {} filter is above the Nyquist frequency {}".format(
+                type, fe
+            ),
+            ErrorSeverity.Invalid,
+        )
+    if len(normalized_freqs) == 1:
+        normalized_freqs = normalized_freqs[0]
+    try:
+        return iirfilter(
+            corners,
+            normalized_freqs,
+            rp=rp,
+            rs=rs,
+            btype=btype,
+            ftype=ftype,
+            output="sos",
+        )
+    except ValueError as err:
+        raise MsPASSError(
+            "filter:  design of {} filter failed:  {}".format(type, str(err)),
+            ErrorSeverity.Invalid,
+        )
+
+
+def _sos_filter(
+    data,
+    type,
+    freq=None,
+    freqmin=None,
+    freqmax=None,
+    corners=4,
+    zerophase=False,
+    ftype="butter",
+    rp=None,
+    rs=None,
+):
+    """
+    Filters the sample arrays of data in place with the filter types
+    of _NATIVE_FILTER_TYPES.  Arguments have the same meaning as the
+    obspy filter functions of the same type.
+    """
+    if type in ("bandpass", "bandstop"):
+        if freqmin is None or freqmax is None or freq is not None:
+            raise TypeError(
+                "filter:  type " + type + " requires the freqmin and freqmax arguments"
+            )
+        freqs = (float(freqmin), float(freqmax))
+    else:
+        if freq is None or freqmin is not None or freqmax is not None:
+            raise TypeError("filter:  type " + type + " requires the freq argument")
+        freqs = (float(freq),)
+    if isinstance(data, (TimeSeriesEnsemble, SeismogramEnsemble)):
+        members = data.member
+    else:
+        members = [data]
+    for d in members:
+        if d.dead() or d.npts == 0:
+            continue
+        try:
+            sos = _filter_design(type, freqs, d.dt, corners, ftype, rp, rs)
+        except MsPASSError as err:
+            d.elog.log_error("filter", err.message, err.severity)
+            d.kill()
+            continue
+        # a numpy view of the samples of a TimeSeries or the 3xnpts
+        # matrix of a Seismogram
+        x = np.asarray(d.data)
+        y = sosfilt(sos, x, axis=-1)
+        if zerophase:
+            y = np.flip(sosfilt(sos, np.flip(y, axis=-1), axis=-1), axis=-1)
+        x[...] = y
+
+
 @mspass_func_wrapper
 @timeseries_as_trace
 @seismogram_as_stream
@@ -1,4 +1,6 @@
 import pickle
+import threading
+from collections import OrderedDict
 import numpy as np
 from bson import ObjectId
 from scipy.signal import hilbert
@@ -16,6 +18,42 @@ from mspasspy.ccore.algorithms.amplitudes import (
 )
 from mspasspy.ccore.algorithms.basic import TimeWindow, Butterworth, _ExtractComponent
 from mspasspy.algorithms.window import WindowData
+from mspasspy.algorithms.traveltime import TravelTimeTable
+
+
+# Maximum number of multitaper engines cached in each thread by
+# _get_spectrum_engine.   Each one holds ntapers*npts taper values.
+_SPECTRUM_ENGINE_CACHE_SIZE = 32
+_spectrum_engine_cache = threading.local()
+
+
+def _get_spectrum_engine(npts, tbp, ntapers, nfft, dt):
+    """
+    Return a MTPowerSpectrumEngine for data windows of npts samples.
+
+    Constructing a MTPowerSpectrumEngine computes the Slepian tapers, which
+    is far more expensive than applying the operator.  FD_snr_estimator
+    would otherwise do that on every call, so engines are cached here with
+    least recently used eviction.  The tapers do not depend on the sample
+    interval so engines are keyed without dt and a cached engine is reset
+    to dt with set_df.  The cache is per thread because an engine has
+    internal work space and is not safe to share between threads.
+    """
+    cache = getattr(_spectrum_engine_cache, "engines", None)
+    if cache is None:
+        cache = OrderedDict()
+        _spectrum_engine_cache.engines = cache
+    key = (npts, tbp, ntapers, nfft)
+    engine = cache.get(key)
+    if engine is None:
+        engine = MTPowerSpectrumEngine(npts, tbp, ntapers, nfft, dt)
+        cache[key] = engine
+        if len(cache) > _SPECTRUM_ENGINE_CACHE_SIZE:
+            cache.popitem(last=False)
+    else:
+        cache.move_to_end(key)
+        engine.set_df(dt)
+    return engine
 
 
 def _window_invalid(d, win):
@@ -298,14 +336,13 @@ def FD_snr_estimator(
 
     :param noise_spectrum_engine: is expected to either by a None type
     or an instance of a ccore object called an MTPowerSpectralEngine.
-    When None an instance of MTPowerSpectralEngine is computed for
-    each call to this function.   That is a convenience for small
-    jobs or when called with data from mixed sample rates and/or variable
-    length time windows.   It is very inefficient to use the default
-    approach for processing large data sets and really for any use in a
-    map operation with dask or spark.  Normal use should be for the user to
-    predefine an MtPowerSpectralEngine from the expected window size
-    for a given data sample rate and include it in the function call.
+    When None an MTPowerSpectralEngine matching the window size, tbp,
+    and ntapers is fetched from a cache of recently used engines
+    maintained in each worker thread.  An engine is only constructed
+    (the expensive step that computes the Slepian tapers) the first time
+    a window size is seen, so the default is efficient for large data
+    sets as long as the number of distinct window sizes is small.
+    Passing an engine explicitly bypasses the cache.
 
     :param signal_spectrum_engine:  is the comparable MTPowerSpectralEngine
     to use to compute the signal power spectrum.   Default is None with the
@@ -461,11 +498,11 @@ def FD_snr_estimator(
         if noise_spectrum_engine:
             nengine = noise_spectrum_engine
         else:
-            nengine = MTPowerSpectrumEngine(n.npts, tbp, ntapers, n.npts * 2, n.dt)
+            nengine = _get_spectrum_engine(n.npts, tbp, ntapers, n.npts * 2, n.dt)
         if signal_spectrum_engine:
             sengine = signal_spectrum_engine
         else:
-            sengine = MTPowerSpectrumEngine(s.npts, tbp, ntapers, s.npts * 2, s.dt)
+            sengine = _get_spectrum_engine(s.npts, tbp, ntapers, s.npts * 2, s.dt)
         N = nengine.apply(n)
         S = sengine.apply(s)
         bwd = EstimateBandwidth(
@@ -942,10 +979,17 @@ def broadband_snr_QC(
     is required.  It defaults as None because there is no way the author
     knows to initialize it to anything valid.  If set it MUST be an instance
     of the obspy class TauPyModel (https://docs.obspy.org/packages/autogen/obspy.taup.tau.TauPyModel.html#obspy.taup.tau.TauPyModel)
+    or an instance of TravelTimeTable (mspasspy.algorithms.traveltime).
+    TauPyModel does a ray trace for every datum.  A TravelTimeTable
+    tabulating phase_name reduces that to an interpolation and is
+    strongly recommended for large data sets.   With a TravelTimeTable
+    a datum with a source depth or distance outside the table, or where
+    the phase does not exist, is killed.
     Mistakes in use of this argument can cause a MsPASSError exception to
     be thrown (not logged thrown as a fatal error) in one of two ways:
     (1)  If use_measured_arrival_time is False this argument must be defined,
-    and (2) if it is defined it MUST be an instance of TauPyModel.
+    and (2) if it is defined it MUST be an instance of TauPyModel or
+    TravelTimeTable.
 
     :param source_collection:  normalization collection for source data.
     The default is the MsPASS name "source" which means the function will
@@ -1013,13 +1057,28 @@ def broadband_snr_QC(
         receiver_lat = data_object[rcol + "_lat"]
         receiver_lon = data_object[rcol + "_lon"]
         delta = locations2degrees(source_lat, source_lon, receiver_lat, receiver_lon)
-        arrival = taup_model.get_travel_times(
-            source_depth_in_km=source_depth,
-            distance_in_degree=delta,
-            phase_list=[phase_name],
-        )
-        arrival_time = source_time + arrival[0].time
-        taup_arrival_phase = arrival[0].phase.name
+        if isinstance(taup_model, TravelTimeTable):
+            travel_time = taup_model.travel_time(phase_name, source_depth, delta)
+            if np.isnan(travel_time):
+                data_object.elog.log_error(
+                    "broadband_snr_QC",
+                    "Travel time table has no time for phase "
+                    + phase_name
+                    + " at source depth={} and distance={}".format(source_depth, delta),
+                    ErrorSeverity.Invalid,
+                )
+                data_object.kill()
+                return data_object
+            arrival_time = source_time + travel_time
+            taup_arrival_phase = phase_name
+        else:
+            arrival = taup_model.get_travel_times(
+                source_depth_in_km=source_depth,
+                distance_in_degree=delta,
+                phase_list=[phase_name],
+            )
+            arrival_time = source_time + arrival[0].time
+            taup_arrival_phase = arrival[0].phase.name
         # not sure if this will happen but worth trapping it as a warning if
         # it does
         if phase_name != taup_arrival_phase:
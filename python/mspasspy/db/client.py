@@ -1,4 +1,5 @@
 import pymongo
+from mspasspy.db.client_registry import client_state, get_client
 from mspasspy.db.database import Database
 
 
@@ -14,12 +15,19 @@ class DBClient(pymongo.MongoClient):
     :class:`~pymongo.MongoClient` created for convenience.
     In most cases there is functionally little difference from
     creating a MongoClient or the MsPASS DBClient (this class).
+    One difference is that an instance can be pickled.   Unpickling
+    returns the client with the same connection options held by the
+    current process (see :mod:`mspasspy.db.client_registry`) so workers
+    of a parallel job share one connection pool.
     """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.__default_database_name = self._MongoClient__default_database_name
 
+    def __reduce__(self):
+        return (get_client, (client_state(self),))
+
     def __getitem__(self, name):
         """
         Get a database by name.
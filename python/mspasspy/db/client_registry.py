@@ -0,0 +1,113 @@
+"""
+Per-process registry of MongoDB clients used when database handles are
+deserialized.
+
+A MongoClient cannot be pickled.  Database (and through it Collection)
+objects are serialized with a description of their client and a client
+is created again when they are deserialized.  Parallel readers and writers
+pass a Database handle to every task so creating a new client for each
+would open a new connection pool, with the TCP connection and handshake
+costs, for every task run by a worker.  The functions here instead keep
+one client for each distinct connection description in each process.
+Every handle deserialized in a worker process then shares the connection
+pool of one client.
+"""
+import importlib
+import os
+import threading
+
+_clients = dict()
+_clients_pid = None
+_lock = threading.Lock()
+_counts = {"created": 0, "reused": 0}
+
+
+def client_state(client):
+    """
+    Returns a picklable description of a MongoClient (or DBClient) used
+    by get_client to reconstruct or look up an equivalent client.
+    The connection options are taken from the repr of the client as
+    pymongo defines it to be usable as a constructor.
+    """
+    cls = type(client)
+    return {"module": cls.__module__, "class": cls.__name__, "repr": repr(client)}
+
+
+def _create_client(state):
+    # somewhat weird that these imports are needed but the repr of
+    # some options reference them
+    from pymongo import MongoClient
+    from bson.codec_options import CodecOptions, TypeRegistry, DatetimeConversion
+    from bson.binary import UuidRepresentation
+
+    cls = getattr(importlib.import_module(state["module"]), state["class"])
+    text = state["repr"]
+    # some versions of pymongo always write MongoClient as the class name
+    # so we replace the name with the class saved in the state
+    return eval(
+        "_client_class" + text[text.index("(") :], dict(locals(), _client_class=cls)
+    )
+
+
+def get_client(state):
+    """
+    Returns the client of the current process matching a description
+    returned by client_state.  The client is created on the first call
+    with a given description and the same instance is returned by all
+    later calls in the same process.
+
+    :param state:  output of client_state.  For compatibility with handles
+      pickled by earlier versions of MsPASS this can also be the repr
+      string of a MongoClient.
+    :return:  instance of the class of the client described by state
+    """
+    global _clients_pid
+    if isinstance(state, str):
+        state = {"module": "pymongo", "class": "MongoClient", "repr": state}
+    key = (state["module"], state["class"], state["repr"])
+    with _lock:
+        if _clients_pid != os.getpid():
+            # MongoClient instances are not fork safe so a child process
+            # must not use the clients created by its parent
+            _clients.clear()
+            _clients_pid = os.getpid()
+            _counts["created"] = 0
+            _counts["reused"] = 0
+        client = _clients.get(key)
+        if client is None:
+            client = _create_client(state)
+            _clients[key] = client
+            _counts["created"] += 1
+        else:
+            _counts["reused"] += 1
+        return client
+
+
+def client_registry_stats():
+    """
+    Returns a dict with the number of clients held by the registry of the
+    current process ("clients") and the number of calls to get_client
+    that created a new client ("created") or reused one ("reused").
+    With dask or spark this can be run on the workers (e.g. with
+    client.run for dask) to verify each worker holds only one client.
+    """
+    with _lock:
+        if _clients_pid != os.getpid():
+            return {"clients": 0, "created": 0, "reused": 0}
+        return dict(_counts, clients=len(_clients))
+
+
+def clear_client_registry():
+    """
+    Closes and drops all the clients held by the registry of the current
+    process and resets the counters.
+    """
+    global _clients_pid
+    with _lock:
+        if _clients_pid == os.getpid():
+            for client in _clients.values():
+                client.close()
+        _clients.clear()
+        _clients_pid = None
+        _counts["created"] = 0
+        _counts["reused"] = 0
@@ -3,11 +3,17 @@ Tools for connecting to MongoDB.
 """
 import os
 import io
+import concurrent.futures
 import copy
+import fnmatch
+import hashlib
 import pathlib
 import pickle
+import re
 import struct
+import time
 import urllib.request
+import zlib
 from array import array
 import pandas as pd
 
@@ -44,6 +50,16 @@ import base64
 import uuid
 
 from mspasspy.ccore.io import _mseed_file_indexer, _fwrite_to_file, _fread_from_file
+from mspasspy.db.client_registry import client_state, get_client
+from mspasspy.io.dfile_mmap import get_dfile_mmap_reader
+from mspasspy.io.mseed_packets import build_packet_index, packet_range
+from mspasspy.io.sample_codec import (
+    encode_samples,
+    decode_samples,
+    read_samples,
+    write_samples,
+    write_ensemble_samples,
+)
 from mspasspy.util.converter import Trace2TimeSeries, Stream2Seismogram
 
 from mspasspy.ccore.seismic import (
@@ -128,23 +144,20 @@ class Database(pymongo.database.Database):
 
     def __getstate__(self):
         ret = self.__dict__.copy()
-        ret["_Database__client"] = self.client.__repr__()
+        ret["_Database__client"] = client_state(self.client)
         ret["_BaseObject__codec_options"] = self.codec_options.__repr__()
         return ret
 
     def __setstate__(self, data):
-        # somewhat weird that this import is requiired here but it won't
-        # work without it.  Not sure how the symbol MongoClient is required
-        # here but it is - ignore if a lint like ide says MongoClient is not used
-        from pymongo import MongoClient
-
         # The following is also needed for this object to be serialized correctly
         # with dask distributed. Otherwise, the deserialized codec_options
         # will become a different type unrecognized by pymongo. Not sure why...
         from bson.codec_options import CodecOptions, TypeRegistry, DatetimeConversion
         from bson.binary import UuidRepresentation
 
-        data["_Database__client"] = eval(data["_Database__client"])
+        # All handles deserialized in a process share one client (and its
+        # connection pool) for each distinct connection
+        data["_Database__client"] = get_client(data["_Database__client"])
         data["_BaseObject__codec_options"] = eval(data["_BaseObject__codec_options"])
         self.__dict__.update(data)
 
@@ -347,6 +360,9 @@ class Database(pymongo.database.Database):
         merge_interpolation_samples=0,
         aws_access_key_id=None,
         aws_secret_access_key=None,
+        use_mmap=False,
+        attributes=None,
+        time_window=None,
     ):
         """
         This is the core MsPASS reader for constructing Seismogram or TimeSeries
@@ -431,6 +447,32 @@ class Database(pymongo.database.Database):
             which are used to interpolate between overlapping traces. Default to 0.
             If set to -1 all overlapping samples are interpolated.
         :type interpolation_samples: :class:`int`
+        :param use_mmap: When ``True`` sample data stored in binary files
+            (storage_mode "file" with no format) are read from a memory
+            mapping of the file kept open by the process
+            (see :class:`mspasspy.io.dfile_mmap.DfileMmapReader`) instead
+            of with fread.   That is much faster when many data are read
+            from the same files.  Default is ``False``.
+        :type use_mmap: :class:`bool`
+        :param attributes: list of the attributes to load into the
+          Metadata of the datum.   Only those keys are fetched from MongoDB
+          (a projection is passed to find) for the wf document and for the
+          documents of the collections listed in normalize.  The keys the
+          reader needs to construct the datum and load its sample data
+          (e.g. npts, delta, starttime, storage_mode, dir, dfile, and foff)
+          are always loaded.   Use this to keep the many attributes saved
+          by importers (e.g. in wf_miniseed) that are not needed downstream
+          out of the data.  The default (None) loads all attributes.
+        :type attributes: a :class:`list` of :class:`str`
+        :param time_window: optional (starttime, endtime) tuple of epoch
+          times of the interval of the datum that is needed.  It is only
+          used for miniseed data indexed with the packet_index option of
+          index_mseed_file.  For those only the miniseed packets overlapping
+          the interval are read and decoded.  The datum returned then starts
+          at the first sample of the first packet read and can extend
+          outside the interval by up to one packet.  Use WindowData to cut
+          the exact interval.  Default (None) reads the entire datum.
+        :type time_window: :class:`tuple`
         :return: either :class:`mspasspy.ccore.seismic.TimeSeries`
           or :class:`mspasspy.ccore.seismic.Seismogram`
         """
@@ -465,18 +507,23 @@ class Database(pymongo.database.Database):
             exclude_keys = []
 
         # This assumes the name of a metadata schema matches the data type it defines.
-        read_metadata_schema = self.metadata_schema[object_type.__name__]
-
-        # We temporarily swap the main collection defined by the metadata schema by
+        # The view swaps the main collection defined by the metadata schema by
         # the wf_collection. This ensures the method works consistently for any
-        # user-specified collection argument.
-        metadata_schema_collection = read_metadata_schema.collection("_id")
-        if metadata_schema_collection != wf_collection:
-            temp_metadata_schema = copy.deepcopy(self.metadata_schema)
-            temp_metadata_schema[object_type.__name__].swap_collection(
-                metadata_schema_collection, wf_collection, self.database_schema
-            )
-            read_metadata_schema = temp_metadata_schema[object_type.__name__]
+        # user-specified collection argument.  Views are cached by the schema.
+        read_metadata_schema = self.metadata_schema.view(
+            object_type.__name__, wf_collection, self.database_schema
+        )
+
+        # projections limiting what is fetched to attributes (None for all)
+        history_obj_id_name = (
+            self.database_schema.default_name("history_object") + "_id"
+        )
+        projection = _read_projection(
+            attributes, [col + "_id" for col in normalize] + [history_obj_id_name]
+        )
+        normalize_projections = _normalize_projections(
+            attributes, read_metadata_schema, self.database_schema
+        )
 
         # find the corresponding document according to object id
         col = self[wf_collection]
@@ -484,7 +531,7 @@ class Database(pymongo.database.Database):
             oid = object_id["_id"]
         except:
             oid = object_id
-        object_doc = col.find_one({"_id": oid})
+        object_doc = col.find_one({"_id": oid}, projection)
         if not object_doc:
             return None
 
@@ -492,6 +539,10 @@ class Database(pymongo.database.Database):
             if "data_tag" not in object_doc or object_doc["data_tag"] != data_tag:
                 return None
 
+        # the packet index of miniseed data is only used by the reader
+        # so we keep it out of the Metadata
+        packet_index = object_doc.pop("packet_index", None)
+
         # 1. build metadata as dict
         md = Metadata()
 
@@ -522,16 +573,23 @@ class Database(pymongo.database.Database):
             # 1.2.2. normalized key id exists in the wf document
             # 1.2.3. k is not one of the exclude keys
             # 1.2.4. col is in the normalize list provided by user
+            # 1.2.5. k was requested if attributes is defined
             if (
                 col
                 and col != wf_collection
                 and col + "_id" in object_doc
                 and k not in exclude_keys
                 and col in normalize
+                and (attributes is None or k in attributes)
             ):
                 # try to find the corresponding record in the normalized collection from the database
                 if col not in col_dict:
-                    col_dict[col] = self[col].find_one({"_id": object_doc[col + "_id"]})
+                    col_dict[col] = self[col].find_one(
+                        {"_id": object_doc[col + "_id"]},
+                        None
+                        if normalize_projections is None
+                        else normalize_projections[col],
+                    )
                 # might unable to find the normalized document by the normalized_id in the object_doc
                 # we skip reading this attribute
                 if not col_dict[col]:
@@ -650,6 +708,8 @@ class Database(pymongo.database.Database):
                         merge_method=merge_method,
                         merge_fill_value=merge_fill_value,
                         merge_interpolation_samples=merge_interpolation_samples,
+                        packet_index=packet_index,
+                        time_window=time_window,
                     )
                 else:
                     self._read_data_from_dfile(
@@ -657,12 +717,19 @@ class Database(pymongo.database.Database):
                         object_doc["dir"],
                         object_doc["dfile"],
                         object_doc["foff"],
+                        nbytes=object_doc.get("nbytes", 0),
                         merge_method=merge_method,
                         merge_fill_value=merge_fill_value,
                         merge_interpolation_samples=merge_interpolation_samples,
+                        use_mmap=use_mmap,
+                        sample_encoding=object_doc.get("sample_encoding"),
                     )
             elif storage_mode == "gridfs":
-                self._read_data_from_gridfs(mspass_object, object_doc["gridfs_id"])
+                self._read_data_from_gridfs(
+                    mspass_object,
+                    object_doc["gridfs_id"],
+                    sample_encoding=object_doc.get("sample_encoding"),
+                )
             elif storage_mode == "url":
                 self._read_data_from_url(
                     mspass_object,
@@ -684,9 +751,6 @@ class Database(pymongo.database.Database):
 
             # 3.load history
             if load_history:
-                history_obj_id_name = (
-                    self.database_schema.default_name("history_object") + "_id"
-                )
                 if history_obj_id_name in object_doc:
                     self._load_history(
                         mspass_object,
@@ -719,6 +783,7 @@ class Database(pymongo.database.Database):
         data_tag=None,
         alg_name="save_data",
         alg_id="0",
+        sample_encoding=None,
     ):
         """
         Use this method to save an atomic data object (TimeSeries or Seismogram)
@@ -854,6 +919,15 @@ class Database(pymongo.database.Database):
         :param data_tag: a user specified "data_tag" key.  See above and
           User's manual for guidance on how the use of this option.
         :type data_tag: :class:`str`
+        :param sample_encoding: encoding of the sample data for "file"
+          (with format None) and "gridfs" storage.  The default (None)
+          saves the raw 8 byte doubles.  "float32" halves the storage
+          size with a loss of precision.  "shuffle_zlib", "shuffle_zstd",
+          and "delta_zlib" are lossless compressed encodings.  See
+          :mod:`mspasspy.io.sample_codec` for details.   The encoding
+          used is saved in the wf document with the key "sample_encoding"
+          and read_data uses it to decode the data transparently.
+        :type sample_encoding: :class:`str`
         :return: Data object as saved (if killed it will be dead)
         """
         if not isinstance(mspass_object, (TimeSeries, Seismogram)):
@@ -1052,7 +1126,11 @@ class Database(pymongo.database.Database):
             if storage_mode == "file":
                 # TODO:  be sure this can't throw an exception
                 foff, nbytes = self._save_data_to_dfile(
-                    mspass_object, dir, dfile, format=format
+                    mspass_object,
+                    dir,
+                    dfile,
+                    format=format,
+                    sample_encoding=sample_encoding,
                 )
                 insertion_dict["dir"] = dir
                 insertion_dict["dfile"] = dfile
@@ -1060,17 +1138,29 @@ class Database(pymongo.database.Database):
                 if format and format != "binary":
                     insertion_dict["nbytes"] = nbytes
                     insertion_dict["format"] = format
+                elif mspass_object.is_defined("sample_encoding"):
+                    insertion_dict["nbytes"] = nbytes
+                    insertion_dict.pop("format", None)
                 else:
                     insertion_dict.pop("format", None)
                     insertion_dict.pop("nbytes", None)
             elif storage_mode == "gridfs":
                 if overwrite and "gridfs_id" in insertion_dict:
                     gridfs_id = self._save_data_to_gridfs(
-                        mspass_object, insertion_dict["gridfs_id"]
+                        mspass_object,
+                        insertion_dict["gridfs_id"],
+                        sample_encoding=sample_encoding,
                     )
                 else:
-                    gridfs_id = self._save_data_to_gridfs(mspass_object)
+                    gridfs_id = self._save_data_to_gridfs(
+                        mspass_object, sample_encoding=sample_encoding
+                    )
                 insertion_dict["gridfs_id"] = gridfs_id
+            # the savers post the encoding actually used to the datum
+            if mspass_object.is_defined("sample_encoding"):
+                insertion_dict["sample_encoding"] = mspass_object["sample_encoding"]
+            else:
+                insertion_dict.pop("sample_encoding", None)
                 # TODO will support url mode later
                 # elif storage_mode == "url":
                 #    pass
@@ -2676,13 +2766,24 @@ class Database(pymongo.database.Database):
             # if the gridfs_id parameter is defined it does an update
             # when it is not defined it creates a new gridfs "file". In both
             # cases the id needed to get the right datum is returned
+            # data are saved again with the encoding they were read with
+            if mspass_object.is_defined("sample_encoding"):
+                sample_encoding = mspass_object["sample_encoding"]
+            else:
+                sample_encoding = None
             if "gridfs_id" in mspass_object:
                 gridfs_id = self._save_data_to_gridfs(
-                    mspass_object, mspass_object["gridfs_id"]
+                    mspass_object,
+                    mspass_object["gridfs_id"],
+                    sample_encoding=sample_encoding,
                 )
             else:
-                gridfs_id = self._save_data_to_gridfs(mspass_object)
+                gridfs_id = self._save_data_to_gridfs(
+                    mspass_object, sample_encoding=sample_encoding
+                )
             mspass_object["gridfs_id"] = gridfs_id
+            if mspass_object.is_defined("sample_encoding"):
+                update_record["sample_encoding"] = mspass_object["sample_encoding"]
             # There is a possible efficiency gain right here.  Not sure if
             # gridfs_id is altered when the sample data are updated in place.
             # if we can be sure the returned gridfs_id is the same as the
@@ -2754,6 +2855,7 @@ class Database(pymongo.database.Database):
         data_tag=None,
         alg_name="read_ensemble_data",
         alg_id="0",
+        attributes=None,
     ):
         """
         Reads an subset of a dataset with some logical grouping into an Ensemble container.
@@ -2792,6 +2894,11 @@ class Database(pymongo.database.Database):
         :param collection: the collection name in the database that the object is stored. If not specified, use the default wf collection in the schema.
         :param data_tag: a user specified "data_tag" key to filter the read. If not match, the record will be skipped.
         :type data_tag: :class:`str`
+        :param attributes: list of the attributes to load into the Metadata
+          of each member.  Only those keys (and the keys needed to construct
+          the members and read their sample data) are fetched from MongoDB.
+          See read_data.  The default (None) loads all attributes.
+        :type attributes: a :class:`list` of :class:`str`
         :return: either :class:`mspasspy.ccore.seismic.TimeSeriesEnsemble` or
             :class:`mspasspy.ccore.seismic.SeismogramEnsemble`.
         """
@@ -2829,6 +2936,7 @@ class Database(pymongo.database.Database):
                 data_tag=data_tag,
                 alg_name=alg_name,
                 alg_id=alg_id,
+                attributes=attributes,
             )
             if data:
                 ensemble.member.append(data)
@@ -2853,6 +2961,8 @@ class Database(pymongo.database.Database):
         data_tag=None,
         alg_name="read_ensemble_data_group",
         alg_id="0",
+        use_mmap=False,
+        attributes=None,
     ):
         """
         Reads an subset of a dataset with some logical grouping into an Ensemble container.
@@ -2891,6 +3001,16 @@ class Database(pymongo.database.Database):
         :param collection: the collection name in the database that the object is stored. If not specified, use the default wf collection in the schema.
         :param data_tag: a user specified "data_tag" key to filter the read. If not match, the record will be skipped.
         :type data_tag: :class:`str`
+        :param use_mmap: When ``True`` the files are read from memory mappings
+          kept open by the process
+          (see :class:`mspasspy.io.dfile_mmap.DfileMmapReader`) instead of
+          with fread.  Default is ``False``.
+        :type use_mmap: :class:`bool`
+        :param attributes: list of the attributes to load into the Metadata
+          of each member.  Only those keys (and the keys needed to construct
+          the members and read their sample data) are fetched from MongoDB.
+          See read_data.  The default (None) loads all attributes.
+        :type attributes: a :class:`list` of :class:`str`
         :return: either :class:`mspasspy.ccore.seismic.TimeSeriesEnsemble` or
             :class:`mspasspy.ccore.seismic.SeismogramEnsemble`.
         """
@@ -2922,30 +3042,38 @@ class Database(pymongo.database.Database):
 
         cur_collection = self[wf_collection]
 
+        # This assumes the name of a metadata schema matches the data type it defines.
+        # The view swaps the main collection defined by the metadata schema by
+        # the wf_collection. This ensures the method works consistently for any
+        # user-specified collection argument.  Views are cached by the schema.
+        read_metadata_schema = self.metadata_schema.view(
+            object_type.__name__, wf_collection, self.database_schema
+        )
+
+        # projections limiting what is fetched to attributes (None for all).
+        # All normalizing collections linked by the wf documents are read here.
+        history_obj_id_name = (
+            self.database_schema.default_name("history_object") + "_id"
+        )
+        normalize_projections = _normalize_projections(
+            attributes, read_metadata_schema, self.database_schema
+        )
+        projection = _read_projection(
+            attributes,
+            [history_obj_id_name]
+            + [col + "_id" for col in (normalize_projections or {})],
+        )
+
         # this for loop build the skeleton of the ensemble:
         # firstly construct each object with metadata retrieved from mongodb document,
         # and then add the object to the ensemble
         for object_id in objectid_list:
-            # This assumes the name of a metadata schema matches the data type it defines.
-            read_metadata_schema = self.metadata_schema[object_type.__name__]
-
-            # We temporarily swap the main collection defined by the metadata schema by
-            # the wf_collection. This ensures the method works consistently for any
-            # user-specified collection argument.
-            metadata_schema_collection = read_metadata_schema.collection("_id")
-            if metadata_schema_collection != wf_collection:
-                temp_metadata_schema = copy.deepcopy(self.metadata_schema)
-                temp_metadata_schema[object_type.__name__].swap_collection(
-                    metadata_schema_collection, wf_collection, self.database_schema
-                )
-                read_metadata_schema = temp_metadata_schema[object_type.__name__]
-
             col = self[wf_collection]
             try:
                 oid = object_id["_id"]
             except:
                 oid = object_id
-            object_doc = col.find_one({"_id": oid})
+            object_doc = col.find_one({"_id": oid}, projection)
             if not object_doc:
                 return None
 
@@ -2996,11 +3124,15 @@ class Database(pymongo.database.Database):
                     and col + "_id" in object_doc
                     # and (not exclude_keys or k not in exclude_keys)
                     # and col in normalize
+                    and (attributes is None or k in attributes)
                 ):
                     # try to find the corresponding record in the normalized collection from the database
                     if col not in col_dict:
                         col_dict[col] = self[col].find_one(
-                            {"_id": object_doc[col + "_id"]}
+                            {"_id": object_doc[col + "_id"]},
+                            None
+                            if normalize_projections is None
+                            else normalize_projections[col],
                         )
                     # might unable to find the normalized document by the normalized_id in the object_doc
                     # we skip reading this attribute
@@ -3113,9 +3245,6 @@ class Database(pymongo.database.Database):
                 mspass_object.live = True
                 # 3.load history
                 if load_history:
-                    history_obj_id_name = (
-                        self.database_schema.default_name("history_object") + "_id"
-                    )
                     if history_obj_id_name in object_doc:
                         self._load_history(
                             mspass_object,
@@ -3147,6 +3276,8 @@ class Database(pymongo.database.Database):
                         "_id": {"dir": "$dir", "dfile": "$dfile"},
                         "foffs": {"$push": "$foff"},
                         "ids": {"$push": "$_id"},
+                        "encodings": {"$push": {"$ifNull": ["$sample_encoding", None]}},
+                        "nbytes": {"$push": {"$ifNull": ["$nbytes", 0]}},
                     }
                 },
             ]
@@ -3161,9 +3292,43 @@ class Database(pymongo.database.Database):
             # get indexes in the ensemble
             indexes = list(map(objectid_list.index, f["ids"]))
 
+            # data saved with a sample_encoding are decoded one at a time
+            # in file order.  The rest are read in bulk below.
+            encoded = sorted(
+                [
+                    (foff, i, encoding, nbytes)
+                    for foff, i, encoding, nbytes in zip(
+                        foffs, indexes, f["encodings"], f["nbytes"]
+                    )
+                    if encoding
+                ]
+            )
+            for foff, i, encoding, nbytes in encoded:
+                try:
+                    read_samples(
+                        ensemble.member[i],
+                        cur_dir,
+                        cur_dfile,
+                        foff,
+                        nbytes,
+                        encoding,
+                        mmap_reader=get_dfile_mmap_reader() if use_mmap else None,
+                    )
+                except (MsPASSError, OSError, zlib.error) as err:
+                    ensemble.member[i].kill()
+                    ensemble.member[i].elog.log_error(
+                        "read_ensemble_data_group", str(err), ErrorSeverity.Invalid
+                    )
+            zipped = [
+                (foff, i)
+                for foff, i, encoding in zip(foffs, indexes, f["encodings"])
+                if not encoding
+            ]
+            if len(zipped) == 0:
+                continue
+
             # sort according to foff in the file, because sequential reads are faster than random
             # here use zip to make sure foff and index has the same order
-            zipped = zip(foffs, indexes)
             sort_zipped = sorted(zipped, key=lambda x: x[0])
             foffs, indexes = [list(x) for x in zip(*sort_zipped)]
 
@@ -3172,7 +3337,12 @@ class Database(pymongo.database.Database):
             try:
                 # call C++ function fread_from_file to read part of ensemble from current file,
                 # indexes are the indexes of objects in the ensemble to be read
-                cnt = _fread_from_file(ensemble, cur_dir, cur_dfile, indexes)
+                if use_mmap:
+                    cnt = get_dfile_mmap_reader().read_ensemble(
+                        ensemble, cur_dir, cur_dfile, indexes
+                    )
+                else:
+                    cnt = _fread_from_file(ensemble, cur_dir, cur_dfile, indexes)
                 if cnt <= 0:
                     message = "fread returned a count of {count}".format(count=cnt)
                     ensemble.elog.log_error(
@@ -3296,6 +3466,7 @@ class Database(pymongo.database.Database):
         kill_on_failure=False,
         alg_name="save_ensemble_data_binary_file",
         alg_id="0",
+        sample_encoding=None,
     ):
         """
         Save an Ensemble container of a group of data objecs to MongoDB.
@@ -3337,6 +3508,10 @@ class Database(pymongo.database.Database):
           logged and left set live.  (Note data already marked dead are return
           are ignored by this function. )
         :type kill_on_failure: boolean
+        :param sample_encoding: encoding of the sample data of the members
+          (see the same argument of save_data).  The default (None) writes
+          raw doubles.
+        :type sample_encoding: :class:`str`
         """
         if not isinstance(ensemble_object, (TimeSeriesEnsemble, SeismogramEnsemble)):
             raise TypeError(
@@ -3399,8 +3574,15 @@ class Database(pymongo.database.Database):
             # create directory if not exists
             if not os.path.exists(dir):
                 os.makedirs(dir)
-            # This function has overloading.  this might not work
-            foffs = _fwrite_to_file(ensemble_object, dir, dfile)
+            if sample_encoding:
+                foffs = write_ensemble_samples(
+                    ensemble_object, dir, dfile, sample_encoding
+                )
+            else:
+                for d in ensemble_object.member:
+                    d.erase("sample_encoding")
+                # This function has overloading.  this might not work
+                foffs = _fwrite_to_file(ensemble_object, dir, dfile)
 
         except MsPASSError as merr:
             mspass_object.elog.log_error(merr)
@@ -4223,6 +4405,10 @@ class Database(pymongo.database.Database):
         merge_method=0,
         merge_fill_value=None,
         merge_interpolation_samples=0,
+        use_mmap=False,
+        sample_encoding=None,
+        packet_index=None,
+        time_window=None,
     ):
         """
         Read the stored data from a file and loads it into a mspasspy object.
@@ -4234,19 +4420,49 @@ class Database(pymongo.database.Database):
         :param dfile: file name.
         :type dfile: :class:`str`
         :param foff: offset that marks the starting of the data in the file.
-        :param nbytes: number of bytes to be read from the offset. This is only used when ``format`` is given.
+        :param nbytes: number of bytes to be read from the offset. This is only used when ``format`` or ``sample_encoding`` is given.
         :param format: the format of the file. This can be one of the `supported formats <https://docs.obspy.org/packages/autogen/obspy.core.stream.read.html#supported-formats>`__ of ObsPy writer. By default (``None``), the format will be the binary waveform.
         :type format: :class:`str`
         :param fill_value: Fill value for gaps. Defaults to None. Traces will be converted to NumPy masked arrays if no value is given and gaps are present.
         :type fill_value: :class:`int`, :class:`float` or None
+        :param use_mmap: when ``True`` binary data (``format`` None) are read
+          from the per-process memory mapping of the file instead of with fread.
+        :type use_mmap: :class:`bool`
+        :param sample_encoding: encoding of binary data saved with the
+          sample_encoding option of save_data.  None (the default) means
+          raw doubles.
+        :type sample_encoding: :class:`str`
+        :param packet_index: packet index table of miniseed data saved by
+          index_mseed_file (see :mod:`mspasspy.io.mseed_packets`).  Used
+          with time_window to read only the packets overlapping the window.
+        :param time_window: (starttime, endtime) tuple of the interval of
+          the data needed.  Ignored unless packet_index is defined.
         """
         if not isinstance(mspass_object, (TimeSeries, Seismogram)):
             raise TypeError("only TimeSeries and Seismogram are supported")
 
-        if not format:
+        if not format and sample_encoding:
+            try:
+                read_samples(
+                    mspass_object,
+                    dir,
+                    dfile,
+                    foff,
+                    nbytes,
+                    sample_encoding,
+                    mmap_reader=get_dfile_mmap_reader() if use_mmap else None,
+                )
+            except (MsPASSError, OSError, zlib.error) as err:
+                # Errors thrown must always cause a failure
+                raise MsPASSError("Error while read data from files.", "Fatal") from err
+        elif not format:
+            if use_mmap:
+                fread = get_dfile_mmap_reader().read
+            else:
+                fread = _fread_from_file
             if isinstance(mspass_object, TimeSeries):
                 try:
-                    count = _fread_from_file(mspass_object, dir, dfile, foff)
+                    count = fread(mspass_object, dir, dfile, foff)
                     if count != mspass_object.npts:
                         message = "fread count mismatch.  Expected to read {npts} but fread returned a count of {count}".format(
                             npts=mspass_object.npts, count=count
@@ -4263,7 +4479,7 @@ class Database(pymongo.database.Database):
                 # We can only get here if this is a Seismogram
                 try:
                     nsamples = 3 * mspass_object.npts
-                    count = _fread_from_file(mspass_object, dir, dfile, foff)
+                    count = fread(mspass_object, dir, dfile, foff)
                     if count != nsamples:
                         message = "fread count mismatch.  Expected to read {nsamples} doubles but fread returned a count of {count}".format(
                             nsamples=nsamples, count=count
@@ -4279,6 +4495,12 @@ class Database(pymongo.database.Database):
 
         else:
             fname = os.path.join(dir, dfile)
+            windowed = packet_index is not None and time_window is not None
+            if windowed:
+                offset, nbytes = packet_range(
+                    packet_index, nbytes, time_window[0], time_window[1]
+                )
+                foff += offset
             with open(fname, mode="rb") as fh:
                 if foff > 0:
                     fh.seek(foff)
@@ -4307,6 +4529,10 @@ class Database(pymongo.database.Database):
                     )  #   Convert the nparray type to double, to match the DoubleVector
                     mspass_object.npts = len(tr_data)
                     mspass_object.data = DoubleVector(tr_data)
+                    if windowed:
+                        # the data start at the first packet read, not at
+                        # the start of the segment defined in the database
+                        mspass_object.t0 = tr.stats.starttime.timestamp
                     mspass_object = Trace2TimeSeries(tr)
                 elif isinstance(mspass_object, Seismogram):
                     # This was previous form.   The toSeismogram run as a
@@ -4320,10 +4546,17 @@ class Database(pymongo.database.Database):
                     sm = st.toSeismogram(cardinal=True)
                     mspass_object.npts = sm.data.columns()
                     mspass_object.data = sm.data
+                    if windowed:
+                        mspass_object.t0 = sm.t0
 
     @staticmethod
     def _save_data_to_dfile(
-        mspass_object, dir, dfile, format=None, kill_on_failure=False
+        mspass_object,
+        dir,
+        dfile,
+        format=None,
+        kill_on_failure=False,
+        sample_encoding=None,
     ):
         """
         This is a private method used under the hood to save the sample data
@@ -4364,6 +4597,12 @@ class Database(pymongo.database.Database):
           logged and left set live.  (Note data already marked dead are return
           are ignored by this function. )
         :type kill_on_failure: boolean
+        :param sample_encoding: encoding of the sample data when format is
+          None (see :mod:`mspasspy.io.sample_codec`).  The default (None)
+          writes raw doubles with fwrite.  The encoding used is posted to
+          the Metadata of mspass_object with the key "sample_encoding".
+          That key is cleared when the data are saved without an encoding.
+        :type sample_encoding: :class:`str`
         :return: Position of first data sample (foff) and the size of the saved chunk.
            If the input is flagged as dead return (-1,0)
         """
@@ -4372,7 +4611,21 @@ class Database(pymongo.database.Database):
         if mspass_object.dead():
             return -1, 0
 
-        if not format or format == "binary":
+        mspass_object.erase("sample_encoding")
+        if (not format or format == "binary") and sample_encoding:
+            try:
+                foff, nbytes_written, encoding = write_samples(
+                    mspass_object, os.path.abspath(dir), dfile, sample_encoding
+                )
+            except OSError as err:
+                mspass_object.elog.log_error(
+                    "_save_data_to_dfile", str(err), ErrorSeverity.Invalid
+                )
+                if kill_on_failure:
+                    mspass_object.kill()
+                return 0, 0
+            mspass_object["sample_encoding"] = encoding
+        elif not format or format == "binary":
             try:
                 # create directory if not exists
                 dir = os.path.abspath(dir)
@@ -4407,7 +4660,7 @@ class Database(pymongo.database.Database):
                 nbytes_written = len(ub)
         return foff, nbytes_written
 
-    def _save_data_to_gridfs(self, mspass_object, gridfs_id=None):
+    def _save_data_to_gridfs(self, mspass_object, gridfs_id=None, sample_encoding=None):
         """
         Save a mspasspy object sample data to MongoDB grid file system. We recommend to use this method
         for saving a mspasspy object inside MongoDB.
@@ -4417,18 +4670,26 @@ class Database(pymongo.database.Database):
         :param gridfs_id: if the data is already stored and you want to update it, you should provide the object id
         of the previous data, which will be deleted. A new document will be inserted instead.
         :type gridfs_id: :class:`bson.objectid.ObjectId`.
+        :param sample_encoding: encoding of the sample data (see :mod:`mspasspy.io.sample_codec`).
+        The default (None) saves raw doubles.  The encoding used is posted to the Metadata of
+        mspass_object with the key "sample_encoding".
+        :type sample_encoding: :class:`str`
         :return inserted gridfs object id.
         """
         gfsh = gridfs.GridFS(self)
         if gridfs_id and gfsh.exists(gridfs_id):
             gfsh.delete(gridfs_id)
-        if isinstance(mspass_object, Seismogram):
+        mspass_object.erase("sample_encoding")
+        if sample_encoding:
+            ub, encoding = encode_samples(mspass_object, sample_encoding)
+            mspass_object["sample_encoding"] = encoding
+        elif isinstance(mspass_object, Seismogram):
             ub = bytes(np.array(mspass_object.data).transpose())
         else:
             ub = bytes(mspass_object.data)
         return gfsh.put(ub)
 
-    def _read_data_from_gridfs(self, mspass_object, gridfs_id):
+    def _read_data_from_gridfs(self, mspass_object, gridfs_id, sample_encoding=None):
         """
         Read data stored in gridfs and load it into a mspasspy object.
 
@@ -4436,10 +4697,15 @@ class Database(pymongo.database.Database):
         :type mspass_object: either :class:`mspasspy.ccore.seismic.TimeSeries` or :class:`mspasspy.ccore.seismic.Seismogram`
         :param gridfs_id: the object id of the data stored in gridfs.
         :type gridfs_id: :class:`bson.objectid.ObjectId`
+        :param sample_encoding: encoding of data saved with the sample_encoding
+        option of save_data.  None (the default) means raw doubles.
+        :type sample_encoding: :class:`str`
         """
         gfsh = gridfs.GridFS(self)
         fh = gfsh.get(file_id=gridfs_id)
-        if isinstance(mspass_object, TimeSeries):
+        if sample_encoding:
+            decode_samples(mspass_object, fh.read(), sample_encoding)
+        elif isinstance(mspass_object, TimeSeries):
             # fh.seek(16)
             float_array = array("d")
             if not mspass_object.is_defined("npts"):
@@ -5623,6 +5889,63 @@ class Database(pymongo.database.Database):
         # o['npts'] = index_record.npts
         return o
 
+    def _insert_mseed_index(
+        self, dbh, docs, logdata, elog_collection, normalize_channel, verbose
+    ):
+        """
+        Private method used by index_mseed_file and index_mseed_archive to
+        save the index documents of one file created by
+        _mseed_index_documents with one insert_many.   When
+        normalize_channel is True channel_id is set in each document
+        before the insert.  If the indexer logged errors (logdata is not
+        empty) one elog document is saved for each index document.
+
+        :return: tuple of the lists of ids of index and elog documents saved.
+        """
+        if normalize_channel:
+            for doc in docs:
+                # these quantities are always defined unless there was a
+                # read error and we can't get here if we had a read error.
+                if "loc" in doc:
+                    chandoc = self.get_seed_channel(
+                        doc["net"],
+                        doc["sta"],
+                        doc["chan"],
+                        doc["loc"],
+                        time=doc["starttime"],
+                        verbose=verbose,
+                    )
+                else:
+                    chandoc = self.get_seed_channel(
+                        doc["net"],
+                        doc["sta"],
+                        doc["chan"],
+                        time=doc["starttime"],
+                        verbose=verbose,
+                    )
+                if chandoc != None:
+                    doc["channel_id"] = chandoc["_id"]
+        ids_affected = []
+        if len(docs) > 0:
+            ids_affected = dbh.insert_many(docs).inserted_ids
+        # To mesh with the standard elog collection we add a copy of the
+        # error messages with a tag for each id in the ids_affected list.
+        # That should make elog connection to wf_miniseed records exactly
+        # like wf_TimeSeries records but with a different collection link
+        log_ids = []
+        if len(logdata) > 0 and len(ids_affected) > 0:
+            log_ids = (
+                self[elog_collection]
+                .insert_many(
+                    [
+                        {"logdata": logdata, "wf_miniseed_id": wfid}
+                        for wfid in ids_affected
+                    ]
+                )
+                .inserted_ids
+            )
+        return ids_affected, log_ids
+
     def index_mseed_file(
         self,
         dfile,
@@ -5633,6 +5956,7 @@ class Database(pymongo.database.Database):
         return_ids=False,
         normalize_channel=False,
         verbose=False,
+        packet_index=False,
     ):
         """
         This is the first stage import function for handling the import of
@@ -5739,6 +6063,16 @@ class Database(pymongo.database.Database):
           False.  Set this True if you are using inline normalization
           (normalize_channel set True) and you aren't certain your
           channel collection has no serious inconsistencies.
+        :param packet_index:  boolean controlling creation of a packet level
+          index.  When set True (default is False) the start time and offset
+          of every miniseed packet of each segment is saved in the document
+          as "packet_index" (see :mod:`mspasspy.io.mseed_packets`).
+          read_data uses that table to read and decode only the packets
+          overlapping the time_window it is given, which TimeIntervalReader
+          passes for every segment it reads.   That is much faster than
+          decoding a long segment (e.g. a day) to extract a short window.
+          The cost is an extra scan of the packet headers of the file when
+          the index is built and about 12 bytes per packet in the database.
         :exception: This function can throw a range of error types for
           a long list of possible io issues.   Callers should use a
           generic handler to avoid aborts in a large job.
@@ -5754,71 +6088,215 @@ class Database(pymongo.database.Database):
         if dfile is None:
             dfile = self._get_dfile_uuid("mseed")
         fname = os.path.join(odir, dfile)
-        (ind, elog) = _mseed_file_indexer(fname)
-        if len(elog.get_error_log()) > 0 and "No such file or directory" in str(
-            elog.get_error_log()
-        ):
-            raise FileNotFoundError(str(elog.get_error_log()))
-        ids_affected = []
-        for i in ind:
-            doc = self._convert_mseed_index(i)
-            doc["storage_mode"] = "file"
-            doc["format"] = "mseed"
-            doc["dir"] = odir
-            doc["dfile"] = dfile
-            thisid = dbh.insert_one(doc).inserted_id
-            ids_affected.append(thisid)
-        if normalize_channel:
-            # these quantities are always defined unless there was a read error
-            # and I don't think we can get here if we had a read error.
-            net = doc["net"]
-            sta = doc["sta"]
-            chan = doc["chan"]
-            stime = doc["starttime"]
-            if "loc" in doc:
-                loc = doc["loc"]
-                chandoc = self.get_seed_channel(
-                    net, sta, chan, loc, time=stime, verbose=False
-                )
-            else:
-                chandoc = self.get_seed_channel(
-                    net, sta, chan, time=stime, verbose=False
+        docs, logdata = _mseed_index_documents(fname, odir, dfile, packet_index)
+        ids_affected, log_ids = self._insert_mseed_index(
+            dbh, docs, logdata, elog_collection, normalize_channel, verbose
+        )
+        if return_ids:
+            return [ids_affected, log_ids]
+        else:
+            return None
+
+    def index_mseed_archive(
+        self,
+        dir,
+        pattern="*",
+        recursive=True,
+        collection="wf_miniseed",
+        manifest_collection="mseed_manifest",
+        elog_collection="elog",
+        nprocs=None,
+        checksum=True,
+        packet_index=False,
+        normalize_channel=False,
+        verbose=False,
+    ):
+        """
+        Indexes all the miniseed files in a directory tree with a pool of
+        processes.  The index documents are the same as those created by
+        index_mseed_file, which this method replaces for the common task
+        of importing an archive of miniseed files (e.g. the output of
+        obspy's mass_downloader or a day volume archive).
+
+        The method is incremental.   The size, modification time, and
+        (optionally) an md5 checksum of each file indexed are saved in a
+        manifest collection (manifest_collection argument) with one
+        document per file.  When the method is run again on the same
+        archive files with the same size and modification time as the
+        manifest are skipped without being read.  Only new files and files
+        that changed are indexed.  The index documents of a file that
+        changed, and the elog documents linked to them, are deleted before
+        the new ones are inserted.  When
+        checksum is True a file with a new modification time but the same
+        checksum (e.g. one that was copied or touched) is not indexed again.
+        Files that cannot be indexed, including files in which the reader
+        finds no miniseed data, count as failed.  They are not entered in
+        the manifest so they are retried the next time the method is run.
+
+        The files are scanned in parallel by nprocs worker processes with
+        a python ProcessPoolExecutor.  The workers only read files and
+        build documents.   All the database writes are done by the calling
+        process with one insert_many per file.
+
+        :param dir:  top level directory of the archive.
+        :param pattern:  unix shell style pattern (see python fnmatch) the
+          file names must match to be indexed.  Default ("*") indexes all
+          files.
+        :param recursive:  when True (default) subdirectories of dir
+          are searched.  When False only the files in dir are indexed.
+        :param collection:  collection for the index documents.  Default
+          is "wf_miniseed".
+        :param manifest_collection:  collection used for the manifest.
+          Default is "mseed_manifest".
+        :param elog_collection:  collection for error log messages of the
+          miniseed reader (see index_mseed_file).  Default is "elog".
+        :param nprocs:  number of worker processes.  Default (None) uses the
+          number of processors of the machine.  When set to 1 the files
+          are indexed serially in the calling process.
+        :param checksum:  when True (default) an md5 checksum of each
+          file is computed and saved in the manifest as described above.
+          Set False to skip the extra read of each file needed to
+          compute it.
+        :param packet_index:  passed to the indexer of each file.  See
+          index_mseed_file.
+        :param normalize_channel:  see index_mseed_file.
+        :param verbose:  when True progress and the summary statistics are
+          printed.
+        :return:  dict of summary statistics with the number of files
+          found ("files"), indexed ("indexed"), skipped as unchanged
+          ("skipped"), and that failed ("failed"), the number of index
+          documents saved ("documents"), the number of bytes of the files
+          indexed ("bytes"), the elapsed time in seconds ("elapsed"), and the
+          throughput of the files indexed as "files_per_second" and
+          "gb_per_second".  Error messages of failed files are listed in
+          "errors" as (path, message) tuples.
+        """
+        t0 = time.time()
+        odir = os.path.abspath(dir)
+        files = []
+        for root, dirnames, filenames in os.walk(odir):
+            dirnames.sort()
+            for name in sorted(fnmatch.filter(filenames, pattern)):
+                files.append((root, name))
+            if not recursive:
+                break
+
+        manifest = self[manifest_collection]
+        previous = {}
+        # dir values of the manifest documents are absolute paths so this
+        # anchored prefix query selects the documents of this archive
+        query = {"dir": {"$regex": "^" + re.escape(odir) + "(/|$)"}}
+        for doc in manifest.find(query):
+            previous[(doc["dir"], doc["dfile"])] = doc
+
+        tasks = []
+        skipped = 0
+        for fdir, fname in files:
+            st = os.stat(os.path.join(fdir, fname))
+            old = previous.get((fdir, fname))
+            if old and old["size"] == st.st_size and old["mtime"] == st.st_mtime:
+                skipped += 1
+                continue
+            tasks.append(
+                (
+                    fdir,
+                    fname,
+                    st.st_size,
+                    st.st_mtime,
+                    old["checksum"] if (old and checksum) else None,
+                    checksum,
+                    packet_index,
                 )
-            if chandoc != None:
-                doc["channel_id"] = chandoc["_id"]
+            )
 
-        # log_ids is created here so it is defined but empty in
-        # the tuple returned when return_ids is true
-        log_ids = []
-        if elog.size() > 0:
-            elog_col = self[elog_collection]
+        stats = {
+            "files": len(files),
+            "indexed": 0,
+            "skipped": skipped,
+            "failed": 0,
+            "documents": 0,
+            "bytes": 0,
+            "errors": [],
+        }
+        dbh = self[collection]
 
-            errs = elog.get_error_log()
-            jobid = elog.get_job_id()
-            logdata = []
-            for x in errs:
-                logdata.append(
-                    {
-                        "job_id": jobid,
-                        "algorithm": x.algorithm,
-                        "badness": str(x.badness),
-                        "error_message": x.message,
-                        "process_id": x.p_id,
-                    }
+        def save(result):
+            fdir, fname, size, mtime, file_checksum, docs, logdata, error = result
+            path = os.path.join(fdir, fname)
+            if error is not None:
+                stats["failed"] += 1
+                stats["errors"].append((path, error))
+                if verbose:
+                    print("index_mseed_archive:  failed to index", path, error)
+                return
+            old = previous.get((fdir, fname))
+            if docs is None:
+                # checksum unchanged - only the manifest is updated
+                stats["skipped"] += 1
+            else:
+                if old:
+                    # the elog documents of the old index are deleted with it
+                    old_ids = [
+                        doc["_id"]
+                        for doc in dbh.find({"dir": fdir, "dfile": fname}, {"_id": 1})
+                    ]
+                    if len(old_ids) > 0:
+                        self[elog_collection].delete_many(
+                            {"wf_miniseed_id": {"$in": old_ids}}
+                        )
+                        dbh.delete_many({"_id": {"$in": old_ids}})
+                ids, log_ids = self._insert_mseed_index(
+                    dbh, docs, logdata, elog_collection, normalize_channel, verbose
                 )
-            docentry = {"logdata": logdata}
-            # To mesh with the standard elog collection we add a copy of the
-            # error messages with a tag for each id in the ids_affected list.
-            # That should make elog connection to wf_miniseed records exactly
-            # like wf_TimeSeries records but with a different collection link
-            for wfid in ids_affected:
-                docentry["wf_miniseed_id"] = wfid
-                elogid = elog_col.insert_one(docentry).inserted_id
-                log_ids.append(elogid)
-        if return_ids:
-            return [ids_affected, log_ids]
+                stats["indexed"] += 1
+                stats["documents"] += len(ids)
+                stats["bytes"] += size
+            manifest.update_one(
+                {"dir": fdir, "dfile": fname},
+                {
+                    "$set": {
+                        "size": size,
+                        "mtime": mtime,
+                        "checksum": file_checksum,
+                        "collection": collection,
+                        "index_time": time.time(),
+                    }
+                },
+                upsert=True,
+            )
+
+        if nprocs == 1 or len(tasks) <= 1:
+            for task in tasks:
+                save(_index_mseed_archive_file(task))
         else:
-            return None
+            with concurrent.futures.ProcessPoolExecutor(max_workers=nprocs) as pool:
+                futures = [
+                    pool.submit(_index_mseed_archive_file, task) for task in tasks
+                ]
+                for future in concurrent.futures.as_completed(futures):
+                    save(future.result())
+
+        elapsed = time.time() - t0
+        stats["elapsed"] = elapsed
+        stats["files_per_second"] = stats["indexed"] / elapsed if elapsed > 0 else 0.0
+        stats["gb_per_second"] = (
+            stats["bytes"] / 1.0e9 / elapsed if elapsed > 0 else 0.0
+        )
+        if verbose:
+            print(
+                "index_mseed_archive:  {} files found, {} indexed, {} unchanged, {} failed".format(
+                    stats["files"], stats["indexed"], stats["skipped"], stats["failed"]
+                )
+            )
+            print(
+                "index_mseed_archive:  {} documents saved in {:.1f} s ({:.1f} files/s, {:.3f} GB/s)".format(
+                    stats["documents"],
+                    elapsed,
+                    stats["files_per_second"],
+                    stats["gb_per_second"],
+                )
+            )
+        return stats
 
     def save_dataframe(
         self, df, collection, null_values=None, one_to_one=True, parallel=False
@@ -6360,6 +6838,92 @@ class Database(pymongo.database.Database):
         return dfile
 
 
+def _mseed_index_documents(fname, dir, dfile, packet_index=False):
+    """
+    Scans the miniseed file fname with the C++ indexer and converts the
+    result to the wf_miniseed documents saved by index_mseed_file and
+    index_mseed_archive.   Does not use the database so it can be run by
+    worker processes.
+
+    :return:  tuple of the list of index documents and the list of elog
+      logdata entries of errors posted by the indexer (empty when there
+      were none).
+    :exception:  raises FileNotFoundError if fname does not exist.
+    """
+    (ind, elog) = _mseed_file_indexer(fname)
+    if len(elog.get_error_log()) > 0 and "No such file or directory" in str(
+        elog.get_error_log()
+    ):
+        raise FileNotFoundError(str(elog.get_error_log()))
+    docs = []
+    for i in ind:
+        doc = Database._convert_mseed_index(i)
+        doc["storage_mode"] = "file"
+        doc["format"] = "mseed"
+        doc["dir"] = dir
+        doc["dfile"] = dfile
+        if packet_index:
+            table = build_packet_index(fname, doc["foff"], doc["nbytes"])
+            # segments that cannot be indexed are read in full
+            if table is not None:
+                doc["packet_index"] = table
+        docs.append(doc)
+    logdata = []
+    if elog.size() > 0:
+        jobid = elog.get_job_id()
+        for x in elog.get_error_log():
+            logdata.append(
+                {
+                    "job_id": jobid,
+                    "algorithm": x.algorithm,
+                    "badness": str(x.badness),
+                    "error_message": x.message,
+                    "process_id": x.p_id,
+                }
+            )
+    return docs, logdata
+
+
+def _file_checksum(fname):
+    """
+    Returns the md5 checksum of the file fname as a hex string.
+    """
+    md5 = hashlib.md5()
+    with open(fname, mode="rb") as fh:
+        for block in iter(lambda: fh.read(1 << 22), b""):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+def _index_mseed_archive_file(task):
+    """
+    Function run by the worker processes of Database.index_mseed_archive
+    to index one file.  task is a tuple of (dir, dfile, size, mtime,
+    checksum in the manifest or None, compute checksum, packet_index).
+    Returns a tuple of (dir, dfile, size, mtime, checksum, docs, logdata,
+    error).  docs is None if the checksum of the file is the same as
+    in the manifest.  Errors are returned as a message in error instead of
+    being raised so one bad file does not abort the import.
+    """
+    dir, dfile, size, mtime, old_checksum, checksum, packet_index = task
+    fname = os.path.join(dir, dfile)
+    try:
+        file_checksum = _file_checksum(fname) if checksum else None
+        if old_checksum is not None and file_checksum == old_checksum:
+            return (dir, dfile, size, mtime, file_checksum, None, None, None)
+        docs, logdata = _mseed_index_documents(fname, dir, dfile, packet_index)
+        if len(docs) == 0:
+            # nothing the readers could use (e.g. not a miniseed file) so
+            # the file is reported as failed and not entered in the manifest
+            message = "no miniseed data could be indexed"
+            if len(logdata) > 0:
+                message += ":  " + "\n".join([x["error_message"] for x in logdata])
+            return (dir, dfile, size, mtime, None, None, None, message)
+        return (dir, dfile, size, mtime, file_checksum, docs, logdata, None)
+    except Exception as err:
+        return (dir, dfile, size, mtime, None, None, None, str(err))
+
+
 def index_mseed_file_parallel(db, *arg, **kwargs):
     """
     A parallel wrapper for the index_mseed_file method in the Database class.
@@ -6380,3 +6944,80 @@ def index_mseed_file_parallel(db, *arg, **kwargs):
     except FileNotFoundError as e:
         ret = str(e)
     return ret
+
+
+# wf attributes always fetched by the readers when the attributes argument
+# limits what is loaded.  They are needed to construct the data objects
+# (npts, sample interval, time reference and the transformation matrix
+# of Seismogram) and to locate and read the sample data for every
+# storage_mode.
+_READ_REQUIRED_KEYS = (
+    "npts",
+    "delta",
+    "starttime",
+    "starttime_shift",
+    "time_standard",
+    "utc_convertible",
+    "tmatrix",
+    "cardinal",
+    "orthogonal",
+    "storage_mode",
+    "dir",
+    "dfile",
+    "foff",
+    "nbytes",
+    "format",
+    "sample_encoding",
+    "packet_index",
+    "gridfs_id",
+    "url",
+    "data_tag",
+    "net",
+    "sta",
+    "chan",
+    "loc",
+    "year",
+    "day_of_year",
+    "filename",
+    "provider",
+)
+
+
+def _read_projection(attributes, extra_keys=()):
+    """
+    Returns the projection passed to find for wf documents by the readers
+    given their attributes argument or None (all keys) if attributes is
+    None.  The projection includes the keys the readers require
+    (_READ_REQUIRED_KEYS) and extra_keys, which the readers use for the
+    links to normalizing, history, and elog collections.
+    """
+    if attributes is None:
+        return None
+    projection = dict.fromkeys(_READ_REQUIRED_KEYS, True)
+    for k in extra_keys:
+        projection[k] = True
+    for k in attributes:
+        projection[k] = True
+    return projection
+
+
+def _normalize_projections(attributes, read_metadata_schema, database_schema):
+    """
+    Returns a dict keyed by normalizing collection name of the projections
+    passed to find for documents of that collection by the readers given
+    their attributes argument.   Keys of the metadata schema are mapped
+    to their unique name in the collection.  Returns None if attributes
+    is None.
+    """
+    if attributes is None:
+        return None
+    projections = {}
+    for k in attributes:
+        if not read_metadata_schema.is_defined(k):
+            continue
+        col = read_metadata_schema.collection(k)
+        if col:
+            projections.setdefault(col, {"_id": True})[
+                database_schema[col].unique_name(k)
+            ] = True
+    return projections
@@ -198,7 +198,7 @@ def TimeIntervalReader(
             current_keys = seed_keys(doc)
             current = _initialize_ensemble(doc, tstart, tend)
             segments = TimeSeriesVector()
-            datum = db.read_data(doc, collection=collection)
+            datum = db.read_data(doc, collection=collection, time_window=(tstart, tend))
             if datum.dead():
                 count += 1
                 continue
@@ -208,7 +208,9 @@ def TimeIntervalReader(
             test_keys = seed_keys(doc)
             # Handle the last item specially.
             if count >= ndocs - 1:
-                datum = db.read_data(doc, collection=collection)
+                datum = db.read_data(
+                    doc, collection=collection, time_window=(tstart, tend)
+                )
                 if test_keys == current_keys:
                     segments.append(datum)
                     if len(segments) == 1:
@@ -240,7 +242,9 @@ def TimeIntervalReader(
                     # be entered if the last doc is a new net:sta:chan:loc
                     # that would otherwise initiate creation and appending
                     # of a new segments vector.
-                    datum = db.read_data(doc, collection=collection)
+                    datum = db.read_data(
+                        doc, collection=collection, time_window=(tstart, tend)
+                    )
                     datum = WindowData(datum, tstart, tend)
                     if datum.live:  # do nothing further if dead
                         if current_keys.same_channel(test_keys):
@@ -290,7 +294,9 @@ def TimeIntervalReader(
                 if current_keys.same_channel(test_keys):
                     current_keys = test_keys
                     segments = TimeSeriesVector()
-                    datum = db.read_data(doc, collection=collection)
+                    datum = db.read_data(
+                        doc, collection=collection, time_window=(tstart, tend)
+                    )
                     if datum.live:
                         segments.append(datum)
                 else:
@@ -308,12 +314,16 @@ def TimeIntervalReader(
                         current = _initialize_ensemble(doc, tstart, tend)
                         current_keys = test_keys
                         segments = TimeSeriesVector()
-                        datum = db.read_data(doc, collection=collection)
+                        datum = db.read_data(
+                            doc, collection=collection, time_window=(tstart, tend)
+                        )
                         if datum.live:
                             segments.append(datum)
 
             else:
-                datum = db.read_data(doc, collection=collection)
+                datum = db.read_data(
+                    doc, collection=collection, time_window=(tstart, tend)
+                )
                 segments.append(datum)
                 current_keys = test_keys
 
@@ -9,13 +9,17 @@ from mspasspy.ccore.seismic import (
     SeismogramEnsemble,
 )
 from mspasspy.db.database import Database
+from mspasspy.db.shared_cache import SharedCache, SharedNormalizationCache
 from mspasspy.util.decorators import mspass_func_wrapper
 
 from bson import ObjectId
 
 from obspy import UTCDateTime
 import pymongo
+import collections
 import copy
+import threading
+import time
 import pandas as pd
 import dask
 import numpy as np
@@ -237,11 +241,14 @@ class DatabaseMatcher(BasicMatcher):
         aliases=None,
         require_unique_match=False,
         prepend_collection_name=False,
+        cache_size=0,
+        cache_ttl=None,
     ):
         """
         Constructor for this intermediate class.  It should not be
         used except by subclasses as this intermediate class
-        is not concrete.
+        is not concrete.  cache_size and cache_ttl define the optional
+        query cache.  See the find method.
         """
         super().__init__(
             attributes_to_load=attributes_to_load,
@@ -258,6 +265,10 @@ class DatabaseMatcher(BasicMatcher):
         self.dbhandle = db[collection]
         self.require_unique_match = require_unique_match
         self.prepend_collection_name = prepend_collection_name
+        if cache_size > 0:
+            self._query_cache = _QueryCache(cache_size, cache_ttl)
+        else:
+            self._query_cache = None
 
     @abstractmethod
     def query_generator(self, mspass_object) -> dict:
@@ -304,6 +315,22 @@ class DatabaseMatcher(BasicMatcher):
         We don't return an PyErrorLogger in that situation as the assumption
         is there is no place to put it and something else has gone really
         wrong.
+
+        When the constructor was called with cache_size > 0 the results
+        of the last cache_size distinct queries, including queries that
+        yielded no documents, are saved in a least recently used cache
+        keyed by the output of query_generator.  A datum generating the
+        same query as a recent one is then matched without a database
+        query.  That is common as data are usually sorted by station or
+        source.   Note queries containing a time of the datum (e.g.
+        MiniseedDBMatcher) only repeat for data with the same time.
+        If cache_ttl is defined saved results older than cache_ttl
+        seconds are not used so changes to the collection are seen
+        after at most that time.  The Metadata containers returned
+        for a cached query are shared by all the data matching it
+        and should not be altered.   Each copy of the matcher made by
+        pickle (e.g. one for each dask task) has its own empty cache.
+        Use cache_stats to get the hit and miss counts.
         """
         if not _input_is_valid(mspass_object):
             elog = PyErrorLogger()
@@ -317,16 +344,17 @@ class DatabaseMatcher(BasicMatcher):
             message = "query_generator method failed to generate a valid query - required attributes are probably missing"
             elog.log_error(message, ErrorSeverity.Invalid)
             return [None, elog]
-        number_hits = self.dbhandle.count_documents(query)
-        if number_hits <= 0:
-            elog = PyErrorLogger()
-            message = "query = " + str(query) + " yielded no documents"
-            elog.log_error(message, ErrorSeverity.Complaint)
-            return [None, elog]
-        cursor = self.dbhandle.find(query)
-        elog = PyErrorLogger()
+        cache_key = None
+        if self._query_cache is not None:
+            cache_key = _query_cache_key(query)
+            if cache_key is not None:
+                found, metadata_list = self._query_cache.get(cache_key)
+                if found:
+                    return self._query_output(query, metadata_list)
+        # the count_documents call this replaced doubled the number
+        # of database round trips
         metadata_list = []
-        for doc in cursor:
+        for doc in self.dbhandle.find(query):
             try:
                 md = _extractData2Metadata(
                     doc,
@@ -339,11 +367,44 @@ class DatabaseMatcher(BasicMatcher):
                 metadata_list.append(md)
             except MsPASSError as e:
                 raise MsPASSError("DatabaseMatcher.find: " + e.message, e.severity)
+        if cache_key is not None:
+            self._query_cache.put(cache_key, metadata_list)
+        return self._query_output(query, metadata_list)
 
-        if elog.size() <= 0:
-            return [metadata_list, None]
-        else:
-            return [metadata_list, elog]
+    def _query_output(self, query, metadata_list):
+        """
+        Private method used by find to build its output from the list of
+        Metadata containers matching query.
+        """
+        if len(metadata_list) <= 0:
+            elog = PyErrorLogger()
+            message = "query = " + str(query) + " yielded no documents"
+            elog.log_error(message, ErrorSeverity.Complaint)
+            return [None, elog]
+        # a copy so a caller changing the list does not alter the cache
+        return [list(metadata_list), None]
+
+    def cache_stats(self) -> dict:
+        """
+        Returns a dict with the number of find calls matched from the
+        query cache ("hits"), the number that ran a database query
+        ("misses"), the number of saved results dropped to keep the
+        cache size below the limit ("evictions") or because they were
+        older than cache_ttl ("expired"), and the number of results
+        in the cache ("size").   All the values are 0 if the cache
+        is disabled (the default).
+        """
+        if self._query_cache is None:
+            return {"hits": 0, "misses": 0, "evictions": 0, "expired": 0, "size": 0}
+        return self._query_cache.stats()
+
+    def clear_cache(self):
+        """
+        Empties the query cache and resets the counts returned by
+        cache_stats.   Use this if the collection was changed.
+        """
+        if self._query_cache is not None:
+            self._query_cache.clear()
 
     def find_one(self, mspass_object):
         """
@@ -640,6 +701,37 @@ class DictionaryCacheMatcher(BasicMatcher):
         else:
             return [self.normcache[thisid], None]
 
+    def share_cache(self, cache_dir=None):
+        """
+        Moves the cache to a file mapped in memory that is shared by
+        all the processes that use this matcher.
+
+        By default every dask or spark worker process that runs a
+        normalization with this matcher deserializes its own copy of the
+        cache.   After a call to this method the cache is written once
+        to a file in cache_dir and pickling the matcher saves only the
+        path of that file.  Each worker then maps the file read only so
+        the processes of a node share one copy of the cache.  The
+        results of find and find_one are unchanged but the Metadata
+        containers for a key are decoded from the file on each call.
+
+        The file is removed when this instance is garbage collected so
+        the matcher must be kept alive until the workflow using it has
+        completed.
+
+        :param cache_dir:  directory where the file is created.  Default
+          is /dev/shm (the default directory for temporary files if
+          that does not exist).  On a cluster with more than one node
+          it must be a file system visible to all the nodes.
+        :return:  self to allow a constructor to be followed by this
+          method in one line.
+        """
+        if not isinstance(self.normcache, SharedNormalizationCache):
+            self.normcache = SharedNormalizationCache.create(
+                self.normcache, cache_dir=cache_dir
+            )
+        return self
+
     def _db_load_normalization_cache(self, db, collection):
         """
         This private method abstracts the process of loading a cached
@@ -798,7 +890,15 @@ class DataFrameCacheMatcher(BasicMatcher):
     This is an intermediate class for instances where the database collection
     to be matched is small enough that the in-memory model is appropriate.
     It should be used when the matching algorithm is readily cast into the
-    subsetting api of a pandas DataFrame.
+    subsetting api of a pandas DataFrame.  Subclasses can optionally
+    also implement a "subset_rows" method returning a numpy array of
+    the integer positions of the matching rows in the cache.  When
+    subset_rows is defined find uses it instead of subset and builds
+    the output from lists of column values precomputed when the cache
+    is loaded.  That avoids constructing a DataFrame for each datum
+    and is orders of magnitude faster.  All the concrete implementations
+    in this module use that approach and implement subset as the
+    DataFrame rows selected by subset_rows.
 
     The constructor of this intermediate class first calls the BasicMatcher
     (base class) constructor to initialize some common attribute including
@@ -844,6 +944,8 @@ class DataFrameCacheMatcher(BasicMatcher):
         self.prepend_collection_name = prepend_collection_name
         self.require_unique_match = require_unique_match
         self.custom_null_values = custom_null_values
+        # set by share_cache
+        self._shared_cache = None
         # this is a necessary sanity check
         if collection is None:
             raise TypeError(
@@ -883,6 +985,16 @@ class DataFrameCacheMatcher(BasicMatcher):
             else pd.DataFrame(list(db_or_df[self.collection].find({})))
         )
         self._load_dataframe_cache(df)
+        # find uses subset_rows only when it is implemented at the same
+        # level of the class hierarchy as subset or below.  That assures
+        # a subclass overriding only subset gets what it expects.
+        self._use_subset_rows = False
+        for cls in type(self).__mro__:
+            if "subset_rows" in cls.__dict__:
+                self._use_subset_rows = True
+                break
+            if "subset" in cls.__dict__:
+                break
 
     def find(self, mspass_object) -> tuple:
         """
@@ -895,6 +1007,12 @@ class DataFrameCacheMatcher(BasicMatcher):
         It then copies entries in attributes_to_load and when not
         null load_if_defined into one Metadata container for each
         row of the returned DataFrame.
+
+        When a subclass implements the subset_rows method the
+        DataFrame is never constructed.  The matching rows are then
+        copied from python lists of column values precomputed when the
+        cache was loaded, which is much faster than iterating over the
+        rows of a DataFrame.
         """
         if not _input_is_valid(mspass_object):
             elog = PyErrorLogger(
@@ -904,63 +1022,44 @@ class DataFrameCacheMatcher(BasicMatcher):
             )
             return [None, elog]
 
-        subset_df = self.subset(mspass_object)
-        # assume all implementations will return a 0 length dataframe
+        if self._use_subset_rows:
+            # fast path - rows are positions in the compiled cache.
+            # loaders is None when the rows are in a shared cache
+            rows = self.subset_rows(mspass_object)
+            loaders = self._loaders
+        else:
+            # subclasses that only implement subset land here
+            subset_df = self.subset(mspass_object)
+            rows = range(len(subset_df))
+            loaders = self._compile_loaders(subset_df)
+        # assume all implementations will return a 0 length result
         # if the subset failed.
-        if len(subset_df) <= 0:
+        if len(rows) <= 0:
             error_message = "subset method found no match for this datum"
             elog = PyErrorLogger()
             elog.log_error(error_message, ErrorSeverity.Invalid)
             return [None, elog]
         else:
             # This loop cautiously fills one or more Metadata
-            # containers with each row of the DataFrame generating
+            # containers with each matching row generating
             # one Metadata container.
             mdlist = list()
-            elog = None
-            for index, row in subset_df.iterrows():
-                md = Metadata()
-                notnulltest = row.notnull()
-                for k in self.attributes_to_load:
-                    if notnulltest[k]:
-                        if k in self.aliases:
-                            key = self.aliases[k]
-                        else:
-                            key = k
-                        if self.prepend_collection_name:
-                            if key == "_id":
-                                mdkey = self.collection + key
-                            else:
-                                mdkey = self.collection + "_" + key
-                        else:
-                            mdkey = key
-                        md[mdkey] = row[key]
-                    else:
-                        if elog is None:
-                            elog = PyErrorLogger()
-                        error_message = "Encountered Null value for required attribute {key} - repairs of the input DataFrame are required".format(
-                            key=k
-                        )
-                        elog.log_error(
-                            error_message,
-                            ErrorSeverity.Invalid,
-                        )
-                        return [None, elog]
-                for k in self.load_if_defined:
-                    if notnulltest[k]:
-                        if k in self.aliases:
-                            key = self.aliases[k]
-                        else:
-                            key = k
-                        if self.prepend_collection_name:
-                            if key == "_id":
-                                mdkey = self.collection + key
-                            else:
-                                mdkey = self.collection + "_" + key
-                        else:
-                            mdkey = key
-                        md[mdkey] = row[key]
-                mdlist.append(md)
+            for i in rows:
+                if loaders is None:
+                    doc, null_key = self._shared_cache.get(i)
+                else:
+                    doc, null_key = _load_row(loaders, i)
+                if null_key is not None:
+                    elog = PyErrorLogger()
+                    error_message = "Encountered Null value for required attribute {key} - repairs of the input DataFrame are required".format(
+                        key=null_key
+                    )
+                    elog.log_error(
+                        error_message,
+                        ErrorSeverity.Invalid,
+                    )
+                    return [None, elog]
+                mdlist.append(Metadata(doc))
             return [mdlist, None]
 
     def find_one(self, mspass_object) -> tuple:
@@ -1030,14 +1129,129 @@ class DataFrameCacheMatcher(BasicMatcher):
         """
         pass
 
+    @property
+    def cache(self):
+        """
+        The DataFrame holding the cache.  When the cache is shared (see
+        share_cache) the DataFrame is loaded from the shared file the
+        first time it is used by a process.
+        """
+        if self.__dict__.get("_cache") is None and self._shared_cache is not None:
+            self._cache = self._shared_cache.get(len(self._shared_cache) - 1)
+        return self._cache
+
+    @cache.setter
+    def cache(self, df):
+        self._cache = df
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if state.get("_shared_cache") is not None:
+            # other processes load the DataFrame from the shared file
+            state["_cache"] = None
+        return state
+
+    def share_cache(self, cache_dir=None):
+        """
+        Moves the cache to a file mapped in memory that is shared by
+        all the processes that use this matcher.
+
+        By default every dask or spark worker process that runs a
+        normalization with this matcher deserializes its own copy of the
+        cache DataFrame.  This method writes the content of each
+        row of the cache that find copies to the output Metadata
+        once to a file in cache_dir and then releases the in memory
+        copy.  Pickling the matcher saves only the path of that file
+        and each worker maps the file read only so the processes of a
+        node share one copy of the cache.  The results of find and
+        find_one are unchanged.
+
+        The savings require a subclass implementing subset_rows with
+        indices that do not use the DataFrame, as all the
+        subclasses in this module do.  The DataFrame is also saved in
+        the file and a process loads it the first time it is used
+        (e.g. by subset).
+
+        The file is removed when this instance is garbage collected so
+        the matcher must be kept alive until the workflow using it has
+        completed.
+
+        :param cache_dir:  directory where the file is created.  Default
+          is /dev/shm (the default directory for temporary files if
+          that does not exist).  On a cluster with more than one node
+          it must be a file system visible to all the nodes.
+        :return:  self to allow a constructor to be followed by this
+          method in one line.
+        """
+        if self._shared_cache is None:
+            self._prepare_shared_cache()
+            rows = [_load_row(self._loaders, i) for i in range(len(self.cache))]
+            # the DataFrame is always the last entry
+            rows.append(self.cache)
+            self._shared_cache = SharedCache.create(rows, cache_dir=cache_dir)
+            self._cache = None
+            self._loaders = None
+        return self
+
+    def _prepare_shared_cache(self):
+        """
+        Called by share_cache before the DataFrame is released.
+        Subclasses that build indices from the cache lazily should
+        override this method to build them so workers do not need to
+        load the DataFrame.
+        """
+        pass
+
     def _load_dataframe_cache(self, df):
         # This is a bit error prone.  It assumes the BasicMatcher
         # constructor initializes a None default to an empty list
         fulllist = self.attributes_to_load + self.load_if_defined
+        # the cache is by definition in memory so a dask DataFrame
+        # is computed here
+        if isinstance(df, type_ddd):
+            df = df.compute()
         self.cache = df.reindex(columns=fulllist)[fulllist]
         if self.custom_null_values is not None:
             for col, nul_val in self.custom_null_values.items():
                 self.cache[col] = self.cache[col].replace(nul_val, np.nan)
+        self._loaders = self._compile_loaders(self.cache)
+
+    def _compile_loaders(self, df):
+        """
+        Private method used by find.  Returns a list of tuples with one
+        entry for each attribute to be loaded.  Each tuple contains the
+        attribute name, the key to use in the output Metadata, a list
+        of the values in df, a list of booleans that are True where the
+        value is not null, and a boolean that is True if the attribute is
+        required.  The lists of values hold python types (tolist converts
+        numpy scalars) so they can be posted to Metadata directly.
+        """
+        loaders = list()
+        for required, keylist in [
+            (True, self.attributes_to_load),
+            (False, self.load_if_defined),
+        ]:
+            for k in keylist:
+                if k in self.aliases:
+                    key = self.aliases[k]
+                else:
+                    key = k
+                if self.prepend_collection_name:
+                    if key == "_id":
+                        mdkey = self.collection + key
+                    else:
+                        mdkey = self.collection + "_" + key
+                else:
+                    mdkey = key
+                column = df[k]
+                # the cache only holds the attribute names so the alias
+                # is only used for the value if it is also a column
+                if key in df.columns:
+                    values = df[key].tolist()
+                else:
+                    values = column.tolist()
+                loaders.append((k, mdkey, values, column.notna().tolist(), required))
+        return loaders
 
 
 class ObjectIdDBMatcher(DatabaseMatcher):
@@ -1089,6 +1303,17 @@ class ObjectIdDBMatcher(DatabaseMatcher):
       the collection name is "channel" the "lat" attribute in the channel
       document would be returned as "channel_lat".
     :type prepend_collection_name:  boolean
+
+    :param cache_size:  maximum number of query results saved in a
+      least recently used cache.  Data generating a query matching a
+      saved one are matched without querying the database.  Default is
+      0 which disables the cache.  See DatabaseMatcher.find.
+    :type cache_size:  integer
+
+    :param cache_ttl:  when defined saved query results older than this
+      number of seconds are not used.  Default is None meaning results
+      are saved until evicted.
+    :type cache_ttl:  float
     """
 
     def __init__(
@@ -1099,6 +1324,8 @@ class ObjectIdDBMatcher(DatabaseMatcher):
         load_if_defined=None,
         aliases=None,
         prepend_collection_name=True,
+        cache_size=0,
+        cache_ttl=None,
     ):
         """
         Class Constructor.  Just calls the superclass constructor
@@ -1113,6 +1340,8 @@ class ObjectIdDBMatcher(DatabaseMatcher):
             aliases=aliases,
             require_unique_match=True,
             prepend_collection_name=prepend_collection_name,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
         )
 
     def query_generator(self, mspass_object) -> dict:
@@ -1375,6 +1604,16 @@ class MiniseedDBMatcher(DatabaseMatcher):
       document would be returned as "channel_lat".
     :type prepend_collection_name:  boolean
 
+    :param cache_size:  maximum number of query results saved in a
+      least recently used cache.  Data generating a query matching a
+      saved one are matched without querying the database.  Default is
+      0 which disables the cache.  See DatabaseMatcher.find.
+    :type cache_size:  integer
+
+    :param cache_ttl:  when defined saved query results older than this
+      number of seconds are not used.  Default is None meaning results
+      are saved until evicted.
+    :type cache_ttl:  float
     """
 
     def __init__(
@@ -1385,6 +1624,8 @@ class MiniseedDBMatcher(DatabaseMatcher):
         load_if_defined=None,
         aliases=None,
         prepend_collection_name=True,
+        cache_size=0,
+        cache_ttl=None,
     ):
         aload_tmp = attributes_to_load
         if collection == "channel":
@@ -1409,6 +1650,8 @@ class MiniseedDBMatcher(DatabaseMatcher):
             aliases=aliases,
             require_unique_match=False,
             prepend_collection_name=prepend_collection_name,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
         )
 
     def query_generator(self, mspass_object):
@@ -1548,11 +1791,14 @@ class MiniseedMatcher(DictionaryCacheMatcher):
     First, the cache index is defined by a unique string created from
     the four string keys of miniseed that the MsPASS default schema
     refers to with the keywords net, sta, chan, and loc.
-    At this point in time we know of no examples of a seismic instrument
-    where the number of distinct time intervals with different Metadata
-    are huge so the secondary search is a simple linear search through
-    the python list return by the generic find method using only the
-    net, sta, chan, and loc keys as the index.
+    The second stage finds the time interval containing the data start
+    time among the python list of Metadata containers stored for that
+    key.  Stations with long histories can have dozens of epochs and
+    this search is run for every datum, so the constructor builds an
+    index of the time intervals for each key sorted by starttime.  The
+    search is then a binary search.  The result is the same as a
+    linear search of the list:  the first container in the list whose
+    time interval contains the data start time.
 
     The default collection name is channel which is the only
     correct use if applied to data created through readers applied to
@@ -1569,8 +1815,9 @@ class MiniseedMatcher(DictionaryCacheMatcher):
 
     Users should only call the find_one method for this application.
     The find_one method here overrides the generic find_one in the
-    superclass DictionaryCacheMatcher.  It implements the linear search for a
-    matching time interval test as noted above.  Note also this
+    superclass DictionaryCacheMatcher.  It implements the search for a
+    matching time interval test as noted above.  For bulk matching of
+    database documents use find_doc or the vectorized find_many method.  Note also this
     class does not support Ensembles directly.   Matching instrument
     data is by definition what we call atomic. If you are processing
     ensembles you will need to write a small wrapper function that
@@ -1605,7 +1852,7 @@ class MiniseedMatcher(DictionaryCacheMatcher):
       ["_id","lat","lon","elev"] is
       default when collection is set as "site".  In either case the
       list MUST contain "starttime" and "endtime".  The reason is the
-      linear search step will always use those two fields in the linear
+      second search step will always use those two fields in the
       search for a time interval match. Be careful in how endtime is defined
       that resolves to an epoch time in the distant future and not some
       null database attribute; a possible scenario with DataFrame
@@ -1687,6 +1934,55 @@ class MiniseedMatcher(DictionaryCacheMatcher):
             require_unique_match=True,
             prepend_collection_name=prepend_collection_name,
         )
+        if self.prepend_collection_name:
+            self._starttime_key = self.collection + "_starttime"
+            self._endtime_key = self.collection + "_endtime"
+        else:
+            self._starttime_key = "starttime"
+            self._endtime_key = "endtime"
+        self._build_interval_index()
+
+    def _build_interval_index(self):
+        """
+        Private method run by the constructor to build an _IntervalIndex
+        of the time ranges of the list of Metadata containers stored for
+        each cache key.  The index replaces the linear search through the
+        list with a binary search.  Keys with time values that cannot be
+        converted to floats (e.g. a None endtime in DataFrame input) are
+        left out and searched linearly.
+        """
+        self.interval_index = dict()
+        for key, mdlist in self.normcache.items():
+            try:
+                starttimes = np.array(
+                    [md[self._starttime_key] for md in mdlist], dtype=float
+                )
+                endtimes = np.array(
+                    [md[self._endtime_key] for md in mdlist], dtype=float
+                )
+            except (TypeError, ValueError):
+                continue
+            self.interval_index[key] = _IntervalIndex(starttimes, endtimes)
+
+    def _find_interval(self, cache_key, t0):
+        """
+        Private method returning the first Metadata container in the
+        cache list for cache_key with starttime <= t0 <= endtime.  Returns
+        None if there is no match.  That is the same result as a linear
+        search of the list but uses the interval index when it exists.
+        """
+        if cache_key not in self.normcache:
+            return None
+        mdlist = self.normcache[cache_key]
+        if cache_key in self.interval_index:
+            i = self.interval_index[cache_key].find(t0)
+            if i < 0:
+                return None
+            return mdlist[i]
+        for md in mdlist:
+            if t0 >= md[self._starttime_key] and t0 <= md[self._endtime_key]:
+                return md
+        return None
 
     def cache_id(self, mspass_object) -> str:
         """
@@ -1786,7 +2082,7 @@ class MiniseedMatcher(DictionaryCacheMatcher):
     def find_one(self, mspass_object):
         """
         We overload find_one to provide the unique match needed.
-        The algorithm does a linear search for the first time interval
+        The algorithm searches for the first time interval
         for which the start time of mspass_object is within the
         startime <= t0 <= endtime range of a record stored in
         the cache.  This works only if starttime and endtime are
@@ -1826,24 +2122,13 @@ class MiniseedMatcher(DictionaryCacheMatcher):
                     # instance
                     return [None, find_output[1]]
                 else:
-                    for md in find_output[0]:
-                        stime_key = (
-                            "starttime"
-                            if not self.prepend_collection_name
-                            else self.collection + "_starttime"
-                        )
-                        etime_key = (
-                            "endtime"
-                            if not self.prepend_collection_name
-                            else self.collection + "_endtime"
-                        )
-                        stime = md[stime_key]
-                        etime = md[etime_key]
-                        t0 = mspass_object.t0
-                        if t0 >= stime and t0 <= etime:
-                            return [md, find_output[1]]
+                    md = self._find_interval(
+                        self.cache_id(mspass_object), mspass_object.t0
+                    )
+                    if md is not None:
+                        return [md, find_output[1]]
 
-                    # we land here if the linear search failed and no
+                    # we land here if the interval search failed and no
                     # t0 is within the ranges defined
                     if find_output[1] is None:
                         elog = PyErrorLogger()
@@ -1883,7 +2168,7 @@ class MiniseedMatcher(DictionaryCacheMatcher):
         method accepts a python dict retrieved in a cursor loop for
         bulk_normalize.   Returns the Metadata container that is matched
         from the cache.   This uses the same algorithm as the overloaded
-        find_one above where a linear search is used to handle the time
+        find_one above where the interval index is used to handle the time
         interval matching.  Here, however, the time field is extracted
         from doc with the key defined by starttime.
 
@@ -1916,28 +2201,58 @@ class MiniseedMatcher(DictionaryCacheMatcher):
         testid = self.db_make_cache_id(doc)
         if testid is None:
             return None
-        if testid in self.normcache:
-            matches = self.normcache[testid]
-        else:
-            return None
+        return self._find_interval(testid, doc[wfdoc_starttime_key])
 
-        # linear search similar to that in find_one above
-        for md in matches:
-            if self.prepend_collection_name:
-                stkey = self.collection + "_" + "starttime"
-                etkey = self.collection + "_" + "endtime"
+    def find_many(self, docs, wfdoc_starttime_key="starttime"):
+        """
+        Bulk version of find_doc.  Matches a list of documents in one
+        call and returns a list of the same length containing the
+        matching Metadata container for each document or None if the
+        match failed.
+
+        The documents are grouped by cache key and the start times for
+        each key are matched with one vectorized binary search (numpy
+        searchsorted) of the interval index.  That is much faster than
+        calling find_doc in a loop when the same channel appears many
+        times in docs, which is the norm for wf_miniseed.
+
+        :param docs:  list of documents (python dictionaries - normally
+          from wf_miniseed) to be matched with channel or site.
+        :param wfdoc_starttime_key:  key used to fetch the start time
+          of waveform data from each document (default "starttime")
+        :return:  list of Metadata containers (or None for failures)
+          parallel to docs.
+        """
+        result = [None] * len(docs)
+        groups = dict()
+        for i, doc in enumerate(docs):
+            if wfdoc_starttime_key not in doc:
+                raise MsPASSError(
+                    "MiniseedMatcher.find_many:  "
+                    + "Required key defining waveform start time="
+                    + wfdoc_starttime_key
+                    + " is missing from document number {}".format(i),
+                    ErrorSeverity.Fatal,
+                )
+            testid = self.db_make_cache_id(doc)
+            if testid is not None and testid in self.normcache:
+                groups.setdefault(testid, []).append(i)
+        for testid, members in groups.items():
+            mdlist = self.normcache[testid]
+            if testid in self.interval_index:
+                times = np.array(
+                    [docs[i][wfdoc_starttime_key] for i in members], dtype=float
+                )
+                matches = self.interval_index[testid].find_many(times)
+                for i, j in zip(members, matches.tolist()):
+                    if j >= 0:
+                        result[i] = mdlist[j]
             else:
-                stkey = "starttime"
-                etkey = "endtime"
-            # let this throw an exception if fetch fails. Constructor
-            # should guarantee these two attributes are loaded
-            stime = md[stkey]
-            etime = md[etkey]
-            dt0 = doc[wfdoc_starttime_key]
-            if dt0 >= stime and dt0 <= etime:
-                return md
-
-        return None
+                for i in members:
+                    result[i] = self._find_interval(
+                        testid, docs[i][wfdoc_starttime_key]
+                    )
+        return result
 
 
 class EqualityMatcher(DataFrameCacheMatcher):
@@ -2097,6 +2412,31 @@ class EqualityMatcher(DataFrameCacheMatcher):
             raise TypeError(
                 "EqualityMatcher Constructor:  required argument 2 (matchkeys) must be a python dictionary"
             )
+        self._match_index = self._build_match_index()
+
+    def _build_match_index(self):
+        """
+        Private method used by the constructor to build a dictionary
+        keyed by tuples of the values of the match key columns.  The
+        value associated with each key is an array of the row positions
+        in the cache with those values.  Rows with a null in any of the
+        match key columns are omitted as they can never match.  Returns
+        None if the columns contain values that cannot be used as a
+        dictionary key.  subset_rows then falls back to a vectorized
+        comparison of each column.
+        """
+        columns = [self.cache[col] for col in self.match_keys.values()]
+        notnull = np.ones(len(self.cache), dtype=bool)
+        for column in columns:
+            notnull &= column.notna().to_numpy()
+        index = dict()
+        try:
+            for i, values in enumerate(zip(*[column.tolist() for column in columns])):
+                if notnull[i]:
+                    index.setdefault(values, []).append(i)
+        except TypeError:
+            return None
+        return {key: np.array(rows) for key, rows in index.items()}
 
     def subset(self, mspass_object) -> pd.DataFrame:
         """
@@ -2127,20 +2467,37 @@ class EqualityMatcher(DataFrameCacheMatcher):
            two other situations can cause the return to have no data:
                (1) dead input, and (2) match keys missing from mspass_object.
         """
+        return self.cache.iloc[self.subset_rows(mspass_object)]
+
+    def subset_rows(self, mspass_object) -> np.ndarray:
+        """
+        Returns an array of the row positions in the cache matching
+        mspass_object.   The match uses a dictionary lookup in an
+        index built by the constructor so the cost does not depend
+        upon the size of the cache.  See subset for the rules.
+
+        :return:  numpy array of integer row positions that is empty
+          if there is no match.
+        """
         if mspass_object.dead():
-            return pd.DateFrame()
-        # I don't think this can cause a memory problem as in python
-        # this make dfret a temporary alias for self.cache
-        # In the loop it is replaced by subset dataframes
-        dfret = self.cache
+            return _EMPTY_ROWS
+        testvals = list()
         for key in self.match_keys.keys():
             if mspass_object.is_defined(key):
-                testval = mspass_object[key]
-                # this allows an alias between data and dataframe keys
-                dfret = dfret[dfret[self.match_keys[key]] == testval]
+                testvals.append(mspass_object[key])
             else:
-                return pd.DataFrame()
-        return dfret
+                return _EMPTY_ROWS
+        if self._match_index is None:
+            mask = np.ones(len(self.cache), dtype=bool)
+            for col, testval in zip(self.match_keys.values(), testvals):
+                # this allows an alias between data and dataframe keys
+                mask &= (self.cache[col] == testval).to_numpy()
+            return np.flatnonzero(mask)
+        try:
+            return self._match_index.get(tuple(testvals), _EMPTY_ROWS)
+        except TypeError:
+            # an unhashable value cannot match anything in the index
+            return _EMPTY_ROWS
 
 
 class EqualityDBMatcher(DatabaseMatcher):
@@ -2202,6 +2559,16 @@ class EqualityDBMatcher(DatabaseMatcher):
       found and logs a complaint message.  (default is False)
     :type require_unique_match:  boolean
 
+    :param cache_size:  maximum number of query results saved in a
+      least recently used cache.  Data generating a query matching a
+      saved one are matched without querying the database.  Default is
+      0 which disables the cache.  See DatabaseMatcher.find.
+    :type cache_size:  integer
+
+    :param cache_ttl:  when defined saved query results older than this
+      number of seconds are not used.  Default is None meaning results
+      are saved until evicted.
+    :type cache_ttl:  float
     """
 
     def __init__(
@@ -2214,6 +2581,8 @@ class EqualityDBMatcher(DatabaseMatcher):
         aliases=None,
         require_unique_match=False,
         prepend_collection_name=False,
+        cache_size=0,
+        cache_ttl=None,
     ):
         super().__init__(
             db,
@@ -2223,6 +2592,8 @@ class EqualityDBMatcher(DatabaseMatcher):
             aliases=aliases,
             require_unique_match=require_unique_match,
             prepend_collection_name=prepend_collection_name,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
         )
         if isinstance(match_keys, dict):
             self.match_keys = match_keys
@@ -2340,6 +2711,17 @@ class OriginTimeDBMatcher(DatabaseMatcher):
       is not unique.  When False find_one returns the first document
       found and logs a complaint message.  (default is False)
     :type require_unique_match:  boolean
+
+    :param cache_size:  maximum number of query results saved in a
+      least recently used cache.  Data generating a query matching a
+      saved one are matched without querying the database.  Default is
+      0 which disables the cache.  See DatabaseMatcher.find.
+    :type cache_size:  integer
+
+    :param cache_ttl:  when defined saved query results older than this
+      number of seconds are not used.  Default is None meaning results
+      are saved until evicted.
+    :type cache_ttl:  float
     """
 
     def __init__(
@@ -2356,6 +2738,8 @@ class OriginTimeDBMatcher(DatabaseMatcher):
         prepend_collection_name=True,
         data_time_key=None,
         source_time_key=None,
+        cache_size=0,
+        cache_ttl=None,
     ):
         super().__init__(
             db,
@@ -2365,6 +2749,8 @@ class OriginTimeDBMatcher(DatabaseMatcher):
             aliases=aliases,
             require_unique_match=require_unique_match,
             prepend_collection_name=prepend_collection_name,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
         )
         self.t0offset = t0offset
         self.tolerance = tolerance
@@ -2576,13 +2962,35 @@ class OriginTimeMatcher(DataFrameCacheMatcher):
             self.source_time_key = collection + "_time"
         else:
             self.source_time_key = source_time_key
+        # sorted times built on the first call to subset_rows
+        self._time_index = None
+
+    def _prepare_shared_cache(self):
+        if self._time_index is None:
+            times = _time_column(self.cache, self.source_time_key, "OriginTimeMatcher")
+            self._time_index = _TimeIndex(times, np.arange(len(times)))
 
     def subset(self, mspass_object) -> pd.DataFrame:
-        """ """
+        """
+        Returns the rows of the cache DataFrame with source times
+        matching mspass_object.  See the class description for the rules.
+        """
+        return self.cache.iloc[self.subset_rows(mspass_object)]
+
+    def subset_rows(self, mspass_object) -> np.ndarray:
+        """
+        Returns an array of the row positions in the cache with source
+        times matching mspass_object.  The test is done with a binary
+        search (numpy searchsorted) of the source times sorted
+        on the first call to this method.
+
+        :return:  numpy array of integer row positions that is empty
+          if there is no match.
+        """
         if not _input_is_valid(mspass_object):
-            return pd.DataFrame()
+            return _EMPTY_ROWS
         if mspass_object.dead():
-            return pd.DataFrame()
+            return _EMPTY_ROWS
 
         if self.data_time_key is None:
             # this maybe should have a test to assure UTC time standard
@@ -2592,19 +3000,16 @@ class OriginTimeMatcher(DataFrameCacheMatcher):
             if mspass_object.is_defined(self.data_time_key):
                 test_time = mspass_object[self.data_time_key]
             else:
-                return pd.DataFrame()
+                return _EMPTY_ROWS
 
+        if self._time_index is None:
+            times = _time_column(self.cache, self.source_time_key, "OriginTimeMatcher")
+            self._time_index = _TimeIndex(times, np.arange(len(times)))
         tmin = test_time - self.tolerance
         tmax = test_time + self.tolerance
-        # For this matcher we dogmatically use <= equivalent in the between
-        # construct here - inclusive=True.  In this context seems appropriate
-        dfquery = (
-            self.source_time_key
-            + ".between({tmin},{tmax},inclusive=True)".format(tmin=tmin, tmax=tmax)
-        )
-        dfret = self.cache.query(dfquery)
-
-        return dfret
+        # For this matcher we dogmatically use <= in both tests.
+        # In this context seems appropriate
+        return self._time_index.rows(tmin, tmax)
 
 
 class ArrivalDBMatcher(DatabaseMatcher):
@@ -2693,6 +3098,17 @@ class ArrivalDBMatcher(DatabaseMatcher):
     :type query:  python dictionary or None.  None is equivalewnt to
       passing an empty dictionary.  A TypeError will be thrown if this
       argument is not None or a dict.
+
+    :param cache_size:  maximum number of query results saved in a
+      least recently used cache.  Data generating a query matching a
+      saved one are matched without querying the database.  Default is
+      0 which disables the cache.  See DatabaseMatcher.find.
+    :type cache_size:  integer
+
+    :param cache_ttl:  when defined saved query results older than this
+      number of seconds are not used.  Default is None meaning results
+      are saved until evicted.
+    :type cache_ttl:  float
     """
 
     def __init__(
@@ -2705,6 +3121,8 @@ class ArrivalDBMatcher(DatabaseMatcher):
         require_unique_match=False,
         prepend_collection_name=True,
         query=None,
+        cache_size=0,
+        cache_ttl=None,
     ):
         super().__init__(
             db,
@@ -2714,6 +3132,8 @@ class ArrivalDBMatcher(DatabaseMatcher):
             aliases=aliases,
             require_unique_match=require_unique_match,
             prepend_collection_name=prepend_collection_name,
+            cache_size=cache_size,
+            cache_ttl=cache_ttl,
         )
 
         if query is None:
@@ -2900,42 +3320,99 @@ class ArrivalMatcher(DataFrameCacheMatcher):
             raise TypeError(
                 "ArrivalDBMatcher constructor: arrival_time_key argument must define a string"
             )
+        # per station sorted times built on the first call to subset_rows
+        self._sta_index = None
+
+    def _prepare_shared_cache(self):
+        if self._sta is not None:
+            if self._sta_index is None:
+                self._sta_index = self._build_sta_index()
+            # only used to build the index
+            self._sta = None
+
+    def _load_dataframe_cache(self, df):
+        """
+        Overrides the superclass method to also save the sta and net
+        columns used for matching.  They are not normally in the list of
+        attributes to load so they are not in the cache.
+        """
+        if isinstance(df, type_ddd):
+            df = df.compute()
+        super()._load_dataframe_cache(df)
+        if "sta" in df.columns:
+            self._sta = df["sta"].tolist()
+        else:
+            self._sta = None
+        if "net" in df.columns:
+            self._net = df["net"].to_numpy()
+        else:
+            self._net = None
 
     def subset(self, mspass_object) -> pd.DataFrame:
         """
         Concrete implementation of method required by superclass
         DataFramematcher
         """
+        return self.cache.iloc[self.subset_rows(mspass_object)]
 
-        if _input_is_valid(mspass_object):
-            if mspass_object.live:
-                if _input_is_atomic(mspass_object):
-                    stime = mspass_object.t0
-                    etime = mspass_object.endtime()
-                else:
-                    if mspass_object.is_defined(
-                        self.starttime_key
-                    ) and mspass_object.is_defined(self.endtimekey):
-                        stime = mspass_object[self.starttime_key]
-                        etime = mspass_object[self.endtime_key]
-                    else:
-                        return pd.DataFrame()
-                sta = _get_with_readonly_recovery(mspass_object, "sta")
-                if sta is not None:
-                    dfret = self.cache[
-                        ("sta" == sta)
-                        & (self.arrival_time_key >= stime)
-                        & (self.arrival_time_key <= etime)
-                    ]
-                    if len(dfret) > 1:
-                        net = _get_with_readonly_recovery(mspass_object, "net")
-                        if net is not None:
-                            dfret = dfret["net" == net]
-                    return dfret
-            else:
-                return pd.DataFrame()
+    def subset_rows(self, mspass_object) -> np.ndarray:
+        """
+        Returns an array of the row positions in the cache matching
+        mspass_object.  The arrivals are grouped by station and sorted
+        by time on the first call to this method so the test for each
+        datum is a dictionary lookup and a binary search.
+
+        :return:  numpy array of integer row positions that is empty
+          if there is no match.
+        """
+        if not _input_is_valid(mspass_object):
+            return _EMPTY_ROWS
+        if mspass_object.dead():
+            return _EMPTY_ROWS
+        if _input_is_atomic(mspass_object):
+            stime = mspass_object.t0
+            etime = mspass_object.endtime()
         else:
-            return pd.DataFrame()
+            if mspass_object.is_defined(
+                self.starttime_key
+            ) and mspass_object.is_defined(self.endtime_key):
+                stime = mspass_object[self.starttime_key]
+                etime = mspass_object[self.endtime_key]
+            else:
+                return _EMPTY_ROWS
+        sta = _get_with_readonly_recovery(mspass_object, "sta")
+        if sta is None:
+            return _EMPTY_ROWS
+        if self._sta_index is None:
+            self._sta_index = self._build_sta_index()
+        if sta not in self._sta_index:
+            return _EMPTY_ROWS
+        rows = self._sta_index[sta].rows(stime, etime)
+        if len(rows) > 1 and self._net is not None:
+            net = _get_with_readonly_recovery(mspass_object, "net")
+            if net is not None:
+                rows = rows[self._net[rows] == net]
+        return rows
+
+    def _build_sta_index(self):
+        """
+        Private method building the dictionary keyed by station code
+        of _TimeIndex objects used by subset_rows.
+        """
+        if self._sta is None:
+            raise MsPASSError(
+                "ArrivalMatcher:  arrival table has no sta column required for matching",
+                ErrorSeverity.Fatal,
+            )
+        times = _time_column(self.cache, self.arrival_time_key, "ArrivalMatcher")
+        rows_by_sta = dict()
+        for i, sta in enumerate(self._sta):
+            rows_by_sta.setdefault(sta, []).append(i)
+        sta_index = dict()
+        for sta, rows in rows_by_sta.items():
+            rows = np.array(rows)
+            sta_index[sta] = _TimeIndex(times[rows], rows)
+        return sta_index
 
 
 @mspass_func_wrapper
@@ -3008,6 +3485,7 @@ def bulk_normalize(
     wf_col="wf_miniseed",
     blocksize=1000,
     matcher_list=None,
+    verbose=False,
 ):
     """
     This function iterates through the collection specified by db and wf_col,
@@ -3019,13 +3497,21 @@ def bulk_normalize(
     run this function on wf_miniseed data running a matcher to set
     channel_id, site_id, and source_id.
 
+    Documents are processed in batches of blocksize documents.  Each
+    matcher is applied to a complete batch at once.  Matchers that
+    implement a find_many method (e.g. MiniseedMatcher) match the batch
+    with a vectorized search of their cache.  Others are called with
+    find_doc for each document in the batch.  The updates for each
+    batch are then written with one (unordered) bulk_write call.
+
     :param db: should be a MsPASS database handle containing the wf_col
     and the collections defined by the matcher_list list.
     :param wf_col: The collection that need to be normalized, default is
     wf_miniseed
     :param blockssize:   To speed up updates this function uses the
     bulk writer/updater methods of MongoDB that can be orders of
-    magnitude faster than one-at-a-time updates. A user should not normally
+    magnitude faster than one-at-a-time updates.  It is also the number
+    of documents matched in each batch. A user should not normally
     need to alter this parameter.
     :param wfquery: is an optional query to apply to wf_col.  The output of this
     query defines the list of documents that the algorithm will attempt
@@ -3041,6 +3527,12 @@ def bulk_normalize(
       by the BasicMatcher interface.   (find_doc is comparable to find_one
       but uses a python dictionary as the container instead of referencing
       a mspass data object.  find_one is the core method for inline normalization)
+      Matchers can optionally also implement find_many that is used
+      in place of find_doc if defined.  find_many receives a list of
+      documents and must return a parallel list of the find_doc results.
+    :param verbose:  when True the number of documents processed and the
+      throughput in documents per second is printed at the end of the run.
+      Default is False.
 
 
 
@@ -3105,48 +3597,74 @@ def bulk_normalize(
     # components set as the size of matcher_list and initialized to 0
     cnt_list = [0] * len(matcher_list)
     counter = 0
+    nprocessed = 0
+    t0 = time.time()
 
-    cursor = db[wf_col].find(wfquery)
-    bulk = []
+    cursor = db[wf_col].find(wfquery, batch_size=blocksize)
+    batch = []
     for doc in cursor:
-        wf_id = doc["_id"]
-        need_update = False
-        update_doc = {}
-        for ind, matcher in enumerate(matcher_list):
-            norm_doc = matcher.find_doc(doc)
+        batch.append(doc)
+        if len(batch) >= blocksize:
+            counter += _bulk_normalize_batch(db[wf_col], batch, matcher_list, cnt_list)
+            nprocessed += len(batch)
+            batch = []
+    if len(batch) > 0:
+        counter += _bulk_normalize_batch(db[wf_col], batch, matcher_list, cnt_list)
+        nprocessed += len(batch)
+
+    if verbose:
+        elapsed = time.time() - t0
+        print(
+            "bulk_normalize:  processed {n} documents of {col} in {t:.1f} s ({rate:.0f} documents/s) and updated {nup}".format(
+                n=nprocessed,
+                col=wf_col,
+                t=elapsed,
+                rate=nprocessed / elapsed if elapsed > 0.0 else 0.0,
+                nup=counter,
+            )
+        )
+    return [ndocs] + cnt_list
+
+
+def _bulk_normalize_batch(collection, docs, matcher_list, cnt_list):
+    """
+    Private function used by bulk_normalize to match one batch of wf
+    documents, docs, with each matcher in matcher_list and write the
+    updates with one bulk_write call.  Increments the match counts in
+    cnt_list and returns the number of documents updated.
+    """
+    update_docs = [dict() for doc in docs]
+    for ind, matcher in enumerate(matcher_list):
+        if hasattr(matcher, "find_many") and callable(getattr(matcher, "find_many")):
+            norm_docs = matcher.find_many(docs)
+        else:
+            norm_docs = [matcher.find_doc(doc) for doc in docs]
+        keylist = list()
+        for key in matcher.attributes_to_load:
+            new_key = key
+            if matcher.prepend_collection_name:
+                if key == "_id":
+                    new_key = matcher.collection + key
+                else:
+                    new_key = matcher.collection + "_" + key
+            keylist.append(new_key)
+        for update_doc, norm_doc in zip(update_docs, norm_docs):
             if norm_doc is None:
                 # not this silently ignores failures
                 # may want this to count failures for each matcher
                 continue
-            for key in matcher.attributes_to_load:
-                new_key = key
-                if matcher.prepend_collection_name:
-                    if key == "_id":
-                        new_key = matcher.collection + key
-                    else:
-                        new_key = matcher.collection + "_" + key
+            for new_key in keylist:
                 update_doc[new_key] = norm_doc[new_key]
-
             cnt_list[ind] += 1
-            need_update = True
-
-        if need_update:
-            bulk.append(pymongo.UpdateOne({"_id": wf_id}, {"$set": update_doc}))
-            counter += 1
-        # Tests for counter and len(bulk) are needed because the logic here
-        # allows this block to be entered the first pass and if the pass
-        # after the previous call to bulk_write did not yield a match
-        # either will cause bulk_write to throw an error when it gets an
-        # an empty list.   Should consider a logic  change here
-        # to make this less obscure
-        if counter % blocksize == 0 and counter != 0 and len(bulk) > 0:
-            db[wf_col].bulk_write(bulk)
-            bulk = []
-
-    if counter % blocksize != 0:
-        db[wf_col].bulk_write(bulk)
-
-    return [ndocs] + cnt_list
+    bulk = [
+        pymongo.UpdateOne({"_id": doc["_id"]}, {"$set": update_doc})
+        for doc, update_doc in zip(docs, update_docs)
+        if len(update_doc) > 0
+    ]
+    # bulk_write throws an error if it gets an empty list
+    if len(bulk) > 0:
+        collection.bulk_write(bulk, ordered=False)
+    return len(bulk)
 
 
 def normalize_mseed(
@@ -3261,6 +3779,212 @@ def normalize_mseed(
     return ret
 
 
+# returned by subset_rows methods for no match
+_EMPTY_ROWS = np.array([], dtype=np.int64)
+_EMPTY_ROWS.flags.writeable = False
+
+
+def _load_row(loaders, i):
+    """
+    Private function used by DataFrameCacheMatcher to build the dict of
+    the attributes of row i of the cache output by find from loaders
+    (the output of _compile_loaders).  Returns a tuple of the dict and
+    None or, if the row has a null value for a required attribute, the
+    name of that attribute.
+    """
+    doc = dict()
+    for k, mdkey, values, notnull, required in loaders:
+        if notnull[i]:
+            doc[mdkey] = values[i]
+        elif required:
+            return doc, k
+    return doc, None
+
+
+_CACHE_MISS = (False, None)
+
+
+def _query_cache_key(query):
+    """
+    Private function returning a hashable equivalent of a query dict
+    used as the key of the query cache of DatabaseMatcher.  Returns None
+    if query contains a value that cannot be hashed.  The query is
+    then not cached.
+    """
+    try:
+        return _freeze_query(query)
+    except TypeError:
+        return None
+
+
+def _freeze_query(value):
+    # types are part of the key as MongoDB does not match e.g. True and 1
+    if isinstance(value, dict):
+        return (dict, tuple((k, _freeze_query(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return (list, tuple(_freeze_query(v) for v in value))
+    hash(value)
+    return (type(value), value)
+
+
+class _QueryCache:
+    """
+    Private class implementing the least recently used cache of query
+    results of DatabaseMatcher.  Entries are python lists of Metadata
+    containers saved with the time they were saved to implement the
+    optional time to live limit, ttl (seconds).  A lock makes the cache
+    usable by the threads of a dask worker.  A pickled copy is empty.
+    """
+
+    def __init__(self, maxsize, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.clear()
+
+    def __getstate__(self):
+        return {"maxsize": self.maxsize, "ttl": self.ttl}
+
+    def __setstate__(self, state):
+        self.__init__(state["maxsize"], state["ttl"])
+
+    def clear(self):
+        with self._lock:
+            self._entries = collections.OrderedDict()
+            self._counts = {"hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key):
+        """
+        Returns a tuple of a boolean that is True if key was found and
+        the list saved for key (None if not found).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self.ttl is None or time.monotonic() - entry[0] <= self.ttl:
+                    self._entries.move_to_end(key)
+                    self._counts["hits"] += 1
+                    return True, entry[1]
+                del self._entries[key]
+                self._counts["expired"] += 1
+            self._counts["misses"] += 1
+            return _CACHE_MISS
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self._counts["evictions"] += 1
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counts, size=len(self._entries))
+
+
+class _TimeIndex:
+    """
+    Private class used by the DataFrame matchers to find rows with a time
+    falling in an interval with a binary search.  The constructor sorts
+    times and the row positions they are associated with.  Null (NaN)
+    times are dropped as they never match.
+    """
+
+    def __init__(self, times, rows):
+        keep = ~np.isnan(times)
+        times = times[keep]
+        rows = rows[keep]
+        order = np.argsort(times, kind="stable")
+        self.times = times[order]
+        self.order = rows[order]
+
+    def rows(self, tmin, tmax) -> np.ndarray:
+        """
+        Returns the row positions with tmin <= time <= tmax in the order
+        they appear in the cache.
+        """
+        lo = np.searchsorted(self.times, tmin, side="left")
+        hi = np.searchsorted(self.times, tmax, side="right")
+        return np.sort(self.order[lo:hi])
+
+
+class _IntervalIndex:
+    """
+    Private class used by MiniseedMatcher to find which of a list of
+    closed time intervals, [starttime, endtime], contains a time.
+    Like a linear search of the list the result is the position of the
+    first interval in the list containing the time.
+
+    The constructor sorts the intervals by starttime.  Channel epochs
+    normally do not overlap except where one ends at the time the next
+    begins.  Then at most the interval with the largest starttime <= t
+    and the one before it can contain t and the search is a binary search
+    plus two tests.   Lists with overlapping (or zero length) intervals are searched by
+    testing all intervals with starttime <= t.
+    """
+
+    def __init__(self, starttimes, endtimes):
+        self.order = np.argsort(starttimes, kind="stable")
+        self.starttimes = starttimes[self.order]
+        self.endtimes = endtimes[self.order]
+        # zero length intervals are treated as overlapping as they
+        # can make more than two intervals contain one time
+        self.overlapping = not (
+            np.all(self.endtimes[:-1] <= self.starttimes[1:])
+            and np.all(self.starttimes < self.endtimes)
+        )
+
+    def find(self, t) -> int:
+        """
+        Returns the list position of the first interval containing t
+        or -1 if no interval contains t.
+        """
+        n = np.searchsorted(self.starttimes, t, side="right")
+        if self.overlapping:
+            candidates = np.flatnonzero(self.endtimes[:n] >= t)
+        else:
+            candidates = [i for i in (n - 2, n - 1) if i >= 0 and self.endtimes[i] >= t]
+        if len(candidates) == 0:
+            return -1
+        return int(min(self.order[candidates]))
+
+    def find_many(self, times) -> np.ndarray:
+        """
+        Vectorized version of find for a numpy array of times.
+        Returns an integer array of the same length as times.
+        """
+        if self.overlapping:
+            return np.array([self.find(t) for t in times], dtype=np.int64)
+        n = np.searchsorted(self.starttimes, times, side="right")
+        result = np.full(len(times), -1, dtype=np.int64)
+        # the earlier interval wins if two touching intervals contain t
+        for i in (n - 1, n - 2):
+            ok = i >= 0
+            ok[ok] = self.endtimes[i[ok]] >= times[ok]
+            pos = self.order[i[ok]]
+            current = result[ok]
+            result[ok] = np.where((current < 0) | (pos < current), pos, current)
+        return result
+
+
+def _time_column(df, key, caller):
+    """
+    Private function returning the column of df with name key as a numpy
+    float array.   Raises a MsPASSError if the column does not exist.
+    caller is the name of the class used in the error message.
+    """
+    if key not in df.columns:
+        raise MsPASSError(
+            caller
+            + ":  time column "
+            + key
+            + " is not one of the attributes loaded from the normalizing collection",
+            ErrorSeverity.Fatal,
+        )
+    return df[key].to_numpy(dtype=float, na_value=np.nan)
+
+
 def _get_test_time(d, time):
     """
     A helper function to get the test time used for searching.
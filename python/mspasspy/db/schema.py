@@ -1,6 +1,7 @@
 """
 Tools to define the schema of Metadata.
 """
+import copy
 import os
 
 import yaml
@@ -10,6 +11,65 @@ import bson.objectid
 import mspasspy.ccore.seismic
 from mspasspy.ccore.utility import MsPASSError
 
+# Parsed and validated schema files keyed by file name and version.  Parsing
+# and validating mspass.yaml takes far longer than building the definitions
+# from the result so each file is loaded only once per process.
+_schema_file_cache = dict()
+
+# Map of the type names allowed in schema files to python types
+_schema_types = {
+    "int": int,
+    "integer": int,
+    "double": float,
+    "float": float,
+    "str": str,
+    "string": str,
+    "bool": bool,
+    "boolean": bool,
+    "dict": dict,
+    "list": list,
+    "objectid": bson.objectid.ObjectId,
+    "bytes": bytes,
+    "byte": bytes,
+    "object": bytes,
+}
+
+
+def _load_schema_file(schema_file):
+    """
+    Returns a copy of the validated contents of a schema definition file.
+    The file is parsed and validated only when first seen or when it was
+    modified since it was last loaded.  The copy can be modified freely by
+    the caller.
+    """
+    try:
+        st = os.stat(schema_file)
+    except EnvironmentError as e:
+        raise MsPASSError(
+            "Cannot open schema definition file: " + schema_file, "Fatal"
+        ) from e
+    cache_key = (schema_file, st.st_mtime_ns, st.st_size)
+    schema_dic = _schema_file_cache.get(cache_key)
+    if schema_dic is None:
+        try:
+            with open(schema_file, "r") as stream:
+                schema_dic = yaml.safe_load(stream)
+        except yaml.YAMLError as e:
+            raise MsPASSError(
+                "Cannot parse schema definition file: " + schema_file, "Fatal"
+            ) from e
+        except EnvironmentError as e:
+            raise MsPASSError(
+                "Cannot open schema definition file: " + schema_file, "Fatal"
+            ) from e
+
+        try:
+            _check_format(schema_dic)
+        except schema.SchemaError as e:
+            raise MsPASSError("The schema definition is not valid", "Fatal") from e
+        _schema_file_cache[cache_key] = schema_dic
+    return copy.deepcopy(schema_dic)
+
 
 class SchemaBase:
     def __init__(self, schema_file=None):
@@ -33,23 +93,7 @@ class SchemaBase:
                 schema_file = os.path.abspath(
                     os.path.join(os.path.dirname(__file__), "../data/yaml", schema_file)
                 )
-        try:
-            with open(schema_file, "r") as stream:
-                schema_dic = yaml.safe_load(stream)
-        except yaml.YAMLError as e:
-            raise MsPASSError(
-                "Cannot parse schema definition file: " + schema_file, "Fatal"
-            ) from e
-        except EnvironmentError as e:
-            raise MsPASSError(
-                "Cannot open schema definition file: " + schema_file, "Fatal"
-            ) from e
-
-        try:
-            _check_format(schema_dic)
-        except schema.SchemaError as e:
-            raise MsPASSError("The schema definition is not valid", "Fatal") from e
-        self._raw = schema_dic
+        self._raw = _load_schema_file(schema_file)
 
     def __getitem__(self, key):
         try:
@@ -278,24 +322,7 @@ class SchemaDefinitionBase:
         :return: type of the attribute associated with ``key``
         :rtype: :class:`type`
         """
-        tp = self._main_dic[key]["type"].strip().casefold()
-        if tp in ["int", "integer"]:
-            return int
-        if tp in ["double", "float"]:
-            return float
-        if tp in ["str", "string"]:
-            return str
-        if tp in ["bool", "boolean"]:
-            return bool
-        if tp in ["dict"]:
-            return dict
-        if tp in ["list"]:
-            return list
-        if tp in ["objectid"]:
-            return bson.objectid.ObjectId
-        if tp in ["bytes", "byte", "object"]:
-            return bytes
-        return None
+        return _schema_types.get(self._main_dic[key]["type"].strip().casefold())
 
     def unique_name(self, aliasname):
         """
@@ -587,12 +614,51 @@ class MetadataSchema(SchemaBase):
             schemadef = MDSchemaDefinition(self._raw["Metadata"], collection, dbschema)
             setattr(self, collection, schemadef)
             self._attr_dict[collection] = schemadef
+        self._views = dict()
 
     def __setitem__(self, key, value):
         if not isinstance(value, MDSchemaDefinition):
             raise MsPASSError("value is not a MDSchemaDefinition", "Invalid")
         setattr(self, key, value)
         self._attr_dict[key] = value
+        self._views.clear()
+
+    def view(self, data_type, collection, dbschema):
+        """
+        Return the definition of data_type with the collection of the keys
+        it loads from its wf collection changed to collection.
+
+        Readers use this when data are read from a wf collection other
+        than the one defined for the data type in the schema (e.g.
+        wf_miniseed for TimeSeries).  The result is the same as
+        swap_collection applied to a copy of the definition but it is
+        built only once for each data_type and collection and cached.
+        The returned definition is shared so it must not be modified.
+        It is rebuilt if the definition of data_type or dbschema are
+        replaced.  Changes made in place to the definition of data_type
+        after the first call are not seen by the view.
+
+        :param data_type: name of the data type (e.g. "TimeSeries")
+        :type data_type: str
+        :param collection: name of the wf collection
+        :type collection: str
+        :param dbschema: the database schema used to set the attributes of the keys.
+        :type dbschema: :class:`mspasspy.db.schema.DatabaseSchema`
+        :return: the definition of data_type itself when collection is
+          its wf collection, otherwise the cached view
+        :rtype: :class:`mspasspy.db.schema.MDSchemaDefinition`
+        """
+        definition = self[data_type]
+        original_collection = definition.collection("_id")
+        if original_collection == collection:
+            return definition
+        entry = self._views.get((data_type, collection))
+        if entry is None or entry[0] is not definition or entry[1] is not dbschema:
+            view = copy.deepcopy(definition)
+            view.swap_collection(original_collection, collection, dbschema)
+            entry = (definition, dbschema, view)
+            self._views[(data_type, collection)] = entry
+        return entry[2]
 
 
 class MDSchemaDefinition(SchemaDefinitionBase):
@@ -689,7 +755,8 @@ class MDSchemaDefinition(SchemaDefinitionBase):
                 s_key = key.replace(col_name + "_", "")
             col_name = dbschema.default_name(col_name)
             foreign_attr = getattr(dbschema, col_name)._main_dic[s_key]
-            self._main_dic[key] = foreign_attr
+            # a copy because the attributes are modified below
+            self._main_dic[key] = copy.deepcopy(foreign_attr)
             if not readonly:
                 self.set_writeable(key)
             if aliases:
@@ -0,0 +1,348 @@
+"""
+Read only caches shared by all the worker processes of a node through
+a memory mapped file.
+
+The cached normalization matchers (e.g. MiniseedMatcher or
+OriginTimeMatcher) hold a copy of an entire collection.  When a matcher
+is passed to a dask or spark map operator every worker process
+deserializes its own copy of that cache.  For large collections
+(e.g. a channel collection of a few hundred thousand documents) that can
+use hundreds of MB per worker.  A SharedCache instead writes the cached
+objects once to a file, normally in the RAM based file system /dev/shm,
+and is pickled as only the path of the file.   Each worker process maps
+the file read only when the cache is deserialized so all the processes
+of a node share a single copy of the data through the page cache.
+Each entry is stored as a pickle that is decoded only when it is
+accessed.   An entry can be accessed by position or, when the cache is
+created with keys, by key with a binary search of a table of hashes of
+the keys.
+
+The process that creates a SharedCache owns the file and removes it
+when that instance is garbage collected or closed.  Workers that have
+already mapped the file are not affected, but the creating instance
+(normally held by a matcher in the driver) must be kept alive as long as
+new workers may need to attach to it.  With a cluster of more than one
+node the cache_dir must be a file system visible to all the nodes.
+"""
+import hashlib
+import mmap
+import os
+import pickle
+import tempfile
+import threading
+import uuid
+import weakref
+
+import numpy as np
+
+from mspasspy.ccore.utility import MsPASSError, ErrorSeverity
+
+_MAGIC = b"MSPSHC01"
+# magic string, number of entries, and a flag set when the entries have keys
+_HEADER = np.dtype([("magic", "S8"), ("n", "<u8"), ("keyed", "<u8")])
+
+_attached = dict()
+_attached_pid = None
+_lock = threading.Lock()
+
+
+def default_cache_dir():
+    """
+    Returns the directory used to create shared caches when the cache_dir
+    argument is not defined:  /dev/shm when it exists and otherwise
+    the default directory for temporary files.
+    """
+    if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        return "/dev/shm"
+    return tempfile.gettempdir()
+
+
+def _key_hash(key):
+    """
+    Returns a 64 bit hash of key that, unlike the builtin hash of a string,
+    is the same in every process.   numpy scalars are converted to the
+    equivalent python type so they hash the same way.
+    """
+    if isinstance(key, np.generic):
+        key = key.item()
+    digest = hashlib.blake2b(repr(key).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class _MappedFile:
+    """
+    Private class holding the memory map of one cache file and numpy
+    views of the tables in the file.   One instance is shared by all
+    the SharedCache objects of a process attached to the same file.
+    """
+
+    def __init__(self, path):
+        try:
+            with open(path, "rb") as fh:
+                self.mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            raise MsPASSError(
+                "SharedCache:  cache file "
+                + path
+                + " not found.  It was either removed by the process that created it or "
+                + "cache_dir is not visible to this process",
+                ErrorSeverity.Fatal,
+            )
+        header = np.frombuffer(self.mm, dtype=_HEADER, count=1)[0]
+        if header["magic"] != _MAGIC:
+            raise MsPASSError(
+                "SharedCache:  " + path + " is not a shared cache file",
+                ErrorSeverity.Fatal,
+            )
+        n = int(header["n"])
+        pos = _HEADER.itemsize
+        self.offsets = np.frombuffer(self.mm, dtype="<i8", count=n + 1, offset=pos)
+        pos += 8 * (n + 1)
+        if header["keyed"]:
+            self.hashes = np.frombuffer(self.mm, dtype="<u8", count=n, offset=pos)
+            pos += 8 * n
+            self.positions = np.frombuffer(self.mm, dtype="<i8", count=n, offset=pos)
+        else:
+            self.hashes = None
+            self.positions = None
+        self.n = n
+
+
+def _attach(path):
+    """
+    Returns the _MappedFile of path for the current process.  The file
+    is mapped on the first call and the same map is returned by all
+    later calls with the same path.
+    """
+    global _attached_pid
+    with _lock:
+        if _attached_pid != os.getpid():
+            # a forked child inherits the maps but we do not count on that
+            _attached.clear()
+            _attached_pid = os.getpid()
+        mapped = _attached.get(path)
+        if mapped is None:
+            mapped = _MappedFile(path)
+            _attached[path] = mapped
+        return mapped
+
+
+def _release(path):
+    """
+    Removes the cache file path and drops its map from the registry of
+    the current process.
+    """
+    with _lock:
+        if _attached_pid == os.getpid():
+            _attached.pop(path, None)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class SharedCache:
+    """
+    Read only container of python objects stored in a memory mapped file.
+    Create one with the create class method.  Pickling an instance saves
+    only the path of the file so unpickling it in another process maps
+    the same file instead of making a copy of its contents.
+
+    Entries are accessed by position with get.  When created with a list
+    of keys, find returns the position of the entry with a key and lookup
+    the value of that entry.   Keys can be any object with a repr that
+    does not depend on the process (e.g. strings, numbers, or tuples
+    of them).
+    """
+
+    def __init__(self, path):
+        """
+        Attaches to the existing cache file path.   Normally used only
+        to unpickle an instance.  Use create to make a new cache.
+        """
+        self.path = path
+        self._mapped = _attach(path)
+        self._finalizer = None
+
+    @classmethod
+    def create(cls, values, keys=None, cache_dir=None):
+        """
+        Writes a new cache file and returns an instance attached to it.
+        The returned instance owns the file:  the file is removed when
+        the instance is closed or garbage collected.
+
+        :param values:  iterable of the picklable objects to store.
+        :param keys:  optional list of keys of the values.  Must have the
+          same length as values.   Keys must be unique.
+        :param cache_dir:  directory where the file is created.  Defaults
+          to the output of default_cache_dir.  With a cluster of
+          more than one node this must be a file system shared by all the
+          nodes.
+        """
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        payloads = [pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL) for v in values]
+        n = len(payloads)
+        if keys is not None:
+            keys = list(keys)
+            if len(keys) != n:
+                raise MsPASSError(
+                    "SharedCache.create:  number of keys ({}) does not match number of values ({})".format(
+                        len(keys), n
+                    ),
+                    ErrorSeverity.Fatal,
+                )
+            # the key is stored with the value to resolve hash collisions
+            payloads = [
+                pickle.dumps((k, p), protocol=pickle.HIGHEST_PROTOCOL)
+                for k, p in zip(keys, payloads)
+            ]
+        header = np.zeros(1, dtype=_HEADER)
+        header["magic"] = _MAGIC
+        header["n"] = n
+        header["keyed"] = keys is not None
+        tables = [header]
+        size = _HEADER.itemsize + 8 * (n + 1)
+        if keys is not None:
+            size += 16 * n
+        offsets = np.empty(n + 1, dtype="<i8")
+        offsets[0] = size
+        offsets[1:] = size + np.cumsum([len(p) for p in payloads], dtype="<i8")
+        tables.append(offsets)
+        if keys is not None:
+            hashes = np.array([_key_hash(k) for k in keys], dtype="<u8")
+            order = np.argsort(hashes, kind="stable")
+            tables.append(hashes[order])
+            tables.append(order.astype("<i8"))
+        path = os.path.join(cache_dir, "mspass_cache_" + uuid.uuid4().hex)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as fh:
+            for table in tables:
+                fh.write(table.tobytes())
+            for p in payloads:
+                fh.write(p)
+        os.replace(tmp, path)
+        cache = cls(path)
+        cache._finalizer = weakref.finalize(cache, _release, path)
+        return cache
+
+    def __reduce__(self):
+        return (SharedCache, (self.path,))
+
+    def __len__(self):
+        return self._mapped.n
+
+    def close(self):
+        """
+        Removes the file if this instance created it.   Processes that
+        have already mapped the file are not affected.
+        """
+        if self._finalizer is not None:
+            self._finalizer()
+
+    def _payload(self, i):
+        m = self._mapped
+        return m.mm[m.offsets[i] : m.offsets[i + 1]]
+
+    def get(self, i):
+        """
+        Returns the value of the entry at position i.
+        """
+        if i < 0 or i >= self._mapped.n:
+            raise IndexError("SharedCache.get:  position {} out of range".format(i))
+        payload = self._payload(i)
+        if self._mapped.hashes is not None:
+            key, payload = pickle.loads(payload)
+        return pickle.loads(payload)
+
+    def key(self, i):
+        """
+        Returns the key of the entry at position i of a keyed cache.
+        """
+        key, payload = pickle.loads(self._payload(i))
+        return key
+
+    def find(self, key) -> int:
+        """
+        Returns the position of the entry with key or -1 if the cache
+        has no such key or was created without keys.
+        """
+        m = self._mapped
+        if m.hashes is None:
+            return -1
+        h = _key_hash(key)
+        i = np.searchsorted(m.hashes, h, side="left")
+        while i < m.n and m.hashes[i] == h:
+            pos = int(m.positions[i])
+            if self.key(pos) == key:
+                return pos
+            i += 1
+        return -1
+
+    def lookup(self, key, default=None):
+        """
+        Returns the value of the entry with key or default if there
+        is no such entry.
+        """
+        i = self.find(key)
+        if i < 0:
+            return default
+        key, payload = pickle.loads(self._payload(i))
+        return pickle.loads(payload)
+
+
+class SharedNormalizationCache:
+    """
+    Read only replacement of the python dict of lists of Metadata
+    containers used as the normcache of DictionaryCacheMatcher.  It has
+    the same interface as a dict for reading (in, [], get, keys, items,
+    and len) but the contents are held by a SharedCache.   The list of
+    Metadata containers returned for a key is decoded on each access.
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+
+    @classmethod
+    def create(cls, normcache, cache_dir=None):
+        """
+        Copies the contents of the python dict normcache to a new
+        SharedCache and returns the container wrapping it.
+        """
+        keys = list(normcache.keys())
+        cache = SharedCache.create(
+            [normcache[k] for k in keys], keys=keys, cache_dir=cache_dir
+        )
+        return cls(cache)
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, key):
+        return self._cache.find(key) >= 0
+
+    def __getitem__(self, key):
+        i = self._cache.find(key)
+        if i < 0:
+            raise KeyError(key)
+        return self._cache.get(i)
+
+    def get(self, key, default=None):
+        return self._cache.lookup(key, default)
+
+    def keys(self):
+        return [self._cache.key(i) for i in range(len(self._cache))]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def items(self):
+        return [
+            (self._cache.key(i), self._cache.get(i)) for i in range(len(self._cache))
+        ]
+
+    def close(self):
+        """
+        Removes the file holding the cache if this process created it.
+        """
+        self._cache.close()
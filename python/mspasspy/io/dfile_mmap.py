@@ -0,0 +1,252 @@
+import mmap
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from mspasspy.ccore.utility import MsPASSError, ErrorSeverity
+from mspasspy.ccore.seismic import (
+    TimeSeries,
+    Seismogram,
+    TimeSeriesEnsemble,
+    SeismogramEnsemble,
+)
+
+
+class DfileMmapReader:
+    """
+    Reader of the sample data of TimeSeries and Seismogram objects
+    stored in binary files (storage_mode "file" with no format) using
+    memory mapped files.
+
+    The default reader of Database calls fopen, fseek, and fread for
+    every datum read.  This class instead maps each file once and keeps
+    the mapping open.  Reads after the first from the same file are then
+    a memory copy from the mapping with no system calls, and the kernel
+    can use the page cache and read ahead of the mapping across all reads.
+    That is most helpful for files containing many waveform segments
+    (e.g. files written by save_ensemble_data) on parallel file systems
+    where open calls are expensive.
+
+    Mappings are held in a least recently used cache limited to
+    max_open_files to bound the number of open file descriptors.  A
+    mapping covers the file size at the time it was created.  Files
+    written by MsPASS are only appended to so a read beyond the end of a
+    mapping causes the file to be mapped again.
+
+    The view and ensemble_views methods return read-only numpy arrays
+    that reference the mapping directly.   They are intended for
+    analysis-only workflows that do not need to build MsPASS data objects
+    (e.g. computing statistics of the samples of a large data set).  The
+    views remain valid while a reference to them exists, even after the
+    mapping is dropped from the cache.
+
+    Memory maps cannot be pickled.  Pickling an instance of this class
+    produces an empty reader with the same parameters so it can be
+    passed to dask or spark workers.   Most users should use the
+    per-process instance returned by get_dfile_mmap_reader.
+
+    :param max_open_files:  maximum number of files kept mapped
+      (default 64).
+    :type max_open_files:  integer
+    """
+
+    def __init__(self, max_open_files=64):
+        if max_open_files < 1:
+            raise MsPASSError(
+                "DfileMmapReader constructor:  max_open_files must be positive",
+                ErrorSeverity.Fatal,
+            )
+        self.max_open_files = max_open_files
+        self._maps = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        return {"max_open_files": self.max_open_files}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_open_files"])
+
+    def close(self):
+        """
+        Drops all the cached mappings.  Files are closed when no view
+        of their mapping remains.
+        """
+        with self._lock:
+            self._maps.clear()
+
+    def _buffer(self, dir, dfile, nbytes_required):
+        """
+        Private method returning a numpy uint8 array of the contents of
+        file dir/dfile backed by the mapping of the file.  The file
+        is mapped again if it is shorter than nbytes_required.
+        """
+        if dir:
+            fname = os.path.join(dir, dfile)
+        else:
+            fname = dfile
+        with self._lock:
+            buf = self._maps.get(fname)
+            if buf is not None and len(buf) >= nbytes_required:
+                self._maps.move_to_end(fname)
+                return buf
+            try:
+                with open(fname, "rb") as fh:
+                    size = os.fstat(fh.fileno()).st_size
+                    if size == 0:
+                        buf = np.zeros(0, dtype=np.uint8)
+                    else:
+                        mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+                        # the array keeps the mapping alive after the
+                        # file is closed and the cache entry is dropped
+                        buf = np.frombuffer(mm, dtype=np.uint8)
+            except OSError as err:
+                raise MsPASSError(
+                    "DfileMmapReader:  Open failed on file " + fname + ":  " + str(err),
+                    ErrorSeverity.Invalid,
+                )
+            self._maps[fname] = buf
+            self._maps.move_to_end(fname)
+            while len(self._maps) > self.max_open_files:
+                self._maps.popitem(last=False)
+            return buf
+
+    def view(self, dir, dfile, foff, npts, ncomponents=1):
+        """
+        Returns a read-only numpy array referencing the sample data of one
+        datum in the mapping of file dir/dfile without copying.
+
+        :param dir:  directory name of the file
+        :param dfile:  leaf name of the file
+        :param foff:  offset in bytes of the first sample of the datum
+        :param npts:  number of samples of the datum
+        :param ncomponents:  1 (the default) for TimeSeries data and 3
+          for Seismogram data.
+        :return:  for ncomponents==1 a 1d array of length npts.  Otherwise
+          a 2d array with shape (ncomponents,npts) matching the layout of
+          the data attribute of a Seismogram.   Returns a shorter array
+          if the file ends before npts samples.
+        """
+        foff = int(foff)
+        nbytes = 8 * ncomponents * npts
+        buf = self._buffer(dir, dfile, foff + nbytes)
+        nbytes = max(min(nbytes, len(buf) - foff), 0)
+        # truncate to whole samples if the file is short
+        nsamples = nbytes // (8 * ncomponents)
+        data = buf[foff : foff + 8 * ncomponents * nsamples].view(np.float64)
+        if ncomponents == 1:
+            return data
+        # Seismogram samples are stored in column major order
+        return data.reshape((ncomponents, nsamples), order="F")
+
+    def read(self, mspass_object, dir, dfile, foff):
+        """
+        Loads the sample data of an atomic data object from file dir/dfile
+        starting at offset foff.  This is an alternative to the fread based
+        reader with the same behavior:  mspass_object must be
+        constructed with npts set and the return is the number of values
+        read.  That can be less than expected only if the file is too short.
+
+        :param mspass_object:  datum with npts set whose sample data
+          are to be loaded.
+        :type mspass_object:  TimeSeries or Seismogram
+        :return:  number of values (samples times components) read.
+        """
+        if isinstance(mspass_object, TimeSeries):
+            src = self.view(dir, dfile, foff, mspass_object.npts)
+            if len(src) > 0:
+                np.asarray(mspass_object.data)[: len(src)] = src
+            return len(src)
+        elif isinstance(mspass_object, Seismogram):
+            src = self.view(dir, dfile, foff, mspass_object.npts, ncomponents=3)
+            if src.shape[1] > 0:
+                np.asarray(mspass_object.data)[:, : src.shape[1]] = src
+            return src.size
+        else:
+            raise TypeError(
+                "DfileMmapReader.read:  only TimeSeries and Seismogram are supported"
+            )
+
+    def read_ensemble(self, ensemble, dir, dfile, indexes):
+        """
+        Loads the sample data of the ensemble members with positions listed
+        in indexes from file dir/dfile.  Each member must have foff
+        defined.  Members are read in order of increasing foff so
+        the file is scanned sequentially.  Members with foff undefined or
+        with a short read are killed with an error posted to their elog
+        as in the fread based ensemble reader.
+
+        :return:  total number of values read.
+        """
+        if not isinstance(ensemble, (TimeSeriesEnsemble, SeismogramEnsemble)):
+            raise TypeError(
+                "DfileMmapReader.read_ensemble:  only TimeSeriesEnsemble and SeismogramEnsemble are supported"
+            )
+        ordered = list()
+        for i in indexes:
+            d = ensemble.member[i]
+            if d.is_defined("foff"):
+                ordered.append((d["foff"], i))
+            else:
+                d.kill()
+                d.elog.log_error(
+                    "DfileMmapReader.read_ensemble",
+                    "foff not defined for {} member in ensemble".format(i),
+                    ErrorSeverity.Invalid,
+                )
+        ordered.sort()
+        count = 0
+        for foff, i in ordered:
+            d = ensemble.member[i]
+            n = self.read(d, dir, dfile, foff)
+            expected = d.npts if isinstance(d, TimeSeries) else 3 * d.npts
+            if n != expected:
+                d.kill()
+                d.elog.log_error(
+                    "DfileMmapReader.read_ensemble",
+                    "read error: npts not equal",
+                    ErrorSeverity.Invalid,
+                )
+            else:
+                d.set_live()
+            count += n
+        return count
+
+    def ensemble_views(self, docs, ncomponents=1):
+        """
+        Returns read-only views of the sample data for a list of wf
+        documents as returned by a MongoDB query.  Each document must
+        contain dir, dfile, foff, and npts.  The documents are processed
+        in order of file and foff to scan each file sequentially.
+
+        :param docs:  list of python dictionaries defining the data
+        :param ncomponents:  1 for TimeSeries data and 3 for Seismogram data.
+        :return:  list of numpy arrays parallel to docs (see view method).
+        """
+        order = sorted(
+            range(len(docs)),
+            key=lambda i: (docs[i]["dir"], docs[i]["dfile"], docs[i]["foff"]),
+        )
+        result = [None] * len(docs)
+        for i in order:
+            doc = docs[i]
+            result[i] = self.view(
+                doc["dir"], doc["dfile"], doc["foff"], doc["npts"], ncomponents
+            )
+        return result
+
+
+_dfile_mmap_reader = None
+
+
+def get_dfile_mmap_reader():
+    """
+    Returns the DfileMmapReader instance of the current process.  It is
+    created on the first call so each worker process of a parallel job
+    maps each file once and reuses the mappings for all the data it reads.
+    """
+    global _dfile_mmap_reader
+    if _dfile_mmap_reader is None:
+        _dfile_mmap_reader = DfileMmapReader()
+    return _dfile_mmap_reader
@@ -15,6 +15,7 @@ import gridfs
 import pymongo
 import pymongo.errors
 import numpy as np
+from bson.objectid import ObjectId
 import obspy
 from obspy.clients.fdsn import Client
 from obspy import Inventory
@@ -24,9 +25,11 @@ import json
 import base64
 import uuid
 
-from mspasspy.db.database import Database
+from mspasspy.db.database import Database, _read_projection, _normalize_projections
 from mspasspy.ccore.io import _mseed_file_indexer, _fwrite_to_file, _fread_from_file
 from mspasspy.util.converter import Trace2TimeSeries, Stream2Seismogram
+from mspasspy.io.sample_codec import encode_samples, decode_samples
+from mspasspy.algorithms.edit import Executioner, _metadata_frame
 
 from mspasspy.ccore.seismic import (
     TimeSeries,
@@ -68,6 +71,12 @@ def read_distributed_data(
     data_tag=None,
     aws_access_key_id=None,
     aws_secret_access_key=None,
+    batch_size=1000,
+    query=None,
+    collection="wf",
+    partition_key="_id",
+    attributes=None,
+    edit=None,
 ):
     """
     This function should be used to read an entire dataset that is to be handled
@@ -80,12 +89,21 @@ def read_distributed_data(
     is done in sequence, and reading from file is done with dask/spark. The two parts
     are done in two functions: read_to_dataframe, and read_files.
 
-    The data param can be database or dataframe. If it is database, the function will
-    firstly read from the database sequentially, and save the metadata to a dataframe.
-    Then we have the dataframe. Use the information in the dataframe to read from files
+    The data param can be database or dataframe. If it is database and a cursor is
+    given, the function will firstly read from the database sequentially, and save
+    the metadata to a dataframe. Then we have the dataframe. Use the information in the dataframe to read from files
     using dask/spark distributedly, and generate the objects to the container. This step
     uses map in dask/spark to improve efficiency.
 
+    If data is a database and cursor is None the dataset is instead defined by
+    the query and collection arguments and the metadata are never assembled
+    on the driver.  The driver only asks MongoDB for npartitions range
+    boundaries of partition_key (normally the default of "_id") over the
+    documents matching query.  Each dask/spark partition then runs its own
+    cursor for its range of partition_key values and builds the metadata
+    for its members.  Metadata loading in that mode is parallel, lazy, and
+    bounded in memory by the partition size rather than the dataset size.
+
     All other arguments are options that change behavior as described below.
 
     :param data: the data to be read, can be database or dataframe.
@@ -93,7 +111,8 @@ def read_distributed_data(
     or :class:`dask.dataframe.core.DataFrame` or :class:`pyspark.sql.dataframe.DataFrame`
     :param cursor: mongodb cursor defining what "the dataset" is.  It would
       normally be the output of the find method with a workflow dependent
-      query.
+      query.  If data is a database and this argument is None the partitioned
+      read described above is used.
     :type cursor: :class:`pymongo.cursor.CursorType`
     :param mode: reading mode that controls how the function interacts with
       the schema definition for the data type.   Must be one of
@@ -142,6 +161,41 @@ def read_distributed_data(
     :type data_tag: :class:`str`
     :param aws_access_key_id: A part of the credentials to authenticate the user
     :param aws_secret_access_key: A part of the credentials to authenticate the user
+    :param batch_size: number of wf documents fetched from MongoDB with each
+      query when data is a Database.  Passed to read_to_dataframe.
+      Default is 1000.
+    :type batch_size: :class:`int`
+    :param query: MongoDB query defining the dataset in the partitioned read.
+      Ignored unless data is a database and cursor is None.  Default (None)
+      means all documents in collection.
+    :type query: :class:`dict`
+    :param collection: wf collection to read in the partitioned read.
+      Default is "wf", which resolves to the schema's default wf collection.
+    :type collection: :class:`str`
+    :param partition_key: key used to split the partitioned read into ranges.
+      It should be indexed and present in every document.  Documents
+      lacking the key are not read.  Default is "_id".
+    :type partition_key: :class:`str`
+    :param attributes: list of the attributes to load into the Metadata of
+      each datum when data is a database.  Only those keys (and the keys
+      needed to construct the data and read their sample data) are fetched
+      from MongoDB for the wf documents and the documents of the
+      collections listed in normalize.   That also limits what is pickled
+      and shipped to the workers with each datum.  Default (None) loads all
+      attributes.  Passed to read_to_dataframe.
+    :type attributes: a :class:`list` of :class:`str`
+    :param edit: optional Executioner (e.g. MetadataInterval or a
+      FiringSquad chain of them) used to drop the data it would kill
+      before their sample data are read.  The test is applied to the
+      metadata of each datum (after normalization) and the data it would
+      kill are silently left out of the container.   In the partitioned
+      read the test is also added to the MongoDB query (see
+      Executioner.keep_query) when the metadata schema says all of its
+      keys are read straight from the wf documents, so doomed documents
+      are not even fetched.  The keys of the test are added to attributes.  Only
+      Executioners that define metadata_keys and kill_mask can be used.
+      Default (None) reads every datum.
+    :type edit: :class:`mspasspy.algorithms.edit.Executioner`
     :return: container defining the parallel dataset.  A spark `RDD` if format
       is "Spark" and a dask 'bag' if format is "dask"
     """
@@ -153,6 +207,66 @@ def read_distributed_data(
     ):
         raise TypeError("Only Database or DataFrame are supported")
     db = data
+    if edit is not None:
+        attributes = _add_edit_keys(attributes, edit)
+    if isinstance(data, Database) and cursor is None:
+        # partitioned read - each partition runs its own cursor and nothing
+        # but the partition boundaries are handled by the driver
+        wf_collection = db.database_schema.default_name(collection)
+        if npartitions is None:
+            if format == "spark":
+                npartitions = spark_context.defaultParallelism
+            else:
+                npartitions = 100
+        if edit is not None:
+            keep_query = _edit_keep_query(db, wf_collection, edit, mode, exclude_keys)
+            if keep_query is not None:
+                query = keep_query if query is None else {"$and": [query, keep_query]}
+        partition_queries = _partition_queries(
+            db[wf_collection], query, partition_key, npartitions
+        )
+
+        def read_partition(partition_query):
+            # the cursor only supplies ids - _read_metadata_records fetches
+            # the documents themselves in batches
+            records = list(
+                _read_metadata_records(
+                    db,
+                    db[wf_collection].find(partition_query, {"_id": 1}),
+                    mode,
+                    normalize,
+                    load_history,
+                    exclude_keys,
+                    data_tag,
+                    batch_size=batch_size,
+                    attributes=attributes,
+                )
+            )
+            if edit is not None:
+                records = _edit_records(records, edit)
+            return records
+
+        if format == "spark":
+            list_ = spark_context.parallelize(
+                partition_queries, numSlices=len(partition_queries)
+            ).flatMap(read_partition)
+        else:
+            list_ = (
+                daskbag.from_sequence(
+                    partition_queries, npartitions=len(partition_queries)
+                )
+                .map(read_partition)
+                .flatten()
+            )
+        return list_.map(
+            lambda cur: read_files(
+                Metadata(cur),
+                gridfs.GridFS(db) if cur["storage_mode"] == "gridfs" else None,
+                aws_access_key_id=aws_access_key_id,
+                aws_secret_access_key=aws_secret_access_key,
+            )
+        )
+
     if isinstance(data, Database):
         #  first read the metadata from database to a dataframe, and save to data
         data = read_to_dataframe(
@@ -163,6 +277,9 @@ def read_distributed_data(
             load_history,
             exclude_keys,
             data_tag,
+            batch_size=batch_size,
+            attributes=attributes,
+            edit=edit,
         )
 
     # convert dask dataframe to pandas dataframe
@@ -174,12 +291,15 @@ def read_distributed_data(
         data = data.toPandas()
 
     # now the type of data is a pandas dataframe
+    records = data.to_dict("records")
+    # read_to_dataframe has already applied edit to data read from a database
+    if edit is not None and not isinstance(db, Database):
+        records = _edit_records(records, edit)
+
     if format == "spark":
-        list_ = spark_context.parallelize(
-            data.to_dict("records"), numSlices=npartitions
-        )
+        list_ = spark_context.parallelize(records, numSlices=npartitions)
     else:
-        list_ = daskbag.from_sequence(data.to_dict("records"), npartitions=npartitions)
+        list_ = daskbag.from_sequence(records, npartitions=npartitions)
 
     # list_ is a parallel container of dict
     return list_.map(
@@ -208,13 +328,19 @@ def read_to_dataframe(
     alg_id="0",
     define_as_raw=False,
     retrieve_history_record=False,
+    batch_size=1000,
+    attributes=None,
+    edit=None,
 ):
     """
     This is the MsPASS reader for constructing metadata of Seismogram or TimeSeries
-    objects from data managed with MondoDB through MsPASS. Firstly construct a list
-    of objects using cursor. Then for each object, constrcut the metadata and add to
-    the list. Finally convert the list to a dataframe. The return type is a dataframe
-    of metadata. The logic of constructing metadata is same as Database.read_data().
+    objects from data managed with MondoDB through MsPASS. The cursor is consumed
+    in batches of batch_size ids.  The wf documents of each batch are fetched with
+    one query and the normalizing documents (and any elog documents) they link to
+    are resolved with one query per collection.   The metadata constructed for each
+    object is then added to a list that is finally converted column-wise to a
+    dataframe. The return type is a dataframe of metadata. The logic of constructing
+    metadata is same as Database.read_data().
 
     :param db: the database from which the data are to be read.
     :type db: :class:`mspasspy.db.database.Database`.
@@ -269,10 +395,75 @@ def read_to_dataframe(
     :type define_as_raw: :class:`bool`
     :param retrieve_history_record: a boolean control whether we would like to load processing history
     :type retrieve_history_record: :class:`bool`
+    :param batch_size: number of wf documents fetched from MongoDB with each
+        query.   Larger values reduce the number of round trips to the server
+        at the cost of driver memory.  Default is 1000.
+    :type batch_size: :class:`int`
+    :param attributes: list of the attributes to load for each datum.
+        Only those keys are fetched from MongoDB (a projection is passed to
+        find) for the wf documents and the documents of the collections
+        listed in normalize and only those become columns of the dataframe.
+        The keys needed to construct the data and read their sample data
+        are always loaded.  The default (None) loads all attributes.
+    :type attributes: a :class:`list` of :class:`str`
+    :param edit: optional Executioner (e.g. MetadataInterval or a
+        FiringSquad chain of them).   The rows of the data it would kill
+        are dropped from the dataframe.  The test is applied to each batch of
+        metadata as it is read so the rows dropped never accumulate in
+        memory.   The keys of the test are added to attributes.  Only
+        Executioners that define metadata_keys and kill_mask can be used.
+        Default (None) keeps every row.
+    :type edit: :class:`mspasspy.algorithms.edit.Executioner`
     """
-    # first get the object list
-    obj_list = list(cursor)
+    if edit is not None:
+        attributes = _add_edit_keys(attributes, edit)
+    md_list = _read_metadata_records(
+        db,
+        cursor,
+        mode,
+        normalize,
+        load_history,
+        exclude_keys,
+        data_tag,
+        alg_name,
+        alg_id,
+        define_as_raw,
+        retrieve_history_record,
+        batch_size,
+        attributes,
+    )
+    if edit is None:
+        records = list(md_list)
+    else:
+        records = []
+        for batch in _batched(md_list, batch_size):
+            records += _edit_records(batch, edit)
+    # convert the metadata list to a dataframe
+    return _records_to_dataframe(records)
+
 
+def _read_metadata_records(
+    db,
+    cursor,
+    mode="promiscuous",
+    normalize=None,
+    load_history=False,
+    exclude_keys=None,
+    data_tag=None,
+    alg_name="read_to_dataframe",
+    alg_id="0",
+    define_as_raw=False,
+    retrieve_history_record=False,
+    batch_size=1000,
+    attributes=None,
+):
+    """
+    Generator that does the work of read_to_dataframe.   It yields one
+    python dict of metadata for each object defined by cursor, fetching
+    documents from MongoDB one batch at a time.   Being a generator the
+    memory use is bounded by batch_size no matter how many documents
+    the cursor defines.  Arguments are the same as read_to_dataframe.
+    """
     collection = cursor.collection.name
     try:
         wf_collection = db.database_schema.default_name(collection)
@@ -305,89 +496,127 @@ def read_to_dataframe(
         exclude_keys = []
 
     # This assumes the name of a metadata schema matches the data type it defines.
-    read_metadata_schema = db.metadata_schema[object_type.__name__]
-
-    # We temporarily swap the main collection defined by the metadata schema by
+    # The view swaps the main collection defined by the metadata schema by
     # the wf_collection. This ensures the method works consistently for any
-    # user-specified collection argument.
-    metadata_schema_collection = read_metadata_schema.collection("_id")
-    if metadata_schema_collection != wf_collection:
-        temp_metadata_schema = copy.deepcopy(db.metadata_schema)
-        temp_metadata_schema[object_type.__name__].swap_collection(
-            metadata_schema_collection, wf_collection, db.database_schema
-        )
-        read_metadata_schema = temp_metadata_schema[object_type.__name__]
+    # user-specified collection argument.  Views are cached by the schema.
+    read_metadata_schema = db.metadata_schema.view(
+        object_type.__name__, wf_collection, db.database_schema
+    )
 
-    # find the corresponding document according to object id
-    col = db[wf_collection]
+    # The schema lookups needed for normalization are the same for every
+    # document so we resolve them once here instead of inside the loop.
+    # Each entry is (key, collection, unique name in that collection).
+    normalize_keys = []
+    for k in read_metadata_schema.keys():
+        col = read_metadata_schema.collection(k)
+        if (
+            col
+            and col != wf_collection
+            and k not in exclude_keys
+            and col in normalize
+            and (attributes is None or k in attributes)
+        ):
+            normalize_keys.append((k, col, db.database_schema[col].unique_name(k)))
+    normalize_collections = set([x[1] for x in normalize_keys])
+
+    elog_col_name = db.database_schema.default_name("elog")
+    elog_id_name = elog_col_name + "_id"
+
+    # projections limiting what is fetched to attributes (None for all)
+    projection = _read_projection(
+        attributes,
+        [col + "_id" for col in normalize_collections]
+        + [elog_id_name, db.database_schema.default_name("history_object") + "_id"],
+    )
+    normalize_projections = _normalize_projections(
+        attributes, read_metadata_schema, db.database_schema
+    )
 
-    md_list = []
+    # cache of normalizing documents keyed by collection and then by _id.
+    # Normalizing collections are small compared to the wf collection so
+    # we keep everything loaded for the life of this function.
+    normalize_cache = {col: {} for col in normalize_collections}
+
+    # the wf documents are fetched in batches of batch_size with one $in query
+    # per batch rather than one find_one per object
+    for id_batch in _batched(cursor, batch_size):
+        oid_list = []
+        for object_id in id_batch:
+            try:
+                oid = object_id["_id"]
+            except:
+                oid = object_id
+            oid_list.append(oid)
+        doc_dict = _find_documents_by_id(db[wf_collection], oid_list, projection)
+
+        # resolve all the normalization and elog ids of this batch with
+        # one query per collection
+        for col in normalize_collections:
+            id_set = set()
+            for doc in doc_dict.values():
+                if col + "_id" in doc and doc[col + "_id"] not in normalize_cache[col]:
+                    id_set.add(doc[col + "_id"])
+            found = _find_documents_by_id(
+                db[col],
+                list(id_set),
+                None if normalize_projections is None else normalize_projections[col],
+            )
+            # ids with no match are cached as None so they are not queried again
+            for nid in id_set:
+                normalize_cache[col][nid] = found.get(nid)
+        elog_dict = _find_documents_by_id(
+            db[elog_col_name],
+            [doc[elog_id_name] for doc in doc_dict.values() if elog_id_name in doc],
+        )
 
-    # sequentially get all metadata for each object
-    for object_id in obj_list:
-        # the same as read_data() in database.py
-        try:
-            oid = object_id["_id"]
-        except:
-            oid = object_id
-        object_doc = db[wf_collection].find_one({"_id": oid})
-        if not object_doc:
-            md_list.append(None)
-
-        if data_tag:
-            if "data_tag" not in object_doc or object_doc["data_tag"] != data_tag:
-                md_list.append(None)
-
-        # 1. build metadata as dict
-        md = Metadata()
-
-        # 1.1 read in the attributes from the document in the database
-        for k in object_doc:
-            if k in exclude_keys:
+        for oid in oid_list:
+            # the same as read_data() in database.py
+            object_doc = doc_dict.get(oid)
+            if not object_doc:
                 continue
-            if mode == "promiscuous":
-                md[k] = object_doc[k]
-                continue
-            # FIXME: note that we do not check whether the attributes' type in the database matches the schema's definition.
-            # This may or may not be correct. Should test in practice and get user feedbacks.
-            if read_metadata_schema.is_defined(k) and not read_metadata_schema.is_alias(
-                k
-            ):
-                md[k] = object_doc[k]
-
-        # 1.2 read the attributes in the metadata schema
-        # col_dict is a hashmap used to store the normalized records by the normalized_id in object_doc
-        col_dict = {}
-        # log_error_msg is used to record all the elog entries generated during the reading process
-        # After the mspass_object is created, we would post every elog entry with the messages in the log_error_msg.
-        log_error_msg = []
-        for k in read_metadata_schema.keys():
-            col = read_metadata_schema.collection(k)
-            # explanation of the 4 conditions in the following if statement
-            # 1.2.1. col is not None and is a normalized collection name
-            # 1.2.2. normalized key id exists in the wf document
-            # 1.2.3. k is not one of the exclude keys
-            # 1.2.4. col is in the normalize list provided by user
-            if (
-                col
-                and col != wf_collection
-                and col + "_id" in object_doc
-                and k not in exclude_keys
-                and col in normalize
-            ):
-                # try to find the corresponding record in the normalized collection from the database
-                if col not in col_dict:
-                    col_dict[col] = db[col].find_one({"_id": object_doc[col + "_id"]})
+
+            if data_tag:
+                if "data_tag" not in object_doc or object_doc["data_tag"] != data_tag:
+                    continue
+
+            # the packet index of miniseed data is only used by read_data
+            object_doc.pop("packet_index", None)
+
+            # 1. build metadata as dict
+            md = dict()
+
+            # 1.1 read in the attributes from the document in the database
+            for k in object_doc:
+                if k in exclude_keys:
+                    continue
+                if mode == "promiscuous":
+                    md[k] = object_doc[k]
+                    continue
+                # FIXME: note that we do not check whether the attributes' type in the database matches the schema's definition.
+                # This may or may not be correct. Should test in practice and get user feedbacks.
+                if read_metadata_schema.is_defined(
+                    k
+                ) and not read_metadata_schema.is_alias(k):
+                    md[k] = object_doc[k]
+
+            # 1.2 read the attributes in the metadata schema
+            # log_error_msg is used to record all the elog entries generated during the reading process
+            # After the mspass_object is created, we would post every elog entry with the messages in the log_error_msg.
+            log_error_msg = []
+            for k, col, unique_k in normalize_keys:
+                # skip if the normalized key id does not exist in the wf document
+                if col + "_id" not in object_doc:
+                    continue
+                normalized_doc = normalize_cache[col].get(object_doc[col + "_id"])
                 # might unable to find the normalized document by the normalized_id in the object_doc
                 # we skip reading this attribute
-                if not col_dict[col]:
+                if not normalized_doc:
                     continue
                 # this attribute may be missing in the normalized record we retrieve above
                 # in this case, we skip reading this attribute
                 # however, if it is a required attribute for the normalized collection
                 # we should post an elog entry to the associated wf object created after.
-                unique_k = db.database_schema[col].unique_name(k)
-                if not unique_k in col_dict[col]:
+                if not unique_k in normalized_doc:
                     if db.database_schema[col].is_required(unique_k):
                         log_error_msg.append(
                             "Attribute {} is required in collection {}, but is missing in the document with id={}.".format(
@@ -395,153 +624,321 @@ def read_to_dataframe(
                             )
                         )
                     continue
-                md[k] = col_dict[col][unique_k]
-
-        # 1.3 schema check normalized data according to the read mode
-        is_dead = False
-        fatal_keys = []
-        if mode == "cautious":
-            for k in md:
-                if read_metadata_schema.is_defined(k):
-                    col = read_metadata_schema.collection(k)
-                    unique_key = db.database_schema[col].unique_name(k)
-                    if not isinstance(md[k], read_metadata_schema.type(k)):
-                        # try to convert the mismatch attribute
-                        try:
-                            # convert the attribute to the correct type
-                            md[k] = read_metadata_schema.type(k)(md[k])
-                        except:
-                            if db.database_schema[col].is_required(unique_key):
-                                fatal_keys.append(k)
-                                is_dead = True
-                                log_error_msg.append(
-                                    "cautious mode: Required attribute {} has type {}, forbidden by definition and unable to convert".format(
-                                        k, type(md[k])
+                md[k] = normalized_doc[unique_k]
+
+            # 1.3 schema check normalized data according to the read mode
+            is_dead = False
+            fatal_keys = []
+            if mode == "cautious":
+                for k in md:
+                    if read_metadata_schema.is_defined(k):
+                        col = read_metadata_schema.collection(k)
+                        unique_key = db.database_schema[col].unique_name(k)
+                        if not isinstance(md[k], read_metadata_schema.type(k)):
+                            # try to convert the mismatch attribute
+                            try:
+                                # convert the attribute to the correct type
+                                md[k] = read_metadata_schema.type(k)(md[k])
+                            except:
+                                if db.database_schema[col].is_required(unique_key):
+                                    fatal_keys.append(k)
+                                    is_dead = True
+                                    log_error_msg.append(
+                                        "cautious mode: Required attribute {} has type {}, forbidden by definition and unable to convert".format(
+                                            k, type(md[k])
+                                        )
                                     )
+
+            elif mode == "pedantic":
+                for k in md:
+                    if read_metadata_schema.is_defined(k):
+                        if not isinstance(md[k], read_metadata_schema.type(k)):
+                            fatal_keys.append(k)
+                            is_dead = True
+                            log_error_msg.append(
+                                "pedantic mode: {} has type {}, forbidden by definition".format(
+                                    k, type(md[k])
                                 )
+                            )
 
-        elif mode == "pedantic":
-            for k in md:
-                if read_metadata_schema.is_defined(k):
-                    if not isinstance(md[k], read_metadata_schema.type(k)):
-                        fatal_keys.append(k)
-                        is_dead = True
-                        log_error_msg.append(
-                            "pedantic mode: {} has type {}, forbidden by definition".format(
-                                k, type(md[k])
+            # 1.4 create a mspass object by passing MetaData
+            # if not changing the fatal key values, runtime error in construct a mspass object
+            for k in fatal_keys:
+                if read_metadata_schema.type(k) is str:
+                    md[k] = ""
+                elif read_metadata_schema.type(k) is int:
+                    md[k] = 0
+                elif read_metadata_schema.type(k) is float:
+                    md[k] = 0.0
+                elif read_metadata_schema.type(k) is bool:
+                    md[k] = False
+                elif read_metadata_schema.type(k) is dict:
+                    md[k] = {}
+                elif read_metadata_schema.type(k) is list:
+                    md[k] = []
+                elif read_metadata_schema.type(k) is bytes:
+                    md[k] = b"\x00"
+                else:
+                    md[k] = None
+
+            # init a ProcessingHistory to store history
+            processing_history_record = ProcessingHistory()
+            # load the history in database
+            if elog_id_name in object_doc and object_doc[elog_id_name] in elog_dict:
+                elog_doc = elog_dict[object_doc[elog_id_name]]
+                for log in elog_doc["logdata"]:
+                    me = MsPASSError(log["error_message"], log["badness"].split(".")[1])
+                    processing_history_record.elog.log_error(
+                        log["algorithm"], log["error_message"], me.severity
+                    )
+
+            # not continue step 2 & 3 if the mspass object is dead
+            if is_dead:
+                md["is_dead"] = True  # mspass_object.kill()
+                for msg in log_error_msg:
+                    processing_history_record.elog.log_error(
+                        "read_data", msg, ErrorSeverity.Invalid
+                    )
+            else:
+                md["is_dead"] = False  # mspass_object.live = True
+
+                # 3.load history
+                if load_history:
+                    history_obj_id_name = (
+                        db.database_schema.default_name("history_object") + "_id"
+                    )
+                    if history_obj_id_name in object_doc:
+                        # Load (in place) the processing history into h.
+                        history_object_id = object_doc[history_obj_id_name]
+                        # get the atomic type of the mspass object
+                        if object_type is TimeSeries:
+                            atomic_type = AtomicType.TIMESERIES
+                        else:
+                            atomic_type = AtomicType.SEISMOGRAM
+                        if not collection:
+                            collection = db.database_schema.default_name(
+                                "history_object"
                             )
-                        )
+                        # retrieve_history_record
+                        if retrieve_history_record:
+                            # load history if set True.  Only needed here so we
+                            # avoid the round trip when just setting the origin
+                            res = db[collection].find_one({"_id": history_object_id})
+                            processing_history_record = pickle.loads(
+                                res["processing_history"]
+                            )
+                        else:
+                            # set the associated history_object_id as the uuid of the origin
+                            if not alg_name:
+                                alg_name = "0"
+                            if not alg_id:
+                                alg_id = "0"
+                            processing_history_record.set_as_origin(
+                                alg_name,
+                                alg_id,
+                                history_object_id,
+                                atomic_type,
+                                define_as_raw,
+                            )
+
+                # 4.post complaint elog entries if any
+                for msg in log_error_msg:
+                    processing_history_record.elog.log_error(
+                        "read_data", msg, ErrorSeverity.Complaint
+                    )
 
-        # 1.4 create a mspass object by passing MetaData
-        # if not changing the fatal key values, runtime error in construct a mspass object
-        for k in fatal_keys:
-            if read_metadata_schema.type(k) is str:
-                md[k] = ""
-            elif read_metadata_schema.type(k) is int:
-                md[k] = 0
-            elif read_metadata_schema.type(k) is float:
-                md[k] = 0.0
-            elif read_metadata_schema.type(k) is bool:
-                md[k] = False
-            elif read_metadata_schema.type(k) is dict:
-                md[k] = {}
-            elif read_metadata_schema.type(k) is list:
-                md[k] = []
-            elif read_metadata_schema.type(k) is bytes:
-                md[k] = b"\x00"
+            # save additional params to metadata
+            md["history"] = processing_history_record
+            if object_type is TimeSeries:
+                md["object_type"] = "TimeSeries"
             else:
-                md[k] = None
-
-        # init a ProcessingHistory to store history
-        processing_history_record = ProcessingHistory()
-        # load the history in database
-        elog_col_name = db.database_schema.default_name("elog")
-        elog_id_name = elog_col_name + "_id"
-        if elog_id_name in object_doc:
-            elog_id = object_doc[elog_id_name]
-            elog_doc = db[elog_col_name].find_one({"_id": elog_id})
-            for log in elog_doc["logdata"]:
-                me = MsPASSError(log["error_message"], log["badness"].split(".")[1])
-                processing_history_record.elog.log_error(
-                    log["algorithm"], log["error_message"], me.severity
-                )
+                md["object_type"] = "Seismogram"
+            md["storage_mode"] = object_doc["storage_mode"]
+            # if md["storage_mode"] == "gridfs":
+            #    md["gfsh"] = gridfs.GridFS(db)
+            md["dir"] = object_doc.get("dir")
+            md["dfile"] = object_doc.get("dfile")
+            md["foff"] = object_doc.get("foff")
+            md["nbytes"] = object_doc.get("nbytes")
+            md["format"] = object_doc.get("format")
+            md["sample_encoding"] = object_doc.get("sample_encoding")
+            md["gridfs_id"] = object_doc.get("gridfs_id")
+            md["url"] = object_doc.get("url")
+
+            yield md
+
+
+def _partition_queries(col, query, partition_key, npartitions):
+    """
+    Split the documents of col matching query into (at most) npartitions
+    contiguous ranges of partition_key and return a list of queries, one
+    per range.   The boundaries are computed by MongoDB with a $bucketAuto
+    aggregation so only npartitions small documents are returned to the
+    caller.  The union of the returned queries is exactly the set of
+    documents matching query that define partition_key.
+    """
+    if query is None:
+        query = {}
+    match = {"$and": [query, {partition_key: {"$exists": True}}]}
+    buckets = list(
+        col.aggregate(
+            [
+                {"$match": match},
+                {
+                    "$bucketAuto": {
+                        "groupBy": "$" + partition_key,
+                        "buckets": npartitions,
+                    }
+                },
+            ],
+            allowDiskUse=True,
+        )
+    )
+    if len(buckets) == 0:
+        # always return at least one partition so the container is valid
+        return [match]
+    partition_queries = []
+    for i, bucket in enumerate(buckets):
+        # $bucketAuto ranges are [min, max) except the last which is [min, max]
+        upper = "$lte" if i == len(buckets) - 1 else "$lt"
+        partition_queries.append(
+            {
+                "$and": [
+                    query,
+                    {
+                        partition_key: {
+                            "$gte": bucket["_id"]["min"],
+                            upper: bucket["_id"]["max"],
+                        }
+                    },
+                ]
+            }
+        )
+    return partition_queries
 
-        # not continue step 2 & 3 if the mspass object is dead
-        if is_dead:
-            md["is_dead"] = True  # mspass_object.kill()
-            for msg in log_error_msg:
-                processing_history_record.elog.log_error(
-                    "read_data", msg, ErrorSeverity.Invalid
-                )
-        else:
-            md["is_dead"] = False  # mspass_object.live = True
 
-            # 3.load history
-            if load_history:
-                history_obj_id_name = (
-                    db.database_schema.default_name("history_object") + "_id"
-                )
-                if history_obj_id_name in object_doc:
-                    # Load (in place) the processing history into h.
-                    history_object_id = object_doc[history_obj_id_name]
-                    # get the atomic type of the mspass object
-                    if object_type is TimeSeries:
-                        atomic_type = AtomicType.TIMESERIES
-                    else:
-                        atomic_type = AtomicType.SEISMOGRAM
-                    if not collection:
-                        collection = db.database_schema.default_name("history_object")
-                    # load history if set True
-                    res = db[collection].find_one({"_id": history_object_id})
-                    # retrieve_history_record
-                    if retrieve_history_record:
-                        processing_history_record = pickle.loads(
-                            res["processing_history"]
-                        )
-                    else:
-                        # set the associated history_object_id as the uuid of the origin
-                        if not alg_name:
-                            alg_name = "0"
-                        if not alg_id:
-                            alg_id = "0"
-                        processing_history_record.set_as_origin(
-                            alg_name,
-                            alg_id,
-                            history_object_id,
-                            atomic_type,
-                            define_as_raw,
-                        )
+def _batched(iterable, batch_size):
+    """
+    Generator yielding lists of at most batch_size items from iterable.
+    Used to walk a (potentially huge) cursor without materializing it.
+    """
+    batch = []
+    for x in iterable:
+        batch.append(x)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
 
-            md.clear_modified()
 
-            # 4.post complaint elog entries if any
-            for msg in log_error_msg:
-                processing_history_record.elog.log_error(
-                    "read_data", msg, ErrorSeverity.Complaint
-                )
+def _find_documents_by_id(col, id_list, projection=None):
+    """
+    Fetch all documents in col with _id in id_list using a single
+    $in query.   Returns a dict of the documents keyed by _id.  Ids
+    that do not match any document are silently absent from the result.
+    """
+    if len(id_list) == 0:
+        return {}
+    return {doc["_id"]: doc for doc in col.find({"_id": {"$in": id_list}}, projection)}
 
-        # save additional params to metadata
-        md["history"] = processing_history_record
-        if object_type is TimeSeries:
-            md["object_type"] = "TimeSeries"
-        else:
-            md["object_type"] = "Seismogram"
-        md["storage_mode"] = object_doc["storage_mode"]
-        # if md["storage_mode"] == "gridfs":
-        #    md["gfsh"] = gridfs.GridFS(db)
-        md["dir"] = object_doc.get("dir")
-        md["dfile"] = object_doc.get("dfile")
-        md["foff"] = object_doc.get("foff")
-        md["nbytes"] = object_doc.get("nbytes")
-        md["format"] = object_doc.get("format")
-        md["gridfs_id"] = object_doc.get("gridfs_id")
-        md["url"] = object_doc.get("url")
-
-        # add metadata for current object to metadata list
-        md_list.append(md)
 
-    # convert the metadata list to a dataframe
-    return pd.json_normalize(map(lambda cur: cur.todict(), md_list))
+def _add_edit_keys(attributes, edit):
+    """
+    Verifies edit is an Executioner that can be applied to tabular
+    metadata and returns attributes with the keys the test uses appended.
+    Returns None (all attributes) if attributes is None.
+    """
+    keys = None
+    if isinstance(edit, Executioner):
+        keys = edit.metadata_keys()
+    if keys is None:
+        raise MsPASSError(
+            "edit must be an Executioner with a test that can be applied to a "
+            + "DataFrame of metadata (see Executioner.kill_mask).  "
+            + "Apply other tests with kill_if_true after the data are read",
+            ErrorSeverity.Invalid,
+        )
+    if attributes is None:
+        return None
+    return list(attributes) + [k for k in keys if k not in attributes]
+
+
+def _edit_keep_query(db, wf_collection, edit, mode, exclude_keys):
+    """
+    Returns the MongoDB query selecting the wf documents that survive the
+    Executioner edit or None if the test should not be applied by MongoDB.
+    MongoDB only sees the wf document so the test is only pushed down when
+    every key it uses is read verbatim from the wf document.  The metadata
+    schema decides that:  a key fails if normalization loads it from one of
+    the normalize collections, if the schema places it in any collection
+    other than wf_collection, if it is an alias, or if exclude_keys drops
+    it.  Keys the schema does not define only come from the wf document
+    in promiscuous mode.  In any of those cases the query could kill data
+    the test would not.
+    """
+    object_type = db.database_schema[wf_collection].data_type()
+    read_metadata_schema = db.metadata_schema.view(
+        object_type.__name__, wf_collection, db.database_schema
+    )
+    for key in edit.metadata_keys():
+        if exclude_keys is not None and key in exclude_keys:
+            return None
+        if read_metadata_schema.is_defined(key):
+            if read_metadata_schema.is_alias(key):
+                return None
+            # covers the keys normalization loads from normalize collections
+            if read_metadata_schema.collection(key) != wf_collection:
+                return None
+        elif mode != "promiscuous":
+            return None
+    return edit.keep_query()
+
+
+def _edit_records(records, edit):
+    """
+    Returns the list of the metadata records (python dicts) that survive
+    the Executioner edit.   The test is applied to all the records at
+    once with kill_mask.  If the values cannot be compared that way
+    (kill_mask raises a TypeError) kill_if_true is applied to each record
+    loaded into an empty TimeSeries as Executioner.edit_ensemble_members
+    does for ensemble members.
+    """
+    if len(records) == 0:
+        return records
+    keys = edit.metadata_keys()
+    try:
+        mask = edit.kill_mask(_metadata_frame(records, keys))
+    except TypeError:
+        mask = []
+        for r in records:
+            d = TimeSeries()
+            for k in keys:
+                if k in r:
+                    d[k] = r[k]
+            d.set_live()
+            edit.kill_if_true(d)
+            mask.append(d.dead())
+    return [r for r, doomed in zip(records, mask) if not doomed]
+
+
+def _records_to_dataframe(records):
+    """
+    Build a pandas DataFrame from a list of python dict records column by
+    column.   Keys missing from a record are filled with NaN as
+    json_normalize did, but nested dict values are kept intact instead of
+    being flattened into dotted column names.
+    """
+    columns = {}
+    for i, record in enumerate(records):
+        for k, v in record.items():
+            if k not in columns:
+                columns[k] = [np.nan] * i
+            columns[k].append(v)
+        for column in columns.values():
+            if len(column) == i:
+                column.append(np.nan)
+    return pd.DataFrame(columns)
 
 
 def read_files(
@@ -594,32 +991,39 @@ def read_files(
 
     if not md["is_dead"]:
         mspass_object.set_live()
+        # missing values are None or NaN when md comes from a dataframe
+        sample_encoding = None
+        if md.is_defined("sample_encoding") and isinstance(md["sample_encoding"], str):
+            sample_encoding = md["sample_encoding"]
         # 2.load data from different modes
         storage_mode = md["storage_mode"]
         if storage_mode == "file":
-            if md.is_defined("format"):  # "format" in object_doc:
-                Database._read_data_from_dfile(
-                    mspass_object,
-                    md["dir"],
-                    md["dfile"],
-                    md["foff"],
-                    nbytes=md["nbytes"],
-                    format=md["format"],
-                )
-            else:
-                Database._read_data_from_dfile(
-                    mspass_object,
-                    md["dir"],
-                    md["dfile"],
-                    md["foff"],
-                )
+            # format is None for binary files and NaN when md comes from a
+            # dataframe - only a string names a format for obspy
+            format = None
+            if md.is_defined("format") and isinstance(md["format"], str):
+                format = md["format"]
+            nbytes = 0
+            if format or sample_encoding:
+                nbytes = int(md["nbytes"])
+            Database._read_data_from_dfile(
+                mspass_object,
+                md["dir"],
+                md["dfile"],
+                md["foff"],
+                nbytes=nbytes,
+                format=format,
+                sample_encoding=sample_encoding,
+            )
         elif storage_mode == "gridfs":
             # tried to store GridFS object in metadata here, but GridFS object in Pandas.DataFrame
             # can not be converted to RDD or daskbag, it will throw a TypeError: can't pickle _thread.RLock objects.
             # If the storage mode is gridfs, we have to use the database.
             # raise TypeError("gridfs storage mode are not supported in distributed read")
             if gfsh is not None:
-                _read_data_from_gridfs(gfsh, mspass_object, md["gridfs_id"])
+                _read_data_from_gridfs(
+                    gfsh, mspass_object, md["gridfs_id"], sample_encoding
+                )
             else:
                 raise TypeError(
                     "To use gridfs storage mode, must provide database rather than dataframe"
@@ -648,7 +1052,7 @@ def read_files(
     return mspass_object
 
 
-def _read_data_from_gridfs(gfsh, mspass_object, gridfs_id):
+def _read_data_from_gridfs(gfsh, mspass_object, gridfs_id, sample_encoding=None):
     """
     Read data stored in gridfs and load it into a mspasspy object. This is similar
     to database._read_data_from_gridfs(), but here we have gfsh as a parameter to
@@ -660,9 +1064,13 @@ def _read_data_from_gridfs(gfsh, mspass_object, gridfs_id):
     :type mspass_object: either :class:`mspasspy.ccore.seismic.TimeSeries` or :class:`mspasspy.ccore.seismic.Seismogram`
     :param gridfs_id: the object id of the data stored in gridfs.
     :type gridfs_id: :class:`bson.objectid.ObjectId`
+    :param sample_encoding: encoding of the stored data.  None (the default) means raw doubles.
+    :type sample_encoding: :class:`str`
     """
     fh = gfsh.get(file_id=gridfs_id)
-    if isinstance(mspass_object, TimeSeries):
+    if sample_encoding:
+        decode_samples(mspass_object, fh.read(), sample_encoding)
+    elif isinstance(mspass_object, TimeSeries):
         # fh.seek(16)
         float_array = array("d")
         if not mspass_object.is_defined("npts"):
@@ -702,15 +1110,21 @@ def write_distributed_data(
     data_tag=None,
     alg_name="write_distributed_data",
     alg_id="0",
+    batch_size=1000,
+    sample_encoding=None,
 ):
     """
     This function should be used to write an entire dataset that is to be handled
     by subsequent parallel operations.  The function can be thought of as
     writing the entire data set from a parallel container (rdd for spark
-    implementations or bag for a dask implementatio) to storage. From the container,
-    it will write to files distributedly using spark/dask, and then write to the
-    database sequentially. The two parts are done in two functions: write_files,
-    and write_to_db. It returns a dataframe of metadata for each object in the
+    implementations or bag for a dask implementatio) to storage. Each partition
+    of the container is written by a worker that first writes the sample data
+    of its members with write_files and then saves their documents to the database
+    in bulk with the same logic as write_to_db.  Documents are inserted with
+    insert_many in batches of batch_size (unordered) and elog and history
+    documents are linked to the wf documents at insertion time so no follow-up
+    updates are needed.  The database phase therefore scales with the number
+    of workers.  It returns a dataframe of metadata for each object in the
     original container. The return value can be used as input for
     read_distributed_data() function.
 
@@ -778,30 +1192,56 @@ def write_distributed_data(
     :param data_tag: a user specified "data_tag" key.  See above and
         User's manual for guidance on how the use of this option.
     :type data_tag: :class:`str`
+    :param batch_size: maximum number of documents sent to MongoDB with each
+        insert_many call by each worker.  Default is 1000.
+    :type batch_size: :class:`int`
+    :param sample_encoding: encoding of the sample data for "gridfs" storage
+        and "file" storage with no file_format.  The default (None) saves raw
+        doubles.  See :meth:`mspasspy.db.database.Database.save_data` and
+        :mod:`mspasspy.io.sample_codec` for the options.
+    :type sample_encoding: :class:`str`
     """
-    # 1. write to file system, distributed, get the metadata
-    metadata_container = data.map(
-        lambda cur: write_files(
-            cur, file_format, storage_mode, overwrite, gfsh=gridfs.GridFS(db)
+    if mode not in ["promiscuous", "cautious", "pedantic"]:
+        raise MsPASSError(
+            "only promiscuous, cautious and pedantic are supported, but {} is requested.".format(
+                mode
+            ),
+            "Fatal",
         )
-    )
-    # 2. write to database, sequential
+
+    def write_partition(partition):
+        # 1. write to file system, get the metadata
+        gfsh = gridfs.GridFS(db)
+        md_list = [
+            write_files(
+                cur,
+                file_format,
+                storage_mode,
+                overwrite,
+                gfsh=gfsh,
+                sample_encoding=sample_encoding,
+            )
+            for cur in partition
+        ]
+        # 2. write to database in bulk from the same worker
+        return _write_metadata_records(
+            db,
+            md_list,
+            mode=mode,
+            storage_mode=storage_mode,
+            format=file_format,
+            exclude_keys=exclude_keys,
+            collection=collection,
+            data_tag=data_tag,
+            batch_size=batch_size,
+        )
+
     # convert the parallel container to list
     if format == "spark":
-        md_list = metadata_container.collect()  # rdd -> list
+        md_list = data.mapPartitions(write_partition).collect()  # rdd -> list
     else:
-        md_list = metadata_container.compute()  # bag -> list
-    return write_to_db(
-        db,
-        md_list,
-        mode=mode,
-        storage_mode=storage_mode,
-        format=file_format,
-        overwrite=overwrite,
-        exclude_keys=exclude_keys,
-        collection=collection,
-        data_tag=data_tag,
-    )
+        md_list = data.map_partitions(write_partition).compute()  # bag -> list
+    return _records_to_dataframe(md_list)
 
 
 def write_to_db(
@@ -816,6 +1256,7 @@ def write_to_db(
     data_tag=None,
     alg_name="write_to_db",
     alg_id="0",
+    batch_size=1000,
 ):
     """
     Use this method to save a list of atomic data objects (TimeSeries or Seismogram)
@@ -826,6 +1267,12 @@ def write_to_db(
     for the target mspass objects. The logic is same as Database.save_data().
     The function is the exact reverse of read_to_dataframe().
 
+    Unlike Database.save_data the documents are not inserted one at a time.
+    The ObjectIds of the new wf documents are generated on the client so
+    the wf, elog, and history documents can all be cross referenced before
+    they are written.  They are then inserted with unordered insert_many
+    calls of at most batch_size documents.
+
     Any errors messages held in the object being saved are always
     written to documents in MongoDB is a special collection defined in
     the schema.   Saving object level history is optional.
@@ -931,6 +1378,9 @@ def write_to_db(
     :param data_tag: a user specified "data_tag" key.  See above and
         User's manual for guidance on how the use of this option.
     :type data_tag: :class:`str`
+    :param batch_size: maximum number of documents sent to MongoDB with each
+        insert_many call.  Default is 1000.
+    :type batch_size: :class:`int`
     """
     if mode not in ["promiscuous", "cautious", "pedantic"]:
         raise MsPASSError(
@@ -939,6 +1389,54 @@ def write_to_db(
             ),
             "Fatal",
         )
+    # convert list of metadata to dataframe
+    return _records_to_dataframe(
+        _write_metadata_records(
+            db,
+            md_list,
+            mode=mode,
+            storage_mode=storage_mode,
+            format=format,
+            exclude_keys=exclude_keys,
+            collection=collection,
+            data_tag=data_tag,
+            alg_name=alg_name,
+            alg_id=alg_id,
+            batch_size=batch_size,
+        )
+    )
+
+
+def _write_metadata_records(
+    db,
+    md_list,
+    mode="promiscuous",
+    storage_mode="file",
+    format=None,
+    exclude_keys=None,
+    collection=None,
+    data_tag=None,
+    alg_name="write_to_db",
+    alg_id="0",
+    batch_size=1000,
+):
+    """
+    Does the work of write_to_db, which see for the arguments.   Returns a
+    list of python dict records, one for each Metadata in md_list, rather
+    than a dataframe so it can be run on each partition of a parallel
+    container.
+    """
+    elog_col_name = db.database_schema.default_name("elog")
+    elog_id_name = elog_col_name + "_id"
+    history_col_name = db.database_schema.default_name("history_object")
+    history_obj_id_name = history_col_name + "_id"
+    # documents waiting for the next bulk insert.  wf documents are keyed
+    # by collection name as the collection can depend on the object type.
+    pending_wf = {}
+    pending_elog = []
+    pending_history = []
+    npending = 0
+    records = []
 
     for md in md_list:
         # below we try to capture permission issue before writing anything to the database.
@@ -991,7 +1489,6 @@ def write_to_db(
             # This returns a string that is the collection name for this atomic data type
             # A weird construct
             wf_collection_name = save_schema.collection("_id")
-        wf_collection = db[wf_collection_name]
 
         if md["is_dead"] == False:
             if exclude_keys is None:
@@ -1116,7 +1613,6 @@ def write_to_db(
         # above so we need repeat the test for live
         if md["is_dead"] == False:
             insertion_dict["storage_mode"] = storage_mode
-            gridfs_id = None
 
             if storage_mode == "file":
                 # TODO:  be sure this can't throw an exception
@@ -1137,10 +1633,13 @@ def write_to_db(
                 # elif storage_mode == "url":
                 #    pass
 
+            # The wf document id is generated here rather than by the server
+            # so the elog and history documents can carry the cross reference
+            # when they are inserted.   That avoids an update_one for each.
+            wfid = ObjectId()
+            wf_id_name = wf_collection_name + "_id"
+
             # save history if not empty
-            history_obj_id_name = (
-                db.database_schema.default_name("history_object") + "_id"
-            )
             history_object_id = None
             if md["history"].is_empty():
                 # Use this trick in update_metadata too. None is needed to
@@ -1149,9 +1648,12 @@ def write_to_db(
                 insertion_dict.pop(history_obj_id_name, None)
             else:
                 # optional history save - only done if history container is not empty
-                history_object_id = _save_history(
-                    db, md, save_schema, atomic_type, alg_name, alg_id
+                history_doc = _history_document(
+                    md, save_schema, atomic_type, alg_name, alg_id
                 )
+                history_doc[wf_id_name] = wfid
+                pending_history.append(history_doc)
+                history_object_id = history_doc["_id"]
                 insertion_dict[history_obj_id_name] = history_object_id
 
             # add tag
@@ -1160,36 +1662,27 @@ def write_to_db(
             else:
                 # We need to clear data tag if was previously defined in
                 # this case or a the old tag will be saved with this datum
-                if "data_tag" in insertion_dict:
-                    insertion_dict.erase("data_tag")
-            # We don't want an elog_id in the insertion at this point.
-            # A option to consider is if we need an update after _save_elog
-            # section below to post elog_id back.
-
-            # test will fail here because there might be some Complaint elog post to the wf above
-            # we need to save the elog and get the elog_id
-            # then associate with the wf document so that we could insert in the wf_collection
+                insertion_dict.pop("data_tag", None)
 
             # save elogs if the size of elog is greater than 0
             elog_id = None
             if md["history"].elog.size() > 0:
-                elog_id_name = db.database_schema.default_name("elog") + "_id"
-                # elog ids will be updated in the wf col when saving metadata
-                elog_id = _save_elog(db, md, save_schema, elog_id=None)
+                elog_doc = _elog_document(md, save_schema)
+                elog_id = ObjectId()
+                elog_doc["_id"] = elog_id
+                elog_doc[wf_id_name] = wfid
+                pending_elog.append(elog_doc)
                 insertion_dict[elog_id_name] = elog_id
 
             # history attribute is redundant
             insertion_dict.pop("history", None)
-            # finally ready to insert the wf doc - keep the id as we'll need
-            # it for tagging any elog entries
-            wfid = wf_collection.insert_one(insertion_dict).inserted_id
+            insertion_dict["_id"] = wfid
+            pending_wf.setdefault(wf_collection_name, []).append(insertion_dict)
+            npending += 1
             # Put wfid into the object's meta as the new definition of
             # the parent of this waveform
             md["_id"] = wfid
 
-            # we may probably set the gridfs_id field in the mspass_object
-            if gridfs_id:
-                md["gridfs_id"] = gridfs_id
             # we may probably set the history_object_id field in the mspass_object
             if history_object_id:
                 md[history_obj_id_name] = history_object_id
@@ -1197,49 +1690,54 @@ def write_to_db(
             if elog_id:
                 md[elog_id_name] = elog_id
 
-            # Empty error logs are skipped.  When nonzero tag them with tid
-            # just returned
-            if md["history"].elog.size() > 0:
-                # elog_id_name = self.database_schema.default_name('elog') + '_id'
-                # _save_elog uses a  null id as a signal to add a new record
-                # When we land here the record must be new since it is
-                # associated with a new wf document.  elog_id=None is default
-                # but set it explicitly for clarity
-
-                # This is comment out becuase we need to save it before inserting into the wf_collection
-                # elog_id = self._save_elog(mspass_object, elog_id=None)
-
-                # cross reference for elog entry, assoicate the wfid to the elog entry
-                elog_col = db[db.database_schema.default_name("elog")]
-                wf_id_name = wf_collection_name + "_id"
-                filter_ = {"_id": insertion_dict[elog_id_name]}
-                elog_col.update_one(filter_, {"$set": {wf_id_name: md["_id"]}})
-            # When history is enable we need to do an update to put the
-            # wf collection id as a cross-reference.    Any value stored
-            # above with saave_history may be incorrect.  We use a
-            # stock test with the is_empty method for know if history data is present
-            if not md["history"].is_empty():
-                history_object_col = db[
-                    db.database_schema.default_name("history_object")
-                ]
-                wf_id_name = wf_collection_name + "_id"
-                filter_ = {"_id": history_object_id}
-                update_dict = {wf_id_name: wfid}
-                history_object_col.update_one(filter_, {"$set": update_dict})
-
         else:
             # We land here when the input is dead or was killed during a
             # cautious or pedantic mode edit of the metadata.
-            elog_id_name = db.database_schema.default_name("elog") + "_id"
             if elog_id_name in md:
-                old_elog_id = md[elog_id_name]
+                # appending to an existing elog document needs a read so
+                # this rare case is not batched
+                _save_elog(db, md, save_schema, elog_id=md[elog_id_name])
             else:
-                old_elog_id = None
-            elog_id = _save_elog(db, md, save_schema, elog_id=old_elog_id)
+                elog_doc = _elog_document(md, save_schema)
+                if elog_doc:
+                    pending_elog.append(elog_doc)
+                    npending += 1
         # Both live and dead data land here.
+        records.append(md.todict())
+
+        if npending >= batch_size:
+            _insert_pending(db, pending_wf, pending_elog, pending_history)
+            npending = 0
+
+    _insert_pending(db, pending_wf, pending_elog, pending_history)
+    return records
 
-    # convert list of metadata to dataframe
-    return pd.json_normalize(map(lambda cur: cur.todict(), md_list))
+
+def _insert_pending(db, pending_wf, pending_elog, pending_history):
+    """
+    Bulk insert and then clear the documents accumulated by
+    _write_metadata_records.   elog and history documents are inserted
+    before the wf documents that reference them.
+    """
+    if pending_elog:
+        db[db.database_schema.default_name("elog")].insert_many(
+            pending_elog, ordered=False
+        )
+        pending_elog.clear()
+    if pending_history:
+        try:
+            db[db.database_schema.default_name("history_object")].insert_many(
+                pending_history, ordered=False
+            )
+        except pymongo.errors.BulkWriteError as e:
+            raise MsPASSError(
+                "The history objects to be saved include a duplicate uuid", "Fatal"
+            ) from e
+        pending_history.clear()
+    for wf_collection_name, docs in pending_wf.items():
+        if docs:
+            db[wf_collection_name].insert_many(docs, ordered=False)
+    pending_wf.clear()
 
 
 def write_files(
@@ -1248,6 +1746,7 @@ def write_files(
     storage_mode="file",
     overwrite=False,
     gfsh=None,
+    sample_encoding=None,
 ):
     """
     This is the writer for writing the object to storage. Return type is the
@@ -1278,6 +1777,10 @@ def write_files(
     :type overwrite:  boolean
     :param gfsh: GridFS object
     :type gfsh: :class:`gridfs.GridFS`
+    :param sample_encoding: encoding of the sample data (see
+        :mod:`mspasspy.io.sample_codec`).  The encoding used is posted to
+        the Metadata as "sample_encoding".
+    :type sample_encoding: :class:`str`
 
     """
     if not isinstance(mspass_object, (TimeSeries, Seismogram)):
@@ -1299,6 +1802,7 @@ def write_files(
                 mspass_object["dir"],
                 mspass_object["dfile"],
                 format=format,
+                sample_encoding=sample_encoding,
             )
 
             mspass_object["foff"] = foff
@@ -1306,10 +1810,12 @@ def write_files(
         elif storage_mode == "gridfs":
             if overwrite and "gridfs_id" in mspass_object:
                 gridfs_id = _save_data_to_gridfs(
-                    gfsh, mspass_object, mspass_object["gridfs_id"]
+                    gfsh, mspass_object, mspass_object["gridfs_id"], sample_encoding
                 )
             else:
-                gridfs_id = _save_data_to_gridfs(gfsh, mspass_object)
+                gridfs_id = _save_data_to_gridfs(
+                    gfsh, mspass_object, sample_encoding=sample_encoding
+                )
             mspass_object["gridfs_id"] = gridfs_id
     else:
         mspass_object["is_dead"] = True
@@ -1323,7 +1829,7 @@ def write_files(
     return md
 
 
-def _save_data_to_gridfs(gfsh, mspass_object, gridfs_id=None):
+def _save_data_to_gridfs(gfsh, mspass_object, gridfs_id=None, sample_encoding=None):
     """
     Save a mspasspy object sample data to MongoDB grid file system. We recommend to use this method
     for saving a mspasspy object inside MongoDB. This is similar to database._save_data_to_gridfs(),
@@ -1336,11 +1842,18 @@ def _save_data_to_gridfs(gfsh, mspass_object, gridfs_id=None):
     :param gridfs_id: if the data is already stored and you want to update it, you should provide the object id
     of the previous data, which will be deleted. A new document will be inserted instead.
     :type gridfs_id: :class:`bson.objectid.ObjectId`.
+    :param sample_encoding: encoding of the sample data.  The encoding used is
+    posted to the Metadata of mspass_object as "sample_encoding".
+    :type sample_encoding: :class:`str`
     :return inserted gridfs object id.
     """
     if gridfs_id and gfsh.exists(gridfs_id):
         gfsh.delete(gridfs_id)
-    if isinstance(mspass_object, Seismogram):
+    mspass_object.erase("sample_encoding")
+    if sample_encoding:
+        ub, encoding = encode_samples(mspass_object, sample_encoding)
+        mspass_object["sample_encoding"] = encoding
+    elif isinstance(mspass_object, Seismogram):
         ub = bytes(np.array(mspass_object.data).transpose())
     else:
         ub = bytes(mspass_object.data)
@@ -1364,42 +1877,11 @@ def _save_elog(db, md, update_metadata_def, elog_id=None, collection=None):
     collection in the schema.
     :return: updated elog_id.
     """
-    wf_id_name = update_metadata_def.collection("_id") + "_id"
-
     if not collection:
         collection = db.database_schema.default_name("elog")
 
-    # TODO: Need to discuss whether the _id should be linked in a dead elog entry. It
-    # might be confusing to link the dead elog to an alive wf record.
-    oid = None
-    if "_id" in md:
-        oid = md["_id"]
-
-    elog = md["history"].elog
-    n = elog.size()
-    if n != 0:
-        logdata = []
-        docentry = {"logdata": logdata}
-        errs = elog.get_error_log()
-        jobid = elog.get_job_id()
-        for x in errs:
-            logdata.append(
-                {
-                    "job_id": jobid,
-                    "algorithm": x.algorithm,
-                    "badness": str(x.badness),
-                    "error_message": x.message,
-                    "process_id": x.p_id,
-                }
-            )
-        if oid:
-            docentry[wf_id_name] = oid
-
-        if md["is_dead"]:
-            # history attribute is redundant
-            md.erase("history")
-            docentry["tombstone"] = dict(md)
-
+    docentry = _elog_document(md, update_metadata_def)
+    if docentry:
         if elog_id:
             # append elog
             elog_doc = db[collection].find_one({"_id": elog_id})
@@ -1410,7 +1892,7 @@ def _save_elog(db, md, update_metadata_def, elog_id=None, collection=None):
                 # the order. May need some practice to see if such a behavior makes sense.
                 [
                     elog_doc["logdata"].append(x)
-                    for x in logdata
+                    for x in docentry["logdata"]
                     if x not in elog_doc["logdata"]
                 ]
                 docentry["logdata"] = elog_doc["logdata"]
@@ -1424,6 +1906,49 @@ def _save_elog(db, md, update_metadata_def, elog_id=None, collection=None):
         return ret_elog_id
 
 
+def _elog_document(md, update_metadata_def):
+    """
+    Build the elog document _save_elog would insert for a metadata object
+    without touching the database.   Returns None if the error log is empty.
+    Note that, as in _save_elog, the "history" key is erased from md when
+    md is marked dead.
+    """
+    wf_id_name = update_metadata_def.collection("_id") + "_id"
+
+    # TODO: Need to discuss whether the _id should be linked in a dead elog entry. It
+    # might be confusing to link the dead elog to an alive wf record.
+    oid = None
+    if "_id" in md:
+        oid = md["_id"]
+
+    elog = md["history"].elog
+    n = elog.size()
+    if n == 0:
+        return None
+    logdata = []
+    docentry = {"logdata": logdata}
+    errs = elog.get_error_log()
+    jobid = elog.get_job_id()
+    for x in errs:
+        logdata.append(
+            {
+                "job_id": jobid,
+                "algorithm": x.algorithm,
+                "badness": str(x.badness),
+                "error_message": x.message,
+                "process_id": x.p_id,
+            }
+        )
+    if oid:
+        docentry[wf_id_name] = oid
+
+    if md["is_dead"]:
+        # history attribute is redundant
+        md.erase("history")
+        docentry["tombstone"] = dict(md)
+    return docentry
+
+
 def _save_history(
     db,
     md,
@@ -1448,6 +1973,32 @@ def _save_history(
     collection in the schema.
     :return: current history_object_id.
     """
+    if not collection:
+        collection = db.database_schema.default_name("history_object")
+    history_col = db[collection]
+
+    insert_dict = _history_document(
+        md, update_metadata_def, atomic_type, alg_name, alg_id
+    )
+    # todo save jobname jobid when global history module is done
+    try:
+        # insert new one
+        history_col.insert_one(insert_dict)
+    except pymongo.errors.DuplicateKeyError as e:
+        raise MsPASSError(
+            "The history object to be saved has a duplicate uuid", "Fatal"
+        ) from e
+
+    return insert_dict["_id"]
+
+
+def _history_document(md, update_metadata_def, atomic_type, alg_name=None, alg_id=None):
+    """
+    Build the history document _save_history would insert for a metadata
+    object without touching the database.   As in _save_history the history
+    chain of md is cleared and reset to an origin with the id of the
+    returned document, so the document must be saved by the caller.
+    """
     # get the wf id name in the schema
     wf_id_name = update_metadata_def.collection("_id") + "_id"
 
@@ -1456,10 +2007,6 @@ def _save_history(
     if "_id" in md:
         oid = md["_id"]
 
-    if not collection:
-        collection = db.database_schema.default_name("history_object")
-    history_col = db[collection]
-
     proc_history = md["history"]
     current_uuid = proc_history.id()  # uuid in the current node
     current_nodedata = proc_history.current_nodedata()
@@ -1470,27 +2017,19 @@ def _save_history(
         alg_name = current_nodedata.algorithm
 
     history_binary = pickle.dumps(proc_history)
-    # todo save jobname jobid when global history module is done
-    try:
-        # construct the insert dict for saving into database
-        insert_dict = {
-            "_id": current_uuid,
-            "processing_history": history_binary,
-            "alg_id": alg_id,
-            "alg_name": alg_name,
-        }
-        if oid:
-            insert_dict[wf_id_name] = oid
-        # insert new one
-        history_col.insert_one(insert_dict)
-    except pymongo.errors.DuplicateKeyError as e:
-        raise MsPASSError(
-            "The history object to be saved has a duplicate uuid", "Fatal"
-        ) from e
+    # construct the insert dict for saving into database
+    insert_dict = {
+        "_id": current_uuid,
+        "processing_history": history_binary,
+        "alg_id": alg_id,
+        "alg_name": alg_name,
+    }
+    if oid:
+        insert_dict[wf_id_name] = oid
 
     # clear the history chain of the mspass object
     md["history"].clear_history()
     # set_as_origin with uuid set to the newly generated id
     md["history"].set_as_origin(alg_name, alg_id, current_uuid, atomic_type)
 
-    return current_uuid
+    return insert_dict
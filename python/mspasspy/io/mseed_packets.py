@@ -0,0 +1,151 @@
+"""
+Packet level index of miniseed data used for random access reads of
+short time windows from long segments.
+
+A wf_miniseed document created by Database.index_mseed_file defines a
+block of contiguous miniseed records (packets) by foff and nbytes.  The
+normal reader decodes the entire block even when only a short time
+window is needed (e.g. by TimeIntervalReader).  The functions here build
+a compact table of the start time and offset of every record in a
+block that index_mseed_file can save as "packet_index" and use that table
+to compute the byte range holding only the records that overlap a time
+window.   The table is a packed array of little endian pairs of a double
+(record start time, epoch seconds) and a uint32 (offset of the record
+relative to foff).
+"""
+import calendar
+import struct
+
+import numpy as np
+
+_PACKET_DTYPE = np.dtype([("time", "<f8"), ("offset", "<u4")])
+
+# offset of the BTIME start time in the miniseed fixed header and the
+# layout of the fields from there to the end of the 48 byte header
+_BTIME_OFFSET = 20
+_HEADER_FORMAT = "HHBBBBHHhhBBBBiHH"
+_HEADER_SIZE = 48
+
+
+def _record_time_and_length(buf, pos):
+    """
+    Decodes the fixed header of the miniseed record starting at pos of buf
+    and returns a tuple of the record start time (epoch seconds) and the
+    record length in bytes.   Raises a ValueError if the header is not
+    valid or the record length is not defined by a blockette 1000.
+    """
+    if pos + _HEADER_SIZE > len(buf):
+        raise ValueError("truncated miniseed record header")
+    # the byte order is not marked in the header.  Like libmseed we
+    # take the order that gives a sensible year and day of year.
+    for byteorder in (">", "<"):
+        year, doy = struct.unpack_from(byteorder + "HH", buf, pos + _BTIME_OFFSET)
+        if 1900 <= year <= 2100 and 1 <= doy <= 366:
+            break
+    else:
+        raise ValueError("cannot decode the start time of a miniseed record")
+    (
+        year,
+        doy,
+        hour,
+        minute,
+        second,
+        unused,
+        fract,
+        nsamp,
+        srfact,
+        srmult,
+        activity,
+        io_flags,
+        quality,
+        nblockettes,
+        time_correction,
+        data_offset,
+        blockette_offset,
+    ) = struct.unpack_from(byteorder + _HEADER_FORMAT, buf, pos + _BTIME_OFFSET)
+    t = (
+        calendar.timegm((year, 1, 1, hour, minute, second))
+        + 86400.0 * (doy - 1)
+        + 1.0e-4 * fract
+    )
+    # bit 1 of the activity flags means the correction was already applied
+    if not activity & 0x02:
+        t += 1.0e-4 * time_correction
+    reclen = None
+    next_offset = blockette_offset
+    for i in range(nblockettes):
+        if next_offset == 0 or pos + next_offset + 4 > len(buf):
+            break
+        btype, following = struct.unpack_from(byteorder + "HH", buf, pos + next_offset)
+        if btype == 1000:
+            reclen = 2 ** buf[pos + next_offset + 6]
+        elif btype == 1001:
+            (microsec,) = struct.unpack_from("b", buf, pos + next_offset + 5)
+            t += 1.0e-6 * microsec
+        next_offset = following
+    if reclen is None:
+        raise ValueError("miniseed record has no blockette 1000")
+    return t, reclen
+
+
+def build_packet_index(fname, foff, nbytes):
+    """
+    Scans the miniseed records of the block of nbytes at offset foff of
+    the file fname and returns the packet index table of the block as
+    bytes.  Returns None if the block cannot be indexed:  records without
+    a blockette 1000, blocks larger than 4 GB, or records that are not in
+    time order (e.g. a backward time tear).  The reader then falls back
+    to reading the whole block.
+    """
+    if nbytes <= 0 or nbytes >= 2**32:
+        return None
+    with open(fname, mode="rb") as fh:
+        fh.seek(foff)
+        buf = fh.read(nbytes)
+    times = []
+    offsets = []
+    pos = 0
+    try:
+        while pos < len(buf):
+            t, reclen = _record_time_and_length(buf, pos)
+            times.append(t)
+            offsets.append(pos)
+            pos += reclen
+    except ValueError:
+        return None
+    table = np.empty(len(times), dtype=_PACKET_DTYPE)
+    table["time"] = times
+    table["offset"] = offsets
+    if len(table) > 1 and np.any(np.diff(table["time"]) < 0.0):
+        return None
+    return table.tobytes()
+
+
+def packet_range(packet_index, nbytes, starttime, endtime):
+    """
+    Returns the byte range of the records of a block that overlap the time
+    interval starttime to endtime as a tuple of the offset relative to the
+    start of the block (foff) and the number of bytes.
+
+    :param packet_index:  packet index table of the block as returned by
+      build_packet_index.
+    :param nbytes:  size of the block in bytes.
+    :param starttime:  start of the time window (epoch seconds).
+    :param endtime:  end of the time window (epoch seconds).
+    """
+    table = np.frombuffer(packet_index, dtype=_PACKET_DTYPE)
+    if len(table) == 0:
+        return 0, nbytes
+    times = table["time"]
+    # the record containing starttime is the last one starting before it
+    first = max(np.searchsorted(times, starttime, side="right") - 1, 0)
+    last = np.searchsorted(times, endtime, side="right")
+    if last <= first:
+        # window before the first record:  read the first one
+        last = first + 1
+    offset = int(table["offset"][first])
+    if last >= len(table):
+        end = nbytes
+    else:
+        end = int(table["offset"][last])
+    return offset, end - offset
@@ -0,0 +1,287 @@
+"""
+Encoders and decoders for the sample data of TimeSeries and Seismogram
+objects saved by Database.save_data, Database.save_ensemble_data_binary_file,
+and write_distributed_data.
+
+The default storage of sample data in MsPASS is a raw dump of the 8 byte
+doubles in memory.  That is the fastest to read and write but many data
+sets do not need that precision and most raw data compress well.  The
+functions in this module implement the alternative sample encodings
+that can be selected with the sample_encoding argument of the writers:
+
+  float64 - the default raw doubles.  Data saved this way have no
+      sample_encoding attribute in their wf document.
+  float32 - samples are cast to 4 byte floats.   This halves the storage
+      size and is lossy (about 7 significant digits are preserved).
+      Appropriate for most processed data.
+  shuffle_zlib - lossless.  The bytes of the doubles are transposed
+      (byte-shuffled) so the slowly varying exponent bytes of all samples
+      are adjacent and the result is compressed with zlib.
+  shuffle_zstd - same as shuffle_zlib but compressed with zstandard.
+      Faster to write and read than zlib.   Requires the optional
+      zstandard package.
+  delta_zlib - lossless for integer valued samples (e.g. raw counts
+      converted from miniseed).  First differences of each component are
+      stored as byte-shuffled 4 byte integers compressed with zlib.  Data
+      that are not integer valued or with differences that do not fit in
+      4 bytes are saved with shuffle_zlib instead.
+
+Every encoded datum is written as one contiguous chunk and the writers
+record the encoding actually used in the wf document as
+"sample_encoding" and the chunk size in bytes as "nbytes".  The readers
+use those two attributes to decode the data transparently.  Seismogram
+samples are encoded in the same order used for raw storage
+(three components of each sample adjacent).
+"""
+import os
+import zlib
+
+import numpy as np
+
+try:
+    import zstandard
+
+    _mspasspy_has_zstandard = True
+except ImportError:
+    _mspasspy_has_zstandard = False
+
+from mspasspy.ccore.utility import MsPASSError, ErrorSeverity
+from mspasspy.ccore.seismic import TimeSeries, Seismogram
+
+SAMPLE_ENCODINGS = ("float64", "float32", "shuffle_zlib", "shuffle_zstd", "delta_zlib")
+
+# zlib level 1 is several times faster than the default of 6 and the
+# difference in size is small for shuffled sample data
+_ZLIB_LEVEL = 1
+_ZSTD_LEVEL = 3
+
+
+def _check_encoding(encoding, caller):
+    if encoding not in SAMPLE_ENCODINGS:
+        raise MsPASSError(
+            caller
+            + ":  unknown sample_encoding="
+            + str(encoding)
+            + ".  Must be one of "
+            + str(SAMPLE_ENCODINGS),
+            ErrorSeverity.Fatal,
+        )
+    if encoding == "shuffle_zstd" and not _mspasspy_has_zstandard:
+        raise MsPASSError(
+            caller + ":  sample_encoding=shuffle_zstd requires the zstandard package",
+            ErrorSeverity.Fatal,
+        )
+
+
+def _storage_order_samples(mspass_object):
+    """
+    Returns a 1d float64 array of the samples of mspass_object in the order
+    used for raw storage and the number of components.   No copy is made
+    when the data are contiguous.
+    """
+    if isinstance(mspass_object, TimeSeries):
+        return np.asarray(mspass_object.data), 1
+    elif isinstance(mspass_object, Seismogram):
+        # dmatrix is stored in column order so this is a flat view
+        return np.asarray(mspass_object.data).ravel(order="F"), 3
+    else:
+        raise TypeError("only TimeSeries and Seismogram are supported")
+
+
+def _shuffle(values):
+    nbytes = values.dtype.itemsize
+    return values.view(np.uint8).reshape((len(values), nbytes)).T.tobytes()
+
+
+def _unshuffle(buf, dtype):
+    dtype = np.dtype(dtype)
+    b = np.frombuffer(buf, dtype=np.uint8).reshape((dtype.itemsize, -1))
+    return np.ascontiguousarray(b.T).view(dtype).ravel()
+
+
+def _compress(buf, encoding):
+    if encoding == "shuffle_zstd":
+        return zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(buf)
+    return zlib.compress(buf, _ZLIB_LEVEL)
+
+
+def _decompress(buf, encoding):
+    if encoding == "shuffle_zstd":
+        return zstandard.ZstdDecompressor().decompress(buf)
+    return zlib.decompress(buf)
+
+
+def _delta_encode(values, ncomponents):
+    """
+    Returns the int32 first differences of each component of values or
+    None if values cannot be represented that way without loss.
+    """
+    if not np.all(np.isfinite(values)):
+        return None
+    ivalues = values.astype(np.int64)
+    if not np.array_equal(ivalues, values):
+        return None
+    ivalues = ivalues.reshape((-1, ncomponents))
+    diffs = np.diff(ivalues, axis=0, prepend=np.zeros((1, ncomponents), np.int64))
+    if len(diffs) > 0 and (
+        diffs.max() > np.iinfo(np.int32).max or diffs.min() < np.iinfo(np.int32).min
+    ):
+        return None
+    return diffs.astype(np.int32).ravel()
+
+
+def encode_samples(mspass_object, encoding):
+    """
+    Encodes the sample data of an atomic data object.
+
+    :param mspass_object:  datum to be encoded
+    :type mspass_object:  TimeSeries or Seismogram
+    :param encoding:  one of the names in SAMPLE_ENCODINGS
+    :return:  tuple of the encoded bytes and the name of the encoding used.
+      The encoding returned differs from the one requested only for
+      delta_zlib with data that cannot be delta encoded without loss.
+    """
+    _check_encoding(encoding, "encode_samples")
+    values, ncomponents = _storage_order_samples(mspass_object)
+    if encoding == "float64":
+        return values.tobytes(), encoding
+    elif encoding == "float32":
+        return values.astype(np.float32).tobytes(), encoding
+    elif encoding == "delta_zlib":
+        diffs = _delta_encode(values, ncomponents)
+        if diffs is not None:
+            return _compress(_shuffle(diffs), encoding), encoding
+        encoding = "shuffle_zlib"
+    return _compress(_shuffle(values), encoding), encoding
+
+
+def decode_samples(mspass_object, buf, encoding):
+    """
+    Decodes a chunk created by encode_samples and loads the result into
+    the sample data of mspass_object.  As for the other sample data readers
+    mspass_object must be constructed with npts set so the data buffer
+    is allocated.
+
+    :param mspass_object:  datum whose sample data are to be loaded.
+    :type mspass_object:  TimeSeries or Seismogram
+    :param buf:  encoded data
+    :type buf:  bytes or any object supporting the buffer protocol.
+    :param encoding:  encoding of buf (the sample_encoding attribute
+      saved with the datum)
+    :exception:  raises a MsPASSError if the number of decoded samples
+      does not match npts.
+    """
+    _check_encoding(encoding, "decode_samples")
+    if isinstance(mspass_object, TimeSeries):
+        ncomponents = 1
+    elif isinstance(mspass_object, Seismogram):
+        ncomponents = 3
+    else:
+        raise TypeError("only TimeSeries and Seismogram are supported")
+    if encoding == "float64":
+        values = np.frombuffer(buf, dtype=np.float64)
+    elif encoding == "float32":
+        values = np.frombuffer(buf, dtype=np.float32)
+    elif encoding == "delta_zlib":
+        diffs = _unshuffle(_decompress(buf, encoding), np.int32)
+        values = np.cumsum(
+            diffs.reshape((-1, ncomponents)), axis=0, dtype=np.int64
+        ).ravel()
+    else:
+        values = _unshuffle(_decompress(buf, encoding), np.float64)
+    npts = mspass_object.npts
+    if len(values) != ncomponents * npts:
+        raise MsPASSError(
+            "decode_samples:  decoded {} values from data with sample_encoding={} but expected {}".format(
+                len(values), encoding, ncomponents * npts
+            ),
+            ErrorSeverity.Invalid,
+        )
+    if ncomponents == 1:
+        np.asarray(mspass_object.data)[:] = values
+    else:
+        np.asarray(mspass_object.data)[:, :] = values.reshape((npts, 3)).T
+
+
+def write_samples(mspass_object, dir, dfile, encoding):
+    """
+    Encodes the sample data of mspass_object and appends the result to
+    the file dir/dfile.   The directory is created if it does not exist.
+
+    :return:  tuple (foff, nbytes, encoding) of the offset of the chunk
+      in the file, its size, and the encoding used (see encode_samples).
+    """
+    buf, encoding = encode_samples(mspass_object, encoding)
+    if dir:
+        os.makedirs(dir, exist_ok=True)
+        fname = os.path.join(dir, dfile)
+    else:
+        fname = dfile
+    with open(fname, mode="ab") as fh:
+        foff = fh.seek(0, 2)
+        fh.write(buf)
+    return foff, len(buf), encoding
+
+
+def write_ensemble_samples(ensemble, dir, dfile, encoding):
+    """
+    Encodes the sample data of all the live members of an ensemble and
+    appends them to the file dir/dfile opened once.   This is the
+    encoded equivalent of the ensemble overloads of _fwrite_to_file:
+    dir, dfile, and foff are posted to the Metadata of each member
+    written along with the chunk size as nbytes and the encoding used
+    as sample_encoding.
+
+    :return:  list of foff values parallel to the ensemble members with
+      0 as a place holder for dead members.
+    """
+    if dir:
+        os.makedirs(dir, exist_ok=True)
+        fname = os.path.join(dir, dfile)
+    else:
+        fname = dfile
+    foffs = []
+    with open(fname, mode="ab") as fh:
+        foff = fh.seek(0, 2)
+        for d in ensemble.member:
+            if d.dead():
+                foffs.append(0)
+                continue
+            buf, used = encode_samples(d, encoding)
+            fh.write(buf)
+            foffs.append(foff)
+            d["dir"] = dir
+            d["dfile"] = dfile
+            d["foff"] = foff
+            d["nbytes"] = len(buf)
+            d["sample_encoding"] = used
+            foff += len(buf)
+    return foffs
+
+
+def read_samples(mspass_object, dir, dfile, foff, nbytes, encoding, mmap_reader=None):
+    """
+    Reads a chunk of nbytes at offset foff of the file dir/dfile written
+    by write_samples and loads the decoded samples into mspass_object.
+
+    :param mmap_reader:  optional DfileMmapReader.  When given the chunk is
+      read from the memory mapping of the file kept by the reader instead
+      of opening the file.
+    """
+    foff = int(foff)
+    nbytes = int(nbytes)
+    if mmap_reader is not None:
+        buf = mmap_reader._buffer(dir, dfile, foff + nbytes)[foff : foff + nbytes]
+    else:
+        fname = os.path.join(dir, dfile) if dir else dfile
+        with open(fname, mode="rb") as fh:
+            fh.seek(foff)
+            buf = fh.read(nbytes)
+    if len(buf) != nbytes:
+        raise MsPASSError(
+            "read_samples:  file {} ended before the {} bytes of data at offset {}".format(
+                os.path.join(dir, dfile) if dir else dfile, nbytes, foff
+            ),
+            ErrorSeverity.Invalid,
+        )
+    decode_samples(mspass_object, buf, encoding)
@@ -6,8 +6,10 @@ try:
     import pyspark
 except ImportError:
     pass
+from functools import partial
+
 from mspasspy.util.decorators import mspass_reduce_func_wrapper
-from mspasspy.util.converter import list2Ensemble
+from mspasspy.ccore.utility import MsPASSError, ErrorSeverity
 from mspasspy.ccore.seismic import (
     Seismogram,
     TimeSeries,
@@ -43,7 +45,127 @@ def stack(data1, data2, object_history=False, alg_id=None, alg_name=None, dryrun
     return data1
 
 
-def mspass_spark_foldby(self, key="site_id"):
+class _EnsembleFold:
+    """
+    Private class used as the accumulator of the foldby functions.
+    Data are appended directly to ensembles so the cost of adding
+    a datum does not depend on the size of the group.  That contrasts
+    with the concatenation of python lists this replaced that made the
+    cost of building a group grow with the square of its size.
+    When max_members or max_bytes are defined a new ensemble is
+    started when appending a datum would make the current one exceed
+    a limit.  An oversized group is then spilled into several ensembles.
+    """
+
+    def __init__(self, max_members=None, max_bytes=None):
+        self.max_members = max_members
+        self.max_bytes = max_bytes
+        self.ensembles = []
+        self.nbytes = []
+
+    def _fits(self, nmembers, nbytes):
+        """
+        Returns True if nmembers data with nbytes of sample data can be
+        added to the last ensemble without exceeding a limit.
+        """
+        last = self.ensembles[-1]
+        if (
+            self.max_members is not None
+            and len(last.member) + nmembers > self.max_members
+        ):
+            return False
+        # an ensemble always holds at least one datum
+        if self.max_bytes is not None and len(last.member) > 0:
+            return self.nbytes[-1] + nbytes <= self.max_bytes
+        return True
+
+    def add(self, d):
+        """
+        Appends the atomic datum d to the last ensemble starting a new
+        one if it is full.  Returns self to allow use as a fold function.
+        """
+        nbytes = _sample_bytes(d)
+        if len(self.ensembles) == 0 or not self._fits(1, nbytes):
+            if isinstance(d, TimeSeries):
+                self.ensembles.append(TimeSeriesEnsemble())
+            elif isinstance(d, Seismogram):
+                self.ensembles.append(SeismogramEnsemble())
+            else:
+                raise MsPASSError(
+                    "mspass_foldby:  data must be TimeSeries or Seismogram objects but '{}' was received".format(
+                        type(d)
+                    ),
+                    ErrorSeverity.Fatal,
+                )
+            self.nbytes.append(0)
+        self.ensembles[-1].member.append(d)
+        self.nbytes[-1] += nbytes
+        return self
+
+    def merge(self, other):
+        """
+        Moves the content of the _EnsembleFold other into self.  The
+        members of the smaller of two ensembles that fit within the
+        limits are appended to the larger one.  Others are kept as
+        separate ensembles.  Returns self.
+        """
+        for ens, nbytes in zip(other.ensembles, other.nbytes):
+            if len(self.ensembles) > 0 and self._fits(len(ens.member), nbytes):
+                if len(ens.member) > len(self.ensembles[-1].member):
+                    ens.member.extend(self.ensembles[-1].member)
+                    self.ensembles[-1] = ens
+                else:
+                    self.ensembles[-1].member.extend(ens.member)
+                self.nbytes[-1] += nbytes
+            else:
+                self.ensembles.append(ens)
+                self.nbytes.append(nbytes)
+        return self
+
+    def output(self, sort_key=None):
+        """
+        Returns the list of ensembles with the ensemble Metadata copied
+        from the first member as done by list2Ensemble.  When sort_key
+        is defined the members of each ensemble are sorted by it.  It can
+        be a Metadata key (members without it are put last) or a function
+        returning the value to sort by from a member.
+        """
+        for ens in self.ensembles:
+            if sort_key is not None:
+                _sort_members(ens, sort_key)
+            ens.update_metadata(ens.member[0])
+        return self.ensembles
+
+
+def _sample_bytes(d):
+    if isinstance(d, Seismogram):
+        return 24 * d.npts
+    return 8 * d.npts
+
+
+def _sort_members(ens, sort_key):
+    if callable(sort_key):
+        values = [sort_key(d) for d in ens.member]
+    else:
+        values = [
+            (0, d[sort_key]) if d.is_defined(sort_key) else (1, 0) for d in ens.member
+        ]
+    order = sorted(range(len(values)), key=values.__getitem__)
+    if order != list(range(len(values))):
+        ens.member = type(ens.member)([ens.member[i] for i in order])
+
+
+def _fold_add(fold, d):
+    return fold.add(d)
+
+
+def _fold_merge(fold1, fold2):
+    return fold1.merge(fold2)
+
+
+def mspass_spark_foldby(
+    self, key="site_id", sort_key=None, max_members=None, max_bytes=None
+):
     """
     This function implements a convenient foldby method for a spark RDD to generate ensembles from atomic data.
     The concept is to assemble ensembles of :class:`mspasspy.ccore.seismic.TimeSeries` or
@@ -53,7 +175,11 @@ def mspass_spark_foldby(self, key="site_id"):
     acts a bit like a reduce operator BUT the data volume is not reduced;  we just bundle groups of
     related data into ensembles.   The outputs are always larger due to the overhead of the ensemble
     container.   That is important as be careful with this operator as it can easily create huge
-    ensembles that could cause a memory fault in your workflow.
+    ensembles that could cause a memory fault in your workflow.  Use max_members or max_bytes
+    to limit the size of the ensembles.
+
+    Data are appended directly to the ensembles with combineByKey so the cost of building an
+    ensemble grows linearly with its size.
 
     Note that because this is implemented as a method of the RDD class the usage is a different from
     the map and reduce methods.  arg0 is "self" which means it must be defined by the input RDD.
@@ -64,20 +190,29 @@ def mspass_spark_foldby(self, key="site_id"):
       mydata = mspass_spark_foldby(mydata,key="source_id")
 
     :param key: The key that defines the gather. By default, it will use "site_id" to produce a common station gather.
+    :param sort_key: when defined the members of each ensemble are sorted by this Metadata key (members
+      without it are put last) or by the value returned by this function of a member.  Default is None
+      which leaves the members in an undefined order.
+    :param max_members: maximum number of members of an ensemble.  A group with more data is spilled
+      into several ensembles with the same value of key.  Default is None meaning no limit.
+    :param max_bytes: maximum size of the sample data of an ensemble in bytes.  A group with more data
+      is spilled into several ensembles as for max_members.  Default is None meaning no limit.
     :return: :class:`pyspark.RDD` of :class:`mspasspy.ccore.seismic.TimeSeriesEnsemble` or :class:`mspasspy.ccore.seismic.SeismogramEnsemble`.
     """
     return (
         self.map(lambda x: (x[key], x))
-        .foldByKey(
-            [],
-            lambda x, y: (x if isinstance(x, list) else [x])
-            + (y if isinstance(y, list) else [y]),
+        .combineByKey(
+            lambda x: _EnsembleFold(max_members, max_bytes).add(x),
+            _fold_add,
+            _fold_merge,
         )
-        .map(lambda x: list2Ensemble(x[1]))
+        .flatMap(lambda x: x[1].output(sort_key))
     )
 
 
-def mspass_dask_foldby(self, key="site_id"):
+def mspass_dask_foldby(
+    self, key="site_id", sort_key=None, max_members=None, max_bytes=None
+):
     """
     This function implements a convenient foldby method for a dask bag to generate ensembles from atomic data.
     The concept is to assemble ensembles of :class:`mspasspy.ccore.seismic.TimeSeries` or
@@ -87,7 +222,11 @@ def mspass_dask_foldby(self, key="site_id"):
     acts a bit like a reduce operator BUT the data volume is not reduced;  we just bundle groups of
     related data into ensembles.   The outputs are always larger due to the overhead of the ensemble
     container.   That is important as be careful with this operator as it can easily create huge
-    ensembles that could cause a memory fault in your workflow.
+    ensembles that could cause a memory fault in your workflow.  Use max_members or max_bytes
+    to limit the size of the ensembles.
+
+    Data are appended directly to the ensembles in the fold so the cost of building an ensemble
+    grows linearly with its size.
 
     Note that because this is implemented as a method of the bag class the usage is a different from
     the map and reduce methods.  arg0 is "self" which means it must be defined by the input bag.
@@ -98,13 +237,25 @@ def mspass_dask_foldby(self, key="site_id"):
       mydata = mspass_dask_foldby(mydata,key="source_id")
 
     :param key: The key that defines the gather. By default, it will use "site_id" to produce a common station gather.
+    :param sort_key: when defined the members of each ensemble are sorted by this Metadata key (members
+      without it are put last) or by the value returned by this function of a member.  Default is None
+      which leaves the members in an undefined order.
+    :param max_members: maximum number of members of an ensemble.  A group with more data is spilled
+      into several ensembles with the same value of key.  Default is None meaning no limit.
+    :param max_bytes: maximum size of the sample data of an ensemble in bytes.  A group with more data
+      is spilled into several ensembles as for max_members.  Default is None meaning no limit.
     :return: :class:`dask.bag.Bag` of :class:`mspasspy.ccore.seismic.TimeSeriesEnsemble` or :class:`mspasspy.ccore.seismic.SeismogramEnsemble`.
     """
-    return self.foldby(
-        lambda x: x[key],
-        lambda x, y: (x if isinstance(x, list) else [x])
-        + (y if isinstance(y, list) else [y]),
-    ).map(lambda x: list2Ensemble(x[1]))
+    return (
+        self.foldby(
+            lambda x: x[key],
+            _fold_add,
+            initial=partial(_EnsembleFold, max_members, max_bytes),
+            combine=_fold_merge,
+        )
+        .map(lambda x: x[1].output(sort_key))
+        .flatten()
+    )
 
 
 try:
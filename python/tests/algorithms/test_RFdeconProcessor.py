@@ -15,7 +15,13 @@ from helper import (
     get_live_seismogram_ensemble,
 )
 from mspasspy.algorithms.window import WindowData
-from mspasspy.algorithms.RFdeconProcessor import RFdeconProcessor, RFdecon
+from mspasspy.algorithms.RFdeconProcessor import (
+    RFdeconProcessor,
+    RFdecon,
+    _get_processor,
+)
+from mspasspy.ccore.seismic import Seismogram
+from mspasspy.ccore.algorithms.deconvolution import shared_fft_wavetable_count
 
 
 def test_RFdeconProcessor():
@@ -76,3 +82,47 @@ def test_RFdecon():
 
     for k in range(3):
         assert all(abs(a - b) < 1e-6 for a, b in zip(result1.data[k], result2.data[k]))
+
+
+def test_RFdecon_processor_reuse():
+    seis = get_live_seismogram(71, 2.0)
+    seis.t0 = -5
+
+    # default processors are cached per thread by alg and pf
+    p1 = _get_processor("LeastSquares", "RFdeconProcessor.pf")
+    p2 = _get_processor("LeastSquares", "RFdeconProcessor.pf")
+    assert p1 is p2
+    assert _get_processor("WaterLevel", "RFdeconProcessor.pf") is not p1
+
+    result1 = RFdecon(Seismogram(seis))
+    # repeated calls reuse the cached operator and give the same answer
+    result2 = RFdecon(Seismogram(seis))
+    processor = RFdeconProcessor()
+    result3 = RFdecon(Seismogram(seis), processor=processor)
+    # an explicit processor keeps the state of the last call and
+    # survives serialization
+    processor_copy = pickle.loads(pickle.dumps(processor))
+    result4 = RFdecon(Seismogram(seis), processor=processor_copy)
+    for result in [result1, result2, result3, result4]:
+        assert result.live
+        assert result.npts == result1.npts
+    for k in range(3):
+        for result in [result2, result3, result4]:
+            assert np.allclose(result1.data[k], result.data[k], atol=1e-6)
+
+
+def test_shared_fft_wavetable():
+    seis = get_live_seismogram(71, 2.0)
+    seis.t0 = -5
+    result1 = RFdecon(Seismogram(seis), processor=RFdeconProcessor())
+    n = shared_fft_wavetable_count()
+    assert n >= 1
+    # operators with the same fft length share one wavetable
+    results = [
+        RFdecon(Seismogram(seis), processor=RFdeconProcessor()) for i in range(3)
+    ]
+    assert shared_fft_wavetable_count() == n
+    for result in results:
+        assert result.live
+        for k in range(3):
+            assert np.allclose(result1.data[k], result.data[k], atol=1e-6)
@@ -5,8 +5,10 @@ from mspasspy.ccore.seismic import (
     Seismogram,
     SlownessVector,
     SeismogramEnsemble,
+    TimeSeriesEnsemble,
     DoubleVector,
 )
+from mspasspy.ccore.algorithms.basic import Butterworth
 from mspasspy.ccore.utility import SphericalCoordinate
 from mspasspy.algorithms.basic import (
     ExtractComponent,
@@ -21,7 +23,13 @@ from mspasspy.algorithms.basic import (
 # module to test
 sys.path.append("python/tests")
 
-from helper import get_live_seismogram, get_live_timeseries, get_sin_timeseries
+from helper import (
+    get_live_seismogram,
+    get_live_timeseries,
+    get_sin_timeseries,
+    get_live_timeseries_ensemble,
+    get_live_seismogram_ensemble,
+)
 
 
 def test_ExtractComponent():
@@ -175,3 +183,29 @@ def test_transform():
     # test with invalid uvec, but inplace return
     seis4 = free_surface_transformation(seis2, SlownessVector(1.0, 1.0, 0.0), 5.0, 3.5)
     assert seis4
+
+
+def test_Butterworth_ensemble():
+    for zerophase in [False, True]:
+        bwfilter = Butterworth(zerophase, True, True, 2, 0.5, 2, 5.0, 0.05)
+        tse = get_live_timeseries_ensemble(5)
+        # one member with a different sample interval and one dead member
+        tse.member[1].dt = 0.025
+        tse.member[3].kill()
+        expected = TimeSeriesEnsemble(tse)
+        for d in expected.member:
+            if d.live:
+                Butterworth(bwfilter).apply(d)
+        bwfilter.apply(tse, nthreads=3)
+        # the operator is not altered by the ensemble method
+        assert bwfilter.dt() == 0.05
+        for d, x in zip(tse.member, expected.member):
+            assert np.allclose(d.data, x.data)
+
+        seis_e = get_live_seismogram_ensemble(4)
+        expected = SeismogramEnsemble(seis_e)
+        for d in expected.member:
+            Butterworth(bwfilter).apply(d)
+        bwfilter.apply(seis_e)
+        for d, x in zip(seis_e.member, expected.member):
+            assert np.allclose(d.data, x.data)
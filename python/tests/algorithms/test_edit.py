@@ -1,4 +1,5 @@
 import numpy as np
+import pandas as pd
 from mspasspy.ccore.seismic import TimeSeries, TimeSeriesEnsemble
 from mspasspy.algorithms.edit import (
     MetadataGT,
@@ -492,3 +493,90 @@ def test_edit():
     opchain = MetadataOperatorChain(oplist)
     enscpy = opchain.apply(enscpy)
     assert np.isclose(enscpy["lhs"], (4 * 7.5) / 3)
+
+
+def test_edit_compiled():
+    # members with a mix of values, a missing key, and a string key
+    values = [0, 1, 2, 3, 4, 5, 2.5, None]
+    ens = TimeSeriesEnsemble(len(values))
+    for i, v in enumerate(values):
+        d = TimeSeries(10)
+        d.set_live()
+        if v is not None:
+            d["a"] = v
+        d["b"] = "y" if i % 2 else "x"
+        ens.member.append(d)
+    ens.set_live()
+
+    testers = [
+        MetadataGT("a", 2),
+        MetadataGE("a", 2),
+        MetadataLT("a", 2),
+        MetadataLE("a", 2),
+        MetadataEQ("a", 2),
+        MetadataNE("a", 2),
+        MetadataNE("b", "y"),
+        MetadataDefined("a"),
+        MetadataUndefined("a"),
+        MetadataInterval("a", 1, 4),
+        MetadataInterval("a", 1, 4, use_lower_edge=False, kill_if_outside=False),
+        FiringSquad([MetadataGT("a", 3), MetadataEQ("b", "x")]),
+    ]
+    records = [{k: d[k] for k in ["a", "b"] if d.is_defined(k)} for d in ens.member]
+    df = pd.DataFrame(records)
+    for tester in testers:
+        # kill_if_true applied to each member is the reference
+        expected = []
+        for d in ens.member:
+            x = TimeSeries(d)
+            tester.kill_if_true(x)
+            expected.append(x.dead())
+        mask = tester.kill_mask(df)
+        assert list(mask) == expected
+        # the vectorized ensemble edit gives the same answer
+        enscpy = TimeSeriesEnsemble(ens)
+        enscpy = tester.kill_if_true(enscpy, apply_to_members=True)
+        assert [d.dead() for d in enscpy.member] == expected
+
+    assert MetadataGT("a", 2).kill_query() == {"a": {"$gt": 2}}
+    assert MetadataGT("a", 2).keep_query() == {"$nor": [{"a": {"$gt": 2}}]}
+    assert MetadataInterval("a", 1, 4).kill_query() == {
+        "$or": [{"a": {"$lt": 1}}, {"a": {"$gt": 4}}]
+    }
+    assert MetadataInterval("a", 1, 4, kill_if_outside=False).kill_query() == {
+        "a": {"$gte": 1, "$lte": 4}
+    }
+    fstest = FiringSquad([MetadataGT("a", 3), MetadataUndefined("b")])
+    assert fstest.kill_query() == {
+        "$or": [{"a": {"$gt": 3}}, {"b": {"$exists": False}}]
+    }
+    assert fstest.metadata_keys() == ["a", "b"]
+
+    # NaN is a value kill_if_true treats as defined - the vectorized
+    # ensemble edit must agree with it
+    ens = TimeSeriesEnsemble(3)
+    for v in [np.nan, 1.0, None]:
+        d = TimeSeries(10)
+        d.set_live()
+        if v is not None:
+            d["a"] = v
+        ens.member.append(d)
+    ens.set_live()
+    for tester in [
+        MetadataDefined("a"),
+        MetadataUndefined("a"),
+        MetadataGT("a", 0),
+        MetadataNE("a", 1.0),
+        MetadataInterval("a", 0, 2),
+    ]:
+        expected = []
+        for d in ens.member:
+            x = TimeSeries(d)
+            tester.kill_if_true(x)
+            expected.append(x.dead())
+        enscpy = TimeSeriesEnsemble(ens)
+        enscpy = tester.kill_if_true(enscpy, apply_to_members=True)
+        assert [d.dead() for d in enscpy.member] == expected
+    enscpy = TimeSeriesEnsemble(ens)
+    MetadataDefined("a").kill_if_true(enscpy, apply_to_members=True)
+    assert [d.dead() for d in enscpy.member] == [True, True, False]
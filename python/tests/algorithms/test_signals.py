@@ -62,6 +62,38 @@ def test_filter():
     assert not all(abs(a - b) < 0.001 for a, b in zip(ts.data, copy))
 
 
+def test_filter_native():
+    # types computed without obspy conversion must match obspy
+    for type, options in [
+        ("bandpass", {"freqmin": 1, "freqmax": 5}),
+        ("bandstop", {"freqmin": 1, "freqmax": 5, "corners": 2}),
+        ("lowpass", {"freq": 1, "zerophase": True}),
+        ("highpass", {"freq": 1}),
+    ]:
+        seis = get_live_seismogram()
+        st = seis.toStream()
+        st.filter(type, **options)
+        filter(seis, type, **options)
+        for k in range(3):
+            assert np.allclose(seis.data[k], st[k].data, atol=1e-6)
+
+    tse = get_live_timeseries_ensemble(3)
+    expected = []
+    for ts in tse.member:
+        tr = ts.toTrace()
+        tr.filter("bandpass", freqmin=1, freqmax=5, zerophase=True)
+        expected.append(tr.data)
+    filter(tse, "bandpass", freqmin=1, freqmax=5, zerophase=True)
+    for ts, x in zip(tse.member, expected):
+        assert np.allclose(ts.data, x, atol=1e-6)
+
+    # a corner above Nyquist kills the datum and logs the error
+    ts = get_live_timeseries()
+    filter(ts, "highpass", freq=15)
+    assert ts.dead()
+    assert ts.elog.size() == 1
+
+
 def test_detrend():
     ts = get_live_timeseries()
     seis = get_live_seismogram()
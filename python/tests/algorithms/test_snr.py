@@ -7,6 +7,8 @@ from mspasspy.algorithms.snr import (
     arrival_snr,
     broadband_snr_QC,
     save_snr_arrival,
+    _get_spectrum_engine,
+    _SPECTRUM_ENGINE_CACHE_SIZE,
 )
 from mspasspy.db.client import DBClient
 from mspasspy.db.database import Database
@@ -274,3 +276,22 @@ def test_snr():
         update_id=idout,
     )
     assert idout2 == idout
+
+
+def test_spectrum_engine_cache():
+    e1 = _get_spectrum_engine(1000, 4.0, 6, 2000, 0.01)
+    assert e1.taper_length() == 1000
+    assert e1.nfft() == 2000
+    # same window parameters return the cached engine
+    assert _get_spectrum_engine(1000, 4.0, 6, 2000, 0.01) is e1
+    # a different sample interval reuses the tapers but resets df
+    e2 = _get_spectrum_engine(1000, 4.0, 6, 2000, 0.02)
+    assert e2 is e1
+    assert np.isclose(e2.df(), 1.0 / (2.0 * 0.02 * (e2.nf() - 1)))
+    e3 = _get_spectrum_engine(500, 4.0, 6, 1000, 0.01)
+    assert e3 is not e1
+    assert e3.taper_length() == 500
+    # least recently used engines are evicted
+    for npts in range(100, 100 + _SPECTRUM_ENGINE_CACHE_SIZE):
+        _get_spectrum_engine(npts, 4.0, 6, 2 * npts, 0.01)
+    assert _get_spectrum_engine(1000, 4.0, 6, 2000, 0.01) is not e1
@@ -0,0 +1,55 @@
+import pickle
+
+import numpy as np
+import pytest
+from obspy.taup import TauPyModel
+
+from mspasspy.algorithms.traveltime import TravelTimeTable
+from mspasspy.ccore.utility import MsPASSError
+
+
+def test_TravelTimeTable():
+    model = TauPyModel(model="iasp91")
+    table = TravelTimeTable(
+        model=model,
+        phases=["P", "S"],
+        min_depth=0.0,
+        max_depth=100.0,
+        depth_spacing=10.0,
+        min_distance=30.0,
+        max_distance=40.0,
+        distance_spacing=0.5,
+    )
+    assert table.phases() == ["P", "S"]
+    depths = np.array([5.0, 33.0, 72.5])
+    distances = np.array([31.2, 35.7, 39.9])
+    for phase in ["P", "S"]:
+        times = table.travel_time(phase, depths, distances)
+        assert times.shape == (3,)
+        for depth, distance, t in zip(depths, distances, times):
+            arrivals = model.get_travel_times(
+                source_depth_in_km=depth,
+                distance_in_degree=distance,
+                phase_list=[phase],
+            )
+            assert np.isclose(t, arrivals[0].time, atol=0.05)
+            # scalar input returns a scalar
+            assert table.travel_time(phase, depth, distance) == pytest.approx(t)
+    # grid nodes reproduce the TauP result exactly
+    arrivals = model.get_travel_times(
+        source_depth_in_km=100.0, distance_in_degree=40.0, phase_list=["P"]
+    )
+    assert table.travel_time("P", 100.0, 40.0) == pytest.approx(arrivals[0].time)
+    # outside the grid
+    assert np.isnan(table.travel_time("P", 150.0, 35.0))
+    assert np.isnan(table.travel_time("P", 50.0, 20.0))
+    with pytest.raises(MsPASSError, match="not tabulated"):
+        table.travel_time("PKIKP", 10.0, 35.0)
+    # the table must survive a pickle round trip for use with dask and spark
+    table_copy = pickle.loads(pickle.dumps(table))
+    assert np.allclose(
+        table_copy.travel_time("S", depths, distances),
+        table.travel_time("S", depths, distances),
+    )
+    with pytest.raises(MsPASSError, match="illegal grid range"):
+        TravelTimeTable(model=model, min_depth=10.0, max_depth=5.0)
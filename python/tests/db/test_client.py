@@ -1,7 +1,10 @@
+import pickle
+
 import pymongo
 import pytest
 
 from mspasspy.db.client import DBClient
+from mspasspy.db.client_registry import client_registry_stats, clear_client_registry
 
 
 class TestDBClient:
@@ -36,3 +39,23 @@ class TestDBClient:
         db1 = self.c1.get_database(schema="mspass_lite.yaml")
         with pytest.raises(KeyError, match="site"):
             db1.database_schema._attr_dict["site"]
+
+    def test_pickle(self):
+        clear_client_registry()
+        db = self.c2["my_db"]
+        db1 = pickle.loads(pickle.dumps(db))
+        db2 = pickle.loads(pickle.dumps(db))
+        assert db1.name == "my_db"
+        assert isinstance(db1.client, DBClient)
+        assert db1.client is not self.c2
+        # every handle deserialized in this process shares one client
+        assert db2.client is db1.client
+        col = pickle.loads(pickle.dumps(db["wf_TimeSeries"]))
+        assert col.database.client is db1.client
+        assert pickle.loads(pickle.dumps(self.c2)) is db1.client
+        stats = client_registry_stats()
+        assert stats["clients"] == 1
+        assert stats["created"] == 1
+        assert stats["reused"] == 3
+        clear_client_registry()
+        assert client_registry_stats()["clients"] == 0
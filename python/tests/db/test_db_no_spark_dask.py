@@ -278,6 +278,89 @@ with mock.patch.dict(
             self.db._save_data_to_gridfs(tmp_ts, gridfs_id)
             assert not gfsh.exists(gridfs_id)
 
+        def test_save_and_read_sample_encoding(self):
+            dir = "python/tests/data/"
+            dfile = "test_sample_encoding_output"
+            for storage_mode in ["file", "gridfs"]:
+                for encoding in ["float32", "shuffle_zlib", "delta_zlib"]:
+                    ts = get_live_timeseries()
+                    seis = get_live_seismogram()
+                    for d in [ts, seis]:
+                        self.db.save_data(
+                            d,
+                            storage_mode=storage_mode,
+                            dir=dir,
+                            dfile=dfile,
+                            sample_encoding=encoding,
+                        )
+                    ts_doc = self.db.wf_TimeSeries.find_one({"_id": ts["_id"]})
+                    # random samples cannot be delta encoded
+                    if encoding == "delta_zlib":
+                        assert ts_doc["sample_encoding"] == "shuffle_zlib"
+                    else:
+                        assert ts_doc["sample_encoding"] == encoding
+                    ts2 = self.db.read_data(ts["_id"], collection="wf_TimeSeries")
+                    seis2 = self.db.read_data(seis["_id"], collection="wf_Seismogram")
+                    assert ts2.live and seis2.live
+                    if encoding == "float32":
+                        assert np.allclose(ts2.data, ts.data, rtol=1.0e-6)
+                        assert np.allclose(seis2.data, seis.data, rtol=1.0e-6)
+                    else:
+                        assert np.array_equal(ts2.data, ts.data)
+                        assert np.array_equal(seis2.data, seis.data)
+
+            # integer valued data are delta encoded and saving again with
+            # the default clears the encoding
+            ts = get_live_timeseries()
+            ts.data = DoubleVector(np.round(1000.0 * np.random.randn(ts.npts)))
+            self.db.save_data(
+                ts,
+                storage_mode="file",
+                dir=dir,
+                dfile=dfile,
+                sample_encoding="delta_zlib",
+            )
+            ts2 = self.db.read_data(ts["_id"], collection="wf_TimeSeries")
+            assert ts2["sample_encoding"] == "delta_zlib"
+            assert np.array_equal(ts2.data, ts.data)
+            self.db.save_data(ts2, storage_mode="file", dir=dir, dfile=dfile)
+            assert "sample_encoding" not in ts2
+            ts_doc = self.db.wf_TimeSeries.find_one({"_id": ts2["_id"]})
+            assert "sample_encoding" not in ts_doc
+            ts3 = self.db.read_data(ts2["_id"], collection="wf_TimeSeries")
+            assert np.array_equal(ts3.data, ts.data)
+
+            with pytest.raises(MsPASSError, match="unknown sample_encoding"):
+                self.db._save_data_to_gridfs(ts, sample_encoding="bzip2")
+
+        def test_read_data_attributes(self):
+            ts = copy.deepcopy(self.test_ts)
+            ts["extra1"] = "extra1"
+            self.db.save_data(ts, mode="promiscuous", storage_mode="gridfs")
+            ts2 = self.db.read_data(
+                ts["_id"],
+                normalize=["site", "source"],
+                attributes=["calib", "site_lat"],
+                collection="wf_TimeSeries",
+            )
+            assert ts2.live
+            assert np.isclose(ts2.data, ts.data).all()
+            assert ts2["calib"] == ts["calib"]
+            assert ts2["site_lat"] == 1.0
+            assert "extra1" not in ts2
+            assert "sampling_rate" not in ts2
+            assert "source_lat" not in ts2
+            assert "site_lon" not in ts2
+            # attributes required to construct the datum are always read
+            assert ts2["storage_mode"] == "gridfs"
+            assert ts2.npts == ts.npts
+
+            ts3 = self.db.read_data(
+                ts["_id"], normalize=["site"], collection="wf_TimeSeries"
+            )
+            assert ts3["extra1"] == "extra1"
+            assert ts3["site_lon"] == 1.0
+
         def mock_urlopen(*args):
             response = Mock()
             with open("python/tests/data/read_data_from_url.pickle", "rb") as handle:
@@ -2496,6 +2579,7 @@ with mock.patch.dict(
             try:
                 os.remove("python/tests/data/test_db_output")
                 os.remove("python/tests/data/test_mseed_output")
+                os.remove("python/tests/data/test_sample_encoding_output")
             except OSError:
                 pass
             client = DBClient("localhost")
@@ -1,6 +1,7 @@
 from mspasspy.db.client import DBClient
 from mspasspy.db.database import Database
 import copy
+import shutil
 import io
 import os
 import pickle
@@ -1569,6 +1570,102 @@ class TestDatabase:
             ts = self.db.read_data(doc, collection="wf_miniseed")
             assert ts.npts == len(ts.data)
 
+    def test_index_mseed_archive(self, tmp_path):
+        self.db["wf_miniseed"].delete_many({})
+        self.db["mseed_manifest"].delete_many({})
+        os.makedirs(os.path.join(tmp_path, "sub"))
+        shutil.copy("python/tests/data/3channels.mseed", tmp_path)
+        shutil.copy(
+            "python/tests/data/3channels.mseed",
+            os.path.join(tmp_path, "sub", "copy.mseed"),
+        )
+        with open(os.path.join(tmp_path, "bad.mseed"), "w") as fh:
+            fh.write("not miniseed")
+        stats = self.db.index_mseed_archive(str(tmp_path), nprocs=2)
+        badfile = os.path.join(str(tmp_path), "bad.mseed")
+        assert stats["files"] == 3
+        assert stats["indexed"] == 2
+        assert stats["failed"] == 1
+        assert stats["skipped"] == 0
+        # the file with no miniseed data is reported but not entered in
+        # the manifest or wf_miniseed so it is retried on the next run
+        assert len(stats["errors"]) == 1
+        assert stats["errors"][0][0] == badfile
+        assert stats["errors"][0][1].startswith("no miniseed data could be indexed")
+        assert self.db["mseed_manifest"].count_documents({"dfile": "bad.mseed"}) == 0
+        assert self.db["wf_miniseed"].count_documents({"dfile": "bad.mseed"}) == 0
+        assert stats["bytes"] == 2 * os.path.getsize(
+            "python/tests/data/3channels.mseed"
+        )
+        assert stats["files_per_second"] > 0.0
+        ndocs = self.db["wf_miniseed"].count_documents({})
+        assert ndocs == 6
+        assert self.db["mseed_manifest"].count_documents({}) == 2
+        for doc in self.db["wf_miniseed"].find():
+            ts = self.db.read_data(doc, collection="wf_miniseed")
+            assert ts.npts == len(ts.data)
+
+        # nothing changed so nothing is indexed again but bad.mseed is retried
+        stats = self.db.index_mseed_archive(str(tmp_path), nprocs=2)
+        assert stats["indexed"] == 0
+        assert stats["skipped"] == 2
+        assert stats["failed"] == 1
+        assert stats["errors"][0][0] == badfile
+        assert self.db["wf_miniseed"].count_documents({}) == ndocs
+
+        # a copy with a new modification time has the same checksum
+        fname = os.path.join(tmp_path, "3channels.mseed")
+        os.utime(fname, (os.path.getatime(fname), os.path.getmtime(fname) + 10.0))
+        stats = self.db.index_mseed_archive(str(tmp_path), recursive=False)
+        assert stats["files"] == 2
+        assert stats["indexed"] == 0
+        assert stats["skipped"] == 1
+        assert stats["failed"] == 1
+        assert self.db["wf_miniseed"].count_documents({}) == ndocs
+
+        # a file that changed has its index and the elog documents linked
+        # to the old index replaced
+        old_doc = self.db["wf_miniseed"].find_one({"dfile": "3channels.mseed"})
+        self.db["elog"].insert_one({"logdata": [], "wf_miniseed_id": old_doc["_id"]})
+        shutil.copy("python/tests/data/3channels.mseed", fname)
+        with open(fname, "ab") as fh:
+            with open("python/tests/data/3channels.mseed", "rb") as fh2:
+                fh.write(fh2.read())
+        stats = self.db.index_mseed_archive(
+            str(tmp_path), pattern="3channels*", recursive=False
+        )
+        assert stats["files"] == 1
+        assert stats["indexed"] == 1
+        assert stats["failed"] == 0
+        assert self.db["wf_miniseed"].count_documents({"_id": old_doc["_id"]}) == 0
+        assert self.db["elog"].count_documents({"wf_miniseed_id": old_doc["_id"]}) == 0
+        assert self.db["wf_miniseed"].count_documents({"dfile": "3channels.mseed"}) > 0
+
+    def test_index_mseed_file_packet_index(self):
+        self.db["wf_miniseed"].delete_many({})
+        dir = "python/tests/data/"
+        dfile = "3channels.mseed"
+        fname = os.path.join(dir, dfile)
+        self.db.index_mseed_file(fname, collection="wf_miniseed", packet_index=True)
+        assert self.db["wf_miniseed"].count_documents({}) == 3
+
+        for doc in self.db["wf_miniseed"].find():
+            assert len(doc["packet_index"]) > 0
+            ts = self.db.read_data(doc, collection="wf_miniseed")
+            assert "packet_index" not in ts
+            tstart = ts.t0 + 100.0
+            tend = ts.t0 + 130.0
+            ts2 = self.db.read_data(
+                doc, collection="wf_miniseed", time_window=(tstart, tend)
+            )
+            assert ts2.live
+            assert ts2.npts < ts.npts
+            assert ts2.t0 <= tstart and ts2.endtime() >= tend
+            i = ts.sample_number(ts2.t0)
+            assert np.array_equal(
+                np.array(ts2.data), np.array(ts.data)[i : i + ts2.npts]
+            )
+
     def test_delete_wf(self):
         # clear all the wf collection documents
         # self.db['wf_TimeSeries'].delete_many({})
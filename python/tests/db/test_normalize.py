@@ -15,15 +15,21 @@ from mspasspy.db.normalize import (
     MiniseedDBMatcher,
     OriginTimeDBMatcher,
     OriginTimeMatcher,
+    ArrivalMatcher,
     normalize_mseed,
     bulk_normalize,
 )
 
 from mspasspy.db.database import Database
+from mspasspy.ccore.utility import MsPASSError
 from mspasspy.db.client import DBClient
-from mspasspy.ccore.seismic import TimeReferenceType
+from mspasspy.ccore.seismic import TimeReferenceType, TimeSeries
 
+import gc
 import os
+import pickle
+import pytest
+import time
 import bson.json_util
 import numpy
 import copy
@@ -485,6 +491,94 @@ class TestMiniseedMatcher(TestNormalize):
         retdoc = matcher(ts)
         assert retdoc[0] is None
 
+    def test_MiniseedMatcher_find_many(self):
+        cached_matcher = MiniseedMatcher(self.db)
+        docs = list(self.db.wf_miniseed.find().limit(200))
+        # a time no channel epoch contains and a document with no match
+        docs[0]["starttime"] = 1972908800.0
+        del docs[1]["net"]
+        mdlist = cached_matcher.find_many(docs)
+        assert len(mdlist) == len(docs)
+        assert mdlist[0] is None
+        assert mdlist[1] is None
+        # expected values from a linear scan of the channel documents:
+        # the first one with matching codes and a time range containing
+        # the start time of the waveform
+        channels = list(self.db.channel.find())
+        for doc, md in zip(docs, mdlist):
+            expected = None
+            if "net" in doc:
+                for chan in channels:
+                    if (
+                        chan["net"] == doc["net"]
+                        and chan["sta"] == doc["sta"]
+                        and chan["chan"] == doc["chan"]
+                        and chan.get("loc", "") == doc.get("loc", "")
+                        and chan["starttime"] <= doc["starttime"] <= chan["endtime"]
+                    ):
+                        expected = chan
+                        break
+            if expected is None:
+                assert md is None
+            else:
+                assert md["channel_id"] == expected["_id"]
+        assert sum(md is not None for md in mdlist) > 100
+        with pytest.raises(MsPASSError, match="is missing from document"):
+            del docs[2]["starttime"]
+            cached_matcher.find_many(docs)
+
+
+class TestDatabaseMatcherCache(TestNormalize):
+    def test_query_cache(self):
+        matcher = MiniseedDBMatcher(self.db, cache_size=2)
+        uncached = MiniseedDBMatcher(self.db)
+        ts = copy.deepcopy(self.ts)
+        expected = uncached.find_one(ts)[0]
+        assert uncached.cache_stats()["misses"] == 0
+        for i in range(3):
+            retdoc = matcher.find_one(ts)
+            assert Metadata_cmp(retdoc[0], expected)
+        stats = matcher.cache_stats()
+        assert stats["hits"] == 2 and stats["misses"] == 1 and stats["size"] == 1
+
+        # queries with no match are also saved
+        broken_ts = copy.deepcopy(ts)
+        broken_ts["sta"] = "NOSTA"
+        for i in range(2):
+            retdoc = matcher.find(broken_ts)
+            assert retdoc[0] is None
+            assert "yielded no documents" in retdoc[1].get_error_log()[0].message
+        assert matcher.cache_stats()["hits"] == 3
+
+        # least recently used query is dropped when the cache is full
+        other_ts = copy.deepcopy(ts)
+        other_ts.set_t0(ts.t0 + 1.0)
+        matcher.find(other_ts)
+        stats = matcher.cache_stats()
+        assert stats["evictions"] == 1 and stats["size"] == 2
+        matcher.find(ts)
+        assert matcher.cache_stats()["misses"] == 4
+
+        # copies made by pickle start with an empty cache
+        matcher_copy = pickle.loads(pickle.dumps(matcher))
+        assert matcher_copy.cache_stats()["size"] == 0
+        assert Metadata_cmp(matcher_copy.find_one(ts)[0], expected)
+        matcher.clear_cache()
+        assert matcher.cache_stats() == {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expired": 0,
+            "size": 0,
+        }
+
+        matcher = MiniseedDBMatcher(self.db, cache_size=10, cache_ttl=0.001)
+        matcher.find_one(ts)
+        time.sleep(0.01)
+        assert Metadata_cmp(matcher.find_one(ts)[0], expected)
+        stats = matcher.cache_stats()
+        assert stats["expired"] == 1 and stats["misses"] == 2
+
 
 class TestEqualityMatcher(TestNormalize):
     def setup_method(self):
@@ -823,3 +917,166 @@ class TestMatcherHelperFunctions(TestNormalize):
             matcher_list=matcher_function_list,
         )
         assert ret == [3934, 3934, 3934]
+
+
+def test_DataFrameCacheMatcher_subset_rows():
+    """
+    Tests the compiled find path of the DataFrame matchers against
+    the DataFrame returned by subset.   Uses only DataFrames so does not
+    require MongoDB.
+    """
+    arrivals = pd.DataFrame(
+        {
+            "net": ["AA", "BB", "AA", "AA", "AA"],
+            "sta": ["X1", "X1", "X1", "X2", "X1"],
+            "phase": ["P", "P", "S", "P", None],
+            "time": [105.0, 106.0, 150.0, 110.0, 180.0],
+            "source_id": [1, 1, 1, 1, 2],
+        }
+    )
+    ts = TimeSeries(600)
+    ts.set_live()
+    ts.dt = 0.1
+    ts.t0 = 100.0
+    ts["sta"] = "X1"
+    matcher = ArrivalMatcher(
+        arrivals,
+        attributes_to_load=["phase", "time"],
+        load_if_defined=["source_id"],
+        arrival_time_key="time",
+    )
+    rows = matcher.subset_rows(ts)
+    assert list(rows) == [0, 1, 2]
+    assert list(matcher.subset(ts).index) == [0, 1, 2]
+    mdlist, elog = matcher.find(ts)
+    assert elog is None
+    assert [md["arrival_time"] for md in mdlist] == [105.0, 106.0, 150.0]
+    assert [md["arrival_phase"] for md in mdlist] == ["P", "P", "S"]
+    assert mdlist[0]["arrival_source_id"] == 1
+    # net is used to resolve multiple matches when it is defined
+    ts["net"] = "AA"
+    assert list(matcher.subset_rows(ts)) == [0, 2]
+    # required attribute with a null value
+    ts.t0 = 170.0
+    mdlist, elog = matcher.find(ts)
+    assert mdlist is None
+    assert "Null value for required attribute phase" in elog.get_error_log()[0].message
+    ts["sta"] = "X3"
+    mdlist, elog = matcher.find(ts)
+    assert mdlist is None
+    assert len(matcher.subset(ts)) == 0
+
+    sources = pd.DataFrame(
+        {
+            "lat": [10.0, 20.0, 30.0],
+            "lon": [1.0, 2.0, 3.0],
+            "depth": [5.0, 10.0, 15.0],
+            "time": [1000.0, 100.0, 102.0],
+        }
+    )
+    matcher = OriginTimeMatcher(sources, source_time_key="time", load_if_defined=[])
+    ts.t0 = 101.0
+    assert list(matcher.subset_rows(ts)) == [1, 2]
+    mdlist, elog = matcher.find(ts)
+    assert [md["source_lat"] for md in mdlist] == [20.0, 30.0]
+    ts.t0 = 500.0
+    assert matcher.find(ts)[0] is None
+
+    matcher = EqualityMatcher(
+        arrivals,
+        "arrival",
+        {"sta": "sta", "net": "net"},
+        ["sta", "net", "phase", "time"],
+    )
+    ts["sta"] = "X1"
+    ts["net"] = "BB"
+    assert list(matcher.subset_rows(ts)) == [1]
+    assert matcher.find(ts)[0][0]["time"] == 106.0
+
+
+def test_share_cache():
+    """
+    Tests find with the caches of the matchers moved to a shared file by
+    share_cache and with copies of the matchers made by pickle as
+    dask does for workers.   Uses only DataFrames so does not require
+    MongoDB.
+    """
+    channel = pd.DataFrame(
+        {
+            "net": ["AA", "AA", "BB"],
+            "sta": ["X1", "X1", "X2"],
+            "chan": ["BHZ", "BHZ", "BHZ"],
+            "loc": ["00", "00", "00"],
+            "starttime": [0.0, 100.0, 0.0],
+            "endtime": [100.0, 200.0, 1.0e9],
+            "lat": [1.0, 2.0, 3.0],
+            "lon": [1.0, 2.0, 3.0],
+            "elev": [0.0, 0.0, 0.0],
+            "hang": [0.0, 0.0, 0.0],
+            "vang": [0.0, 0.0, 0.0],
+            "_id": ["a", "b", "c"],
+        }
+    )
+    ts = TimeSeries(600)
+    ts.set_live()
+    ts.dt = 0.1
+    ts.t0 = 150.0
+    ts["net"] = "AA"
+    ts["sta"] = "X1"
+    ts["chan"] = "BHZ"
+    ts["loc"] = "00"
+    matcher = MiniseedMatcher(channel)
+    expected = matcher.find_one(ts)[0]
+    assert matcher.share_cache() is matcher
+    path = matcher.normcache._cache.path
+    assert os.path.exists(path)
+    assert len(matcher.normcache) == 2
+    assert "AA_X1_00_BHZ_" in matcher.normcache
+    for m in [matcher, pickle.loads(pickle.dumps(matcher))]:
+        assert Metadata_cmp(m.find_one(ts)[0], expected)
+        assert len(m.find(ts)[0]) == 2
+    del matcher
+    gc.collect()
+    assert not os.path.exists(path)
+
+    arrivals = pd.DataFrame(
+        {
+            "net": ["AA", "BB", "AA", "AA", "AA"],
+            "sta": ["X1", "X1", "X1", "X2", "X1"],
+            "phase": ["P", "P", "S", "P", None],
+            "time": [105.0, 106.0, 150.0, 110.0, 180.0],
+        }
+    )
+    matcher = ArrivalMatcher(
+        arrivals,
+        attributes_to_load=["phase", "time"],
+        load_if_defined=[],
+        arrival_time_key="time",
+    )
+    ts.t0 = 100.0
+    expected = [dict(md) for md in matcher.find(ts)[0]]
+    matcher.share_cache()
+    for m in [matcher, pickle.loads(pickle.dumps(matcher))]:
+        assert m.__dict__["_cache"] is None
+        assert [dict(md) for md in m.find(ts)[0]] == expected
+        # subset loads the DataFrame from the shared file
+        assert list(m.subset(ts).index) == [0, 2]
+    ts.t0 = 170.0
+    mdlist, elog = matcher.find(ts)
+    assert mdlist is None
+    assert "Null value for required attribute phase" in elog.get_error_log()[0].message
+
+    sources = pd.DataFrame(
+        {
+            "lat": [10.0, 20.0, 30.0],
+            "lon": [1.0, 2.0, 3.0],
+            "depth": [5.0, 10.0, 15.0],
+            "time": [1000.0, 100.0, 102.0],
+        }
+    )
+    matcher = OriginTimeMatcher(sources, source_time_key="time", load_if_defined=[])
+    matcher.share_cache()
+    matcher = pickle.loads(pickle.dumps(matcher))
+    ts.t0 = 101.0
+    assert [md["source_lat"] for md in matcher.find(ts)[0]] == [20.0, 30.0]
+    assert matcher.__dict__["_cache"] is None
@@ -287,6 +287,37 @@ class TestSchema:
         assert self.mdschema.TimeSeries.collection("calib") == "wf_TimeSeries"
         assert self.mdschema.TimeSeries.aliases("npts") == alias
 
+    def test_MetadataSchema_view(self):
+        mdschema = MetadataSchema()
+        dbschema = DatabaseSchema()
+        assert (
+            mdschema.view("TimeSeries", "wf_TimeSeries", dbschema)
+            is mdschema.TimeSeries
+        )
+        view = mdschema.view("TimeSeries", "wf_miniseed", dbschema)
+        assert view is mdschema.view("TimeSeries", "wf_miniseed", dbschema)
+        assert view.collection("_id") == "wf_miniseed"
+        assert view.collection("npts") == "wf_miniseed"
+        assert view.collection("sta") == "site"
+        # neither the definition nor the database schema are altered
+        assert mdschema.TimeSeries.collection("npts") == "wf_TimeSeries"
+        assert "collection" not in dbschema.wf_miniseed._main_dic["npts"]
+        # a new database schema or definition invalidates the view
+        view2 = mdschema.view("TimeSeries", "wf_miniseed", DatabaseSchema())
+        assert view2 is not view
+        mdschema["TimeSeries"] = MetadataSchema().TimeSeries
+        assert mdschema.view("TimeSeries", "wf_miniseed", dbschema) is not view2
+
+    def test_schema_file_cache(self):
+        # schema objects built from the cached file contents are independent
+        dbschema = DatabaseSchema()
+        dbschema.wf_TimeSeries.add("test_cache", {"type": "int"})
+        dbschema.wf_TimeSeries.add_alias("npts", "test_npts")
+        dbschema2 = DatabaseSchema()
+        assert not dbschema2.wf_TimeSeries.is_defined("test_cache")
+        assert not dbschema2.wf_TimeSeries.is_defined("test_npts")
+        assert "test_npts" not in MetadataSchema().TimeSeries.aliases("npts")
+
     def test_MDSchemaDefinition_readonly(self):
         assert self.mdschema.TimeSeries.readonly("net")
         assert not self.mdschema.TimeSeries.writeable("net")
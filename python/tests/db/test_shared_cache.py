@@ -0,0 +1,76 @@
+import os
+import pickle
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from mspasspy.ccore.utility import MsPASSError
+from mspasspy.db.shared_cache import SharedCache, SharedNormalizationCache
+
+
+def test_shared_cache(tmp_path):
+    values = [{"a": i, "b": str(i)} for i in range(100)]
+    keys = ["key{}".format(i) for i in range(100)]
+    cache = SharedCache.create(values, keys=keys, cache_dir=str(tmp_path))
+    assert os.path.dirname(cache.path) == str(tmp_path)
+    assert len(cache) == 100
+    assert cache.get(7) == values[7]
+    assert cache.key(7) == "key7"
+    assert cache.find("key42") == 42
+    assert cache.find("nokey") == -1
+    assert cache.lookup("key99") == values[99]
+    assert cache.lookup("nokey", 0) == 0
+    with pytest.raises(IndexError):
+        cache.get(100)
+
+    # a copy made by pickle maps the same file
+    blob = pickle.dumps(cache)
+    assert len(blob) < 200
+    copy = pickle.loads(blob)
+    assert copy._mapped is cache._mapped
+    assert copy.lookup("key3") == values[3]
+    # as does another process
+    code = "import pickle,sys; c = pickle.loads(sys.stdin.buffer.read()); print(c.lookup('key5')['b'])"
+    out = subprocess.run(
+        [sys.executable, "-c", code], input=blob, capture_output=True, check=True
+    )
+    assert out.stdout.decode().strip() == "5"
+
+    # positional cache and numpy scalar keys
+    cache2 = SharedCache.create(
+        [np.arange(3), None], keys=[np.int64(1), 2], cache_dir=str(tmp_path)
+    )
+    assert cache2.find(1) == 0
+    assert cache2.lookup(np.int64(2), "default") is None
+    cache3 = SharedCache.create(["x", "y"], cache_dir=str(tmp_path))
+    assert cache3.get(1) == "y"
+    assert cache3.find("x") == -1
+
+    # only the instance that created the file removes it
+    path = cache.path
+    copy.close()
+    assert os.path.exists(path)
+    cache.close()
+    assert not os.path.exists(path)
+    with pytest.raises(MsPASSError, match="not found"):
+        pickle.loads(blob)
+    with pytest.raises(MsPASSError, match="number of keys"):
+        SharedCache.create([1, 2], keys=["a"], cache_dir=str(tmp_path))
+
+
+def test_shared_normalization_cache(tmp_path):
+    normcache = {"AA_X1": [{"lat": 1.0}, {"lat": 2.0}], "BB_X2": [{"lat": 3.0}]}
+    cache = SharedNormalizationCache.create(normcache, cache_dir=str(tmp_path))
+    assert len(cache) == 2
+    assert "AA_X1" in cache
+    assert "CC_X3" not in cache
+    assert cache["AA_X1"] == normcache["AA_X1"]
+    assert cache.get("CC_X3") is None
+    with pytest.raises(KeyError):
+        cache["CC_X3"]
+    assert sorted(cache.keys()) == ["AA_X1", "BB_X2"]
+    assert dict(cache.items()) == normcache
+    copy = pickle.loads(pickle.dumps(cache))
+    assert copy["BB_X2"] == [{"lat": 3.0}]
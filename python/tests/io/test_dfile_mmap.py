@@ -0,0 +1,114 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from mspasspy.ccore.io import _fwrite_to_file
+from mspasspy.ccore.seismic import (
+    DoubleVector,
+    Seismogram,
+    SeismogramEnsemble,
+    TimeSeries,
+    TimeSeriesEnsemble,
+)
+from mspasspy.ccore.utility import dmatrix, MsPASSError
+from mspasspy.io.dfile_mmap import DfileMmapReader, get_dfile_mmap_reader
+
+
+def make_timeseries(npts):
+    ts = TimeSeries(npts)
+    ts.set_live()
+    ts.dt = 0.01
+    ts.data = DoubleVector(np.random.rand(npts))
+    return ts
+
+
+def make_seismogram(npts):
+    seis = Seismogram(npts)
+    seis.set_live()
+    seis.dt = 0.01
+    seis.data = dmatrix(np.random.rand(3, npts))
+    return seis
+
+
+def test_DfileMmapReader(tmp_path):
+    dir = str(tmp_path)
+    reader = DfileMmapReader(max_open_files=2)
+    ts_list = [make_timeseries(100 + i) for i in range(5)]
+    foffs = [_fwrite_to_file(ts, dir, "ts.dat") for ts in ts_list]
+    seis = make_seismogram(50)
+    seis_foff = _fwrite_to_file(seis, dir, "ts.dat")
+
+    for ts, foff in zip(ts_list, foffs):
+        v = reader.view(dir, "ts.dat", foff, ts.npts)
+        assert not v.flags.writeable
+        assert np.array_equal(v, np.array(ts.data))
+        ts_new = TimeSeries(ts.npts)
+        assert reader.read(ts_new, dir, "ts.dat", foff) == ts.npts
+        assert np.array_equal(np.array(ts_new.data), np.array(ts.data))
+    seis_new = Seismogram(50)
+    assert reader.read(seis_new, dir, "ts.dat", seis_foff) == 150
+    assert np.array_equal(np.array(seis_new.data), np.array(seis.data))
+    v = reader.view(dir, "ts.dat", seis_foff, 50, ncomponents=3)
+    assert v.shape == (3, 50)
+    assert np.array_equal(v, np.array(seis.data))
+
+    # a short file returns a short read
+    ts_new = TimeSeries(100)
+    assert reader.read(ts_new, dir, "ts.dat", seis_foff + 8 * 100) == 50
+
+    # data appended after the file was mapped are still found
+    ts = make_timeseries(30)
+    foff = _fwrite_to_file(ts, dir, "ts.dat")
+    assert np.array_equal(reader.view(dir, "ts.dat", foff, 30), np.array(ts.data))
+
+    # the cache drops the least recently used mapping but views stay valid
+    v = reader.view(dir, "ts.dat", foff, 30)
+    for name in ["a.dat", "b.dat"]:
+        _fwrite_to_file(make_timeseries(10), dir, name)
+        reader.view(dir, name, 0, 10)
+    assert len(reader._maps) == 2
+    assert np.array_equal(v, np.array(ts.data))
+
+    with pytest.raises(MsPASSError, match="Open failed"):
+        reader.view(dir, "missing.dat", 0, 10)
+
+    reader_copy = pickle.loads(pickle.dumps(reader))
+    assert reader_copy.max_open_files == 2
+    assert len(reader_copy._maps) == 0
+    assert get_dfile_mmap_reader() is get_dfile_mmap_reader()
+
+
+def test_DfileMmapReader_ensemble(tmp_path):
+    dir = str(tmp_path)
+    reader = DfileMmapReader()
+    for ensemble_type, maker, ncomp in [
+        (TimeSeriesEnsemble, make_timeseries, 1),
+        (SeismogramEnsemble, make_seismogram, 3),
+    ]:
+        data = [maker(20 + i) for i in range(4)]
+        dfile = ensemble_type.__name__ + ".dat"
+        foffs = [_fwrite_to_file(d, dir, dfile) for d in data]
+        ens = ensemble_type(4)
+        # members in the reverse of file order with one missing foff
+        for d, foff in reversed(list(zip(data, foffs))):
+            if ncomp == 1:
+                m = TimeSeries(d.npts)
+            else:
+                m = Seismogram(d.npts)
+            m["foff"] = foff
+            ens.member.append(m)
+        ens.member[1].erase("foff")
+        count = reader.read_ensemble(ens, dir, dfile, [0, 1, 2, 3])
+        assert count == ncomp * (23 + 21 + 20)
+        assert ens.member[1].dead()
+        for i, j in [(0, 3), (2, 1), (3, 0)]:
+            assert ens.member[i].live
+            assert np.array_equal(np.array(ens.member[i].data), np.array(data[j].data))
+        docs = [
+            {"dir": dir, "dfile": dfile, "foff": foff, "npts": d.npts}
+            for d, foff in zip(data, foffs)
+        ]
+        views = reader.ensemble_views(docs, ncomponents=ncomp)
+        for v, d in zip(views, data):
+            assert np.array_equal(v, np.array(d.data))
@@ -61,6 +61,13 @@ from helper import (
     get_live_seismogram_ensemble,
 )
 
+from mspasspy.algorithms.edit import (
+    FiringSquad,
+    MetadataEQ,
+    MetadataGT,
+    MetadataInterval,
+    MetadataUndefined,
+)
 from mspasspy.io.distributed import (
     read_distributed_data,
     read_to_dataframe,
@@ -270,6 +277,256 @@ def test_read_distributed_data_df(spark_context):
     client.drop_database("mspasspy_test_db")
 
 
+def test_read_to_dataframe_batched():
+    client = DBClient("localhost")
+    client.drop_database("mspasspy_test_db")
+    db = Database(client, "mspasspy_test_db")
+
+    site_id = ObjectId()
+    db["site"].insert_one(
+        {
+            "_id": site_id,
+            "net": "net",
+            "sta": "sta",
+            "loc": "loc",
+            "lat": 1.0,
+            "lon": 1.0,
+            "elev": 2.0,
+            "starttime": datetime.utcnow().timestamp(),
+            "endtime": datetime.utcnow().timestamp(),
+        }
+    )
+    ts_list = []
+    for i in range(5):
+        ts = get_live_timeseries()
+        ts["site_id"] = site_id
+        ts_list.append(ts)
+        db.save_data(
+            ts,
+            mode="promiscuous",
+            storage_mode="gridfs",
+            data_tag="tag1" if i % 2 == 0 else "tag2",
+        )
+    # a dangling site_id must be skipped like a missing normalizing document
+    db["wf_TimeSeries"].update_one(
+        {"_id": ts_list[4]["_id"]}, {"$set": {"site_id": ObjectId()}}
+    )
+
+    # batch_size smaller than the number of documents forces multiple batches
+    df = read_to_dataframe(
+        db,
+        db["wf_TimeSeries"].find({}).sort("_id", 1),
+        normalize=["site"],
+        batch_size=2,
+    )
+    assert len(df) == 5
+    assert list(df["_id"]) == [ts["_id"] for ts in ts_list]
+    assert list(df["site_lat"][:4]) == [1.0] * 4
+    assert np.isnan(df["site_lat"][4])
+
+    df = read_to_dataframe(
+        db,
+        db["wf_TimeSeries"].find({}),
+        data_tag="tag1",
+        batch_size=2,
+    )
+    assert len(df) == 3
+    assert set(df["data_tag"]) == set(["tag1"])
+
+    obj_list = read_distributed_data(df, format="dask").compute()
+    assert len(obj_list) == 3
+    for l in obj_list:
+        assert l.live
+
+    client.drop_database("mspasspy_test_db")
+
+
+def test_read_to_dataframe_attributes():
+    client = DBClient("localhost")
+    client.drop_database("mspasspy_test_db")
+    db = Database(client, "mspasspy_test_db")
+
+    site_id = ObjectId()
+    db["site"].insert_one(
+        {
+            "_id": site_id,
+            "net": "net",
+            "sta": "sta",
+            "loc": "loc",
+            "lat": 1.0,
+            "lon": 1.0,
+            "elev": 2.0,
+            "starttime": datetime.utcnow().timestamp(),
+            "endtime": datetime.utcnow().timestamp(),
+        }
+    )
+    for i in range(3):
+        ts = get_live_timeseries()
+        ts["site_id"] = site_id
+        ts["extra1"] = "extra1"
+        db.save_data(ts, mode="promiscuous", storage_mode="gridfs")
+
+    df = read_to_dataframe(
+        db,
+        db["wf_TimeSeries"].find({}),
+        normalize=["site"],
+        attributes=["calib", "site_lat"],
+    )
+    assert len(df) == 3
+    assert "calib" in df.columns
+    assert "site_lat" in df.columns
+    assert "extra1" not in df.columns
+    assert "sampling_rate" not in df.columns
+    assert "site_lon" not in df.columns
+
+    obj_list = read_distributed_data(
+        db,
+        query={},
+        collection="wf_TimeSeries",
+        normalize=["site"],
+        attributes=["calib", "site_lat"],
+        format="dask",
+        npartitions=2,
+    ).compute()
+    assert len(obj_list) == 3
+    for d in obj_list:
+        assert d.live
+        assert d["site_lat"] == 1.0
+        assert "extra1" not in d
+        assert "site_lon" not in d
+
+    client.drop_database("mspasspy_test_db")
+
+
+def test_read_distributed_data_partitioned():
+    client = DBClient("localhost")
+    client.drop_database("mspasspy_test_db")
+    db = Database(client, "mspasspy_test_db")
+
+    ts_list = []
+    for i in range(7):
+        ts = get_live_timeseries()
+        ts_list.append(ts)
+        db.save_data(
+            ts,
+            mode="promiscuous",
+            storage_mode="gridfs",
+            data_tag="tag1" if i < 5 else "tag2",
+        )
+
+    bag = read_distributed_data(
+        db, query={"data_tag": "tag1"}, npartitions=3, format="dask"
+    )
+    assert bag.npartitions <= 3
+    obj_list = bag.compute()
+    assert len(obj_list) == 5
+    ts_dict = {ts["_id"]: ts for ts in ts_list}
+    for l in obj_list:
+        assert l.live
+        assert np.isclose(l.data, ts_dict[l["_id"]].data).all()
+
+    # more partitions than documents still returns every datum exactly once
+    obj_list = read_distributed_data(db, npartitions=20, format="dask").compute()
+    assert sorted([l["_id"] for l in obj_list]) == sorted(ts_dict.keys())
+
+    # an empty query result yields an empty container
+    obj_list = read_distributed_data(
+        db, query={"data_tag": "no_such_tag"}, format="dask"
+    ).compute()
+    assert len(obj_list) == 0
+
+    client.drop_database("mspasspy_test_db")
+
+
+def test_read_distributed_data_edit():
+    client = DBClient("localhost")
+    client.drop_database("mspasspy_test_db")
+    db = Database(client, "mspasspy_test_db")
+
+    for i in range(6):
+        ts = get_live_timeseries()
+        ts["test_int"] = i
+        db.save_data(
+            ts,
+            mode="promiscuous",
+            storage_mode="file",
+            dir="./data/",
+            dfile="test_read_distributed_data_edit",
+        )
+
+    edit = MetadataInterval("test_int", 1, 3)
+    df = read_to_dataframe(db, db["wf_TimeSeries"].find({}), batch_size=4, edit=edit)
+    assert sorted(df["test_int"]) == [1, 2, 3]
+
+    # cursor and partitioned reads
+    for obj_list in [
+        read_distributed_data(
+            db, db["wf_TimeSeries"].find({}), format="dask", edit=edit
+        ).compute(),
+        read_distributed_data(db, npartitions=2, format="dask", edit=edit).compute(),
+    ]:
+        assert sorted([d["test_int"] for d in obj_list]) == [1, 2, 3]
+        for d in obj_list:
+            assert d.live
+
+    # keys of the test are loaded even when not listed in attributes
+    fstest = FiringSquad([MetadataGT("test_int", 3), MetadataUndefined("calib")])
+    obj_list = read_distributed_data(
+        db, attributes=["calib"], npartitions=2, format="dask", edit=fstest
+    ).compute()
+    assert sorted([d["test_int"] for d in obj_list]) == [0, 1, 2, 3]
+
+    # keys loaded by normalization are absent from the wf documents so the
+    # test must not be handed to MongoDB
+    site_id = ObjectId()
+    db["site"].insert_one(
+        {
+            "_id": site_id,
+            "net": "net",
+            "sta": "sta",
+            "loc": "loc",
+            "lat": 1.0,
+            "lon": 1.0,
+            "elev": 2.0,
+            "starttime": datetime.utcnow().timestamp(),
+            "endtime": datetime.utcnow().timestamp(),
+        }
+    )
+    db["wf_TimeSeries"].update_many(
+        {"test_int": {"$lt": 4}}, {"$set": {"site_id": site_id}}
+    )
+    db["wf_TimeSeries"].update_many({}, {"$unset": {"sta": "", "net": ""}})
+    obj_list = read_distributed_data(
+        db,
+        normalize=["site"],
+        npartitions=2,
+        format="dask",
+        edit=MetadataUndefined("sta"),
+    ).compute()
+    assert sorted([d["test_int"] for d in obj_list]) == [0, 1, 2, 3]
+    for d in obj_list:
+        assert d["sta"] == "sta"
+
+    # values kill_mask cannot compare fall back to kill_if_true per record
+    db["wf_TimeSeries"].update_one({"test_int": 0}, {"$set": {"test_mixed": "bad"}})
+    db["wf_TimeSeries"].update_one({"test_int": 1}, {"$set": {"test_mixed": 1}})
+    db["wf_TimeSeries"].update_one({"test_int": 2}, {"$set": {"test_mixed": 5}})
+    fsmixed = FiringSquad(
+        [MetadataEQ("test_mixed", "bad"), MetadataGT("test_mixed", 3)]
+    )
+    df = read_to_dataframe(db, db["wf_TimeSeries"].find({}), edit=fsmixed)
+    assert sorted(df["test_int"]) == [1, 3, 4, 5]
+    # dataframe input takes the same fallback
+    df = read_to_dataframe(db, db["wf_TimeSeries"].find({}))
+    obj_list = read_distributed_data(df, format="dask", edit=fsmixed).compute()
+    assert sorted([d["test_int"] for d in obj_list]) == [1, 3, 4, 5]
+
+    with pytest.raises(MsPASSError, match="edit must be an Executioner"):
+        read_to_dataframe(db, db["wf_TimeSeries"].find({}), edit="test_int")
+
+    client.drop_database("mspasspy_test_db")
+
+
 def test_read_distributed_data_dask():
     client = DBClient("localhost")
     client.drop_database("mspasspy_test_db")
@@ -775,3 +1032,90 @@ def test_write_distributed_data_dask():
     assert errlog.algorithm == "debug"
     assert errlog.badness == ErrorSeverity(5)
     # write_files(ts1, storage_mode="gridfs", overwrite=False, gfsh=gridfs.GridFS(db))
+
+
+def test_write_distributed_data_sample_encoding():
+    client = DBClient("localhost")
+    client.drop_database("mspasspy_test_db")
+    db = Database(client, "mspasspy_test_db")
+
+    dir = os.path.abspath("./data/")
+    ts_list = []
+    for i in range(4):
+        ts = get_live_timeseries()
+        ts["dir"] = dir
+        ts["dfile"] = "test_sample_encoding_distributed"
+        ts["test_int"] = i
+        ts_list.append(ts)
+    df = write_distributed_data(
+        daskbag.from_sequence(ts_list, npartitions=2),
+        db,
+        storage_mode="file",
+        format="dask",
+        sample_encoding="shuffle_zlib",
+    )
+    for doc in db["wf_TimeSeries"].find({}):
+        assert doc["sample_encoding"] == "shuffle_zlib"
+
+    # partitioned, cursor, and dataframe reads all decode the samples
+    for obj_list in [
+        read_distributed_data(db, npartitions=2, format="dask").compute(),
+        read_distributed_data(
+            db, db["wf_TimeSeries"].find({}), format="dask"
+        ).compute(),
+        read_distributed_data(df, format="dask").compute(),
+    ]:
+        assert len(obj_list) == 4
+        for d in obj_list:
+            assert d.live
+            assert np.array_equal(d.data, ts_list[d["test_int"]].data)
+
+    client.drop_database("mspasspy_test_db")
+
+
+def test_write_distributed_data_bulk():
+    client = DBClient("localhost")
+    client.drop_database("mspasspy_test_db")
+    db = Database(client, "mspasspy_test_db")
+
+    ts_list = []
+    for i in range(5):
+        ts = get_live_timeseries()
+        logging_helper.info(ts, "1", "deepcopy")
+        ts.elog.log_error("debug", "message {}".format(i), ErrorSeverity.Debug)
+        ts_list.append(ts)
+    dead_ts = get_live_timeseries()
+    dead_ts.elog.log_error("debug", "dead", ErrorSeverity.Invalid)
+    dead_ts.kill()
+    ts_list.append(dead_ts)
+
+    # batch_size smaller than a partition forces several insert_many calls
+    list_ = daskbag.from_sequence(ts_list, npartitions=2)
+    df = write_distributed_data(
+        list_,
+        db,
+        mode="promiscuous",
+        storage_mode="gridfs",
+        format="dask",
+        batch_size=2,
+    )
+    assert len(df) == 6
+    assert db["wf_TimeSeries"].count_documents({}) == 5
+    # every live datum links to its elog and history documents and
+    # those documents link back without any follow-up update
+    for doc in db["wf_TimeSeries"].find({}):
+        elog_doc = db["elog"].find_one({"_id": doc["elog_id"]})
+        assert elog_doc["wf_TimeSeries_id"] == doc["_id"]
+        history_doc = db["history_object"].find_one({"_id": doc["history_object_id"]})
+        assert history_doc["wf_TimeSeries_id"] == doc["_id"]
+    # the dead datum only leaves a tombstone in elog
+    assert db["elog"].count_documents({"tombstone": {"$exists": True}}) == 1
+
+    obj_list = read_distributed_data(
+        db, db["wf_TimeSeries"].find({}), format="dask"
+    ).compute()
+    assert len(obj_list) == 5
+    for l in obj_list:
+        assert l.live
+
+    client.drop_database("mspasspy_test_db")
@@ -0,0 +1,38 @@
+import io
+import os
+
+import numpy as np
+import obspy
+
+from mspasspy.io.mseed_packets import build_packet_index, packet_range
+
+
+def test_build_packet_index():
+    fname = "python/tests/data/3channels.mseed"
+    # the first 16 packets of 512 bytes are the BH1 channel
+    nbytes = 16 * 512
+    table = build_packet_index(fname, 0, nbytes)
+    assert len(table) == 16 * 12
+    st = obspy.read(fname)
+    t0 = st[0].stats.starttime.timestamp
+
+    # window in the middle of the segment
+    offset, n = packet_range(table, nbytes, t0 + 100.0, t0 + 130.0)
+    assert offset > 0 and offset + n < nbytes
+    assert offset % 512 == 0 and n % 512 == 0
+    with open(fname, mode="rb") as fh:
+        fh.seek(offset)
+        tr = obspy.read(io.BytesIO(fh.read(n)), format="mseed")[0]
+    assert tr.stats.starttime.timestamp <= t0 + 100.0
+    assert tr.stats.endtime.timestamp >= t0 + 130.0
+    i = int(round((tr.stats.starttime.timestamp - t0) * tr.stats.sampling_rate))
+    assert np.array_equal(tr.data, st[0].data[i : i + tr.stats.npts])
+
+    # windows at or outside the ends of the segment
+    assert packet_range(table, nbytes, t0 - 10.0, t0 + 1.0) == (0, 512)
+    offset, n = packet_range(table, nbytes, t0 + 290.0, t0 + 400.0)
+    assert offset + n == nbytes
+    assert packet_range(table, nbytes, t0 - 10.0, t0 + 400.0) == (0, nbytes)
+
+    # the whole file mixes channels so packet times are not ordered
+    assert build_packet_index(fname, 0, os.path.getsize(fname)) is None
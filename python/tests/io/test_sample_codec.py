@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from mspasspy.ccore.seismic import (
+    DoubleVector,
+    Seismogram,
+    TimeSeries,
+    TimeSeriesEnsemble,
+)
+from mspasspy.ccore.utility import dmatrix, MsPASSError
+from mspasspy.io.dfile_mmap import DfileMmapReader
+from mspasspy.io.sample_codec import (
+    encode_samples,
+    decode_samples,
+    read_samples,
+    write_samples,
+    write_ensemble_samples,
+)
+
+
+def make_timeseries(npts, integer=False):
+    ts = TimeSeries(npts)
+    ts.set_live()
+    ts.dt = 0.01
+    x = 1000.0 * np.random.randn(npts)
+    if integer:
+        x = np.round(x)
+    ts.data = DoubleVector(x)
+    return ts
+
+
+def make_seismogram(npts, integer=False):
+    seis = Seismogram(npts)
+    seis.set_live()
+    seis.dt = 0.01
+    x = 1000.0 * np.random.randn(3, npts)
+    if integer:
+        x = np.round(x)
+    seis.data = dmatrix(x)
+    return seis
+
+
+@pytest.mark.parametrize("maker", [make_timeseries, make_seismogram])
+def test_encode_decode_samples(maker):
+    for integer in [False, True]:
+        d = maker(200, integer)
+        for encoding in ["float64", "float32", "shuffle_zlib", "delta_zlib"]:
+            buf, used = encode_samples(d, encoding)
+            if encoding == "delta_zlib" and not integer:
+                assert used == "shuffle_zlib"
+            else:
+                assert used == encoding
+            if encoding == "float32":
+                assert len(buf) == 4 * np.size(np.array(d.data))
+            d2 = maker(200)
+            decode_samples(d2, buf, used)
+            if encoding == "float32":
+                assert np.allclose(np.array(d2.data), np.array(d.data), rtol=1.0e-6)
+            else:
+                assert np.array_equal(np.array(d2.data), np.array(d.data))
+        # delta encoding of integers is much smaller than the raw data
+        buf, used = encode_samples(d, "delta_zlib")
+        if integer:
+            assert len(buf) < 4 * np.size(np.array(d.data))
+        with pytest.raises(MsPASSError, match="expected"):
+            decode_samples(maker(100), buf, used)
+    with pytest.raises(MsPASSError, match="unknown sample_encoding"):
+        encode_samples(d, "gzip")
+
+
+def test_write_read_samples(tmp_path):
+    dir = str(tmp_path)
+    ts = make_timeseries(300, integer=True)
+    foff, nbytes, used = write_samples(ts, dir, "data.dat", "delta_zlib")
+    assert foff == 0 and used == "delta_zlib"
+    ens = TimeSeriesEnsemble(3)
+    for i in range(3):
+        ens.member.append(make_timeseries(100 + i))
+    ens.member[1].kill()
+    foffs = write_ensemble_samples(ens, dir, "data.dat", "float32")
+    assert foffs == [nbytes, 0, nbytes + 400]
+    assert ens.member[2]["nbytes"] == 408
+    assert not ens.member[1].is_defined("foff")
+
+    reader = DfileMmapReader()
+    for mmap_reader in [None, reader]:
+        ts2 = TimeSeries(300)
+        read_samples(ts2, dir, "data.dat", foff, nbytes, used, mmap_reader)
+        assert np.array_equal(np.array(ts2.data), np.array(ts.data))
+        for i in [0, 2]:
+            d = ens.member[i]
+            d2 = TimeSeries(d.npts)
+            read_samples(
+                d2,
+                dir,
+                "data.dat",
+                d["foff"],
+                d["nbytes"],
+                d["sample_encoding"],
+                mmap_reader,
+            )
+            assert np.allclose(np.array(d2.data), np.array(d.data), rtol=1.0e-6)
+        with pytest.raises(MsPASSError, match="ended before"):
+            read_samples(
+                TimeSeries(102), dir, "data.dat", foffs[2], 1000, "float32", mmap_reader
+            )
@@ -0,0 +1,98 @@
+"""
+Benchmark of Butterworth filtering of large ensembles.
+
+Compares a python loop calling the Butterworth apply method for each
+member with the ensemble apply method run with an increasing number of
+threads.  Reports the throughput in MB/s of samples filtered and the
+speedup relative to the python loop.  With enough members the ensemble
+method should scale close to linearly up to the number of physical cores.
+Run with:
+
+    python python/tests/manual/mbench_butterworth_ensemble.py --nmembers 10000 --npts 4000
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from mspasspy.ccore.algorithms.basic import Butterworth
+from mspasspy.ccore.seismic import (
+    DoubleVector,
+    Seismogram,
+    SeismogramEnsemble,
+    TimeSeries,
+    TimeSeriesEnsemble,
+)
+from mspasspy.ccore.utility import dmatrix
+
+
+def make_ensemble(kind, nmembers, npts, dt):
+    rng = np.random.default_rng(42)
+    if kind == "TimeSeriesEnsemble":
+        ens = TimeSeriesEnsemble()
+        for i in range(nmembers):
+            d = TimeSeries(npts)
+            d.data = DoubleVector(rng.normal(size=npts))
+            d.dt = dt
+            d.set_live()
+            ens.member.append(d)
+    else:
+        ens = SeismogramEnsemble()
+        for i in range(nmembers):
+            d = Seismogram(npts)
+            d.data = dmatrix(rng.normal(size=(3, npts)))
+            d.dt = dt
+            d.set_live()
+            ens.member.append(d)
+    ens.set_live()
+    return ens
+
+
+def run(bwfilter, ens, nthreads):
+    t = time.time()
+    if nthreads is None:
+        for d in ens.member:
+            bwfilter.apply(d)
+    else:
+        bwfilter.apply(ens, nthreads=nthreads)
+    return time.time() - t
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nmembers", type=int, default=10000)
+    parser.add_argument("--npts", type=int, default=4000)
+    parser.add_argument("--dt", type=float, default=0.01)
+    parser.add_argument("--zerophase", action="store_true")
+    args = parser.parse_args()
+
+    ncpu = os.cpu_count()
+    threads = [1]
+    while threads[-1] * 2 <= ncpu:
+        threads.append(threads[-1] * 2)
+    if threads[-1] != ncpu:
+        threads.append(ncpu)
+    bwfilter = Butterworth(args.zerophase, True, True, 2, 0.5, 2, 5.0, args.dt)
+    print(
+        "{:20s} {:>10s} {:>10s} {:>8s}".format("ensemble", "threads", "MB/s", "speedup")
+    )
+    for kind in ["TimeSeriesEnsemble", "SeismogramEnsemble"]:
+        ens = make_ensemble(kind, args.nmembers, args.npts, args.dt)
+        ncomp = 1 if kind == "TimeSeriesEnsemble" else 3
+        mbytes = 8.0 * ncomp * args.nmembers * args.npts / 1.0e6
+        tloop = run(bwfilter, ens, None)
+        print(
+            "{:20s} {:>10s} {:10.1f} {:8.2f}".format(kind, "loop", mbytes / tloop, 1.0)
+        )
+        for nthreads in threads:
+            t = run(bwfilter, ens, nthreads)
+            print(
+                "{:20s} {:10d} {:10.1f} {:8.2f}".format(
+                    kind, nthreads, mbytes / t, tloop / t
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark of deserializing Database handles the way dask and spark
+workers do for every task of read_distributed_data and
+write_distributed_data.
+
+Compares the per-process client registry used by Database.__setstate__
+with the earlier behavior of constructing a new MongoClient for every
+handle.  Reports the time per handle and the number of clients (each with
+its own connection pool and monitor threads) left open.  With --query a
+find_one is run with each handle so the cost of opening connections is
+included.  That requires a MongoDB server.  Run with:
+
+    python python/tests/manual/mbench_client_registry.py --ntasks 500 --query
+"""
+import argparse
+import pickle
+import time
+
+from mspasspy.db.client import DBClient
+from mspasspy.db.client_registry import client_registry_stats, clear_client_registry
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", type=str, default="localhost")
+    parser.add_argument("--ntasks", type=int, default=500)
+    parser.add_argument("--query", action="store_true")
+    args = parser.parse_args()
+
+    client = DBClient(args.host)
+    db = client.get_database("mbench_client_registry")
+    state = pickle.dumps(db)
+    clear_client_registry()
+
+    t = time.time()
+    for i in range(args.ntasks):
+        dbw = pickle.loads(state)
+        if args.query:
+            dbw.wf_TimeSeries.find_one()
+    tregistry = time.time() - t
+    stats = client_registry_stats()
+
+    clients = []
+    t = time.time()
+    for i in range(args.ntasks):
+        # equivalent of the old eval of the client repr in __setstate__
+        c = DBClient(args.host)
+        clients.append(c)
+        if args.query:
+            c.get_database("mbench_client_registry").wf_TimeSeries.find_one()
+    tnew = time.time() - t
+    for c in clients:
+        c.close()
+
+    print("{:28s} {:>12s} {:>10s}".format("method", "ms/handle", "clients"))
+    print(
+        "{:28s} {:12.3f} {:10d}".format(
+            "new client per handle", 1000.0 * tnew / args.ntasks, args.ntasks
+        )
+    )
+    print(
+        "{:28s} {:12.3f} {:10d}".format(
+            "client registry", 1000.0 * tregistry / args.ntasks, stats["clients"]
+        )
+    )
+    print("registry counters:", stats)
+    clear_client_registry()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark of the memory mapped dfile reader against the fread reader.
+
+Writes a file of TimeSeries sample data the way save_ensemble_data does and
+reads it back three ways:  one datum at a time with fread
+(_fread_from_file) and with DfileMmapReader.read, as ensembles with the
+fread and mmap ensemble readers used by read_ensemble_data_group, and as
+read-only numpy views.   Does not require MongoDB.  The first pass over a
+file that is not in the page cache measures the file system.  Later passes
+measure the overhead of the readers.   Run with:
+
+    python python/tests/manual/mbench_dfile_mmap.py --ndata 2000 --npts 10000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from mspasspy.ccore.io import _fread_from_file, _fwrite_to_file
+from mspasspy.ccore.seismic import DoubleVector, TimeSeries, TimeSeriesEnsemble
+from mspasspy.io.dfile_mmap import DfileMmapReader
+
+
+def write_file(dir, dfile, ndata, npts):
+    ts = TimeSeries(npts)
+    ts.set_live()
+    ts.dt = 0.01
+    foffs = []
+    for i in range(ndata):
+        ts.data = DoubleVector(np.random.rand(npts))
+        foffs.append(_fwrite_to_file(ts, dir, dfile))
+    return foffs
+
+
+def make_ensemble(foffs, npts):
+    ens = TimeSeriesEnsemble(len(foffs))
+    for foff in foffs:
+        ts = TimeSeries(npts)
+        ts["foff"] = foff
+        ens.member.append(ts)
+    return ens
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ndata", type=int, default=2000)
+    parser.add_argument("--npts", type=int, default=10000)
+    parser.add_argument("--npasses", type=int, default=3)
+    parser.add_argument("--dir", type=str, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as dir:
+        dfile = "mbench_dfile_mmap.dat"
+        foffs = write_file(dir, dfile, args.ndata, args.npts)
+        # random order the way data are read by a typical workflow
+        read_order = np.random.permutation(args.ndata)
+        mbytes = 8.0 * args.ndata * args.npts / 1.0e6
+        reader = DfileMmapReader()
+        docs = [
+            {"dir": dir, "dfile": dfile, "foff": foff, "npts": args.npts}
+            for foff in foffs
+        ]
+
+        def atomic(fread):
+            ts = TimeSeries(args.npts)
+            for i in read_order:
+                fread(ts, dir, dfile, foffs[i])
+
+        def ensemble(fread):
+            ens = make_ensemble([foffs[i] for i in read_order], args.npts)
+            fread(ens, dir, dfile, list(range(args.ndata)))
+
+        tests = [
+            ("atomic fread", lambda: atomic(_fread_from_file)),
+            ("atomic mmap", lambda: atomic(reader.read)),
+            ("ensemble fread", lambda: ensemble(_fread_from_file)),
+            ("ensemble mmap", lambda: ensemble(reader.read_ensemble)),
+            ("ensemble views", lambda: reader.ensemble_views(docs)),
+        ]
+        print(
+            "{:16s}".format("reader")
+            + "".join(
+                ["{:>14s}".format("pass {}".format(i)) for i in range(args.npasses)]
+            )
+        )
+        for name, func in tests:
+            reader.close()
+            line = "{:16s}".format(name)
+            for i in range(args.npasses):
+                t = time.time()
+                func()
+                line += "{:9.0f} MB/s".format(mbytes / (time.time() - t))
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark of the cost of constructing fft based deconvolution operators.
+
+The fft based operators get the GSL fft wavetable for their fft length
+from a cache shared by all operators of the process, so an operator
+constructed for every datum no longer recomputes it.  This benchmark
+times two workloads that construct operators repeatedly:  a copy of a
+MTPowerSpectrumEngine (which does not recompute the tapers) followed by
+one spectrum estimate for a range of fft lengths, and RFdecon called with
+a new RFdeconProcessor for every datum for each algorithm.  It reports
+operators per second and the number of wavetables held by the cache,
+which should equal the number of distinct fft lengths used.  Run the
+same command with a build of the previous version to measure the
+speedup.  Does not require MongoDB.  Run with:
+
+    python python/tests/manual/mbench_fft_plan_cache.py --ntrials 2000 --pf data/pf/RFdeconProcessor.pf
+"""
+import argparse
+import time
+
+import numpy as np
+
+from mspasspy.ccore.seismic import DoubleVector, Seismogram, TimeSeries
+from mspasspy.ccore.utility import dmatrix
+from mspasspy.ccore.algorithms.deconvolution import (
+    MTPowerSpectrumEngine,
+    shared_fft_wavetable_count,
+)
+from mspasspy.algorithms.RFdeconProcessor import RFdeconProcessor, RFdecon
+
+ALGORITHMS = ["LeastSquares", "WaterLevel", "MultiTaperXcor", "MultiTaperSpecDiv"]
+
+
+def run_engine(npts, ntrials):
+    rng = np.random.default_rng(42)
+    d = TimeSeries(npts)
+    d.set_live()
+    d.dt = 1.0
+    d.data = DoubleVector(rng.normal(size=npts))
+    parent = MTPowerSpectrumEngine(npts, 2.5, 4)
+    t = time.time()
+    for i in range(ntrials):
+        engine = MTPowerSpectrumEngine(parent)
+        engine.apply(d)
+    return ntrials / (time.time() - t)
+
+
+def run_rfdecon(alg, pf, ntrials, npts, dt):
+    rng = np.random.default_rng(42)
+    d = Seismogram(npts)
+    d.set_live()
+    d.dt = dt
+    d.t0 = -40.0
+    x = rng.normal(size=(3, npts))
+    i0 = int(40.0 / dt)
+    x[:, i0 : i0 + 20] += 20.0 * np.hanning(20)
+    d.data = dmatrix(x)
+    t = time.time()
+    for i in range(ntrials):
+        result = RFdecon(Seismogram(d), processor=RFdeconProcessor(alg, pf))
+        if result.dead():
+            raise RuntimeError("RFdecon killed a datum with alg=" + alg)
+    return ntrials / (time.time() - t)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ntrials", type=int, default=2000)
+    parser.add_argument("--npts", type=int, default=2001)
+    parser.add_argument("--dt", type=float, default=0.05)
+    parser.add_argument("--pf", type=str, default="RFdeconProcessor.pf")
+    args = parser.parse_args()
+
+    print("{:30s} {:>14s} {:>10s}".format("operator", "operators/s", "tables"))
+    for npts in [256, 1000, 4096, 10000]:
+        rate = run_engine(npts, args.ntrials)
+        print(
+            "{:30s} {:14.1f} {:10d}".format(
+                "MTPowerSpectrumEngine npts=" + str(npts),
+                rate,
+                shared_fft_wavetable_count(),
+            )
+        )
+    # RFdecon is much slower so use fewer trials
+    ntrials = max(args.ntrials // 10, 1)
+    for alg in ALGORITHMS:
+        rate = run_rfdecon(alg, args.pf, ntrials, args.npts, args.dt)
+        print(
+            "{:30s} {:14.1f} {:10d}".format(
+                "RFdecon " + alg, rate, shared_fft_wavetable_count()
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
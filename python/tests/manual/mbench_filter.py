@@ -0,0 +1,118 @@
+"""
+Benchmark of the filter function of mspasspy.algorithms.signals.
+
+Compares the native path filter uses for Butterworth filters, which
+filters the sample arrays in place with a cached design, with the
+obspy path that converts each datum to an obspy Trace or Stream, designs
+the filter, and copies the result back.   Both are run on TimeSeries,
+Seismogram, and TimeSeriesEnsemble data and the throughput is reported
+in MB/s of samples filtered.   Does not require MongoDB.  Run with:
+
+    python python/tests/manual/mbench_filter.py --ndata 500 --npts 10000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from mspasspy.ccore.seismic import (
+    DoubleVector,
+    Seismogram,
+    TimeSeries,
+    TimeSeriesEnsemble,
+)
+from mspasspy.ccore.utility import dmatrix
+from mspasspy.algorithms.signals import _obspy_filter, _sos_filter
+
+
+def make_timeseries(rng, npts, dt):
+    ts = TimeSeries(npts)
+    ts.set_live()
+    ts.dt = dt
+    ts.t0 = 0.0
+    ts["sta"] = "AAK"
+    ts["chan"] = "BHZ"
+    ts.data = DoubleVector(rng.normal(size=npts))
+    return ts
+
+
+def make_data(kind, ndata, npts, dt):
+    rng = np.random.default_rng(42)
+    if kind == "TimeSeries":
+        return [make_timeseries(rng, npts, dt) for i in range(ndata)]
+    elif kind == "Seismogram":
+        data = []
+        for i in range(ndata):
+            d = Seismogram(npts)
+            d.set_live()
+            d.dt = dt
+            d.t0 = 0.0
+            d["sta"] = "AAK"
+            d.data = dmatrix(rng.normal(size=(3, npts)))
+            data.append(d)
+        return data
+    else:
+        # ensembles of 50 members
+        data = []
+        for i in range(max(ndata // 50, 1)):
+            e = TimeSeriesEnsemble()
+            for j in range(50):
+                e.member.append(make_timeseries(rng, npts, dt))
+            e.set_live()
+            data.append(e)
+        return data
+
+
+def nsamples(data):
+    n = 0
+    for d in data:
+        if isinstance(d, TimeSeriesEnsemble):
+            n += sum([m.npts for m in d.member])
+        elif isinstance(d, Seismogram):
+            n += 3 * d.npts
+        else:
+            n += d.npts
+    return n
+
+
+def run(data, path, zerophase):
+    t = time.time()
+    for d in data:
+        if path == "native":
+            _sos_filter(d, "bandpass", freqmin=0.5, freqmax=5.0, zerophase=zerophase)
+        else:
+            _obspy_filter(d, "bandpass", freqmin=0.5, freqmax=5.0, zerophase=zerophase)
+    return time.time() - t
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ndata", type=int, default=500)
+    parser.add_argument("--npts", type=int, default=10000)
+    parser.add_argument("--dt", type=float, default=0.025)
+    args = parser.parse_args()
+
+    print(
+        "{:20s} {:>9s} {:>12s} {:>12s} {:>8s}".format(
+            "data", "zerophase", "obspy MB/s", "native MB/s", "speedup"
+        )
+    )
+    for kind in ["TimeSeries", "Seismogram", "TimeSeriesEnsemble"]:
+        for zerophase in [False, True]:
+            data = make_data(kind, args.ndata, args.npts, args.dt)
+            mbytes = 8.0 * nsamples(data) / 1.0e6
+            tobspy = run(data, "obspy", zerophase)
+            tnative = run(data, "native", zerophase)
+            print(
+                "{:20s} {:>9s} {:12.1f} {:12.1f} {:8.2f}".format(
+                    kind,
+                    str(zerophase),
+                    mbytes / tobspy,
+                    mbytes / tnative,
+                    tobspy / tnative,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark of mspass_foldby building common source gathers with a dask
+bag.  Compares the current implementation, which appends data to
+ensembles in the fold, with the concatenation of python lists used by
+earlier versions.  Does not require MongoDB.  Run with:
+
+    python python/tests/manual/mbench_foldby.py --nsources 4 --nsta 5000 --npts 2000
+"""
+import argparse
+import time
+
+import dask
+import dask.bag as db
+import numpy as np
+
+from mspasspy.ccore.seismic import DoubleVector, TimeSeries
+from mspasspy.reduce import mspass_dask_foldby
+from mspasspy.util.converter import list2Ensemble
+
+
+def make_data(nsources, nsta, npts):
+    data = []
+    x = np.random.randn(npts)
+    for i in range(nsta):
+        for j in range(nsources):
+            ts = TimeSeries(npts)
+            ts.set_live()
+            ts.dt = 0.01
+            ts.data = DoubleVector(x)
+            ts["source_id"] = j
+            ts["sta"] = "S{}".format(i)
+            data.append(ts)
+    return data
+
+
+def list_foldby(bag, key):
+    # implementation used by earlier versions of mspass_dask_foldby
+    return bag.foldby(
+        lambda x: x[key],
+        lambda x, y: (x if isinstance(x, list) else [x])
+        + (y if isinstance(y, list) else [y]),
+    ).map(lambda x: list2Ensemble(x[1]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nsources", type=int, default=4)
+    parser.add_argument("--nsta", type=int, default=5000)
+    parser.add_argument("--npts", type=int, default=2000)
+    parser.add_argument("--npartitions", type=int, default=16)
+    parser.add_argument("--scheduler", type=str, default="processes")
+    args = parser.parse_args()
+
+    data = make_data(args.nsources, args.nsta, args.npts)
+    bag = db.from_sequence(data, npartitions=args.npartitions)
+    with dask.config.set(scheduler=args.scheduler):
+        for name, run in [
+            ("list concatenation", lambda: list_foldby(bag, "source_id")),
+            ("ensemble append", lambda: mspass_dask_foldby(bag, "source_id")),
+            (
+                "ensemble append sorted",
+                lambda: mspass_dask_foldby(bag, "source_id", sort_key="sta"),
+            ),
+        ]:
+            t = time.time()
+            res = run().compute()
+            elapsed = time.time() - t
+            print(
+                "{:24s} {:8.2f} s  {} ensembles of {} members".format(
+                    name, elapsed, len(res), len(res[0].member)
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
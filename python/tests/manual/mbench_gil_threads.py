@@ -0,0 +1,107 @@
+"""
+Thread scaling benchmark of ccore functions that release the GIL.
+
+Runs a fixed amount of work through a ThreadPoolExecutor with an increasing
+number of threads and reports the speedup relative to one thread.  Functions
+that release the GIL should scale close to linearly up to the number of
+physical cores.  Run with:
+
+    python python/tests/manual/mbench_gil_threads.py --ndata 400 --npts 20000
+"""
+import argparse
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from mspasspy.ccore.algorithms.basic import (
+    _WindowData,
+    agc,
+    Butterworth,
+    TimeWindow,
+)
+from mspasspy.ccore.algorithms.deconvolution import MTPowerSpectrumEngine
+from mspasspy.ccore.seismic import DoubleVector, Seismogram, TimeSeries
+from mspasspy.ccore.utility import dmatrix
+
+# processing objects are not thread safe so each thread gets its own
+_local = threading.local()
+
+
+def make_timeseries(npts):
+    ts = TimeSeries(npts)
+    ts.set_live()
+    ts.dt = 0.01
+    ts.t0 = 0.0
+    ts.data = DoubleVector(np.random.rand(npts))
+    return ts
+
+
+def make_seismogram(npts):
+    seis = Seismogram(npts)
+    seis.set_live()
+    seis.dt = 0.01
+    seis.t0 = 0.0
+    seis.data = dmatrix(np.random.rand(3, npts))
+    return seis
+
+
+def butterworth(d):
+    if not hasattr(_local, "filter"):
+        _local.filter = Butterworth(False, True, True, 2, 0.5, 2, 5.0, 0.01)
+    _local.filter.apply(d)
+
+
+def window(d):
+    _WindowData(d, TimeWindow(d.t0 + 1.0, d.endtime() - 1.0))
+
+
+def powerspectrum(d):
+    if not hasattr(_local, "engine"):
+        _local.engine = MTPowerSpectrumEngine(d.npts, 2.5, 4)
+    _local.engine.apply(d)
+
+
+def run(func, data, nthreads):
+    t = time.time()
+    with ThreadPoolExecutor(max_workers=nthreads) as executor:
+        list(executor.map(func, data))
+    return time.time() - t
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ndata", type=int, default=200)
+    parser.add_argument("--npts", type=int, default=20000)
+    parser.add_argument("--max_threads", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    tsdata = [make_timeseries(args.npts) for i in range(args.ndata)]
+    seisdata = [make_seismogram(args.npts) for i in range(args.ndata)]
+    tests = [
+        ("Butterworth.apply", butterworth, tsdata),
+        ("_WindowData", window, tsdata),
+        ("agc", lambda d: agc(d, 1.0), seisdata),
+        ("MTPowerSpectrumEngine", powerspectrum, tsdata),
+    ]
+    nthreads_list = [1]
+    while nthreads_list[-1] * 2 <= args.max_threads:
+        nthreads_list.append(nthreads_list[-1] * 2)
+    print(
+        "{:24s}".format("function")
+        + "".join(["{:>10s}".format("{} thr".format(n)) for n in nthreads_list])
+    )
+    for name, func, data in tests:
+        # warm up - also builds the thread local processing objects
+        run(func, data, max(nthreads_list))
+        t1 = run(func, data, 1)
+        line = "{:24s}".format(name)
+        for n in nthreads_list:
+            line += "{:9.2f}x".format(t1 / run(func, data, n))
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark of the time interval search in MiniseedMatcher.
+
+Builds a synthetic channel table with many epochs per channel and matches
+a set of synthetic wf_miniseed documents three ways:  a linear scan of the
+cached list of epochs (the algorithm the interval index replaced),
+find_doc, and the vectorized find_many.  Does not require MongoDB.
+Run with:
+
+    python python/tests/manual/mbench_miniseed_matcher.py --nepochs 50
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from bson import ObjectId
+
+from mspasspy.db.normalize import MiniseedMatcher
+
+EPOCH_LENGTH = 86400.0 * 30
+
+
+def make_channel_df(nstations, nepochs):
+    rows = []
+    for i in range(nstations):
+        for chan in ["BHE", "BHN", "BHZ"]:
+            for j in range(nepochs):
+                rows.append(
+                    {
+                        "_id": ObjectId(),
+                        "net": "XX",
+                        "sta": "S{:04d}".format(i),
+                        "chan": chan,
+                        "loc": "",
+                        "starttime": j * EPOCH_LENGTH,
+                        "endtime": (j + 1) * EPOCH_LENGTH,
+                        "lat": 45.0,
+                        "lon": -120.0,
+                        "elev": 1.0,
+                        "hang": 0.0,
+                        "vang": 90.0,
+                    }
+                )
+    return pd.DataFrame(rows)
+
+
+def make_wf_docs(nstations, nepochs, ndocs):
+    rng = np.random.default_rng(42)
+    docs = []
+    for i in range(ndocs):
+        docs.append(
+            {
+                "net": "XX",
+                "sta": "S{:04d}".format(rng.integers(nstations)),
+                "chan": ["BHE", "BHN", "BHZ"][rng.integers(3)],
+                "loc": "",
+                "starttime": rng.uniform(0.0, nepochs * EPOCH_LENGTH),
+            }
+        )
+    return docs
+
+
+def linear_find_doc(matcher, doc):
+    testid = matcher.db_make_cache_id(doc)
+    for md in matcher.normcache.get(testid, []):
+        if (
+            doc["starttime"] >= md["channel_starttime"]
+            and doc["starttime"] <= md["channel_endtime"]
+        ):
+            return md
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nstations", type=int, default=100)
+    parser.add_argument("--nepochs", type=int, default=50)
+    parser.add_argument("--ndocs", type=int, default=100000)
+    args = parser.parse_args()
+
+    df = make_channel_df(args.nstations, args.nepochs)
+    docs = make_wf_docs(args.nstations, args.nepochs, args.ndocs)
+    t = time.time()
+    matcher = MiniseedMatcher(df)
+    print(
+        "constructor:  {:.2f} s for {} channel epochs".format(time.time() - t, len(df))
+    )
+
+    t = time.time()
+    linear = [linear_find_doc(matcher, doc) for doc in docs]
+    tlinear = time.time() - t
+    t = time.time()
+    indexed = [matcher.find_doc(doc) for doc in docs]
+    tindexed = time.time() - t
+    t = time.time()
+    bulk = matcher.find_many(docs)
+    tbulk = time.time() - t
+    for a, b, c in zip(linear, indexed, bulk):
+        assert a is b and a is c
+
+    print("{:20s} {:>12s} {:>8s}".format("method", "us/doc", "speedup"))
+    for name, tmethod in [
+        ("linear scan", tlinear),
+        ("find_doc", tindexed),
+        ("find_many", tbulk),
+    ]:
+        print(
+            "{:20s} {:12.2f} {:7.1f}x".format(
+                name, 1.0e6 * tmethod / args.ndocs, tlinear / tmethod
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
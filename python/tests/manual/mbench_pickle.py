@@ -0,0 +1,117 @@
+"""
+Benchmark of pickle round trip throughput for the seismic data objects.
+
+Times pickle.dumps followed by pickle.loads for a TimeSeries, a Seismogram
+and ensembles of each with protocol 4 and with protocol 5 using out-of-band
+sample buffers (the way dask and spark serialize data between workers).
+Run with:
+
+    python python/tests/manual/mbench_pickle.py --npts 10000 --nmembers 500
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from mspasspy.ccore.seismic import (
+    DoubleVector,
+    Seismogram,
+    SeismogramEnsemble,
+    TimeSeries,
+    TimeSeriesEnsemble,
+)
+from mspasspy.ccore.utility import dmatrix, Metadata
+
+
+def make_timeseries(npts):
+    ts = TimeSeries(npts)
+    ts.set_live()
+    ts.dt = 0.01
+    ts.t0 = 0.0
+    for key in ["net", "sta", "chan", "loc"]:
+        ts[key] = "XX"
+    ts["site_lat"] = 45.0
+    ts["site_lon"] = -120.0
+    ts.data = DoubleVector(np.random.rand(npts))
+    return ts
+
+
+def make_seismogram(npts):
+    seis = Seismogram(npts)
+    seis.set_live()
+    seis.dt = 0.01
+    seis.t0 = 0.0
+    for key in ["net", "sta", "loc"]:
+        seis[key] = "XX"
+    seis["site_lat"] = 45.0
+    seis["site_lon"] = -120.0
+    seis.data = dmatrix(np.random.rand(3, npts))
+    return seis
+
+
+def make_ensemble(ensemble_type, datum, nmembers):
+    ens = ensemble_type(Metadata({"source_id": "test"}), nmembers)
+    for i in range(nmembers):
+        ens.member.append(datum)
+    ens.set_live()
+    return ens
+
+
+def round_trip(d, protocol, out_of_band):
+    if out_of_band:
+        buffers = []
+        s = pickle.dumps(d, protocol=protocol, buffer_callback=buffers.append)
+        return pickle.loads(s, buffers=buffers)
+    else:
+        return pickle.loads(pickle.dumps(d, protocol=protocol))
+
+
+def time_round_trip(d, protocol, out_of_band, ntrials):
+    t = time.time()
+    for i in range(ntrials):
+        round_trip(d, protocol, out_of_band)
+    return (time.time() - t) / ntrials
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--npts", type=int, default=10000)
+    parser.add_argument("--nmembers", type=int, default=500)
+    parser.add_argument("--ntrials", type=int, default=20)
+    args = parser.parse_args()
+
+    ts = make_timeseries(args.npts)
+    seis = make_seismogram(args.npts)
+    tests = [
+        ("TimeSeries", ts, args.ntrials * 50),
+        ("Seismogram", seis, args.ntrials * 50),
+        (
+            "TimeSeriesEnsemble",
+            make_ensemble(TimeSeriesEnsemble, ts, args.nmembers),
+            args.ntrials,
+        ),
+        (
+            "SeismogramEnsemble",
+            make_ensemble(SeismogramEnsemble, seis, args.nmembers),
+            args.ntrials,
+        ),
+    ]
+    print(
+        "{:20s} {:>10s} {:>14s} {:>14s} {:>8s}".format(
+            "object", "MB", "protocol 4", "5 out-of-band", "speedup"
+        )
+    )
+    for name, d, ntrials in tests:
+        nbytes = len(pickle.dumps(d, protocol=4)) / 1.0e6
+        t4 = time_round_trip(d, 4, False, ntrials)
+        t5 = time_round_trip(d, 5, True, ntrials)
+        print(
+            "{:20s} {:10.2f} {:11.1f} MB/s {:11.1f} MB/s {:7.1f}x".format(
+                name, nbytes, nbytes / t4, nbytes / t5, t4 / t5
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Benchmark of the driver side metadata loading stage of read_distributed_data.
+
+Compares read_to_dataframe (batched $in queries) against the one find_one
+per wf document and per normalizing document access pattern it replaced.
+Requires a MongoDB server on localhost.  Run with:
+
+    python python/tests/manual/mbench_read_to_dataframe.py --ndocs 20000
+"""
+import argparse
+import time
+
+import pandas as pd
+from bson.objectid import ObjectId
+
+from mspasspy.db.client import DBClient
+from mspasspy.db.database import Database
+from mspasspy.io.distributed import read_to_dataframe
+
+
+def build_test_db(db, ndocs, nsites):
+    site_ids = [ObjectId() for i in range(nsites)]
+    db["site"].insert_many(
+        [
+            {"_id": sid, "net": "XX", "sta": "S{}".format(i), "lat": 1.0, "lon": 2.0}
+            for i, sid in enumerate(site_ids)
+        ]
+    )
+    docs = []
+    for i in range(ndocs):
+        docs.append(
+            {
+                "npts": 1000,
+                "delta": 0.01,
+                "starttime": float(i),
+                "site_id": site_ids[i % nsites],
+                "storage_mode": "gridfs",
+                "gridfs_id": ObjectId(),
+            }
+        )
+    db["wf_TimeSeries"].insert_many(docs)
+
+
+def legacy_read(db, cursor, normalize):
+    # the access pattern of the original implementation
+    md_list = []
+    for doc in list(cursor):
+        object_doc = db["wf_TimeSeries"].find_one({"_id": doc["_id"]})
+        md = dict(object_doc)
+        for col in normalize:
+            ndoc = db[col].find_one({"_id": object_doc[col + "_id"]})
+            if ndoc:
+                md[col + "_lat"] = ndoc["lat"]
+                md[col + "_lon"] = ndoc["lon"]
+        md_list.append(md)
+    return pd.json_normalize(md_list)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ndocs", type=int, default=10000)
+    parser.add_argument("--nsites", type=int, default=100)
+    parser.add_argument("--batch_size", type=int, default=1000)
+    args = parser.parse_args()
+
+    client = DBClient("localhost")
+    client.drop_database("mspasspy_bench_db")
+    db = Database(client, "mspasspy_bench_db")
+    build_test_db(db, args.ndocs, args.nsites)
+
+    t = time.time()
+    legacy_read(db, db["wf_TimeSeries"].find({}), ["site"])
+    t_legacy = time.time() - t
+
+    t = time.time()
+    read_to_dataframe(
+        db,
+        db["wf_TimeSeries"].find({}),
+        normalize=["site"],
+        batch_size=args.batch_size,
+    )
+    t_batched = time.time() - t
+
+    print("documents:                 {}".format(args.ndocs))
+    print(
+        "find_one per document:     {:.3f} s  ({:.0f} docs/s)".format(
+            t_legacy, args.ndocs / t_legacy
+        )
+    )
+    print(
+        "batched read_to_dataframe: {:.3f} s  ({:.0f} docs/s)".format(
+            t_batched, args.ndocs / t_batched
+        )
+    )
+    print("speedup:                   {:.1f}x".format(t_legacy / t_batched))
+    client.drop_database("mspasspy_bench_db")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark of the throughput of RFdecon for each supported algorithm.
+
+Runs RFdecon on a set of synthetic Seismogram objects three ways:
+constructing a new RFdeconProcessor for every datum (the cost of parsing
+the pf and constructing the operator on every call), with the default
+processor cached per thread, and with a processor passed explicitly
+with the processor argument.  Reports the number of Seismograms
+processed per second.  The multitaper algorithms need a noise window so
+the data start 40 s before the time reference.  Does not require MongoDB.
+Run with:
+
+    python python/tests/manual/mbench_rfdecon.py --ndata 200 --pf data/pf/RFdeconProcessor.pf
+"""
+import argparse
+import time
+
+import numpy as np
+
+from mspasspy.ccore.seismic import Seismogram
+from mspasspy.ccore.utility import dmatrix
+from mspasspy.algorithms.RFdeconProcessor import RFdeconProcessor, RFdecon
+
+ALGORITHMS = ["LeastSquares", "WaterLevel", "MultiTaperXcor", "MultiTaperSpecDiv"]
+
+
+def make_data(ndata, npts, dt):
+    rng = np.random.default_rng(42)
+    data = []
+    for i in range(ndata):
+        d = Seismogram(npts)
+        d.set_live()
+        d.dt = dt
+        d.t0 = -40.0
+        x = rng.normal(size=(3, npts))
+        # a simple P wavelet on all components at time 0
+        i0 = int(40.0 / dt)
+        x[:, i0 : i0 + 20] += 20.0 * np.hanning(20)
+        d.data = dmatrix(x)
+        data.append(d)
+    return data
+
+
+def run(data, alg, pf, mode):
+    processor = RFdeconProcessor(alg, pf) if mode == "explicit" else None
+    t = time.time()
+    for d in data:
+        if mode == "per-call":
+            result = RFdecon(d, processor=RFdeconProcessor(alg, pf))
+        elif mode == "explicit":
+            result = RFdecon(d, processor=processor)
+        else:
+            result = RFdecon(d, alg=alg, pf=pf)
+        if result.dead():
+            raise RuntimeError("RFdecon killed a datum with alg=" + alg)
+    return len(data) / (time.time() - t)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ndata", type=int, default=200)
+    parser.add_argument("--npts", type=int, default=2001)
+    parser.add_argument("--dt", type=float, default=0.05)
+    parser.add_argument("--pf", type=str, default="RFdeconProcessor.pf")
+    args = parser.parse_args()
+
+    data = make_data(args.ndata, args.npts, args.dt)
+    modes = ["per-call", "cached", "explicit"]
+    print(
+        "{:18s} {:>12s} {:>12s} {:>12s}   (Seismograms/s)".format("algorithm", *modes)
+    )
+    for alg in ALGORITHMS:
+        rates = [run(data, alg, args.pf, mode) for mode in modes]
+        print("{:18s} {:12.1f} {:12.1f} {:12.1f}".format(alg, *rates))
+
+
+if __name__ == "__main__":
+    main()
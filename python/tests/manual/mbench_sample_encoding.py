@@ -0,0 +1,110 @@
+"""
+Benchmark of the sample encodings available with the sample_encoding
+argument of save_data.
+
+For each encoding writes a set of TimeSeries to a file with the same
+functions used by Database._save_data_to_dfile and reads them back with
+the functions used by read_data.   Reports the size relative to raw
+doubles and the write and read throughput in MB/s of raw data.  Two
+kinds of data are used:  integer counts similar to raw data converted
+from miniseed and the same data after a scaling to ground motion units
+that leaves them not integer valued.  Does not require MongoDB.
+Run with:
+
+    python python/tests/manual/mbench_sample_encoding.py --ndata 200 --npts 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from mspasspy.ccore.io import _fread_from_file, _fwrite_to_file
+from mspasspy.ccore.seismic import DoubleVector, TimeSeries
+from mspasspy.io.sample_codec import (
+    SAMPLE_ENCODINGS,
+    _mspasspy_has_zstandard,
+    read_samples,
+    write_samples,
+)
+
+
+def make_data(ndata, npts, integer):
+    rng = np.random.default_rng(42)
+    data = []
+    for i in range(ndata):
+        # smoothed random walk:  low frequency energy like real noise
+        x = np.cumsum(rng.normal(scale=50.0, size=npts))
+        x = np.convolve(x, np.ones(5) / 5.0, mode="same")
+        x = np.round(x)
+        if not integer:
+            x *= 1.234e-9
+        ts = TimeSeries(npts)
+        ts.set_live()
+        ts.dt = 0.01
+        ts.data = DoubleVector(x)
+        data.append(ts)
+    return data
+
+
+def run(dir, data, encoding):
+    dfile = "mbench_sample_encoding_" + encoding + ".dat"
+    t = time.time()
+    chunks = []
+    for ts in data:
+        if encoding == "float64":
+            chunks.append((_fwrite_to_file(ts, dir, dfile), 8 * ts.npts, None))
+        else:
+            chunks.append(write_samples(ts, dir, dfile, encoding))
+    twrite = time.time() - t
+    nbytes = os.path.getsize(os.path.join(dir, dfile))
+    t = time.time()
+    for ts, (foff, n, used) in zip(data, chunks):
+        d = TimeSeries(ts.npts)
+        if used is None:
+            _fread_from_file(d, dir, dfile, foff)
+        else:
+            read_samples(d, dir, dfile, foff, n, used)
+    tread = time.time() - t
+    used = set([c[2] for c in chunks])
+    return nbytes, twrite, tread, used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ndata", type=int, default=200)
+    parser.add_argument("--npts", type=int, default=100000)
+    parser.add_argument("--dir", type=str, default=None)
+    args = parser.parse_args()
+
+    mbytes = 8.0 * args.ndata * args.npts / 1.0e6
+    encodings = [e for e in SAMPLE_ENCODINGS]
+    if not _mspasspy_has_zstandard:
+        print("zstandard is not installed:  skipping shuffle_zstd")
+        encodings.remove("shuffle_zstd")
+    for integer in [True, False]:
+        data = make_data(args.ndata, args.npts, integer)
+        print()
+        print("integer valued data" if integer else "scaled data")
+        print(
+            "{:14s} {:>8s} {:>12s} {:>12s}  {}".format(
+                "encoding", "ratio", "write MB/s", "read MB/s", "used"
+            )
+        )
+        with tempfile.TemporaryDirectory(dir=args.dir) as dir:
+            for encoding in encodings:
+                nbytes, twrite, tread, used = run(dir, data, encoding)
+                print(
+                    "{:14s} {:8.3f} {:12.0f} {:12.0f}  {}".format(
+                        encoding,
+                        nbytes / (mbytes * 1.0e6),
+                        mbytes / twrite,
+                        mbytes / tread,
+                        ",".join([str(u) for u in used]),
+                    )
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark of the schema operations run by every Database construction
+and by read_data.
+
+Times the construction of DatabaseSchema and MetadataSchema (done by
+every Database constructor, including on workers) and the lookup of the
+TimeSeries definition for data read from wf_miniseed with the cached
+MetadataSchema.view compared to the deepcopy and swap_collection that
+read_data previously ran for every datum.  Does not require MongoDB.
+Run with:
+
+    python python/tests/manual/mbench_schema.py --n 1000
+"""
+import argparse
+import copy
+import time
+
+from mspasspy.db.schema import DatabaseSchema, MetadataSchema
+
+
+def timeit(func, n):
+    t = time.time()
+    for i in range(n):
+        func()
+    return 1000.0 * (time.time() - t) / n
+
+
+def swap_copy(mdschema, dbschema):
+    temp = copy.deepcopy(mdschema)
+    temp["TimeSeries"].swap_collection("wf_TimeSeries", "wf_miniseed", dbschema)
+    return temp["TimeSeries"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--n", type=int, default=1000)
+    args = parser.parse_args()
+
+    t = time.time()
+    dbschema = DatabaseSchema()
+    mdschema = MetadataSchema()
+    print(
+        "first construction (parses mspass.yaml): {:.1f} ms".format(
+            1000.0 * (time.time() - t)
+        )
+    )
+    nconstruct = max(args.n // 10, 1)
+    print("{:32s} {:>10s}".format("operation", "ms"))
+    for name, func, n in [
+        ("DatabaseSchema()", DatabaseSchema, nconstruct),
+        ("MetadataSchema()", MetadataSchema, nconstruct),
+        ("deepcopy and swap_collection", lambda: swap_copy(mdschema, dbschema), args.n),
+        (
+            "MetadataSchema.view",
+            lambda: mdschema.view("TimeSeries", "wf_miniseed", dbschema),
+            args.n,
+        ),
+    ]:
+        print("{:32s} {:10.4f}".format(name, timeit(func, n)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark of the shared caches of the normalization matchers created
+by share_cache.
+
+Builds a MiniseedMatcher and an OriginTimeMatcher from synthetic
+channel and source DataFrames and reports for the in memory and the
+shared versions of each the size of the pickle sent to every worker,
+the time to unpickle it, and the time per find_one call.  Does not
+require MongoDB.  Run with:
+
+    python python/tests/manual/mbench_shared_cache.py --nchannels 400000 --nsources 100000
+"""
+import argparse
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from mspasspy.ccore.seismic import TimeSeries
+from mspasspy.db.normalize import MiniseedMatcher, OriginTimeMatcher
+
+
+def make_channels(n):
+    rng = np.random.default_rng(42)
+    nsta = max(n // 6, 1)
+    i = np.arange(n)
+    return pd.DataFrame(
+        {
+            "net": ["N{}".format(k % 50) for k in i],
+            "sta": ["S{}".format(k % nsta) for k in i],
+            "chan": [["BHE", "BHN", "BHZ"][k % 3] for k in i],
+            "loc": [["00", "10"][(k // 3) % 2] for k in i],
+            "starttime": np.zeros(n),
+            "endtime": np.full(n, 2.0e9),
+            "lat": rng.uniform(-90.0, 90.0, n),
+            "lon": rng.uniform(-180.0, 180.0, n),
+            "elev": rng.uniform(0.0, 3.0, n),
+            "hang": np.zeros(n),
+            "vang": np.zeros(n),
+            "_id": ["id{}".format(k) for k in i],
+        }
+    )
+
+
+def make_sources(n):
+    rng = np.random.default_rng(42)
+    return pd.DataFrame(
+        {
+            "lat": rng.uniform(-90.0, 90.0, n),
+            "lon": rng.uniform(-180.0, 180.0, n),
+            "depth": rng.uniform(0.0, 700.0, n),
+            "time": np.sort(rng.uniform(1.0e9, 1.6e9, n)),
+            "magnitude": rng.uniform(4.0, 8.0, n),
+        }
+    )
+
+
+def run(name, matcher, data):
+    blob = pickle.dumps(matcher)
+    t = time.time()
+    copy = pickle.loads(blob)
+    tload = time.time() - t
+    t = time.time()
+    for d in data:
+        copy.find_one(d)
+    tfind = (time.time() - t) / len(data)
+    print(
+        "{:24s} {:12.2f} {:12.3f} {:12.1f}".format(
+            name, len(blob) / 1.0e6, tload, 1.0e6 * tfind
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nchannels", type=int, default=400000)
+    parser.add_argument("--nsources", type=int, default=100000)
+    parser.add_argument("--nfind", type=int, default=10000)
+    parser.add_argument("--cache_dir", type=str, default=None)
+    args = parser.parse_args()
+
+    channels = make_channels(args.nchannels)
+    sources = make_sources(args.nsources)
+    rng = np.random.default_rng(1)
+    data = []
+    for k in rng.integers(0, args.nchannels, args.nfind):
+        ts = TimeSeries(10)
+        ts.set_live()
+        for key in ["net", "sta", "chan", "loc"]:
+            ts[key] = channels[key][k]
+        ts.t0 = 1.5e9
+        data.append(ts)
+    times = sources["time"].to_numpy()
+    tsdata = []
+    for k in rng.integers(0, args.nsources, args.nfind):
+        ts = TimeSeries(10)
+        ts.set_live()
+        ts.t0 = times[k]
+        tsdata.append(ts)
+
+    print(
+        "{:24s} {:>12s} {:>12s} {:>12s}".format(
+            "matcher", "pickle MB", "unpickle s", "find_one us"
+        )
+    )
+    matcher = MiniseedMatcher(channels)
+    run("MiniseedMatcher", matcher, data)
+    matcher.share_cache(args.cache_dir)
+    run("MiniseedMatcher shared", matcher, data)
+    matcher = OriginTimeMatcher(sources, source_time_key="time")
+    run("OriginTimeMatcher", matcher, tsdata)
+    matcher.share_cache(args.cache_dir)
+    run("OriginTimeMatcher shared", matcher, tsdata)
+
+
+if __name__ == "__main__":
+    main()
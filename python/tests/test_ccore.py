@@ -9,6 +9,7 @@ import pytest
 from mspasspy.ccore.seismic import (
     _CoreSeismogram,
     _CoreTimeSeries,
+    DoubleVector,
     PowerSpectrum,
     Seismogram,
     SeismogramEnsemble,
@@ -913,6 +914,75 @@ def test_Ensemble(Ensemble):
         assert (es.member[1].data[:] == escopy.member[1].data[:]).all()
 
 
+def test_pickle_protocol5():
+    ts = TimeSeries(100)
+    ts.set_live()
+    ts.dt = 0.01
+    ts.t0 = 1.5
+    ts["sta"] = "AAK"
+    ts.data = DoubleVector(np.random.rand(100))
+    seis = Seismogram(100)
+    seis.set_live()
+    seis.dt = 0.01
+    seis["sta"] = "AAK"
+    seis.data = dmatrix(np.random.rand(3, 100))
+    tse = TimeSeriesEnsemble(Metadata({"k": "v"}), 3)
+    se = SeismogramEnsemble(Metadata({"k": "v"}), 3)
+    for i in range(3):
+        tse.member.append(ts)
+        se.member.append(seis)
+    tse.set_live()
+    se.set_live()
+    tse.elog.log_error("test", "test complaint", ErrorSeverity.Complaint)
+
+    # sample buffers go out-of-band, one per atomic object
+    buffers = []
+    ts_copy = pickle.loads(
+        pickle.dumps(ts, protocol=5, buffer_callback=buffers.append), buffers=buffers
+    )
+    assert len(buffers) == 1
+    assert ts_copy.data == ts.data
+    assert ts_copy.t0 == ts.t0
+    assert ts_copy.dt == ts.dt
+    assert ts_copy["sta"] == "AAK"
+    buffers = []
+    seis_copy = pickle.loads(
+        pickle.dumps(seis, protocol=5, buffer_callback=buffers.append),
+        buffers=buffers,
+    )
+    assert len(buffers) == 1
+    assert (seis_copy.data[:] == seis.data[:]).all()
+    assert seis_copy.cardinal() == seis.cardinal()
+    buffers = []
+    tse_copy = pickle.loads(
+        pickle.dumps(tse, protocol=5, buffer_callback=buffers.append),
+        buffers=buffers,
+    )
+    assert len(buffers) == 3
+    assert tse_copy.live()
+    assert tse_copy["k"] == "v"
+    assert tse_copy.elog.size() == 1
+    assert len(tse_copy.member) == 3
+    assert tse_copy.member[2].data == ts.data
+    buffers = []
+    se_copy = pickle.loads(
+        pickle.dumps(se, protocol=5, buffer_callback=buffers.append),
+        buffers=buffers,
+    )
+    assert len(buffers) == 3
+    assert (se_copy.member[2].data[:] == seis.data[:]).all()
+    # in-band protocol 5 and older protocols must give the same result
+    for protocol in [2, 4, 5]:
+        assert pickle.loads(pickle.dumps(ts, protocol=protocol)).data == ts.data
+        se_copy = pickle.loads(pickle.dumps(se, protocol=protocol))
+        assert (se_copy.member[0].data[:] == seis.data[:]).all()
+    # empty objects
+    ts_copy = pickle.loads(pickle.dumps(TimeSeries(), protocol=5))
+    assert ts_copy.npts == 0
+    seis_copy = pickle.loads(pickle.dumps(Seismogram(), protocol=5))
+    assert seis_copy.npts == 0
+
+
 def test_operators():
     d = _CoreTimeSeries(10)
     d1 = make_constant_data_ts(d, nsamp=10)
@@ -174,6 +174,35 @@ def test_foldby(spark_context):
     assert len(res_dask[1].member) == len(res_spark[1].member)
 
 
+def test_foldby_options():
+    data = []
+    for i in range(30):
+        ts = get_live_timeseries(100)
+        ts["source_id"] = i % 3
+        ts["sta"] = "S{:02d}".format(29 - i)
+        data.append(ts)
+    bag = db.from_sequence(data, npartitions=4)
+    res = bag.mspass_foldby(key="source_id", sort_key="sta").compute()
+    assert len(res) == 3
+    for ens in res:
+        assert isinstance(ens, TimeSeriesEnsemble)
+        assert len(ens.member) == 10
+        sta = [d["sta"] for d in ens.member]
+        assert sta == sorted(sta)
+        assert ens["source_id"] == ens.member[0]["source_id"]
+
+    # groups larger than the limits are spilled into several ensembles
+    res = bag.mspass_foldby(key="source_id", max_members=4).compute()
+    assert sum([len(ens.member) for ens in res]) == 30
+    assert max([len(ens.member) for ens in res]) <= 4
+    assert len(res) >= 9
+    res = bag.mspass_foldby(key="source_id", max_bytes=8 * 100 * 5).compute()
+    assert sum([len(ens.member) for ens in res]) == 30
+    assert max([len(ens.member) for ens in res]) <= 5
+    for ens in res:
+        assert len(set([d["source_id"] for d in ens.member])) == 1
+
+
 if __name__ == "__main__":
     # test_reduce_stack()
     a1 = get_live_seismogram()